@@ -15,10 +15,16 @@ All data follows Schwab API structure and integrates with existing handlers.
 import requests
 import pandas as pd
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from connection_manager import ensure_valid_tokens, is_authentication_paused, make_authenticated_request
+from connection_manager import (
+    ensure_valid_tokens, is_authentication_paused, make_authenticated_request,
+    get_http_session, get_rate_limiter, get_account_snapshot
+)
 from config_loader import get_config
+from atomic_json import write_json_atomic
+from artifact_store import save_artifact
 
 class AccountDataHandler:
     """
@@ -42,6 +48,7 @@ class AccountDataHandler:
             self.rate_limit_delay = self.api_config.get('rate_limit_delay', 60)
             self.base_url = self.api_config.get('base_url', 'https://api.schwabapi.com')
             self.request_timeout = self.api_config.get('request_timeout', 10)
+            self.max_account_workers = self.api_config.get('max_account_workers', 4)
         else:
             # Fallback defaults if config is not available
             self.max_retries = 5
@@ -49,13 +56,21 @@ class AccountDataHandler:
             self.rate_limit_delay = 60
             self.base_url = 'https://api.schwabapi.com'
             self.request_timeout = 10
+            self.max_account_workers = 4
+        
+        # Pooled session and rate limiter shared with concurrent per-account fetches
+        self.session = get_http_session()
+        self.rate_limiter = get_rate_limiter()
 
-    def get_all_accounts(self, include_positions: bool = True) -> List[Dict[str, Any]]:
+    def get_all_accounts(self, include_positions: bool = True,
+                         account_numbers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Get all linked account information for the user with authentication pause support.
         
         Args:
             include_positions (bool): Whether to include position details (default: True)
+            account_numbers (List[str], optional): Account hashes to fetch individually and
+                concurrently instead of using the bulk accounts endpoint
             
         Returns:
             List[Dict[str, Any]]: List of account dictionaries with full details
@@ -65,6 +80,18 @@ class AccountDataHandler:
             print("🛑 Authentication paused - skipping get_all_accounts")
             return []
         
+        if account_numbers:
+            return self.get_account_details_concurrently(account_numbers, include_positions)
+        
+        if include_positions:
+            # Reuse the shared snapshot so summaries, exports and the positions
+            # handler don't each download the same accounts payload
+            snapshot = get_account_snapshot()
+            if snapshot and snapshot.accounts:
+                return snapshot.accounts
+            print("❌ Failed to get accounts data")
+            return []
+        
         try:
             # Build URL with optional fields parameter
             url = f"{self.base_url}/trader/v1/accounts"
@@ -125,7 +152,8 @@ class AccountDataHandler:
                     "Accept": "application/json"
                 }
                 
-                response = requests.get(url, headers=headers, params=params, timeout=self.request_timeout)
+                self.rate_limiter.acquire()
+                response = self.session.get(url, headers=headers, params=params, timeout=self.request_timeout)
                 response.raise_for_status()
                 
                 account_data = response.json()
@@ -160,6 +188,42 @@ class AccountDataHandler:
                     
         return {}
 
+    def get_account_details_concurrently(self, account_numbers: List[str],
+                                         include_positions: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch details for several accounts in parallel with bounded concurrency.
+        
+        Requests share the pooled session and process-wide rate limiter, so a
+        multi-account refresh takes about as long as the slowest account.
+        Results are returned in the order of account_numbers; failed accounts are skipped.
+        
+        Args:
+            account_numbers (List[str]): Account hashes to retrieve
+            include_positions (bool): Whether to include position details (default: True)
+            
+        Returns:
+            List[Dict[str, Any]]: Account details dictionaries
+        """
+        if not account_numbers:
+            return []
+        
+        max_workers = max(1, min(self.max_account_workers, len(account_numbers)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.get_account_details, account_number, include_positions)
+                       for account_number in account_numbers]
+        
+        accounts = []
+        for account_number, future in zip(account_numbers, futures):
+            try:
+                account_data = future.result()
+            except Exception as e:
+                print(f"❌ Error fetching account {account_number}: {e}")
+                continue
+            if account_data:
+                accounts.append(account_data)
+        
+        return accounts
+
     def extract_positions(self, account_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Extract and standardize position data from account response.
@@ -391,8 +455,6 @@ class AccountDataHandler:
             bool: True if successful, False otherwise
         """
         try:
-            import json
-            
             # Create the JSON structure for db_inserter
             account_data = {
                 'strategy_name': 'Account_Data',
@@ -444,8 +506,7 @@ class AccountDataHandler:
                 account_data['account_data'][account_number] = account_record
             
             # Write to account_data.json in root directory
-            with open('account_data.json', 'w') as f:
-                json.dump(account_data, f, indent=2)
+            save_artifact('account_data.json', account_data, records_key='account_data')
             
             return True
             
@@ -495,7 +556,6 @@ class AccountDataHandler:
         }
         
         # Save to file
-        import json
         import os
         
         # Ensure the account_data directory exists
@@ -505,8 +565,7 @@ class AccountDataHandler:
         # Create full path
         full_path = os.path.join(account_dir, filename)
         
-        with open(full_path, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        write_json_atomic(full_path, export_data, default=str)
         
         print(f"Saved account data to {full_path}")
         return export_data
@@ -514,8 +573,6 @@ class AccountDataHandler:
     def create_account_data_json(self) -> bool:
         """Create account_data.json file for database insertion matching the account_data table schema"""
         try:
-            import json
-            
             # Get all account summaries
             summaries = self.get_all_account_summaries()
             
@@ -573,8 +630,7 @@ class AccountDataHandler:
                 account_data['account_data'][account_number] = account_record
             
             # Write to account_data.json in root directory
-            with open('account_data.json', 'w') as f:
-                json.dump(account_data, f, indent=2)
+            save_artifact('account_data.json', account_data, records_key='account_data')
             
             print(f"✅ Created account_data.json with {len(summaries)} accounts")
             print(f"📊 Accounts processed: {list(account_data['account_data'].keys())}")
@@ -27,6 +27,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import os
 from pathlib import Path
+from atomic_json import write_json_atomic
 
 # Configure logging
 logging.basicConfig(
@@ -355,8 +356,7 @@ class AlertManager:
                 'last_updated': datetime.now().isoformat()
             }
             
-            with open(history_file, 'w') as f:
-                json.dump(history_data, f, indent=2, default=str)
+            write_json_atomic(history_file, history_data, default=str)
                 
             logger.info(f"Saved {len(recent_alerts)} alerts to history")
             
@@ -11,6 +11,7 @@ import time
 from datetime import datetime
 from email_notification_engine import EmailNotificationEngine
 from db_query_handler import DatabaseQueryHandler
+from artifact_store import load_artifact
 
 # Setup logging
 logging.basicConfig(
@@ -168,8 +169,7 @@ class AlertMonitor:
             # Load account data from JSON file
             account_file = 'account_data.json'
             if os.path.exists(account_file):
-                with open(account_file, 'r') as f:
-                    account_data = json.load(f)
+                account_data = load_artifact(account_file)
                 return account_data
             else:
                 logger.warning(f"⚠️ Account data file not found: {account_file}")
@@ -184,8 +184,7 @@ class AlertMonitor:
             # Load positions from JSON file
             positions_file = 'current_positions.json'
             if os.path.exists(positions_file):
-                with open(positions_file, 'r') as f:
-                    positions_data = json.load(f)
+                positions_data = load_artifact(positions_file)
                 return positions_data
             else:
                 logger.warning(f"⚠️ Positions data file not found: {positions_file}")
@@ -200,8 +199,7 @@ class AlertMonitor:
             # Load VIX data from JSON file created by vix_data_handler.py
             vix_file = 'vix_data.json'
             if os.path.exists(vix_file):
-                with open(vix_file, 'r') as f:
-                    vix_data = json.load(f)
+                vix_data = load_artifact(vix_file)
                 
                 # Extract VIX information from the data structure
                 vix_info = vix_data.get('vix_data', {})
@@ -11,6 +11,7 @@ import sys
 from datetime import datetime, timezone
 import requests
 from pathlib import Path
+from atomic_json import write_json_atomic
 
 # Add the current directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -241,8 +242,7 @@ class APIStatusExporter:
         try:
             status = self.export_status()
             
-            with open(filename, 'w') as f:
-                json.dump(status, f, indent=2, default=str)
+            write_json_atomic(filename, status, default=str)
             
             print(f"✅ API status exported to {filename}")
             
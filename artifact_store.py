@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Artifact Store
+
+Embedded SQLite store for the documents strategies, calculators and handlers
+exchange between processes (indicator and signal files, current positions,
+account data, P&L statistics, watchlist, options and VIX data), so consumers no
+longer have to re-parse every JSON file on every tick.
+
+- WAL journal: readers in any number of processes run concurrently with the one
+  writer and always see the last committed version of a document
+- The per-symbol collection of a document ('indicators', 'signals', 'positions',
+  ...) is stored one row per key, so consumers can load only the symbols they
+  need with load_artifact_records()
+- Every document carries a version, so load_artifact_cached() only re-reads a
+  document after it changed
+
+Documents are addressed by their JSON path. save_artifact() still writes the
+JSON file (atomically) as a compatibility view for anything that reads files
+directly, and load_artifact() falls back to the file when the store does not
+have the document or the file was rewritten after it (by a writer that does not
+use the store).
+
+Usage:
+    save_artifact('current_positions.json', positions_json_data, records_key='positions')
+    positions = load_artifact_records('current_positions.json', 'positions')
+    indicators = load_artifact_records(path, 'indicators', keys=['AAPL', 'MSFT'])
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from atomic_json import dumps_json, loads_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_STORE_FILE = os.path.join(BASE_DIR, 'artifact_store.db')
+
+# SQLite's default limit on bound parameters is 999
+_MAX_KEYS_PER_QUERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    records_key TEXT,
+    document TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifact_records (
+    name TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (name, record_key)
+) WITHOUT ROWID;
+"""
+
+
+def artifact_name(path: str) -> str:
+    """Store name of a JSON path: the path relative to the repository root"""
+    return os.path.relpath(os.path.abspath(path), BASE_DIR).replace(os.sep, '/')
+
+
+class ArtifactStore:
+    """SQLite-backed document store with one row per record of a document's collection"""
+
+    def __init__(self, db_path: str = ARTIFACT_STORE_FILE):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections are not shared between threads)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            # WAL makes NORMAL crash-safe; commits skip the per-transaction fsync
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def put(self, name: str, document: Dict[str, Any], records_key: Optional[str] = None,
+            default: Optional[Callable[[Any], Any]] = None) -> int:
+        """
+        Replace a document.
+
+        Args:
+            name: Artifact name (see artifact_name)
+            document: Document to store
+            records_key: Key of the document's {key: record} collection to store one row per record
+            default: Fallback for unsupported types, as in json.dump (e.g. str)
+
+        Returns:
+            The document's new version
+        """
+        records = document.get(records_key) if records_key else None
+        if isinstance(records, dict):
+            # Placeholder keeps the collection's position among the document's keys
+            body = dict(document)
+            body[records_key] = None
+            rows = [
+                (name, str(key), position, dumps_json(record, default=default).decode('utf-8'))
+                for position, (key, record) in enumerate(records.items())
+            ]
+        else:
+            body, records_key, rows = document, None, []
+        body_text = dumps_json(body, default=default).decode('utf-8')
+
+        connection = self._connection()
+        with self._write_lock:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = connection.execute('SELECT version FROM artifacts WHERE name = ?', (name,)).fetchone()
+                version = (row[0] if row else 0) + 1
+                connection.execute(
+                    'INSERT OR REPLACE INTO artifacts (name, version, updated_at, records_key, document) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (name, version, time.time(), records_key, body_text)
+                )
+                connection.execute('DELETE FROM artifact_records WHERE name = ?', (name,))
+                connection.executemany(
+                    'INSERT INTO artifact_records (name, record_key, position, data) VALUES (?, ?, ?, ?)', rows
+                )
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        return version
+
+    def version(self, name: str) -> Optional[Tuple[int, float]]:
+        """(version, updated_at) of a document, or None if it is not stored"""
+        row = self._connection().execute(
+            'SELECT version, updated_at FROM artifacts WHERE name = ?', (name,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def get(self, name: str) -> Optional[Tuple[int, float, Dict[str, Any]]]:
+        """(version, updated_at, document) of a document, or None if it is not stored"""
+        connection = self._connection()
+        # One read transaction: the document and its records come from the same commit
+        connection.execute('BEGIN')
+        try:
+            row = connection.execute(
+                'SELECT version, updated_at, records_key, document FROM artifacts WHERE name = ?', (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            version, updated_at, records_key, document_text = row
+            document = loads_json(document_text)
+            if records_key:
+                document[records_key] = {
+                    key: loads_json(data) for key, data in connection.execute(
+                        'SELECT record_key, data FROM artifact_records WHERE name = ? ORDER BY position', (name,)
+                    )
+                }
+        finally:
+            connection.execute('COMMIT')
+        return version, updated_at, document
+
+    def get_records(self, name: str, records_key: str,
+                    keys: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Records of a document's collection, optionally only the given keys.
+
+        Returns:
+            {key: record} in document order, or None if the document is not
+            stored with records_key as its collection
+        """
+        connection = self._connection()
+        connection.execute('BEGIN')
+        try:
+            row = connection.execute('SELECT records_key FROM artifacts WHERE name = ?', (name,)).fetchone()
+            if row is None or row[0] != records_key:
+                return None
+
+            if keys is None:
+                rows = connection.execute(
+                    'SELECT record_key, data, position FROM artifact_records WHERE name = ?', (name,)
+                ).fetchall()
+            else:
+                keys = [str(key) for key in keys]
+                rows = []
+                for start in range(0, len(keys), _MAX_KEYS_PER_QUERY):
+                    chunk = keys[start:start + _MAX_KEYS_PER_QUERY]
+                    rows.extend(connection.execute(
+                        f"SELECT record_key, data, position FROM artifact_records "
+                        f"WHERE name = ? AND record_key IN ({','.join('?' * len(chunk))})",
+                        (name, *chunk)
+                    ))
+        finally:
+            connection.execute('COMMIT')
+        return {key: loads_json(data) for key, data, _ in sorted(rows, key=lambda row: row[2])}
+
+
+_artifact_store = None
+_artifact_store_unavailable = False
+_artifact_store_lock = threading.Lock()
+
+# Parsed documents for load_artifact_cached: name -> ((version, file mtime), document)
+_artifact_cache: Dict[str, Tuple[Tuple, Optional[Dict[str, Any]]]] = {}
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Get the process-wide artifact store (None if the database cannot be opened)."""
+    global _artifact_store, _artifact_store_unavailable
+    if _artifact_store is None and not _artifact_store_unavailable:
+        with _artifact_store_lock:
+            if _artifact_store is None and not _artifact_store_unavailable:
+                try:
+                    _artifact_store = ArtifactStore()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Artifact store unavailable, using JSON files only: {e}")
+                    _artifact_store_unavailable = True
+    return _artifact_store
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _read_json_file(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'rb') as f:
+            return loads_json(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _stored_version(path: str) -> Optional[Tuple[int, float]]:
+    """(version, updated_at) of the stored document if it is at least as new as the JSON file"""
+    store = get_artifact_store()
+    if store is None:
+        return None
+    try:
+        info = store.version(artifact_name(path))
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Artifact store read failed for {path}: {e}")
+        return None
+    mtime = _file_mtime(path)
+    if info is None or (mtime is not None and mtime > info[1]):
+        return None
+    return info
+
+
+def save_artifact(path: str, document: Dict[str, Any], records_key: Optional[str] = None,
+                  default: Optional[Callable[[Any], Any]] = None):
+    """
+    Publish a document to the store and export its JSON compatibility file.
+
+    Args:
+        path: JSON file path (also the document's name in the store)
+        document: Document to publish
+        records_key: Key of the document's per-symbol collection, stored one row per
+            record so it can be queried by symbol
+        default: Fallback for unsupported types, as in json.dump (e.g. str)
+    """
+    # File first: the stored document is then never older than the file, which
+    # readers use to detect files rewritten by writers that bypass the store
+    write_json_atomic(path, document, default=default)
+    store = get_artifact_store()
+    if store is not None:
+        try:
+            store.put(artifact_name(path), document, records_key, default)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not store {path} in the artifact store: {e}")
+
+
+def load_artifact(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a document (a new copy the caller may modify).
+
+    Returns:
+        The stored document, the JSON file's contents if the store has no newer
+        version, or None if neither exists
+    """
+    if _stored_version(path) is not None:
+        try:
+            stored = get_artifact_store().get(artifact_name(path))
+            if stored is not None:
+                return stored[2]
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Artifact store read failed for {path}: {e}")
+    return _read_json_file(path)
+
+
+def load_artifact_cached(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a document, reusing the previously loaded one until it changes.
+
+    The returned document is shared between callers and must not be modified.
+    """
+    name = artifact_name(path)
+    signature = (_stored_version(path), _file_mtime(path))
+    with _artifact_cache_lock:
+        cached = _artifact_cache.get(name)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    document = load_artifact(path)
+    with _artifact_cache_lock:
+        _artifact_cache[name] = (signature, document)
+    return document
+
+
+def load_artifact_records(path: str, records_key: str, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Load the per-symbol collection of a document, optionally only some keys.
+
+    Args:
+        path: JSON file path of the document
+        records_key: Collection key ('indicators', 'signals', 'positions', ...)
+        keys: Symbols (or other record keys) to load; None loads all
+
+    Returns:
+        {key: record} ({} if the document does not exist)
+    """
+    if _stored_version(path) is not None:
+        try:
+            records = get_artifact_store().get_records(artifact_name(path), records_key, keys)
+            if records is not None:
+                return records
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Artifact store read failed for {path}: {e}")
+
+    document = load_artifact(path) or {}
+    records = document.get(records_key) or {}
+    if keys is None:
+        return records
+    return {key: records[key] for key in keys if key in records}
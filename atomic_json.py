@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Atomic JSON Writer
+
+Shared writer for the JSON files strategies, calculators and handlers hand to
+other processes (indicator/signal files, positions, account and P&L data).
+
+Files are written to a temp file in the same directory, fsynced and renamed over
+the target, so readers such as DatabaseInserter or the trading engines only ever
+see the previous or the new complete file, never a partially written one.
+
+Encoding (and loads_json decoding) uses orjson when it is installed and the
+standard library otherwise. Both understand NumPy scalars and arrays directly,
+so indicator dicts no longer need a recursive conversion pass before writing,
+and both write NaN/Infinity as null (NaN is not valid JSON). Output is compact
+unless indent=True.
+"""
+
+import dataclasses
+import json
+import math
+import os
+import threading
+from enum import Enum
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_default(obj: Any) -> Any:
+    """
+    json default hook for NumPy scalars and arrays, enums and dataclasses.
+
+    Produces the same values orjson writes for these types natively, so output
+    does not depend on which encoder is installed.
+    """
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _chain_default(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """json_default, then the caller's default (e.g. str) for anything else"""
+    if default is None:
+        return json_default
+
+    def chained(obj):
+        try:
+            return json_default(obj)
+        except TypeError:
+            return default(obj)
+    return chained
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of a JSON-like structure with NaN/Infinity replaced by None"""
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(item) for item in obj]
+    if isinstance(obj, np.ndarray):
+        return _finite(obj.tolist())
+    return obj
+
+
+def dumps_json(data: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode data as UTF-8 JSON.
+
+    Args:
+        data: Value to encode (NumPy scalars/arrays allowed)
+        indent: Indent with 2 spaces instead of writing compact JSON
+        default: Fallback for other unsupported types, as in json.dump (e.g. str)
+
+    Returns:
+        Encoded bytes
+    """
+    default = _chain_default(default)
+    if orjson is not None:
+        # Datetimes go through default like with json.dump, keeping e.g. default=str output unchanged
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=option)
+
+    kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+    try:
+        text = json.dumps(data, default=default, ensure_ascii=False, allow_nan=False, **kwargs)
+    except ValueError:
+        # Out of range float somewhere; only then pay for a conversion pass
+        text = json.dumps(_finite(data), default=lambda obj: _finite(default(obj)),
+                          ensure_ascii=False, allow_nan=False, **kwargs)
+    return text.encode('utf-8')
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json_atomic(path: str, data: Any, indent: bool = False,
+                      default: Optional[Callable[[Any], Any]] = None, fsync: bool = True):
+    """
+    Replace a JSON file atomically.
+
+    Args:
+        path: Target file
+        data: Value to write
+        indent: Indent with 2 spaces (for files meant to be read by people)
+        default: Fallback for unsupported types, as in json.dump (e.g. str)
+        fsync: Flush the temp file to disk before the rename, so a crash cannot
+            leave an empty or truncated file behind
+    """
+    payload = dumps_json(data, indent=indent, default=default)
+    temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_file, path)
+    except BaseException:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
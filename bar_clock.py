@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Bar Clock
+
+Fires subscriber callbacks at exact offsets from bar close, per timeframe,
+instead of strategies polling the wall clock for an analysis window.
+
+Bars are aligned to multiples of the timeframe since the epoch, which matches
+the minute-of-hour bar boundaries used by the strategies (0-4, 5-9, ... for
+5-minute bars) for every timeframe that divides an hour.
+
+Usage:
+    clock = BarClock()
+    clock.subscribe(5, on_bar_close, offset_seconds=-7)   # 7s before each 5min close
+    clock.run()                                            # or clock.start() for a thread
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BarClockSubscription:
+    """A callback scheduled relative to the close of every bar of one timeframe"""
+
+    def __init__(self, timeframe_minutes: int, callback: Callable[[float], None], offset_seconds: float):
+        self.timeframe_minutes = timeframe_minutes
+        self.bar_seconds = timeframe_minutes * 60
+        self.callback = callback
+        self.offset_seconds = offset_seconds
+        self.active = True
+
+    def next_fire(self, after: float):
+        """(fire_at, bar_close) of the first firing strictly after ``after``"""
+        bar_close = (after - self.offset_seconds) // self.bar_seconds * self.bar_seconds + self.bar_seconds
+        return bar_close + self.offset_seconds, bar_close
+
+
+class BarClock:
+    """Exact-timer scheduler for bar-close callbacks"""
+
+    def __init__(self, time_func: Callable[[], float] = time.time):
+        """
+        Initialize the clock.
+
+        Args:
+            time_func: Epoch-seconds clock (overridable for replay)
+        """
+        self.time_func = time_func
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def subscribe(self, timeframe_minutes: int, callback: Callable[[float], None],
+                  offset_seconds: float = 0.0) -> BarClockSubscription:
+        """
+        Call ``callback(bar_close)`` at ``bar_close + offset_seconds`` for every bar.
+
+        Args:
+            timeframe_minutes: Bar size in minutes
+            callback: Receives the bar's close time (epoch seconds)
+            offset_seconds: Negative fires before the close, positive after
+
+        Returns:
+            Subscription handle for unsubscribe()
+        """
+        subscription = BarClockSubscription(timeframe_minutes, callback, offset_seconds)
+        with self._lock:
+            self._schedule(subscription, self.time_func())
+        self._changed.set()
+        return subscription
+
+    def unsubscribe(self, subscription: BarClockSubscription):
+        """Stop firing a subscription."""
+        subscription.active = False
+        self._changed.set()
+
+    def run(self):
+        """Dispatch callbacks until stop() is called (blocks the calling thread)."""
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            with self._lock:
+                if not self._queue:
+                    next_fire = None
+                else:
+                    next_fire = self._queue[0][0]
+
+            self._changed.clear()
+            timeout = None if next_fire is None else max(0.0, next_fire - self.time_func())
+            if timeout is None or timeout > 0:
+                # Woken early by subscribe/unsubscribe/stop; re-evaluate the queue
+                if self._changed.wait(timeout) or self._stopped.is_set():
+                    continue
+
+            with self._lock:
+                if not self._queue or self._queue[0][0] > self.time_func():
+                    continue
+                fire_at, _, bar_close, subscription = heapq.heappop(self._queue)
+                if not subscription.active:
+                    continue
+                now = self.time_func()
+                self._schedule(subscription, max(fire_at, now))
+
+            lateness = now - fire_at
+            if lateness > subscription.bar_seconds / 2:
+                # A callback overran into the next bar; skip the stale firing
+                logger.warning(f"⏰ Skipped {subscription.timeframe_minutes}min bar closing at {bar_close:.0f} "
+                               f"({lateness:.1f}s late)")
+                continue
+            if lateness > 1.0:
+                logger.warning(f"⏰ Bar clock fired {lateness:.2f}s late for {subscription.timeframe_minutes}min bar")
+            try:
+                subscription.callback(bar_close)
+            except Exception as e:
+                logger.error(f"❌ Bar clock callback error ({subscription.timeframe_minutes}min): {e}")
+
+    def start(self) -> threading.Thread:
+        """Run the clock on a daemon thread."""
+        self.thread = threading.Thread(target=self.run, name='bar-clock', daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        """Stop dispatching."""
+        self._stopped.set()
+        self._changed.set()
+
+    def _schedule(self, subscription: BarClockSubscription, after: float):
+        fire_at, bar_close = subscription.next_fire(after)
+        heapq.heappush(self._queue, (fire_at, next(self._sequence), bar_close, subscription))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Divergence Detection Microbenchmark
+
+Compares the per-symbol pandas swing-point / RSI-divergence detection the
+divergence calculator used before with the stacked NumPy implementation in
+divergence_indicators_calculator, on synthetic random-walk bars:
+
+1. Verifies both give identical swing points and divergence classifications
+   for every symbol, for both swing semantics (SciPy argrelextrema and the
+   fallback window scan)
+2. Times each over the same symbols
+
+Usage: python3 benchmark_divergence_detection.py [--symbols 500] [--bars 390] [--repeat 3]
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from divergence_indicators_calculator import (
+    DIVERGENCE_DIRECTIONS, DIVERGENCE_STRENGTHS, SCIPY_AVAILABLE,
+    detect_rsi_divergences_batch, detect_swing_points_batch, stack_series
+)
+
+if SCIPY_AVAILABLE:
+    from scipy.signal import argrelextrema
+else:
+    def argrelextrema(data, comparator, order=1):
+        """argrelextrema for 1-D data (scipy.signal semantics, mode='clip')"""
+        locs = np.arange(len(data))
+        results = np.ones(len(data), dtype=bool)
+        for shift in range(1, order + 1):
+            results &= comparator(data, data.take(locs + shift, mode='clip'))
+            results &= comparator(data, data.take(locs - shift, mode='clip'))
+        return np.nonzero(results)
+
+
+def make_bars(symbols: int, bars: int, seed: int) -> List[pd.DataFrame]:
+    """Random-walk OHLC bars with RSI; lengths vary and a few bars are missing"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(symbols):
+        length = int(rng.integers(bars // 2, bars + 1))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, length)))
+        spread = np.abs(rng.normal(0, 0.001, length)) * close
+        # Tick-rounded prices produce equal highs/lows, which the two swing semantics treat differently
+        df = pd.DataFrame({
+            'high': np.round(close + spread, 2),
+            'low': np.round(close - spread, 2),
+            'close': close
+        })
+        df.loc[rng.random(length) < 0.002, ['high', 'low']] = np.nan
+        delta = df['close'].diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        df['rsi'] = 100 - (100 / (1 + gain / loss))
+        frames.append(df)
+    return frames
+
+
+def reference_swing_points(df: pd.DataFrame, strict: bool) -> pd.DataFrame:
+    """The calculator's previous per-symbol swing detection"""
+    df_swings = df.copy()
+
+    if strict:
+        high_indices = argrelextrema(df_swings['high'].values, np.greater, order=5)[0]
+        low_indices = argrelextrema(df_swings['low'].values, np.less, order=5)[0]
+    else:
+        high_indices = []
+        low_indices = []
+        for i in range(5, len(df_swings) - 5):
+            if df_swings['high'].iloc[i] == df_swings['high'].iloc[i-5:i+6].max():
+                high_indices.append(i)
+            if df_swings['low'].iloc[i] == df_swings['low'].iloc[i-5:i+6].min():
+                low_indices.append(i)
+
+    df_swings['swing_high'] = np.nan
+    df_swings['swing_low'] = np.nan
+    if len(high_indices) > 0:
+        df_swings.loc[df_swings.index[high_indices], 'swing_high'] = df_swings.iloc[high_indices]['high'].values
+    if len(low_indices) > 0:
+        df_swings.loc[df_swings.index[low_indices], 'swing_low'] = df_swings.iloc[low_indices]['low'].values
+    return df_swings
+
+
+def reference_divergences(df: pd.DataFrame) -> Dict[str, Dict[str, bool]]:
+    """The calculator's previous per-symbol divergence classification"""
+    divergences = {
+        "bullish": {"strong": False, "medium": False, "weak": False},
+        "bearish": {"strong": False, "medium": False, "weak": False}
+    }
+    recent_df = df.iloc[max(0, len(df) - 1 - 30):]
+    swing_highs = recent_df['swing_high'].dropna()
+    swing_lows = recent_df['swing_low'].dropna()
+
+    for direction, swings, column in (('bullish', swing_lows, 'low'), ('bearish', swing_highs, 'high')):
+        if len(swings) < 2:
+            continue
+        idx1, idx2 = swings.index.tolist()[-2:]
+        price1, price2 = float(df.loc[idx1, column]), float(df.loc[idx2, column])
+        rsi1, rsi2 = float(df.loc[idx1, 'rsi']), float(df.loc[idx2, 'rsi'])
+        if direction == 'bullish':
+            if not (price2 < price1 and rsi2 > rsi1):
+                continue
+            price_move, rsi_move = (price1 - price2) / price1 * 100, rsi2 - rsi1
+        else:
+            if not (price2 > price1 and rsi2 < rsi1):
+                continue
+            price_move, rsi_move = (price2 - price1) / price1 * 100, rsi1 - rsi2
+        if price_move > 0.5 and rsi_move > 3.0:
+            divergences[direction]["strong"] = True
+        elif price_move > 0.2 and rsi_move > 2.0:
+            divergences[direction]["medium"] = True
+        else:
+            divergences[direction]["weak"] = True
+    return divergences
+
+
+def run_reference(frames: List[pd.DataFrame], strict: bool):
+    results = []
+    for df in frames:
+        df_swings = reference_swing_points(df, strict)
+        results.append((df_swings['swing_high'].to_numpy(), df_swings['swing_low'].to_numpy(),
+                        reference_divergences(df_swings)))
+    return results
+
+
+def run_batch(frames: List[pd.DataFrame], strict: bool):
+    highs, valid = stack_series([df['high'].to_numpy(dtype=float) for df in frames])
+    lows, _ = stack_series([df['low'].to_numpy(dtype=float) for df in frames])
+    rsi, _ = stack_series([df['rsi'].to_numpy(dtype=float) for df in frames])
+    swing_highs, swing_lows = detect_swing_points_batch(highs, lows, valid, strict=strict)
+    divergences = detect_rsi_divergences_batch(highs, lows, rsi, swing_highs, swing_lows)
+    return highs, lows, valid, swing_highs, swing_lows, divergences
+
+
+def verify(frames: List[pd.DataFrame], strict: bool) -> int:
+    """Number of symbols where the two implementations disagree"""
+    reference = run_reference(frames, strict)
+    highs, lows, valid, swing_highs, swing_lows, divergences = run_batch(frames, strict)
+
+    mismatches = 0
+    for row, (ref_highs, ref_lows, ref_divergences) in enumerate(reference):
+        batch_highs = np.where(swing_highs[row], highs[row], np.nan)[valid[row]]
+        batch_lows = np.where(swing_lows[row], lows[row], np.nan)[valid[row]]
+        batch_divergences = {
+            direction: {strength: bool(divergences[direction][strength][row]) for strength in DIVERGENCE_STRENGTHS}
+            for direction in DIVERGENCE_DIRECTIONS
+        }
+        if not (np.array_equal(ref_highs, batch_highs, equal_nan=True)
+                and np.array_equal(ref_lows, batch_lows, equal_nan=True)
+                and ref_divergences == batch_divergences):
+            mismatches += 1
+    return mismatches
+
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark swing-point and RSI-divergence detection')
+    parser.add_argument('--symbols', type=int, default=500, help='Number of symbols')
+    parser.add_argument('--bars', type=int, default=390, help='Maximum bars per symbol')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    args = parser.parse_args()
+
+    frames = make_bars(args.symbols, args.bars, args.seed)
+    print(f"📊 {args.symbols} symbols × up to {args.bars} bars (SciPy available: {SCIPY_AVAILABLE})")
+
+    for strict, label in ((True, 'argrelextrema swings'), (False, 'fallback window swings')):
+        mismatches = verify(frames, strict)
+        reference_time = best_of(args.repeat, run_reference, frames, strict)
+        batch_time = best_of(args.repeat, run_batch, frames, strict)
+        status = '✅ identical' if mismatches == 0 else f'❌ {mismatches} symbols differ'
+        print(f"\n{label}: {status}")
+        print(f"   per-symbol pandas: {reference_time * 1000:9.1f} ms")
+        print(f"   stacked NumPy:     {batch_time * 1000:9.1f} ms  ({reference_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,12 @@ Close All Positions Script
 
 This script will:
 1. Load all current positions and open orders from current_positions.json
-2. Cancel all open orders
-3. Close all positions via market orders
+2. Cancel all open orders and close all positions via market orders,
+   all symbols in parallel (see flatten_executor.py)
 
 Usage: python3 close_all_positions.py
 """
 
-import json
 import os
 import sys
 from datetime import datetime
@@ -18,16 +17,25 @@ from typing import Dict, List, Any, Optional
 import logging
 
 # Import necessary handlers
-from order_handler import OrderHandler
+from order_handler import get_order_handler
 from connection_manager import make_authenticated_request
+from flatten_executor import FlattenExecutor
+from atomic_json import write_json_atomic
+from artifact_store import load_artifact
 
 class CloseAllPositionsHandler:
     """Handler for closing all positions and cancelling all orders."""
     
-    def __init__(self):
-        """Initialize the close all positions handler."""
+    def __init__(self, max_workers: int = 8):
+        """
+        Initialize the close all positions handler.
+        
+        Args:
+            max_workers: Maximum symbols flattened concurrently
+        """
         self.setup_logging()
-        self.order_handler = OrderHandler()
+        self.order_handler = get_order_handler()
+        self.flatten_executor = FlattenExecutor(self.order_handler, max_workers=max_workers)
         self.positions_file = 'current_positions.json'
         
         self.logger.info("🚀 Close All Positions Handler initialized")
@@ -56,8 +64,7 @@ class CloseAllPositionsHandler:
                 self.logger.error(f"❌ Positions file not found: {self.positions_file}")
                 return None
             
-            with open(self.positions_file, 'r') as f:
-                data = json.load(f)
+            data = load_artifact(self.positions_file)
             
             self.logger.info(f"✅ Loaded positions data from {self.positions_file}")
             return data
@@ -68,7 +75,7 @@ class CloseAllPositionsHandler:
     
     def cancel_all_open_orders(self, positions_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Cancel all open orders found in positions data.
+        Cancel all open orders found in positions data (symbols in parallel).
         
         Args:
             positions_data: Positions data containing open orders
@@ -78,72 +85,15 @@ class CloseAllPositionsHandler:
         """
         try:
             self.logger.info("🚫 Starting cancellation of all open orders...")
-            
-            cancelled_count = 0
-            failed_count = 0
-            cancelled_orders = []
-            failed_orders = []
-            
-            positions = positions_data.get('positions', {})
-            
-            for position_key, position_data in positions.items():
-                symbol = position_data.get('symbol', '')
-                open_orders = position_data.get('open_orders', [])
-                
-                self.logger.info(f"🔍 Checking {len(open_orders)} open orders for {symbol}")
-                
-                for order in open_orders:
-                    try:
-                        order_id = order.get('order_id', '')
-                        instruction = order.get('instruction', '')
-                        order_type = order.get('order_type', '')
-                        status = order.get('status', '')
-                        price = order.get('price', 0)
-                        quantity = order.get('quantity', 0)
-                        
-                        self.logger.info(f"🔍 Order: {order_id} - {instruction} {quantity} {symbol} @ ${price} ({status})")
-                        
-                        # Only cancel orders that are still working
-                        if status in ['WORKING', 'QUEUED', 'PENDING_ACTIVATION']:
-                            self.logger.info(f"🚫 Cancelling order {order_id}: {instruction} {quantity} {symbol} @ ${price}")
-                            
-                            cancel_result = self.order_handler.cancel_order(str(order_id))
-                            
-                            # API returns 200 with empty body on success, or error dict on failure
-                            if 'error' not in cancel_result:
-                                cancelled_count += 1
-                                cancelled_orders.append({
-                                    'order_id': order_id,
-                                    'symbol': symbol,
-                                    'instruction': instruction,
-                                    'quantity': quantity,
-                                    'price': price
-                                })
-                                self.logger.info(f"✅ Successfully cancelled order {order_id}")
-                            else:
-                                failed_count += 1
-                                failed_orders.append({
-                                    'order_id': order_id,
-                                    'symbol': symbol,
-                                    'error': cancel_result.get('error', 'Unknown error')
-                                })
-                                self.logger.warning(f"❌ Failed to cancel order {order_id}: {cancel_result.get('error', 'Unknown')}")
-                        else:
-                            self.logger.info(f"ℹ️ Skipping order {order_id} with status: {status}")
-                    
-                    except Exception as e:
-                        failed_count += 1
-                        self.logger.error(f"❌ Error processing order {order.get('order_id', 'unknown')}: {e}")
-                        continue
-            
-            self.logger.info(f"🚫 Order cancellation complete: {cancelled_count} cancelled, {failed_count} failed")
+            result = self.flatten_executor.flatten(positions_data, close_positions=False)
+            self.logger.info(f"🚫 Order cancellation complete: {result['orders_cancelled']} cancelled, {result['orders_cancel_failed']} failed")
             
             return {
                 'success': True,
-                'cancelled_count': cancelled_count,
-                'failed_count': failed_count,
-                'cancelled_orders': cancelled_orders,
-                'failed_orders': failed_orders
+                'cancelled_count': result['orders_cancelled'],
+                'failed_count': result['orders_cancel_failed'],
+                'cancelled_orders': result['cancelled_orders'],
+                'failed_orders': result['failed_orders']
             }
             
         except Exception as e:
@@ -157,7 +107,7 @@ class CloseAllPositionsHandler:
     
     def close_all_positions(self, positions_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Close all positions via market orders.
+        Close all positions via market orders (symbols in parallel).
         
         Args:
             positions_data: Positions data containing current positions
@@ -167,99 +117,16 @@ class CloseAllPositionsHandler:
         """
         try:
             self.logger.info("🔄 Starting closure of all positions...")
-            
-            closed_count = 0
-            failed_count = 0
-            closed_positions = []
-            failed_positions = []
-            
-            positions = positions_data.get('positions', {})
-            
-            for position_key, position_data in positions.items():
-                try:
-                    symbol = position_data.get('symbol', '')
-                    quantity = position_data.get('quantity', 0)
-                    position_type = position_data.get('position_type', '')
-                    instrument_type = position_data.get('instrument_type', '')
-                    account = position_data.get('account', '')
-                    
-                    # Skip if no quantity (already closed)
-                    if quantity == 0:
-                        self.logger.info(f"ℹ️ Skipping {symbol} - no quantity to close")
-                        continue
-                    
-                    self.logger.info(f"🔄 Closing position: {symbol} - {position_type} {abs(quantity)} shares")
-                    
-                    # Determine the instruction based on current position
-                    if quantity > 0:
-                        # Long position - need to SELL
-                        instruction = 'SELL'
-                        close_quantity = abs(quantity)
-                    else:
-                        # Short position - need to BUY_TO_COVER
-                        instruction = 'BUY_TO_COVER'
-                        close_quantity = abs(quantity)
-                    
-                    # Create market order to close position
-                    order_data = {
-                        'orderType': 'MARKET',
-                        'session': 'NORMAL',
-                        'duration': 'DAY',
-                        'orderStrategyType': 'SINGLE',
-                        'orderLegCollection': [
-                            {
-                                'instruction': instruction,
-                                'quantity': close_quantity,
-                                'instrument': {
-                                    'symbol': symbol,
-                                    'assetType': instrument_type
-                                }
-                            }
-                        ]
-                    }
-                    
-                    self.logger.info(f"📤 Placing market order: {instruction} {close_quantity} {symbol}")
-                    
-                    # Place the order
-                    order_result = self.order_handler.place_order(account, order_data)
-                    
-                    if order_result.get('success', False):
-                        closed_count += 1
-                        closed_positions.append({
-                            'symbol': symbol,
-                            'instruction': instruction,
-                            'quantity': close_quantity,
-                            'order_id': order_result.get('order_id', 'unknown'),
-                            'position_type': position_type
-                        })
-                        self.logger.info(f"✅ Successfully placed closing order for {symbol}")
-                    else:
-                        failed_count += 1
-                        failed_positions.append({
-                            'symbol': symbol,
-                            'quantity': quantity,
-                            'error': order_result.get('error', 'Unknown error')
-                        })
-                        self.logger.error(f"❌ Failed to close position {symbol}: {order_result.get('error', 'Unknown')}")
-                
-                except Exception as e:
-                    failed_count += 1
-                    symbol = position_data.get('symbol', 'unknown')
-                    failed_positions.append({
-                        'symbol': symbol,
-                        'error': str(e)
-                    })
-                    self.logger.error(f"❌ Error processing position {symbol}: {e}")
-                    continue
-            
-            self.logger.info(f"🔄 Position closing complete: {closed_count} closed, {failed_count} failed")
+            result = self.flatten_executor.flatten(positions_data, cancel_orders=False)
+            self.logger.info(f"🔄 Position closing complete: {result['positions_closed']} closed, {result['positions_close_failed']} failed")
             
             return {
                 'success': True,
-                'closed_count': closed_count,
-                'failed_count': failed_count,
-                'closed_positions': closed_positions,
-                'failed_positions': failed_positions
+                'closed_count': result['positions_closed'],
+                'failed_count': result['positions_close_failed'],
+                'closed_positions': result['closed_positions'],
+                'failed_positions': result['failed_positions'],
+                'flatten_metrics': result['flatten_metrics']
             }
             
         except Exception as e:
@@ -306,42 +173,28 @@ class CloseAllPositionsHandler:
                     'orders_cancelled': 0
                 }
             
-            # Step 2: Cancel all open orders
-            self.logger.info("🚫 Step 2: Cancelling all open orders...")
-            cancel_result = self.cancel_all_open_orders(positions_data)
-            
-            if not cancel_result.get('success', False):
-                self.logger.warning(f"⚠️ Order cancellation had issues: {cancel_result.get('error', 'Unknown')}")
-            
-            # Step 3: Close all positions
-            self.logger.info("🔄 Step 3: Closing all positions...")
-            close_result = self.close_all_positions(positions_data)
-            
-            if not close_result.get('success', False):
-                self.logger.error(f"❌ Position closing failed: {close_result.get('error', 'Unknown')}")
+            # Step 2: Cancel working orders and close positions, all symbols in parallel
+            self.logger.info("⚡ Step 2: Cancelling open orders and closing positions in parallel...")
+            try:
+                flatten_result = self.flatten_executor.flatten(positions_data)
+            except Exception as e:
+                self.logger.error(f"❌ Position closing failed: {e}")
                 return {
                     'success': False,
-                    'error': close_result.get('error', 'Position closing failed'),
-                    'step_failed': 'close_positions',
-                    'cancel_result': cancel_result
+                    'error': str(e),
+                    'step_failed': 'close_positions'
                 }
             
             # Compile final results
             final_result = {
                 'success': True,
                 'execution_time': datetime.now().isoformat(),
-                'orders_cancelled': cancel_result.get('cancelled_count', 0),
-                'orders_cancel_failed': cancel_result.get('failed_count', 0),
-                'positions_closed': close_result.get('closed_count', 0),
-                'positions_close_failed': close_result.get('failed_count', 0),
-                'cancelled_orders': cancel_result.get('cancelled_orders', []),
-                'closed_positions': close_result.get('closed_positions', []),
-                'failed_orders': cancel_result.get('failed_orders', []),
-                'failed_positions': close_result.get('failed_positions', [])
+                **flatten_result
             }
             
             self.logger.info("🎉 Close All Positions execution completed!")
             self.logger.info(f"📊 Summary: {final_result['orders_cancelled']} orders cancelled, {final_result['positions_closed']} positions closed")
+            self.logger.info(f"⏱️ Flatten latency: {final_result['flatten_metrics']['flatten_latency_ms']:.0f} ms")
             
             return final_result
             
@@ -366,8 +219,7 @@ class CloseAllPositionsHandler:
             # Ensure logs directory exists
             os.makedirs('logs', exist_ok=True)
             
-            with open(log_filename, 'w') as f:
-                json.dump(result, f, indent=2)
+            write_json_atomic(log_filename, result, indent=True)
             
             self.logger.info(f"💾 Execution log saved to: {log_filename}")
             
@@ -418,6 +270,11 @@ def main():
             print(f"🚫 Orders cancelled: {result.get('orders_cancelled', 0)}")
             print(f"🔄 Positions closed: {result.get('positions_closed', 0)}")
             
+            metrics = result.get('flatten_metrics')
+            if metrics:
+                print(f"⏱️ Flatten latency: {metrics['flatten_latency_ms']:.0f} ms "
+                      f"(last closing order at {metrics['last_order_ms']} ms)")
+            
             if result.get('orders_cancel_failed', 0) > 0:
                 print(f"⚠️ Orders failed to cancel: {result.get('orders_cancel_failed', 0)}")
             
@@ -13,14 +13,17 @@ from typing import Dict, Any, Optional
 import logging
 
 # Import necessary handlers
-from order_handler import OrderHandler
+from order_handler import get_order_handler
+from flatten_executor import FlattenExecutor
+from artifact_store import load_artifact
 
 class CloseAllPositionsAPI:
     """Streamlined API handler for closing all positions and cancelling all orders."""
     
-    def __init__(self):
-        """Initialize the handler."""
-        self.order_handler = OrderHandler()
+    def __init__(self, max_workers: int = 8):
+        """Initialize the handler (max_workers: symbols flattened concurrently)."""
+        self.order_handler = get_order_handler()
+        self.flatten_executor = FlattenExecutor(self.order_handler, max_workers=max_workers)
         self.positions_file = 'current_positions.json'
         
         # Setup minimal logging
@@ -33,55 +36,21 @@ class CloseAllPositionsAPI:
             if not os.path.exists(self.positions_file):
                 return None
             
-            with open(self.positions_file, 'r') as f:
-                return json.load(f)
+            return load_artifact(self.positions_file)
                 
         except Exception as e:
             self.logger.error(f"Error loading positions: {e}")
             return None
     
     def cancel_all_orders(self, positions_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Cancel all open orders."""
-        cancelled_count = 0
-        failed_count = 0
-        cancelled_orders = []
-        
+        """Cancel all open orders (symbols in parallel)."""
         try:
-            positions = positions_data.get('positions', {})
-            
-            for position_data in positions.values():
-                open_orders = position_data.get('open_orders', [])
-                
-                for order in open_orders:
-                    try:
-                        order_id = order.get('order_id', '')
-                        status = order.get('status', '')
-                        
-                        # Only cancel working orders
-                        if status in ['WORKING', 'QUEUED', 'PENDING_ACTIVATION']:
-                            cancel_result = self.order_handler.cancel_order(str(order_id))
-                            
-                            if 'error' not in cancel_result:
-                                cancelled_count += 1
-                                cancelled_orders.append({
-                                    'order_id': order_id,
-                                    'symbol': order.get('symbol', ''),
-                                    'instruction': order.get('instruction', ''),
-                                    'quantity': order.get('quantity', 0),
-                                    'price': order.get('price', 0)
-                                })
-                            else:
-                                failed_count += 1
-                    
-                    except Exception:
-                        failed_count += 1
-                        continue
-            
+            result = self.flatten_executor.flatten(positions_data, close_positions=False)
             return {
                 'success': True,
-                'cancelled_count': cancelled_count,
-                'failed_count': failed_count,
-                'cancelled_orders': cancelled_orders
+                'cancelled_count': result['orders_cancelled'],
+                'failed_count': result['orders_cancel_failed'],
+                'cancelled_orders': result['cancelled_orders']
             }
             
         except Exception as e:
@@ -93,74 +62,15 @@ class CloseAllPositionsAPI:
             }
     
     def close_all_positions(self, positions_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Close all positions via market orders."""
-        closed_count = 0
-        failed_count = 0
-        closed_positions = []
-        
+        """Close all positions via market orders (symbols in parallel)."""
         try:
-            positions = positions_data.get('positions', {})
-            
-            for position_data in positions.values():
-                try:
-                    symbol = position_data.get('symbol', '')
-                    quantity = position_data.get('quantity', 0)
-                    instrument_type = position_data.get('instrument_type', '')
-                    account = position_data.get('account', '')
-                    
-                    # Skip if no quantity
-                    if quantity == 0:
-                        continue
-                    
-                    # Determine instruction
-                    if quantity > 0:
-                        instruction = 'SELL'
-                        close_quantity = abs(quantity)
-                    else:
-                        instruction = 'BUY_TO_COVER'
-                        close_quantity = abs(quantity)
-                    
-                    # Create market order
-                    order_data = {
-                        'orderType': 'MARKET',
-                        'session': 'NORMAL',
-                        'duration': 'DAY',
-                        'orderStrategyType': 'SINGLE',
-                        'orderLegCollection': [
-                            {
-                                'instruction': instruction,
-                                'quantity': close_quantity,
-                                'instrument': {
-                                    'symbol': symbol,
-                                    'assetType': instrument_type
-                                }
-                            }
-                        ]
-                    }
-                    
-                    # Place market order using the correct method
-                    order_result = self.order_handler.place_market_order(instruction, symbol, close_quantity)
-                    
-                    if order_result.get('status') == 'submitted':
-                        closed_count += 1
-                        closed_positions.append({
-                            'symbol': symbol,
-                            'instruction': instruction,
-                            'quantity': close_quantity,
-                            'order_id': order_result.get('order_id', 'unknown')
-                        })
-                    else:
-                        failed_count += 1
-                
-                except Exception:
-                    failed_count += 1
-                    continue
-            
+            result = self.flatten_executor.flatten(positions_data, cancel_orders=False)
             return {
                 'success': True,
-                'closed_count': closed_count,
-                'failed_count': failed_count,
-                'closed_positions': closed_positions
+                'closed_count': result['positions_closed'],
+                'failed_count': result['positions_close_failed'],
+                'closed_positions': result['closed_positions'],
+                'flatten_metrics': result['flatten_metrics']
             }
             
         except Exception as e:
@@ -194,22 +104,14 @@ class CloseAllPositionsAPI:
                     'orders_cancelled': 0
                 }
             
-            # Cancel orders
-            cancel_result = self.cancel_all_orders(positions_data)
-            
-            # Close positions
-            close_result = self.close_all_positions(positions_data)
+            # Cancel orders and close positions, all symbols in parallel
+            result = self.flatten_executor.flatten(positions_data)
             
             # Return combined results
             return {
                 'success': True,
                 'execution_time': datetime.now().isoformat(),
-                'orders_cancelled': cancel_result.get('cancelled_count', 0),
-                'orders_cancel_failed': cancel_result.get('failed_count', 0),
-                'positions_closed': close_result.get('closed_count', 0),
-                'positions_close_failed': close_result.get('failed_count', 0),
-                'cancelled_orders': cancel_result.get('cancelled_orders', []),
-                'closed_positions': close_result.get('closed_positions', [])
+                **result
             }
             
         except Exception as e:
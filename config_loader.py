@@ -29,7 +29,11 @@ class ConfigLoader:
                 'base_url': 'https://api.schwabapi.com',
                 'max_retries': 5,
                 'retry_delay': 2,
-                'rate_limit_delay': 60
+                'rate_limit_delay': 60,
+                'max_requests_per_minute': 120,
+                'rate_limit_burst': 10,
+                'max_account_workers': 4,
+                'account_snapshot_max_age': 2
             }
         }
     
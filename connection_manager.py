@@ -6,10 +6,12 @@ import webbrowser
 import json
 import urllib.parse
 import os
+import threading
 from datetime import timedelta, datetime
 import time
 from dotenv import load_dotenv
 from config_loader import get_config
+from atomic_json import write_json_atomic
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 
@@ -109,6 +111,129 @@ MAX_RETRIES = api_config.get('max_retries', 5)
 RETRY_DELAY = api_config.get('retry_delay', 2)
 REQUEST_TIMEOUT = api_config.get('request_timeout', 10)
 RATE_LIMIT_DELAY = api_config.get('rate_limit_delay', 60)
+MAX_REQUESTS_PER_MINUTE = api_config.get('max_requests_per_minute', 120)
+RATE_LIMIT_BURST = api_config.get('rate_limit_burst', 10)
+ACCOUNT_SNAPSHOT_MAX_AGE = api_config.get('account_snapshot_max_age', 2)
+ACCOUNT_SNAPSHOT_FILE = 'account_snapshot.json'
+ACCOUNTS_WITH_POSITIONS_URL = "https://api.schwabapi.com/trader/v1/accounts?fields=positions"
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every Schwab API request made from this process."""
+    
+    def __init__(self, requests_per_minute, burst):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request slot is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+_rate_limiter = RateLimiter(MAX_REQUESTS_PER_MINUTE, RATE_LIMIT_BURST)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Get the process-wide API rate limiter."""
+    return _rate_limiter
+
+def get_http_session():
+    """Get the process-wide pooled HTTP session used for Schwab API calls."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount('https://', adapter)
+                _http_session = session
+    return _http_session
+
+class AccountSnapshot:
+    """
+    One download of /accounts?fields=positions shared by positions, balances,
+    account summaries and open-order integration within a tick.
+    """
+    
+    def __init__(self, accounts_data, fetched_at=None):
+        self.accounts = accounts_data
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+    
+    def age(self):
+        """Seconds since the snapshot was downloaded."""
+        return time.time() - self.fetched_at
+
+_account_snapshot = None
+_account_snapshot_lock = threading.Lock()
+
+def _load_account_snapshot_file(max_age):
+    """Load the snapshot written by another handler process if it is still fresh."""
+    try:
+        if not os.path.exists(ACCOUNT_SNAPSHOT_FILE):
+            return None
+        with open(ACCOUNT_SNAPSHOT_FILE, 'r') as f:
+            data = json.load(f)
+        snapshot = AccountSnapshot(data.get('accounts') or [], data.get('fetched_at', 0))
+        if snapshot.accounts and snapshot.age() <= max_age:
+            return snapshot
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _save_account_snapshot_file(snapshot):
+    """Write the snapshot atomically so concurrent readers never see a partial file."""
+    try:
+        write_json_atomic(ACCOUNT_SNAPSHOT_FILE, {'fetched_at': snapshot.fetched_at, 'accounts': snapshot.accounts})
+    except OSError as e:
+        print(f"⚠️ Could not save account snapshot: {e}")
+
+def get_account_snapshot(max_age=None, force_refresh=False):
+    """
+    Get the shared account snapshot, downloading only when the cached one is stale.
+    
+    The snapshot is cached in memory and in account_snapshot.json, so the positions
+    and account handlers (separate processes under the realtime monitor) share a
+    single accounts download per tick.
+    
+    Args:
+        max_age: Maximum snapshot age in seconds (default: api.account_snapshot_max_age)
+        force_refresh: Always download a new snapshot
+        
+    Returns:
+        AccountSnapshot, or None if the accounts could not be fetched
+    """
+    global _account_snapshot
+    if max_age is None:
+        max_age = ACCOUNT_SNAPSHOT_MAX_AGE
+    
+    with _account_snapshot_lock:
+        if not force_refresh:
+            if _account_snapshot is not None and _account_snapshot.age() <= max_age:
+                return _account_snapshot
+            snapshot = _load_account_snapshot_file(max_age)
+            if snapshot is not None:
+                _account_snapshot = snapshot
+                return snapshot
+        
+        success, accounts_data = make_authenticated_request(ACCOUNTS_WITH_POSITIONS_URL, "get account snapshot")
+        if not success or not accounts_data:
+            return None
+        
+        snapshot = AccountSnapshot(accounts_data)
+        _save_account_snapshot_file(snapshot)
+        _account_snapshot = snapshot
+        return snapshot
 
 def save_tokens_to_aws(tokens):
     """Save tokens to AWS Secrets Manager"""
@@ -145,31 +270,35 @@ def save_tokens_to_aws(tokens):
         print(f"❌ Failed to save tokens to AWS Secrets Manager: {e}")
         return False
 
-def get_comprehensive_account_data():
+def get_comprehensive_account_data(snapshot=None):
     """
     Get comprehensive account data including all balances, positions, and account information.
     This function returns the full Schwab API response structure.
     
+    Args:
+        snapshot: AccountSnapshot to build from (default: the shared snapshot)
+    
     Returns:
         Dictionary containing full account data structure as returned by Schwab API
     """
     try:
         print("📊 Fetching comprehensive account data (full API response)...")
         
-        url = "https://api.schwabapi.com/trader/v1/accounts?fields=positions"
-        success, accounts_data = make_authenticated_request(url, "get comprehensive account data")
+        if snapshot is None:
+            snapshot = get_account_snapshot()
         
-        if not success or not accounts_data:
+        if snapshot is None or not snapshot.accounts:
             print("❌ Failed to get comprehensive account data")
             return None
+        accounts_data = snapshot.accounts
         
         # Return the full response structure with additional metadata
         comprehensive_data = {
             'accounts': accounts_data,
             'metadata': {
-                'fetch_timestamp': datetime.now().isoformat(),
+                'fetch_timestamp': datetime.fromtimestamp(snapshot.fetched_at).isoformat(),
                 'total_accounts': len(accounts_data),
-                'api_endpoint': url,
+                'api_endpoint': ACCOUNTS_WITH_POSITIONS_URL,
                 'fields_requested': 'positions',
                 'response_structure': 'full_schwab_api_format'
             }
@@ -376,8 +505,7 @@ def save_tokens_to_file(tokens):
         expires_at = datetime.now() + timedelta(seconds=int(tokens['expires_in']))
         tokens['expires_at'] = expires_at.isoformat()
         
-        with open(TOKEN_FILE, 'w') as f:
-            json.dump(tokens, f)
+        write_json_atomic(TOKEN_FILE, tokens)
         print(f"✅ Tokens saved to local file: {TOKEN_FILE}")
         return True
     except Exception as e:
@@ -753,8 +881,9 @@ def make_authenticated_request(url, operation_name="API call", max_retries=3, **
             if 'timeout' not in kwargs:
                 kwargs['timeout'] = REQUEST_TIMEOUT
             
-            # Make the request
-            response = requests.get(url, **kwargs)
+            # Make the request over the pooled session, within the shared rate limit
+            get_rate_limiter().acquire()
+            response = get_http_session().get(url, **kwargs)
             
             # Handle the response
             success, data, should_retry = handle_api_response(response, operation_name)
@@ -806,18 +935,19 @@ def make_authenticated_request(url, operation_name="API call", max_retries=3, **
     
     return False, None
 
-def get_all_positions():
+def get_all_positions(snapshot=None):
     """Get comprehensive account data including positions, balances, and account info"""
     try:
         print("📊 Fetching comprehensive account data with positions...")
         
-        # Use the new authenticated request method
-        url = "https://api.schwabapi.com/trader/v1/accounts?fields=positions"
-        success, accounts_data = make_authenticated_request(url, "get all positions")
+        # Reuse the shared account snapshot instead of downloading again
+        if snapshot is None:
+            snapshot = get_account_snapshot()
         
-        if not success or not accounts_data:
+        if snapshot is None or not snapshot.accounts:
             print("❌ Failed to get accounts data")
             return None
+        accounts_data = snapshot.accounts
         
         # Process the full response structure
         processed_accounts = {}
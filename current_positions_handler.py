@@ -21,7 +21,6 @@ Key Features:
 - Options contract details and analysis
 """
 
-import json
 import time
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -32,12 +31,15 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import connection manager for Schwab API
 from connection_manager import (
+    get_account_snapshot,
     get_all_positions, 
     get_comprehensive_account_data,
     extract_account_balances,
     extract_detailed_positions
 )
-from order_handler import OrderHandler
+from order_handler import get_order_handler
+from order_book import OrderBook, extract_order_symbol, process_order
+from artifact_store import load_artifact, save_artifact
 
 class CurrentPositionsHandler:
     """
@@ -52,12 +54,15 @@ class CurrentPositionsHandler:
         
         # Initialize order handler for open orders functionality
         try:
-            self.order_handler = OrderHandler()
+            self.order_handler = get_order_handler()
             self.logger.info("OrderHandler initialized successfully")
         except Exception as e:
             self.logger.warning(f"Could not initialize OrderHandler: {e}")
             self.order_handler = None
         
+        # Open-order book refreshed incrementally instead of re-downloading every order
+        self.order_book = OrderBook(self.order_handler) if self.order_handler else None
+        
         # Database connection parameters
         self.db_config = {
             'host': 'localhost',
@@ -80,91 +85,21 @@ class CurrentPositionsHandler:
             Dictionary with symbols as keys and lists of open orders as values
         """
         try:
-            if not self.order_handler:
+            if not self.order_book:
                 self.logger.warning("OrderHandler not available - cannot fetch open orders")
                 return {}
             
-            self.logger.info("🔄 Fetching open orders from Schwab API...")
-            
-            # Calculate date range for orders (today only to get current open orders)
-            today = datetime.now()
-            from_date = today.strftime('%Y-%m-%dT00:00:00.000Z')
-            to_date = today.strftime('%Y-%m-%dT23:59:59.000Z')
-            
-            orders_by_symbol = {}
-            total_open_orders = 0
-            
-            # Get WORKING orders (open orders) using the correct API approach
-            try:
-                self.logger.info(f"Fetching WORKING orders from {from_date} to {to_date}")
-                orders_response = self.order_handler.get_all_orders(
-                    from_entered_time=from_date,
-                    to_entered_time=to_date,
-                    status="WORKING",
-                    max_results=1000
-                )
-                
-                # The API returns a direct list of orders
-                if isinstance(orders_response, list):
-                    working_orders = orders_response
-                    self.logger.info(f"Retrieved {len(working_orders)} WORKING orders")
-                    
-                    for order in working_orders:
-                        # Extract symbol from order
-                        symbol = self._extract_symbol_from_order(order)
-                        
-                        if symbol:
-                            if symbol not in orders_by_symbol:
-                                orders_by_symbol[symbol] = []
-                            
-                            # Add processed order information
-                            processed_order = self._process_order_data(order)
-                            orders_by_symbol[symbol].append(processed_order)
-                            total_open_orders += 1
-                            
-                            self.logger.info(f"Found WORKING order for {symbol}: {order.get('orderType')} {order.get('instruction', 'N/A')} @ ${order.get('price', 'N/A')}")
-                
-                elif isinstance(orders_response, dict) and 'error' in orders_response:
-                    self.logger.error(f"Error in API response: {orders_response['error']}")
-                else:
-                    self.logger.warning(f"Unexpected response format: {type(orders_response)}")
-                
-            except Exception as e:
-                self.logger.error(f"Error fetching WORKING orders: {e}")
+            self.logger.info("🔄 Refreshing open order book from Schwab API...")
             
-            # Also try to get other open order statuses
-            other_open_statuses = ["QUEUED", "ACCEPTED", "AWAITING_PARENT_ORDER", 
-                                 "AWAITING_CONDITION", "AWAITING_STOP_CONDITION", "PENDING_ACTIVATION"]
+            events = self.order_book.refresh()
+            if events is None:
+                self.logger.warning("Order book refresh failed - using last known open orders")
+            else:
+                for event in events:
+                    self.logger.info(f"Order {event['order_id']} {event['symbol']}: {event['old_status'] or 'NEW'} -> {event['new_status']}")
             
-            for status in other_open_statuses:
-                try:
-                    self.logger.info(f"Fetching {status} orders...")
-                    orders_response = self.order_handler.get_all_orders(
-                        from_entered_time=from_date,
-                        to_entered_time=to_date,
-                        status=status,
-                        max_results=1000
-                    )
-                    
-                    if isinstance(orders_response, list) and len(orders_response) > 0:
-                        self.logger.info(f"Retrieved {len(orders_response)} {status} orders")
-                        
-                        for order in orders_response:
-                            symbol = self._extract_symbol_from_order(order)
-                            
-                            if symbol:
-                                if symbol not in orders_by_symbol:
-                                    orders_by_symbol[symbol] = []
-                                
-                                processed_order = self._process_order_data(order)
-                                orders_by_symbol[symbol].append(processed_order)
-                                total_open_orders += 1
-                                
-                                self.logger.info(f"Found {status} order for {symbol}")
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error fetching {status} orders: {e}")
-                    continue
+            orders_by_symbol = self.order_book.open_orders_by_symbol()
+            total_open_orders = sum(len(orders) for orders in orders_by_symbol.values())
             
             self.logger.info(f"✅ Successfully fetched {total_open_orders} open orders across {len(orders_by_symbol)} symbols")
             
@@ -184,22 +119,7 @@ class CurrentPositionsHandler:
         Returns:
             Symbol string or None if not found
         """
-        try:
-            # Check orderLegCollection for symbol
-            if 'orderLegCollection' in order and len(order['orderLegCollection']) > 0:
-                leg = order['orderLegCollection'][0]
-                if 'instrument' in leg and 'symbol' in leg['instrument']:
-                    return leg['instrument']['symbol']
-            
-            # Fallback: check if there's a direct symbol field
-            if 'symbol' in order:
-                return order['symbol']
-            
-            return None
-            
-        except Exception as e:
-            self.logger.warning(f"Error extracting symbol from order: {e}")
-            return None
+        return extract_order_symbol(order)
 
     def _process_order_data(self, order: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -211,64 +131,7 @@ class CurrentPositionsHandler:
         Returns:
             Processed order data
         """
-        try:
-            # Extract basic order information
-            processed_order = {
-                'order_id': order.get('orderId', ''),
-                'status': order.get('status', ''),
-                'order_type': order.get('orderType', ''),
-                'session': order.get('session', ''),
-                'duration': order.get('duration', ''),
-                'entered_time': order.get('enteredTime', ''),
-                'close_time': order.get('closeTime', ''),
-                'price': order.get('price', 0),
-                'stop_price': order.get('stopPrice', 0),
-                'quantity': 0,
-                'filled_quantity': order.get('filledQuantity', 0),
-                'remaining_quantity': order.get('remainingQuantity', 0),
-                'instruction': '',
-                'asset_type': '',
-                'symbol': '',
-                'order_source': 'schwab_api'
-            }
-            
-            # Extract leg information
-            if 'orderLegCollection' in order and len(order['orderLegCollection']) > 0:
-                leg = order['orderLegCollection'][0]
-                processed_order['instruction'] = leg.get('instruction', '')
-                processed_order['quantity'] = leg.get('quantity', 0)
-                
-                if 'instrument' in leg:
-                    instrument = leg['instrument']
-                    processed_order['symbol'] = instrument.get('symbol', '')
-                    processed_order['asset_type'] = instrument.get('assetType', '')
-            
-            # Calculate remaining quantity if not provided
-            if processed_order['remaining_quantity'] == 0 and processed_order['quantity'] > 0:
-                processed_order['remaining_quantity'] = processed_order['quantity'] - processed_order['filled_quantity']
-            
-            # Add order strategy information
-            processed_order['order_strategy_type'] = order.get('orderStrategyType', '')
-            processed_order['complex_order_strategy_type'] = order.get('complexOrderStrategyType', '')
-            
-            # Add child orders information if present
-            if 'childOrderStrategies' in order:
-                processed_order['has_child_orders'] = True
-                processed_order['child_orders_count'] = len(order['childOrderStrategies'])
-            else:
-                processed_order['has_child_orders'] = False
-                processed_order['child_orders_count'] = 0
-            
-            return processed_order
-            
-        except Exception as e:
-            self.logger.warning(f"Error processing order data: {e}")
-            return {
-                'order_id': order.get('orderId', 'unknown'),
-                'status': order.get('status', 'unknown'),
-                'error': f'Processing error: {str(e)}',
-                'order_source': 'schwab_api'
-            }
+        return process_order(order)
 
     def integrate_schwab_open_orders_only(self, positions_data: Dict[str, Any], schwab_open_orders: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
@@ -408,8 +271,7 @@ class CurrentPositionsHandler:
             if not os.path.exists(positions_file_path):
                 return None
             
-            with open(positions_file_path, 'r') as f:
-                return json.load(f)
+            return load_artifact(positions_file_path)
                 
         except Exception as e:
             self.logger.error(f"❌ Error loading positions from JSON: {e}")
@@ -425,8 +287,11 @@ class CurrentPositionsHandler:
         try:
             self.logger.info("🔄 Fetching comprehensive account data from Schwab API...")
             
+            # One accounts download per tick, shared by every view below
+            snapshot = get_account_snapshot()
+            
             # Get comprehensive account data (full API response)
-            comprehensive_data = get_comprehensive_account_data()
+            comprehensive_data = get_comprehensive_account_data(snapshot)
             
             if not comprehensive_data:
                 self.logger.warning("No comprehensive account data received from API")
@@ -437,7 +302,7 @@ class CurrentPositionsHandler:
             detailed_positions = extract_detailed_positions(comprehensive_data)
             
             # Also get the legacy format for backward compatibility
-            legacy_positions_data = get_all_positions()
+            legacy_positions_data = get_all_positions(snapshot)
             
             if not legacy_positions_data and not detailed_positions:
                 self.logger.warning("No positions data received from any API method")
@@ -934,8 +799,7 @@ class CurrentPositionsHandler:
             }
             
             # Write to positions JSON file for realtime_monitor
-            with open(positions_file_path, 'w') as f:
-                json.dump(positions_json_data, f, indent=2, default=str)
+            save_artifact(positions_file_path, positions_json_data, records_key='positions', default=str)
             
             summary = positions_data.get('summary', {})
             self.logger.info(f"✅ Saved comprehensive positions to {positions_file_path}")
@@ -27,6 +27,7 @@ from psycopg2.extras import RealDictCursor
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
+from artifact_store import load_artifact
 
 class DatabaseInserter:
     """
@@ -74,9 +75,7 @@ class DatabaseInserter:
                     self.logger.warning(f"JSON file not found: {file_path}")
                     return None
                 
-                # Use a shorter timeout for file operations to prevent blocking
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
+                data = load_artifact(file_path)
                 
                 if attempt > 0:
                     self.logger.info(f"Successfully loaded JSON file on attempt {attempt + 1}: {file_path}")
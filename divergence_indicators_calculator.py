@@ -13,6 +13,8 @@ Each JSON file contains only the indicators needed for divergence strategy:
 - RSI (14-period)
 - Price swing highs/lows
 - Divergence detection results
+- 1min: divergence events newly confirmed since the previous run in the same
+  process (streaming Wilder RSI and swing state per symbol, updated per bar)
 - Basic price data (OHLC)
 
 Usage: python3 divergence_indicators_calculator.py
@@ -23,12 +25,13 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import logging
+import importlib
 import json
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time as time_module
 import threading
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # Import TA-Lib for technical analysis
 try:
@@ -38,9 +41,9 @@ except ImportError:
     TALIB_AVAILABLE = False
     logging.warning("TA-Lib not available. Using simplified RSI calculation.")
 
-# Import scipy for swing point detection
+# SciPy's presence selects argrelextrema's strict swing semantics (reimplemented below)
 try:
-    from scipy.signal import argrelextrema
+    importlib.import_module('scipy.signal')
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
@@ -48,6 +51,8 @@ except ImportError:
 
 # Import our existing data handlers
 from historical_data_handler import HistoricalDataHandler
+from latency_tracer import LATENCY_TRACE_KEY, mark_stage
+from artifact_store import save_artifact
 
 class DivergenceTimeframeConfig:
     """Configuration for different timeframes - focused on divergence needs"""
@@ -98,6 +103,466 @@ class DivergenceTimeframeConfig:
         }
     }
 
+# Swing points are the extreme high/low within SWING_ORDER bars on each side
+SWING_ORDER = 5
+# Divergences compare the last two swing points within this many bars of the last bar
+DIVERGENCE_LOOKBACK_BARS = 30
+DIVERGENCE_DIRECTIONS = ('bullish', 'bearish')
+DIVERGENCE_STRENGTHS = ('strong', 'medium', 'weak')
+# (strength, price move % above, RSI move above); anything weaker is 'weak'
+DIVERGENCE_GRADES = (('strong', 0.5, 3.0), ('medium', 0.2, 2.0))
+RSI_PERIOD = 14
+# Timeframes whose indicators come from the per-symbol divergence streams, updated
+# once per closed bar, instead of a full-history recompute every run
+STREAMING_TIMEFRAMES = ('1min',)
+
+def stack_series(series: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack 1-D series of different lengths into a (symbols, bars) matrix aligned on the last bar.
+    
+    Returns:
+        (matrix, valid) where cells before a series' first bar are NaN and valid is False
+    """
+    width = max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), width), np.nan)
+    valid = np.zeros((len(series), width), dtype=bool)
+    for row, values in enumerate(series):
+        if len(values):
+            matrix[row, width - len(values):] = values
+            valid[row, width - len(values):] = True
+    return matrix, valid
+
+def _sliding_windows(values: np.ndarray, valid: np.ndarray, order: int, edge: bool) -> np.ndarray:
+    """(symbols, bars, 2*order+1) views of each bar's neighbourhood.
+    
+    With edge=True, neighbours beyond either end of a series repeat its first/last
+    bar, which is how argrelextrema's default 'clip' mode treats the boundaries.
+    """
+    values = values.copy()
+    if edge and values.shape[1]:
+        first = valid.argmax(axis=1)
+        rows = np.arange(values.shape[0])
+        values = np.where(valid, values, values[rows, first][:, None])
+    if edge:
+        padded = np.pad(values, ((0, 0), (order, order)), mode='edge')
+    else:
+        padded = np.pad(values, ((0, 0), (order, order)), mode='constant', constant_values=np.nan)
+    return np.lib.stride_tricks.sliding_window_view(padded, 2 * order + 1, axis=1)
+
+def detect_swing_points_batch(highs: np.ndarray, lows: np.ndarray, valid: np.ndarray,
+                              order: int = SWING_ORDER, strict: bool = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Swing highs/lows of many symbols at once from stacked (symbols, bars) arrays.
+    
+    Args:
+        highs: Stacked high prices (see stack_series)
+        lows: Stacked low prices
+        valid: Mask of real bars
+        order: Bars on each side a swing point must exceed
+        strict: True for argrelextrema semantics (strictly above/below every
+            neighbour, boundaries clipped), False for the fallback used without
+            SciPy (equal to the window max/min, interior bars only). Defaults to
+            whichever the calculator uses in this environment.
+        
+    Returns:
+        (swing_high_mask, swing_low_mask) boolean arrays shaped like highs
+    """
+    if strict is None:
+        strict = SCIPY_AVAILABLE
+    
+    if strict:
+        high_windows = _sliding_windows(highs, valid, order, edge=True)
+        low_windows = _sliding_windows(lows, valid, order, edge=True)
+        neighbours = np.r_[0:order, order + 1:2 * order + 1]
+        # NaN comparisons are False, as in argrelextrema
+        with np.errstate(invalid='ignore'):
+            swing_highs = (highs[..., None] > high_windows[..., neighbours]).all(axis=-1)
+            swing_lows = (lows[..., None] < low_windows[..., neighbours]).all(axis=-1)
+    else:
+        # Window max/min ignoring NaN, like pandas .max()/.min()
+        high_windows = _sliding_windows(np.where(np.isnan(highs), -np.inf, highs), valid, order, edge=False)
+        low_windows = _sliding_windows(np.where(np.isnan(lows), np.inf, lows), valid, order, edge=False)
+        swing_highs = highs == high_windows.max(axis=-1)
+        swing_lows = lows == low_windows.min(axis=-1)
+        # Only bars with a full window inside their own series
+        lengths = valid.sum(axis=1)
+        position = np.arange(valid.shape[1]) - (valid.shape[1] - lengths)[:, None]
+        interior = (position >= order) & (position < lengths[:, None] - order)
+        swing_highs &= interior
+        swing_lows &= interior
+    
+    return swing_highs & valid, swing_lows & valid
+
+def _last_two(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Column of the last two True cells per row and whether a row has two"""
+    columns = np.where(mask, np.arange(mask.shape[1]), -1)
+    last = columns.max(axis=1, initial=-1)
+    rows = np.arange(mask.shape[0])
+    previous_columns = columns.copy()
+    previous_columns[rows, np.maximum(last, 0)] = -1
+    previous = previous_columns.max(axis=1, initial=-1)
+    has_two = previous >= 0
+    return np.maximum(previous, 0), np.maximum(last, 0), has_two
+
+def detect_rsi_divergences_batch(highs: np.ndarray, lows: np.ndarray, rsi: np.ndarray,
+                                 swing_highs: np.ndarray, swing_lows: np.ndarray,
+                                 lookback: int = DIVERGENCE_LOOKBACK_BARS) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Classify RSI divergences of many symbols at once from stacked (symbols, bars) arrays.
+    
+    Compares the last two swing lows (bullish: lower low price, higher RSI) and the
+    last two swing highs (bearish: higher high price, lower RSI) within the last
+    lookback + 1 bars, graded strong (>0.5% price, >3 RSI), medium (>0.2%, >2) or weak.
+    
+    Returns:
+        {'bullish'|'bearish': {'strong'|'medium'|'weak': bool array over symbols}}
+    """
+    window = slice(max(0, highs.shape[1] - lookback - 1), None)
+    rows = np.arange(highs.shape[0])
+    divergences = {}
+    failed = np.zeros(highs.shape[0], dtype=bool)
+    
+    for direction, prices, swings in (('bullish', lows, swing_lows), ('bearish', highs, swing_highs)):
+        prices, rsi_values = prices[:, window], rsi[:, window]
+        first, second, has_two = _last_two(swings[:, window])
+        price1, price2 = prices[rows, first], prices[rows, second]
+        rsi1, rsi2 = rsi_values[rows, first], rsi_values[rows, second]
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if direction == 'bullish':
+                # Price makes lower low, RSI makes higher low
+                found = has_two & (price2 < price1) & (rsi2 > rsi1)
+                price_move_pct = (price1 - price2) / price1 * 100
+                rsi_move = rsi2 - rsi1
+            else:
+                # Price makes higher high, RSI makes lower high
+                found = has_two & (price2 > price1) & (rsi2 < rsi1)
+                price_move_pct = (price2 - price1) / price1 * 100
+                rsi_move = rsi1 - rsi2
+            graded = {}
+            remaining = found
+            for strength, min_price_move_pct, min_rsi_move in DIVERGENCE_GRADES:
+                graded[strength] = remaining & (price_move_pct > min_price_move_pct) & (rsi_move > min_rsi_move)
+                remaining = remaining & ~graded[strength]
+            graded['weak'] = remaining
+        
+        # A zero reference price raised ZeroDivisionError in the per-symbol code,
+        # which reported no divergence at all for the symbol
+        failed |= found & (price1 == 0)
+        divergences[direction] = graded
+    
+    for direction in DIVERGENCE_DIRECTIONS:
+        for strength in DIVERGENCE_STRENGTHS:
+            divergences[direction][strength] = divergences[direction][strength] & ~failed
+    return divergences
+
+class StreamingRSI:
+    """
+    Wilder-smoothed RSI updated one close at a time in O(1).
+    
+    Seeded with the simple average of the first RSI_PERIOD changes and smoothed
+    with alpha = 1/period afterwards, which gives the same values as talib.RSI.
+    """
+    
+    def __init__(self, period: int = RSI_PERIOD):
+        self.period = period
+        self.previous_close = None
+        self.changes = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = np.nan
+    
+    def update(self, close: float) -> float:
+        """Add the next close and return the RSI (NaN until period changes have been seen)."""
+        if np.isnan(close):
+            return self.value
+        if self.previous_close is None:
+            self.previous_close = close
+            return self.value
+        
+        self.avg_gain, self.avg_loss, self.changes = self._step(close)
+        self.previous_close = close
+        self.value = self._rsi(self.avg_gain, self.avg_loss, self.changes)
+        return self.value
+    
+    def peek(self, close: float) -> float:
+        """RSI the next close would give, without adding it (for the bar still forming)."""
+        if np.isnan(close) or self.previous_close is None:
+            return self.value
+        return self._rsi(*self._step(close))
+    
+    def _step(self, close: float) -> Tuple[float, float, int]:
+        """(avg_gain, avg_loss, changes) after the next close; sums while the seed period fills"""
+        change = close - self.previous_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        changes = self.changes + 1
+        
+        if changes < self.period:
+            # Accumulate the seed sums; averaged once the first period is complete
+            return self.avg_gain + gain, self.avg_loss + loss, changes
+        if changes == self.period:
+            return (self.avg_gain + gain) / self.period, (self.avg_loss + loss) / self.period, changes
+        return ((self.avg_gain * (self.period - 1) + gain) / self.period,
+                (self.avg_loss * (self.period - 1) + loss) / self.period, changes)
+    
+    def _rsi(self, avg_gain: float, avg_loss: float, changes: int) -> float:
+        if changes < self.period:
+            return np.nan
+        total = avg_gain + avg_loss
+        return 100.0 * avg_gain / total if total else 0.0
+
+def grade_divergence(price_move_pct: float, rsi_move: float) -> str:
+    """Strength of a divergence from its price move (%) and RSI move (see DIVERGENCE_GRADES)"""
+    for strength, min_price_move_pct, min_rsi_move in DIVERGENCE_GRADES:
+        if price_move_pct > min_price_move_pct and rsi_move > min_rsi_move:
+            return strength
+    return 'weak'
+
+class DivergenceStreamState:
+    """
+    Streaming RSI and swing state of one symbol/timeframe.
+    
+    Each closed bar updates the RSI and a (2 * order + 1)-bar window in O(1). A
+    swing point is confirmed once order bars have closed after it, and only then
+    is it compared with the previous confirmed swing of the same kind, so a
+    divergence event is emitted exactly once, on the bar that confirms it. The
+    last event of each direction stays active (see divergences()) until the next
+    swing of that kind is confirmed or its earlier swing leaves the lookback.
+    
+    Unlike the snapshot detection, swings within order bars of the latest bar
+    (not yet confirmed) are never used.
+    """
+    
+    def __init__(self, symbol: str, timeframe: str, order: int = SWING_ORDER,
+                 lookback: int = DIVERGENCE_LOOKBACK_BARS, strict: bool = None):
+        """
+        Initialize the state.
+        
+        Args:
+            symbol: Stock symbol
+            timeframe: Timeframe of the bars
+            order: Bars on each side a swing point must exceed
+            lookback: Maximum bars from the confirming bar back to the earlier swing
+            strict: Swing semantics as in detect_swing_points_batch (defaults to
+                whichever the calculator uses in this environment)
+        """
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.order = order
+        self.lookback = lookback
+        self.strict = SCIPY_AVAILABLE if strict is None else strict
+        self.rsi = StreamingRSI()
+        # (bar index, bar time, high, low, rsi) of the most recent bars
+        self.window = deque(maxlen=2 * order + 1)
+        # Last confirmed swing lows (bullish) and highs (bearish): (bar index, bar time, price, rsi)
+        self.swings = {'bullish': deque(maxlen=5), 'bearish': deque(maxlen=5)}
+        # Divergence between the last two swings of each kind: (earlier swing's bar index, event) or None
+        self.active = {'bullish': None, 'bearish': None}
+        self.bars = 0
+        self.last_time = None
+        # Close of the bar that was still forming at the last sync (None if it had closed)
+        self.forming_close = None
+        self.lock = threading.Lock()
+    
+    def update(self, bar_time: Any, high: float, low: float, close: float) -> List[Dict[str, Any]]:
+        """
+        Add the next closed bar.
+        
+        Args:
+            bar_time: Bar open time; bars not after the last one are ignored
+            high: Bar high
+            low: Bar low
+            close: Bar close
+            
+        Returns:
+            Divergence events confirmed by this bar
+        """
+        if self.last_time is not None and bar_time <= self.last_time:
+            return []
+        self.last_time = bar_time
+        
+        rsi = self.rsi.update(close)
+        self.window.append((self.bars, bar_time, high, low, rsi))
+        self.bars += 1
+        if len(self.window) < self.window.maxlen:
+            return []
+        
+        center_index, center_time, center_high, center_low, center_rsi = self.window[self.order]
+        neighbours = [bar for position, bar in enumerate(self.window) if position != self.order]
+        if self.strict:
+            # NaN comparisons are False, as in argrelextrema
+            is_swing_high = all(center_high > bar[2] for bar in neighbours)
+            is_swing_low = all(center_low < bar[3] for bar in neighbours)
+        else:
+            highs = [bar[2] for bar in self.window if not np.isnan(bar[2])]
+            lows = [bar[3] for bar in self.window if not np.isnan(bar[3])]
+            is_swing_high = bool(highs) and center_high == max(highs)
+            is_swing_low = bool(lows) and center_low == min(lows)
+        
+        events = []
+        for direction, is_swing, price in (('bullish', is_swing_low, center_low),
+                                           ('bearish', is_swing_high, center_high)):
+            if not is_swing:
+                continue
+            swings = self.swings[direction]
+            swings.append((center_index, center_time, price, center_rsi))
+            self.active[direction] = None
+            if len(swings) >= 2 and swings[-2][0] >= self.bars - 1 - self.lookback:
+                event = self._divergence_event(direction, swings[-2], swings[-1])
+                if event:
+                    self.active[direction] = (swings[-2][0], event)
+                    events.append(event)
+        return events
+    
+    def divergences(self) -> Dict[str, Dict[str, bool]]:
+        """
+        Divergence flags at the latest bar, as detect_rsi_divergences_batch reports them.
+        
+        A direction is flagged with its event's strength while the earlier of its
+        two swings is within lookback bars of the latest bar.
+        """
+        flags = {}
+        for direction in DIVERGENCE_DIRECTIONS:
+            active = self.active[direction]
+            strength = active[1]['strength'] if active and active[0] >= self.bars - 1 - self.lookback else None
+            flags[direction] = {name: name == strength for name in DIVERGENCE_STRENGTHS}
+        return flags
+    
+    def swing_prices(self, direction: str) -> List[float]:
+        """Prices of the last confirmed swing lows ('bullish') or highs ('bearish'), oldest first"""
+        return [float(swing[2]) for swing in self.swings[direction]]
+    
+    def current_rsi(self) -> float:
+        """RSI at the latest bar, including the bar still forming at the last sync"""
+        if self.forming_close is None:
+            return self.rsi.value
+        return self.rsi.peek(self.forming_close)
+    
+    def _divergence_event(self, direction: str, earlier: Tuple, later: Tuple) -> Optional[Dict[str, Any]]:
+        """Divergence between two consecutive confirmed swings, or None"""
+        _, time1, price1, rsi1 = earlier
+        _, time2, price2, rsi2 = later
+        if price1 == 0:
+            return None
+        
+        if direction == 'bullish':
+            # Price makes lower low, RSI makes higher low
+            if not (price2 < price1 and rsi2 > rsi1):
+                return None
+            price_move_pct = (price1 - price2) / price1 * 100
+            rsi_move = rsi2 - rsi1
+        else:
+            # Price makes higher high, RSI makes lower high
+            if not (price2 > price1 and rsi2 < rsi1):
+                return None
+            price_move_pct = (price2 - price1) / price1 * 100
+            rsi_move = rsi1 - rsi2
+        
+        def timestamp(value):
+            return pd.Timestamp(value).isoformat()
+        
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'direction': direction,
+            'strength': grade_divergence(price_move_pct, rsi_move),
+            'signal_type': 'BUY' if direction == 'bullish' else 'SELL',
+            'swing_times': [timestamp(time1), timestamp(time2)],
+            'swing_prices': [float(price1), float(price2)],
+            'swing_rsi': [float(rsi1), float(rsi2)],
+            'price_move_pct': float(price_move_pct),
+            'rsi_move': float(rsi_move),
+            'confirmed_at': timestamp(self.last_time)
+        }
+
+# Streaming state of every symbol/timeframe synced in this process
+_divergence_streams: Dict[Tuple[str, str], DivergenceStreamState] = {}
+_divergence_streams_lock = threading.Lock()
+
+def _bar_duration(timeframe: str) -> pd.Timedelta:
+    """Length of one bar of a configured timeframe"""
+    params = DivergenceTimeframeConfig.TIMEFRAMES[timeframe]
+    if params['frequency_type'] == 'minute':
+        return pd.Timedelta(minutes=params['frequency'])
+    return pd.Timedelta(days=params['frequency'])
+
+def _closed_bars(datetimes: pd.Series, timeframe: str,
+                 now: Optional[pd.Timestamp] = None) -> Tuple[np.ndarray, int]:
+    """
+    Bar times comparable with the clock, and how many of the bars have closed.
+    
+    Args:
+        datetimes: Bar open times, oldest first. Naive times are local time, as
+            HistoricalDataHandler returns them
+        timeframe: Timeframe of the bars
+        now: Current time in the same zone as the bar times (defaults to now)
+    
+    Returns:
+        (bar times as naive datetime64, number of leading bars that have closed)
+    """
+    times = pd.to_datetime(datetimes)
+    if times.dt.tz is not None:
+        # Compare timezone-aware bars in naive UTC
+        times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+        if now is None:
+            now = pd.Timestamp.now(tz='UTC')
+        if now.tzinfo is not None:
+            now = now.tz_convert('UTC').tz_localize(None)
+    elif now is None:
+        now = pd.Timestamp.now()
+    times = times.to_numpy()
+    return times, int(np.searchsorted(times, np.datetime64(now - _bar_duration(timeframe)), side='right'))
+
+def sync_divergence_stream(symbol: str, timeframe: str, df: pd.DataFrame,
+                           now: Optional[pd.Timestamp] = None) -> List[Dict[str, Any]]:
+    """
+    Feed the closed bars of a fetched history that the symbol/timeframe stream has
+    not seen yet into its streaming state.
+    
+    The first sync (or one whose history no longer reaches back to the last bar
+    seen) replays the whole history to warm the state up without emitting events;
+    later syncs only process the new bars.
+    
+    Args:
+        symbol: Stock symbol
+        timeframe: Timeframe of the bars
+        df: Bars with datetime, high, low and close columns, oldest first. Naive
+            datetimes are local time, as HistoricalDataHandler returns them
+        now: Current time in the same zone as the bar times (defaults to now);
+            a bar still open is not fed, only its close is kept for current_rsi()
+    
+    Returns:
+        Divergence events confirmed by the new bars
+    """
+    if df is None or df.empty:
+        return []
+    
+    times, closed = _closed_bars(df['datetime'], timeframe, now)
+    
+    with _divergence_streams_lock:
+        state = _divergence_streams.get((symbol, timeframe))
+        warm_up = state is None or state.last_time is None or state.last_time < times[0]
+        if warm_up:
+            state = DivergenceStreamState(symbol, timeframe)
+            _divergence_streams[(symbol, timeframe)] = state
+    
+    highs = df['high'].to_numpy(dtype=float)
+    lows = df['low'].to_numpy(dtype=float)
+    closes = df['close'].to_numpy(dtype=float)
+    
+    events = []
+    with state.lock:
+        start = 0 if state.last_time is None else int(np.searchsorted(times, state.last_time, side='right'))
+        for i in range(start, closed):
+            events.extend(state.update(times[i], highs[i], lows[i], closes[i]))
+        state.forming_close = closes[-1] if closed < len(times) else None
+    return [] if warm_up else events
+
+def get_divergence_stream(symbol: str, timeframe: str) -> Optional[DivergenceStreamState]:
+    """Streaming state of a symbol/timeframe (None until it has been synced)"""
+    with _divergence_streams_lock:
+        return _divergence_streams.get((symbol, timeframe))
+
 class DivergenceIndicatorsCalculator:
     """
     Focused calculator for divergence indicators only
@@ -114,19 +579,33 @@ class DivergenceIndicatorsCalculator:
         
         self.logger.info(f"DivergenceIndicatorsCalculator initialized for {timeframe}")
 
-    def get_historical_data_for_timeframe(self, symbol: str) -> Optional[pd.DataFrame]:
-        """Get historical data for the configured timeframe."""
+    def get_historical_data_for_timeframe(self, symbol: str,
+                                          start: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+        """
+        Get historical data for the configured timeframe.
+        
+        Args:
+            symbol: Stock symbol
+            start: Only request bars from this bar time on (naive times are local
+                time); None requests the timeframe's whole period
+        """
         try:
             if self.timeframe not in DivergenceTimeframeConfig.TIMEFRAMES:
                 return None
             
             params = DivergenceTimeframeConfig.TIMEFRAMES[self.timeframe]
+            # The API ignores period when a start date is given; datetime.timestamp()
+            # reads naive times as local time
+            start_date = None
+            if start is not None:
+                start_date = int(pd.Timestamp(start).to_pydatetime().timestamp() * 1000)
             historical_data = self.historical_handler.get_historical_data(
                 symbol=symbol,
                 periodType=params["period_type"],
                 period=params["period"],
                 frequencyType=params["frequency_type"],
-                freq=params["frequency"]
+                freq=params["frequency"],
+                startDate=start_date
             )
             
             if historical_data and 'candles' in historical_data:
@@ -151,13 +630,13 @@ class DivergenceIndicatorsCalculator:
         """Calculate RSI (14-period) for divergence analysis."""
         try:
             if TALIB_AVAILABLE:
-                rsi = talib.RSI(df['close'].values, timeperiod=14)
+                rsi = talib.RSI(df['close'].values, timeperiod=RSI_PERIOD)
                 return pd.Series(rsi, index=df.index)
             else:
                 # Simplified RSI calculation
                 delta = df['close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+                gain = (delta.where(delta > 0, 0)).rolling(window=RSI_PERIOD).mean()
+                loss = (-delta.where(delta < 0, 0)).rolling(window=RSI_PERIOD).mean()
                 rs = gain / loss
                 rsi = 100 - (100 / (1 + rs))
                 return rsi
@@ -171,32 +650,13 @@ class DivergenceIndicatorsCalculator:
         try:
             df_swings = df.copy()
             
-            if SCIPY_AVAILABLE:
-                # Find local maxima using HIGH prices and minima using LOW prices
-                high_indices = argrelextrema(df_swings['high'].values, np.greater, order=5)[0]
-                low_indices = argrelextrema(df_swings['low'].values, np.less, order=5)[0]
-            else:
-                # Simplified swing detection using high/low prices
-                high_indices = []
-                low_indices = []
-                for i in range(5, len(df_swings) - 5):
-                    # Check if current high is the highest in the window
-                    if df_swings['high'].iloc[i] == df_swings['high'].iloc[i-5:i+6].max():
-                        high_indices.append(i)
-                    # Check if current low is the lowest in the window
-                    if df_swings['low'].iloc[i] == df_swings['low'].iloc[i-5:i+6].min():
-                        low_indices.append(i)
-            
-            # Initialize swing columns
-            df_swings['swing_high'] = np.nan
-            df_swings['swing_low'] = np.nan
+            highs = df_swings['high'].to_numpy(dtype=float)[None, :]
+            lows = df_swings['low'].to_numpy(dtype=float)[None, :]
+            swing_highs, swing_lows = detect_swing_points_batch(highs, lows, np.ones(highs.shape, dtype=bool))
             
             # Mark swing points using actual high/low values
-            if len(high_indices) > 0:
-                df_swings.loc[df_swings.index[high_indices], 'swing_high'] = df_swings.iloc[high_indices]['high'].values
-            
-            if len(low_indices) > 0:
-                df_swings.loc[df_swings.index[low_indices], 'swing_low'] = df_swings.iloc[low_indices]['low'].values
+            df_swings['swing_high'] = np.where(swing_highs[0], highs[0], np.nan)
+            df_swings['swing_low'] = np.where(swing_lows[0], lows[0], np.nan)
             
             return df_swings
             
@@ -207,76 +667,17 @@ class DivergenceIndicatorsCalculator:
     def detect_rsi_divergences(self, df: pd.DataFrame) -> Dict[str, Dict[str, bool]]:
         """Detect RSI divergences with improved logic (30-bar lookback, actual high/low prices)."""
         try:
-            divergences = {
-                "bullish": {"strong": False, "medium": False, "weak": False},
-                "bearish": {"strong": False, "medium": False, "weak": False}
-            }
-            
-            # Time constraint: Only consider swing points within last 30 bars
-            current_bar_idx = len(df) - 1
-            lookback_start = max(0, current_bar_idx - 30)
-            
-            # Get swing points within the last 30 bars
-            recent_df = df.iloc[lookback_start:]
-            swing_highs = recent_df['swing_high'].dropna()
-            swing_lows = recent_df['swing_low'].dropna()
-            
-            if len(swing_highs) < 2 and len(swing_lows) < 2:
-                return divergences
-            
-            # Check bullish divergences (swing lows) - Use actual LOWS for price comparison
-            if len(swing_lows) >= 2:
-                lows_indices = swing_lows.index.tolist()[-2:]  # Get last 2 swing lows
-                if len(lows_indices) >= 2:
-                    idx1, idx2 = lows_indices[0], lows_indices[1]
-                    
-                    # Use actual LOW prices for bullish divergence comparison
-                    price1 = float(df.loc[idx1, 'low'])  # First swing low price
-                    price2 = float(df.loc[idx2, 'low'])  # Second swing low price
-                    rsi1 = float(df.loc[idx1, 'rsi'])    # RSI at first swing low
-                    rsi2 = float(df.loc[idx2, 'rsi'])    # RSI at second swing low
-                    
-                    # Bullish divergence: Price makes lower low, RSI makes higher low
-                    if price2 < price1 and rsi2 > rsi1:
-                        # Determine strength based on magnitude of divergence
-                        price_decline_pct = ((price1 - price2) / price1) * 100
-                        rsi_improvement = rsi2 - rsi1
-                        
-                        # Adjusted thresholds for shorter timeframes
-                        if price_decline_pct > 0.5 and rsi_improvement > 3.0:
-                            divergences["bullish"]["strong"] = True
-                        elif price_decline_pct > 0.2 and rsi_improvement > 2.0:
-                            divergences["bullish"]["medium"] = True
-                        else:
-                            divergences["bullish"]["weak"] = True
-            
-            # Check bearish divergences (swing highs) - Use actual HIGHS for price comparison
-            if len(swing_highs) >= 2:
-                highs_indices = swing_highs.index.tolist()[-2:]  # Get last 2 swing highs
-                if len(highs_indices) >= 2:
-                    idx1, idx2 = highs_indices[0], highs_indices[1]
-                    
-                    # Use actual HIGH prices for bearish divergence comparison
-                    price1 = float(df.loc[idx1, 'high'])  # First swing high price
-                    price2 = float(df.loc[idx2, 'high'])  # Second swing high price
-                    rsi1 = float(df.loc[idx1, 'rsi'])     # RSI at first swing high
-                    rsi2 = float(df.loc[idx2, 'rsi'])     # RSI at second swing high
-                    
-                    # Bearish divergence: Price makes higher high, RSI makes lower high
-                    if price2 > price1 and rsi2 < rsi1:
-                        # Determine strength based on magnitude of divergence
-                        price_advance_pct = ((price2 - price1) / price1) * 100
-                        rsi_deterioration = rsi1 - rsi2
-                        
-                        # Adjusted thresholds for shorter timeframes
-                        if price_advance_pct > 0.5 and rsi_deterioration > 3.0:
-                            divergences["bearish"]["strong"] = True
-                        elif price_advance_pct > 0.2 and rsi_deterioration > 2.0:
-                            divergences["bearish"]["medium"] = True
-                        else:
-                            divergences["bearish"]["weak"] = True
+            def row(column):
+                return df[column].to_numpy(dtype=float)[None, :]
             
-            return divergences
+            divergences = detect_rsi_divergences_batch(
+                row('high'), row('low'), row('rsi'),
+                ~np.isnan(row('swing_high')), ~np.isnan(row('swing_low'))
+            )
+            return {
+                direction: {strength: bool(divergences[direction][strength][0]) for strength in DIVERGENCE_STRENGTHS}
+                for direction in DIVERGENCE_DIRECTIONS
+            }
             
         except Exception as e:
             self.logger.error(f"Error detecting RSI divergences: {e}")
@@ -289,9 +690,11 @@ class DivergenceIndicatorsCalculator:
         """Calculate focused divergence indicators for a symbol."""
         try:
             # Get data for this specific timeframe
+            trace = mark_stage(None, 'fetch')
             df = self.get_historical_data_for_timeframe(symbol)
             if df is None or len(df) < 50:
                 return self._create_empty_divergence_indicators(symbol)
+            mark_stage(trace, 'compute')
             
             # Ensure numeric types
             for col in ['open', 'high', 'low', 'close', 'volume']:
@@ -368,7 +771,8 @@ class DivergenceIndicatorsCalculator:
                 'divergence_strength': divergence_strength,
                 'trend_direction': trend_direction,
                 'signal_type': signal_type,
-                'has_trade_signal': bullish_divergence_detected or bearish_divergence_detected
+                'has_trade_signal': bullish_divergence_detected or bearish_divergence_detected,
+                LATENCY_TRACE_KEY: trace
             }
             
         except Exception as e:
@@ -495,23 +899,6 @@ def run_timeframe_analysis_parallel(timeframe: str, watchlist_symbols: List[str]
     
     return timeframe, timeframe_indicators
 
-def convert_numpy_types(obj):
-    """Convert numpy types to native Python types for JSON serialization"""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    else:
-        return obj
-
 def save_divergence_indicators_for_timeframe(timeframe: str, indicators: Dict[str, Any]) -> bool:
     """Save divergence indicators to timeframe-specific JSON file in organized directory"""
     try:
@@ -525,23 +912,20 @@ def save_divergence_indicators_for_timeframe(timeframe: str, indicators: Dict[st
         filename = DivergenceTimeframeConfig.TIMEFRAMES[timeframe]["filename"]
         filepath = os.path.join(output_dir, filename)
         
-        # Convert numpy types to native Python types
-        clean_indicators = convert_numpy_types(indicators)
-        
         # Create comprehensive divergence indicators data
         divergence_data = {
             'strategy_name': f'Divergence_Indicators_{timeframe.upper()}',
             'last_updated': datetime.now().isoformat(),
-            'total_symbols_analyzed': len(clean_indicators),
+            'total_symbols_analyzed': len(indicators),
             'analysis_summary': {
-                'symbols_with_data': len([s for s in clean_indicators.values() if 'error' not in s]),
-                'symbols_with_errors': len([s for s in clean_indicators.values() if 'error' in s]),
-                'bullish_divergences': len([s for s in clean_indicators.values() if s.get('bullish_divergence_detected', False)]),
-                'bearish_divergences': len([s for s in clean_indicators.values() if s.get('bearish_divergence_detected', False)]),
-                'strong_divergences': len([s for s in clean_indicators.values() if s.get('divergence_strength') == 'strong']),
-                'trade_signals': len([s for s in clean_indicators.values() if s.get('has_trade_signal', False)])
+                'symbols_with_data': len([s for s in indicators.values() if 'error' not in s]),
+                'symbols_with_errors': len([s for s in indicators.values() if 'error' in s]),
+                'bullish_divergences': len([s for s in indicators.values() if s.get('bullish_divergence_detected', False)]),
+                'bearish_divergences': len([s for s in indicators.values() if s.get('bearish_divergence_detected', False)]),
+                'strong_divergences': len([s for s in indicators.values() if s.get('divergence_strength') == 'strong']),
+                'trade_signals': len([s for s in indicators.values() if s.get('has_trade_signal', False)])
             },
-            'indicators': clean_indicators,
+            'indicators': indicators,
             'metadata': {
                 'analysis_type': 'divergence_indicators',
                 'timeframe': timeframe,
@@ -556,9 +940,9 @@ def save_divergence_indicators_for_timeframe(timeframe: str, indicators: Dict[st
             }
         }
         
-        # Write to timeframe-specific file in organized directory
-        with open(filepath, 'w') as f:
-            json.dump(divergence_data, f, indent=2)
+        # Write to timeframe-specific file in organized directory (atomically, the
+        # strategy may be reading it)
+        save_artifact(filepath, divergence_data, records_key='indicators')
         
         print(f"✅ Saved {timeframe} divergence indicators to {filepath}")
         print(f"📊 Analysis: {divergence_data['analysis_summary']['symbols_with_data']} symbols, {divergence_data['analysis_summary']['bullish_divergences']} bullish, {divergence_data['analysis_summary']['bearish_divergences']} bearish divergences")
@@ -568,8 +952,48 @@ def save_divergence_indicators_for_timeframe(timeframe: str, indicators: Dict[st
         print(f"❌ Error saving {timeframe} divergence indicators to file: {e}")
         return False
 
-def fetch_all_data_parallel(watchlist_symbols: List[str]) -> Dict[str, Dict[str, pd.DataFrame]]:
-    """Fetch all historical data for all symbols and timeframes in parallel"""
+# Closed bars of the histories fetched in this process:
+# (symbol, timeframe) -> (monotonic time of the full fetch, DataFrame of closed bars)
+_data_cache: Dict[Tuple[str, str], Tuple[float, pd.DataFrame]] = {}
+_data_cache_lock = threading.Lock()
+
+def _get_cached_data(symbol: str, timeframe: str,
+                     max_data_age: Optional[float]) -> Optional[Tuple[float, pd.DataFrame]]:
+    """(full fetch time, closed bars) cached within max_data_age seconds, or None"""
+    if not max_data_age:
+        return None
+    with _data_cache_lock:
+        cached = _data_cache.get((symbol, timeframe))
+    if cached is None or time_module.monotonic() - cached[0] > max_data_age:
+        return None
+    return cached
+
+def _append_bars(closed: pd.DataFrame, newest: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Cached closed bars followed by the newly fetched bars.
+    
+    Returns:
+        The combined bars, or None if the new bars do not start at or before the
+        last cached bar (bars in between may be missing)
+    """
+    if newest is None or newest.empty:
+        return None
+    first = newest['datetime'].iloc[0]
+    if first > closed['datetime'].iloc[-1]:
+        return None
+    return pd.concat([closed[closed['datetime'] < first], newest], ignore_index=True)
+
+def fetch_all_data_parallel(watchlist_symbols: List[str], max_data_age: Optional[float] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Fetch all historical data for all symbols and timeframes in parallel
+    
+    Args:
+        watchlist_symbols: Symbols to fetch
+        max_data_age: Reuse the closed bars of a full history fetched by an earlier
+            call in this process within this many seconds, requesting only the
+            bars from the last of them on, so the forming bar is always fresh
+            (None always fetches the full history)
+    """
     print("📡 Pre-fetching ALL market data simultaneously...")
     fetch_start = time_module.time()
     
@@ -581,7 +1005,26 @@ def fetch_all_data_parallel(watchlist_symbols: List[str]) -> Dict[str, Dict[str,
         """Fetch data for a specific symbol and timeframe"""
         try:
             calculator = DivergenceIndicatorsCalculator(timeframe)
-            df = calculator.get_historical_data_for_timeframe(symbol)
+            cached = _get_cached_data(symbol, timeframe, max_data_age)
+            fetch_started = time_module.monotonic()
+            df = None
+            if cached is not None:
+                cached_at, closed = cached
+                newest = calculator.get_historical_data_for_timeframe(symbol, start=closed['datetime'].iloc[-1])
+                df = _append_bars(closed, newest)
+            if df is None:
+                cached_at = fetch_started
+                df = calculator.get_historical_data_for_timeframe(symbol)
+            if df is not None:
+                df.attrs[LATENCY_TRACE_KEY] = mark_stage(None, 'fetch', fetch_started)
+                if max_data_age:
+                    # The forming bar is left out: it is requested again on every call
+                    _, closed_count = _closed_bars(df['datetime'], timeframe)
+                    if closed_count:
+                        closed = df.iloc[:closed_count].copy()
+                        closed.attrs = {}
+                        with _data_cache_lock:
+                            _data_cache[(symbol, timeframe)] = (cached_at, closed)
             return symbol, timeframe, df
         except Exception as e:
             print(f"  ❌ Error fetching {symbol} {timeframe}: {e}")
@@ -630,96 +1073,199 @@ def fetch_all_data_parallel(watchlist_symbols: List[str]) -> Dict[str, Dict[str,
 
 def process_symbol_timeframe_indicators(symbol: str, timeframe: str, df: Optional[pd.DataFrame]) -> Tuple[str, str, Dict[str, Any]]:
     """Process indicators for a specific symbol and timeframe using pre-fetched data"""
-    try:
-        if df is None or len(df) < 50:
-            return symbol, timeframe, create_empty_divergence_indicators(symbol, timeframe)
-        
-        # Create calculator for this timeframe
-        calculator = DivergenceIndicatorsCalculator(timeframe)
-        
-        # Ensure numeric types
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Calculate RSI
-        df['rsi'] = calculator.calculate_rsi(df)
-        
-        # Detect swing points
-        df_with_swings = calculator.detect_swing_points(df)
-        
-        # Detect divergences
-        divergences = calculator.detect_rsi_divergences(df_with_swings)
-        
-        # Extract current values
-        current_price = float(df['close'].iloc[-1])
-        current_rsi = float(df['rsi'].iloc[-1])
-        current_volume = int(df['volume'].iloc[-1])
-        
-        # Extract swing points
-        swing_highs = df_with_swings['swing_high'].dropna().tolist()
-        swing_lows = df_with_swings['swing_low'].dropna().tolist()
+    return symbol, timeframe, process_timeframe_indicators_batch(timeframe, {symbol: df})[symbol]
+
+def process_timeframe_indicators_stream(timeframe: str, frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Process indicators for every symbol of a streaming timeframe using pre-fetched data.
+    
+    Only the bars closed since the previous run update each symbol's divergence
+    stream (see sync_divergence_stream); RSI, swing points and divergence flags
+    are read from the stream instead of being recomputed over the whole history.
+    The records also carry the divergence events the new bars confirmed.
+    
+    Args:
+        timeframe: Timeframe of the frames
+        frames: Pre-fetched bars by symbol (None if the fetch failed)
         
-        # Determine overall divergence status
-        bullish_divergence_detected = any(divergences['bullish'].values())
-        bearish_divergence_detected = any(divergences['bearish'].values())
+    Returns:
+        Indicators by symbol
+    """
+    results = {}
+    for symbol, df in frames.items():
+        if df is None or len(df) < 50:
+            results[symbol] = create_empty_divergence_indicators(symbol, timeframe)
+            continue
+        try:
+            trace = mark_stage(dict(df.attrs.get(LATENCY_TRACE_KEY, {})), 'compute')
+            
+            # Ensure numeric types
+            for col in ['open', 'high', 'low', 'close', 'volume']:
+                if col in df.columns:
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            
+            events = sync_divergence_stream(symbol, timeframe, df)
+            for event in events:
+                print(f"  📈 {symbol} {timeframe}: {event['strength']} {event['direction']} divergence confirmed")
+            state = get_divergence_stream(symbol, timeframe)
+            with state.lock:
+                indicators = build_divergence_indicators(
+                    symbol, timeframe, df,
+                    swing_highs=state.swing_prices('bearish'),
+                    swing_lows=state.swing_prices('bullish'),
+                    divergences=state.divergences(),
+                    trace=trace,
+                    current_rsi=state.current_rsi()
+                )
+            indicators['divergence_events'] = events
+            results[symbol] = indicators
+        except Exception as e:
+            print(f"  ❌ Error processing {symbol} {timeframe}: {e}")
+            results[symbol] = create_empty_divergence_indicators(symbol, timeframe)
+    
+    return results
+
+def process_timeframe_indicators_batch(timeframe: str, frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Process indicators for every symbol of one timeframe using pre-fetched data.
+    
+    RSI is calculated per symbol; swing points and divergences are detected for
+    all symbols at once on their stacked high/low/RSI arrays. Streaming
+    timeframes (STREAMING_TIMEFRAMES) are handed to
+    process_timeframe_indicators_stream instead.
+    
+    Args:
+        timeframe: Timeframe of the frames
+        frames: Pre-fetched bars by symbol (None if the fetch failed)
         
-        # Determine divergence strength
-        if divergences['bullish']['strong'] or divergences['bearish']['strong']:
-            divergence_strength = 'strong'
-        elif divergences['bullish']['medium'] or divergences['bearish']['medium']:
-            divergence_strength = 'medium'
-        else:
-            divergence_strength = 'weak'
-        
-        # Determine trend direction (simplified)
-        if len(df) >= 20:
-            sma_20 = df['close'].rolling(20).mean().iloc[-1]
-            if current_price > sma_20 * 1.02:
-                trend_direction = 'bullish'
-            elif current_price < sma_20 * 0.98:
-                trend_direction = 'bearish'
-            else:
-                trend_direction = 'neutral'
+    Returns:
+        Indicators by symbol
+    """
+    if timeframe in STREAMING_TIMEFRAMES:
+        return process_timeframe_indicators_stream(timeframe, frames)
+    
+    results = {}
+    prepared = []
+    calculator = DivergenceIndicatorsCalculator(timeframe)
+    
+    for symbol, df in frames.items():
+        if df is None or len(df) < 50:
+            results[symbol] = create_empty_divergence_indicators(symbol, timeframe)
+            continue
+        try:
+            trace = mark_stage(dict(df.attrs.get(LATENCY_TRACE_KEY, {})), 'compute')
+            
+            # Ensure numeric types
+            for col in ['open', 'high', 'low', 'close', 'volume']:
+                if col in df.columns:
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            
+            # Calculate RSI
+            df['rsi'] = calculator.calculate_rsi(df)
+            prepared.append((symbol, df, trace))
+        except Exception as e:
+            print(f"  ❌ Error processing {symbol} {timeframe}: {e}")
+            results[symbol] = create_empty_divergence_indicators(symbol, timeframe)
+    
+    if not prepared:
+        return results
+    
+    # Detect swing points and divergences for all symbols at once
+    highs, valid = stack_series([df['high'].to_numpy(dtype=float) for _, df, _ in prepared])
+    lows, _ = stack_series([df['low'].to_numpy(dtype=float) for _, df, _ in prepared])
+    rsi, _ = stack_series([df['rsi'].to_numpy(dtype=float) for _, df, _ in prepared])
+    swing_high_mask, swing_low_mask = detect_swing_points_batch(highs, lows, valid)
+    all_divergences = detect_rsi_divergences_batch(highs, lows, rsi, swing_high_mask, swing_low_mask)
+    
+    for row, (symbol, df, trace) in enumerate(prepared):
+        try:
+            results[symbol] = build_divergence_indicators(
+                symbol, timeframe, df,
+                swing_highs=highs[row, swing_high_mask[row]].tolist(),
+                swing_lows=lows[row, swing_low_mask[row]].tolist(),
+                divergences={
+                    direction: {strength: bool(all_divergences[direction][strength][row])
+                                for strength in DIVERGENCE_STRENGTHS}
+                    for direction in DIVERGENCE_DIRECTIONS
+                },
+                trace=trace
+            )
+        except Exception as e:
+            print(f"  ❌ Error processing {symbol} {timeframe}: {e}")
+            results[symbol] = create_empty_divergence_indicators(symbol, timeframe)
+    
+    return results
+
+def build_divergence_indicators(symbol: str, timeframe: str, df: pd.DataFrame, swing_highs: List[float],
+                                swing_lows: List[float], divergences: Dict[str, Dict[str, bool]],
+                                trace: Dict[str, float], current_rsi: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Indicator record for one symbol from its bars, swing points and divergences.
+    
+    The RSI is read from the bars' rsi column unless current_rsi is given.
+    """
+    # Extract current values
+    current_price = float(df['close'].iloc[-1])
+    current_rsi = float(df['rsi'].iloc[-1] if current_rsi is None else current_rsi)
+    current_volume = int(df['volume'].iloc[-1])
+    
+    # Determine overall divergence status
+    bullish_divergence_detected = any(divergences['bullish'].values())
+    bearish_divergence_detected = any(divergences['bearish'].values())
+    
+    # Determine divergence strength
+    if divergences['bullish']['strong'] or divergences['bearish']['strong']:
+        divergence_strength = 'strong'
+    elif divergences['bullish']['medium'] or divergences['bearish']['medium']:
+        divergence_strength = 'medium'
+    else:
+        divergence_strength = 'weak'
+    
+    # Determine trend direction (simplified)
+    if len(df) >= 20:
+        sma_20 = df['close'].rolling(20).mean().iloc[-1]
+        if current_price > sma_20 * 1.02:
+            trend_direction = 'bullish'
+        elif current_price < sma_20 * 0.98:
+            trend_direction = 'bearish'
         else:
             trend_direction = 'neutral'
-        
-        # Determine signal type
-        if bullish_divergence_detected:
-            signal_type = "BUY"
-        elif bearish_divergence_detected:
-            signal_type = "SELL"
-        else:
-            signal_type = "NO_SIGNAL"
-        
-        indicators = {
-            'symbol': symbol,
-            'timeframe': timeframe,
-            'timestamp': datetime.now().isoformat(),
-            'current_price': current_price,
-            'current_rsi': current_rsi,
-            'current_volume': current_volume,
-            'swing_highs': swing_highs[-5:] if len(swing_highs) > 5 else swing_highs,  # Last 5
-            'swing_lows': swing_lows[-5:] if len(swing_lows) > 5 else swing_lows,  # Last 5
-            'bullish_divergence_detected': bullish_divergence_detected,
-            'bearish_divergence_detected': bearish_divergence_detected,
-            'bullish_divergence_strong': divergences['bullish']['strong'],
-            'bullish_divergence_medium': divergences['bullish']['medium'],
-            'bullish_divergence_weak': divergences['bullish']['weak'],
-            'bearish_divergence_strong': divergences['bearish']['strong'],
-            'bearish_divergence_medium': divergences['bearish']['medium'],
-            'bearish_divergence_weak': divergences['bearish']['weak'],
-            'divergence_strength': divergence_strength,
-            'trend_direction': trend_direction,
-            'signal_type': signal_type,
-            'has_trade_signal': bullish_divergence_detected or bearish_divergence_detected
-        }
-        
-        return symbol, timeframe, indicators
-        
-    except Exception as e:
-        print(f"  ❌ Error processing {symbol} {timeframe}: {e}")
-        return symbol, timeframe, create_empty_divergence_indicators(symbol, timeframe)
+    else:
+        trend_direction = 'neutral'
+    
+    # Determine signal type
+    if bullish_divergence_detected:
+        signal_type = "BUY"
+    elif bearish_divergence_detected:
+        signal_type = "SELL"
+    else:
+        signal_type = "NO_SIGNAL"
+    
+    indicators = {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'timestamp': datetime.now().isoformat(),
+        'current_price': current_price,
+        'current_rsi': current_rsi,
+        'current_volume': current_volume,
+        'swing_highs': swing_highs[-5:] if len(swing_highs) > 5 else swing_highs,  # Last 5
+        'swing_lows': swing_lows[-5:] if len(swing_lows) > 5 else swing_lows,  # Last 5
+        'bullish_divergence_detected': bullish_divergence_detected,
+        'bearish_divergence_detected': bearish_divergence_detected,
+        'bullish_divergence_strong': divergences['bullish']['strong'],
+        'bullish_divergence_medium': divergences['bullish']['medium'],
+        'bullish_divergence_weak': divergences['bullish']['weak'],
+        'bearish_divergence_strong': divergences['bearish']['strong'],
+        'bearish_divergence_medium': divergences['bearish']['medium'],
+        'bearish_divergence_weak': divergences['bearish']['weak'],
+        'divergence_strength': divergence_strength,
+        'trend_direction': trend_direction,
+        'signal_type': signal_type,
+        'has_trade_signal': bullish_divergence_detected or bearish_divergence_detected,
+        LATENCY_TRACE_KEY: trace
+    }
+    
+    return indicators
 
 def create_empty_divergence_indicators(symbol: str, timeframe: str) -> Dict[str, Any]:
     """Create empty divergence indicators for error cases."""
@@ -747,54 +1293,55 @@ def create_empty_divergence_indicators(symbol: str, timeframe: str) -> Dict[str,
     }
 
 def process_all_indicators_parallel(all_data: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
-    """Process all indicators in parallel using pre-fetched data"""
+    """Process all indicators in parallel using pre-fetched data (one stacked batch per timeframe)"""
     print("⚡ Processing ALL combinations in parallel...")
     process_start = time_module.time()
     
-    # Create results structure: timeframe -> symbol -> indicators
-    results = defaultdict(dict)
-    results_lock = threading.Lock()
+    # Regroup symbol -> timeframe -> DataFrame into timeframe -> symbol -> DataFrame
+    frames_by_timeframe = defaultdict(dict)
+    for symbol, timeframe_data in all_data.items():
+        for timeframe, df in timeframe_data.items():
+            frames_by_timeframe[timeframe][symbol] = df
     
     # Calculate total operations
-    total_operations = sum(len(timeframes) for timeframes in all_data.values())
-    print(f"🔥 Processing {total_operations} symbol-timeframe combinations simultaneously...")
+    total_operations = sum(len(frames) for frames in frames_by_timeframe.values())
+    print(f"🔥 Processing {total_operations} symbol-timeframe combinations in {len(frames_by_timeframe)} timeframe batches...")
     
-    # Use aggressive parallelization for processing
-    max_workers = min(16, total_operations)  # Aggressive concurrency for processing
+    results = {}
     completed_operations = 0
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all processing tasks
-        futures = []
-        for symbol, timeframe_data in all_data.items():
-            for timeframe, df in timeframe_data.items():
-                future = executor.submit(process_symbol_timeframe_indicators, symbol, timeframe, df)
-                futures.append(future)
+    with ThreadPoolExecutor(max_workers=max(1, len(frames_by_timeframe))) as executor:
+        future_to_timeframe = {
+            executor.submit(process_timeframe_indicators_batch, timeframe, frames): timeframe
+            for timeframe, frames in frames_by_timeframe.items()
+        }
         
         # Collect results as they complete
-        for future in as_completed(futures):
+        for future in as_completed(future_to_timeframe):
+            timeframe = future_to_timeframe[future]
             try:
-                symbol, timeframe, indicators = future.result(timeout=30)
-                
-                with results_lock:
-                    results[timeframe][symbol] = indicators
-                    completed_operations += 1
-                    
-                    # Progress updates
-                    if completed_operations % 5 == 0 or completed_operations == total_operations:
-                        print(f"  ⚡ Completed {completed_operations}/{total_operations} operations...")
-                        
+                results[timeframe] = future.result()
+                completed_operations += len(results[timeframe])
+                print(f"  ⚡ Completed {timeframe}: {completed_operations}/{total_operations} operations...")
             except Exception as e:
-                print(f"  ❌ Error in processing: {e}")
-                completed_operations += 1
+                print(f"  ❌ Error in processing {timeframe}: {e}")
     
     process_elapsed = time_module.time() - process_start
     print(f"✅ Processing completed in {process_elapsed:.2f}s")
     
-    return dict(results)
+    return results
 
-def run_all_timeframes_analysis():
-    """Run ultra-parallel divergence indicators analysis"""
+def run_all_timeframes_analysis(max_data_age: Optional[float] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Run ultra-parallel divergence indicators analysis
+    
+    Args:
+        max_data_age: Reuse closed bars fetched by an earlier run in this process
+            within this many seconds (see fetch_all_data_parallel)
+    
+    Returns:
+        Indicators by timeframe and symbol (empty if no watchlist is configured)
+    """
     watchlist_symbols = load_watchlist_from_trading_config()
     
     print("🚀 ULTRA-PARALLEL Divergence Indicators Calculator")
@@ -803,7 +1350,7 @@ def run_all_timeframes_analysis():
     if not watchlist_symbols:
         print("❌ No symbols loaded from trading config. Cannot proceed.")
         print("❌ Please ensure trading_config_live.json contains divergence_strategy_watchlist with symbols")
-        return
+        return {}
     
     total_operations = len(watchlist_symbols) * len(DivergenceTimeframeConfig.TIMEFRAMES)
     print(f"Processing {len(watchlist_symbols)} symbols × {len(DivergenceTimeframeConfig.TIMEFRAMES)} timeframes = {total_operations} total operations...")
@@ -813,7 +1360,7 @@ def run_all_timeframes_analysis():
     overall_start_time = time_module.time()
     
     # Step 1: Fetch all data in parallel
-    all_data = fetch_all_data_parallel(watchlist_symbols)
+    all_data = fetch_all_data_parallel(watchlist_symbols, max_data_age)
     
     # Step 2: Process all indicators in parallel
     all_results = process_all_indicators_parallel(all_data)
@@ -834,6 +1381,8 @@ def run_all_timeframes_analysis():
     for timeframe, config in DivergenceTimeframeConfig.TIMEFRAMES.items():
         filepath = os.path.join(DivergenceTimeframeConfig.OUTPUT_DIR, config['filename'])
         print(f"   - {filepath}")
+    
+    return all_results
 
 def main():
     """Main function to run divergence indicators calculation"""
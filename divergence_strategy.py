@@ -25,6 +25,7 @@ import logging
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import json
+from artifact_store import load_artifact, save_artifact
 
 class SignalType(Enum):
     """Trading signal types"""
@@ -767,7 +768,6 @@ def run_divergence_analysis_for_watchlist() -> Dict[str, Any]:
 def save_divergence_signals_to_file(divergence_signals: Dict[str, Any]) -> bool:
     """Save Divergence signals to dedicated divergence_signals.json file"""
     try:
-        import json
         import os
         
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -797,8 +797,7 @@ def save_divergence_signals_to_file(divergence_signals: Dict[str, Any]) -> bool:
         }
         
         # Write to dedicated Divergence signals file
-        with open(divergence_signals_path, 'w') as f:
-            json.dump(divergence_data, f, indent=2)
+        save_artifact(divergence_signals_path, divergence_data, records_key='signals')
         
         print(f"✅ Saved Divergence signals to {divergence_signals_path}")
         print(f"📊 Analysis: {divergence_data['analysis_summary']['strong_buy']} STRONG_BUY, {divergence_data['analysis_summary']['buy']} BUY, {divergence_data['analysis_summary']['hold']} HOLD")
@@ -837,8 +836,7 @@ def update_existing_divergence_signals_auto_approve():
             print(f"Warning: Could not read auto_approve config: {e}")
         
         # Load existing Divergence signals
-        with open(divergence_signals_path, 'r') as f:
-            divergence_data = json.load(f)
+        divergence_data = load_artifact(divergence_signals_path)
         
         # Update auto_approve for all signals
         signals_updated = 0
@@ -857,8 +855,7 @@ def update_existing_divergence_signals_auto_approve():
         divergence_data['metadata']['auto_approve_status'] = auto_approve
         
         # Save updated Divergence signals
-        with open(divergence_signals_path, 'w') as f:
-            json.dump(divergence_data, f, indent=2)
+        save_artifact(divergence_signals_path, divergence_data, records_key='signals')
         
         print(f"✅ Updated {signals_updated} Divergence signals with auto_approve: {auto_approve}")
         return True
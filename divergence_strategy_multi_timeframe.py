@@ -23,7 +23,6 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
-import subprocess
 import sys
 import time
 import signal as signal_module
@@ -31,6 +30,10 @@ import threading
 from dataclasses import dataclass
 from enum import Enum
 
+from latency_tracer import LATENCY_TRACE_KEY, continue_trace
+from artifact_store import load_artifact_cached, save_artifact
+from divergence_indicators_calculator import run_all_timeframes_analysis
+
 # Import trading components
 try:
     from order_handler import OrderHandler
@@ -41,6 +44,141 @@ except ImportError:
 
 # Risk configuration will be loaded from risk_config_live.json
 
+# Confirmation strength scores; anything other than strong/medium scores as weak
+STRENGTH_SCORES = {'strong': 3, 'medium': 2}
+
+
+class DivergenceConfirmationMatrix:
+    """
+    Symbols × timeframes arrays built once from the per-timeframe divergence
+    indicators, so confirmation, strength scoring and execution data for every
+    symbol are computed with array operations instead of nested dict lookups.
+    """
+    
+    def __init__(self, timeframe_data: Dict[str, Dict[str, Any]], timeframes: List[str],
+                 symbols: Optional[List[str]] = None):
+        """
+        Build the matrix.
+        
+        Args:
+            timeframe_data: {timeframe: {symbol: indicators}}
+            timeframes: Column order
+            symbols: Row order (defaults to every symbol with data in any timeframe)
+        """
+        self.timeframes = list(timeframes)
+        if symbols is None:
+            symbols = sorted(set().union(*(timeframe_data.get(tf, {}).keys() for tf in self.timeframes)))
+        self.symbols = list(symbols)
+        self.row = {symbol: i for i, symbol in enumerate(self.symbols)}
+        
+        shape = (len(self.symbols), len(self.timeframes))
+        self.available = np.zeros(shape, dtype=bool)
+        self.bullish = np.zeros(shape, dtype=bool)
+        self.bearish = np.zeros(shape, dtype=bool)
+        self.strength_score = np.ones(shape, dtype=np.int8)
+        self.strength = np.full(shape, 'none', dtype=object)
+        self.signal_type = np.full(shape, 'NO_SIGNAL', dtype=object)
+        self.trend = np.full(shape, 'neutral', dtype=object)
+        self.current_price = np.zeros(shape)
+        self.rsi = np.full(shape, 50.0)
+        self.volume = np.zeros(shape)
+        
+        # The only per-cell pass: copy the indicator fields into the arrays
+        for col, timeframe in enumerate(self.timeframes):
+            indicators = timeframe_data.get(timeframe) or {}
+            for symbol, symbol_data in indicators.items():
+                row = self.row.get(symbol)
+                if row is None:
+                    continue
+                strength = symbol_data.get('divergence_strength', 'none')
+                self.available[row, col] = True
+                self.bullish[row, col] = bool(symbol_data.get('bullish_divergence_detected', False))
+                self.bearish[row, col] = bool(symbol_data.get('bearish_divergence_detected', False))
+                self.strength[row, col] = strength
+                self.strength_score[row, col] = STRENGTH_SCORES.get(strength, 1)
+                self.signal_type[row, col] = symbol_data.get('signal_type', 'NO_SIGNAL')
+                self.trend[row, col] = symbol_data.get('trend_direction', 'neutral')
+                self.current_price[row, col] = symbol_data.get('current_price', 0) or 0
+                self.rsi[row, col] = symbol_data.get('current_rsi', 50)
+                self.volume[row, col] = symbol_data.get('current_volume', 0) or 0
+    
+    def confirm(self, confirmation_timeframes: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Confirmation status of every symbol.
+        
+        A direction is confirmed when every confirmation timeframe has data and
+        shows that divergence. Strength is the average score of the confirming
+        timeframes (>= 2.5 strong, >= 1.5 medium, else weak); when both directions
+        are confirmed the bearish strength is reported.
+        
+        Returns:
+            Arrays over symbols: bullish_confirmed, bearish_confirmed,
+            has_confirmation, confirmation_strength
+        """
+        cols = [self.timeframes.index(tf) for tf in confirmation_timeframes if tf in self.timeframes]
+        required = len(confirmation_timeframes)
+        available = self.available[:, cols]
+        bullish = self.bullish[:, cols] & available
+        bearish = self.bearish[:, cols] & available
+        
+        bullish_confirmed = bullish.sum(axis=1) >= required
+        bearish_confirmed = bearish.sum(axis=1) >= required
+        strength = np.where(
+            bearish_confirmed, self._grade(bearish, cols),
+            np.where(bullish_confirmed, self._grade(bullish, cols), 'none')
+        )
+        return {
+            'bullish_confirmed': bullish_confirmed,
+            'bearish_confirmed': bearish_confirmed,
+            'has_confirmation': bullish_confirmed | bearish_confirmed,
+            'confirmation_strength': strength
+        }
+    
+    def _grade(self, confirming: np.ndarray, cols: List[int]) -> np.ndarray:
+        """Average strength label over the confirming timeframes of each symbol"""
+        counts = confirming.sum(axis=1)
+        scores = np.where(confirming, self.strength_score[:, cols], 0).sum(axis=1)
+        average = np.divide(scores, counts, out=np.zeros(len(counts)), where=counts > 0)
+        return np.select([average >= 2.5, average >= 1.5], ['strong', 'medium'], 'weak').astype(object)
+    
+    def execution_data(self, execution_timeframe: str) -> Dict[str, np.ndarray]:
+        """Execution fields of every symbol from one timeframe (available marks symbols with data)"""
+        if execution_timeframe not in self.timeframes:
+            empty = np.zeros(len(self.symbols))
+            return {'available': empty.astype(bool), 'current_price': empty, 'rsi': empty + 50,
+                    'trend': np.full(len(self.symbols), 'neutral', dtype=object), 'volume': empty}
+        col = self.timeframes.index(execution_timeframe)
+        return {
+            'available': self.available[:, col],
+            'current_price': self.current_price[:, col],
+            'rsi': self.rsi[:, col],
+            'trend': self.trend[:, col],
+            'volume': self.volume[:, col]
+        }
+    
+    def timeframe_signals(self, row: int) -> Dict[str, Dict[str, Any]]:
+        """Per-timeframe signal summary of one symbol (as stored in timeframe_analysis)"""
+        signals = {}
+        for col, timeframe in enumerate(self.timeframes):
+            if not self.available[row, col]:
+                signals[timeframe] = {
+                    'available': False,
+                    'bullish_divergence': False,
+                    'bearish_divergence': False,
+                    'strength': 'none'
+                }
+                continue
+            signals[timeframe] = {
+                'available': True,
+                'bullish_divergence': bool(self.bullish[row, col]),
+                'bearish_divergence': bool(self.bearish[row, col]),
+                'strength': self.strength[row, col],
+                'signal_type': self.signal_type[row, col],
+                'trend_direction': self.trend[row, col]
+            }
+        return signals
+
+
 class MultiTimeframeDivergenceStrategy:
     """
     Multi-timeframe divergence strategy that requires confirmation across timeframes
@@ -129,39 +267,29 @@ class MultiTimeframeDivergenceStrategy:
         self.logger.info(f"  Stop loss ATR multiplier: {self.stop_loss_atr_multiplier}")
 
 
-    def _generate_fresh_divergence_data(self) -> bool:
-        """Generate fresh divergence indicators using the ultra-parallel calculator."""
+    def _generate_fresh_divergence_data(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate fresh divergence indicators by calling the ultra-parallel calculator in-process.
+        
+        Returns:
+            Indicators by timeframe and symbol (empty on failure)
+        """
         try:
             self.logger.info("🔄 Calling divergence indicators calculator...")
+            generation_start = time.monotonic()
             
-            # Run the divergence indicators calculator
-            result = subprocess.run(
-                [sys.executable, 'divergence_indicators_calculator.py'],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+            results = run_all_timeframes_analysis()
             
-            if result.returncode == 0:
-                self.logger.info("✅ Successfully generated fresh divergence indicators")
-                # Log key output lines
-                output_lines = result.stdout.split('\n')
-                for line in output_lines:
-                    if any(keyword in line for keyword in ['ULTRA-PARALLEL', 'completed in', 'Created', 'symbols']):
-                        self.logger.info(f"   {line.strip()}")
-                return True
+            if results:
+                self.logger.info(f"✅ Successfully generated fresh divergence indicators "
+                                 f"({len(results)} timeframes in {time.monotonic() - generation_start:.1f}s)")
             else:
-                self.logger.error(f"❌ Divergence calculator failed with return code {result.returncode}")
-                if result.stderr:
-                    self.logger.error(f"   Error: {result.stderr.strip()}")
-                return False
+                self.logger.error("❌ Divergence calculator produced no indicators")
+            return results
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error("❌ Divergence calculator timed out after 5 minutes")
-            return False
         except Exception as e:
             self.logger.error(f"❌ Error running divergence calculator: {e}")
-            return False
+            return {}
 
     def _load_trading_config(self) -> Dict[str, Any]:
         """Load trading configuration from trading_config_live.json"""
@@ -207,20 +335,28 @@ class MultiTimeframeDivergenceStrategy:
         except Exception as e:
             self.logger.error(f"❌ Error reloading trading config: {e}")
 
-    def load_multi_timeframe_data(self) -> Dict[str, Dict[str, Any]]:
-        """Load divergence indicators from divergence_data directory."""
+    def load_multi_timeframe_data(self, fresh_indicators: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load divergence indicators from divergence_data directory.
+        
+        Args:
+            fresh_indicators: Indicators by timeframe already in memory (e.g. just
+                generated in-process); only timeframes missing from it are read from disk
+        """
         timeframe_data = {}
         divergence_data_dir = 'divergence_data'
         
         for timeframe in self.timeframes:
+            if fresh_indicators and timeframe in fresh_indicators:
+                timeframe_data[timeframe] = fresh_indicators[timeframe]
+                continue
+            
             filename = f'divergence_indicators_{timeframe}.json'
             filepath = os.path.join(divergence_data_dir, filename)
             
             try:
-                if os.path.exists(filepath):
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                    
+                data = load_artifact_cached(filepath)
+                if data is not None:
                     # Extract indicators from the divergence data structure
                     timeframe_data[timeframe] = data.get('indicators', {})
                     self.logger.info(f"✅ Loaded {len(timeframe_data[timeframe])} symbols from {filepath}")
@@ -245,126 +381,71 @@ class MultiTimeframeDivergenceStrategy:
         Returns:
             Dictionary with confirmation results
         """
-        confirmation_result = {
-            'symbol': symbol,
-            'has_confirmation': False,
-            'bullish_confirmed': False,
-            'bearish_confirmed': False,
-            'timeframe_signals': {},
-            'confirmation_strength': 'none',
-            'execution_data': {}
-        }
+        return self.check_divergence_confirmations(timeframe_data, [symbol])[symbol]
+
+    def check_divergence_confirmations(self, timeframe_data: Dict[str, Dict[str, Any]],
+                                       symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Check divergence confirmation for many symbols at once.
         
-        try:
-            # Check each timeframe for divergence signals
-            for timeframe in self.timeframes:
-                if timeframe not in timeframe_data or symbol not in timeframe_data[timeframe]:
-                    confirmation_result['timeframe_signals'][timeframe] = {
-                        'available': False,
-                        'bullish_divergence': False,
-                        'bearish_divergence': False,
-                        'strength': 'none'
-                    }
-                    continue
-                
-                # Data is now directly from divergence indicators (no nested structure)
-                symbol_data = timeframe_data[timeframe][symbol]
-                
-                # Extract divergence information directly from symbol data
-                bullish_div = symbol_data.get('bullish_divergence_detected', False)
-                bearish_div = symbol_data.get('bearish_divergence_detected', False)
-                strength = symbol_data.get('divergence_strength', 'none')
-                
-                confirmation_result['timeframe_signals'][timeframe] = {
-                    'available': True,
-                    'bullish_divergence': bullish_div,
-                    'bearish_divergence': bearish_div,
-                    'strength': strength,
-                    'signal_type': symbol_data.get('signal_type', 'NO_SIGNAL'),
-                    'trend_direction': symbol_data.get('trend_direction', 'neutral')
-                }
-            
-            # Check for confirmation across required timeframes
-            bullish_confirmations = []
-            bearish_confirmations = []
-            
-            for timeframe in self.confirmation_timeframes:
-                if timeframe in confirmation_result['timeframe_signals']:
-                    tf_signal = confirmation_result['timeframe_signals'][timeframe]
-                    if tf_signal['available']:
-                        if tf_signal['bullish_divergence']:
-                            bullish_confirmations.append(timeframe)
-                        if tf_signal['bearish_divergence']:
-                            bearish_confirmations.append(timeframe)
-            
-            # Determine confirmation status
-            required_confirmations = len(self.confirmation_timeframes)
-            
-            if len(bullish_confirmations) >= required_confirmations:
-                confirmation_result['bullish_confirmed'] = True
-                confirmation_result['has_confirmation'] = True
-                confirmation_result['confirmation_strength'] = self._calculate_confirmation_strength(bullish_confirmations, timeframe_data, symbol, 'bullish')
+        Args:
+            timeframe_data: Data from all timeframes
+            symbols: Symbols to analyze
             
-            if len(bearish_confirmations) >= required_confirmations:
-                confirmation_result['bearish_confirmed'] = True
-                confirmation_result['has_confirmation'] = True
-                confirmation_result['confirmation_strength'] = self._calculate_confirmation_strength(bearish_confirmations, timeframe_data, symbol, 'bearish')
+        Returns:
+            Confirmation results by symbol
+        """
+        results = {}
+        try:
+            matrix = DivergenceConfirmationMatrix(timeframe_data, self.timeframes, symbols)
+            confirmation = matrix.confirm(self.confirmation_timeframes)
+            execution = matrix.execution_data(self.execution_timeframe)
             
-            # Get execution data from 1-minute timeframe
-            if self.execution_timeframe in timeframe_data and symbol in timeframe_data[self.execution_timeframe]:
-                exec_data = timeframe_data[self.execution_timeframe][symbol]
-                confirmation_result['execution_data'] = {
-                    'current_price': exec_data.get('current_price', 0),
-                    'atr': 0,  # ATR not available in divergence data, will calculate from price
-                    'rsi': exec_data.get('current_rsi', 50),
-                    'trend': exec_data.get('trend_direction', 'neutral'),
-                    'volume': exec_data.get('current_volume', 0)
+            for row, symbol in enumerate(matrix.symbols):
+                confirmation_result = {
+                    'symbol': symbol,
+                    'has_confirmation': bool(confirmation['has_confirmation'][row]),
+                    'bullish_confirmed': bool(confirmation['bullish_confirmed'][row]),
+                    'bearish_confirmed': bool(confirmation['bearish_confirmed'][row]),
+                    'timeframe_signals': matrix.timeframe_signals(row),
+                    'confirmation_strength': confirmation['confirmation_strength'][row],
+                    'execution_data': {}
                 }
-            
-            return confirmation_result
+                
+                # Get execution data from 1-minute timeframe
+                if execution['available'][row]:
+                    execution_indicators = timeframe_data.get(self.execution_timeframe, {}).get(symbol, {})
+                    confirmation_result['execution_data'] = {
+                        'current_price': float(execution['current_price'][row]),
+                        'atr': 0,  # ATR not available in divergence data, will calculate from price
+                        'rsi': float(execution['rsi'][row]),
+                        'trend': execution['trend'][row],
+                        'volume': int(execution['volume'][row]),
+                        # Divergences the streaming calculator confirmed on the latest 1-minute bars
+                        'divergence_events': execution_indicators.get('divergence_events', [])
+                    }
+                results[symbol] = confirmation_result
             
         except Exception as e:
-            self.logger.error(f"Error checking divergence confirmation for {symbol}: {e}")
-            return confirmation_result
-
-    def _calculate_confirmation_strength(self, confirmations: List[str], timeframe_data: Dict[str, Dict[str, Any]], 
-                                       symbol: str, direction: str) -> str:
-        """Calculate the strength of multi-timeframe confirmation."""
-        try:
-            strength_scores = []
-            
-            for timeframe in confirmations:
-                if timeframe in timeframe_data and symbol in timeframe_data[timeframe]:
-                    symbol_data = timeframe_data[timeframe][symbol]
-                    strength = symbol_data.get('divergence_strength', 'weak')
-                    
-                    # Convert strength to numeric score
-                    if strength == 'strong':
-                        strength_scores.append(3)
-                    elif strength == 'medium':
-                        strength_scores.append(2)
-                    else:  # weak
-                        strength_scores.append(1)
-            
-            if not strength_scores:
-                return 'weak'
-            
-            avg_strength = sum(strength_scores) / len(strength_scores)
-            
-            if avg_strength >= 2.5:
-                return 'strong'
-            elif avg_strength >= 1.5:
-                return 'medium'
-            else:
-                return 'weak'
-                
-        except Exception:
-            return 'weak'
+            self.logger.error(f"Error checking divergence confirmation: {e}")
+        
+        for symbol in symbols:
+            results.setdefault(symbol, {
+                'symbol': symbol,
+                'has_confirmation': False,
+                'bullish_confirmed': False,
+                'bearish_confirmed': False,
+                'timeframe_signals': {},
+                'confirmation_strength': 'none',
+                'execution_data': {}
+            })
+        return results
 
     def load_account_data(self) -> Dict[str, Any]:
         """Load current account data from account_data.json"""
-        with open('account_data.json', 'r') as f:
-            data = json.load(f)
+        data = load_artifact_cached('account_data.json')
+        if data is None:
+            raise FileNotFoundError('account_data.json not found')
         
         # Extract first account data
         account_data = data.get('account_data', {})
@@ -372,8 +453,10 @@ class MultiTimeframeDivergenceStrategy:
     
     def load_current_positions(self) -> Dict[str, Any]:
         """Load current positions data from current_positions.json"""
-        with open('current_positions.json', 'r') as f:
-            return json.load(f)
+        data = load_artifact_cached('current_positions.json')
+        if data is None:
+            raise FileNotFoundError('current_positions.json not found')
+        return data
     
     def calculate_comprehensive_position_size(self, symbol: str, current_price: float, 
                                             signal_strength: str, stop_loss_price: float) -> Dict[str, Any]:
@@ -630,7 +713,8 @@ class MultiTimeframeDivergenceStrategy:
             'multi_timeframe_confirmation': False,
             'confirmed_timeframes': [],
             'timeframe_analysis': confirmation_result.get('timeframe_signals', {}),
-            'confirmation_strength': confirmation_result.get('confirmation_strength', 'none')
+            'confirmation_strength': confirmation_result.get('confirmation_strength', 'none'),
+            'execution_divergence': None
         }
         
         try:
@@ -682,6 +766,15 @@ class MultiTimeframeDivergenceStrategy:
                 signal['profit_target'] = current_price - (atr * self.stop_loss_atr_multiplier * self.risk_reward_ratio)
                 signal['market_condition'] = 'BEARISH_DIVERGENCE'
             
+            # Latest execution-timeframe divergence in the confirmed direction times the entry
+            direction = 'bullish' if confirmation_result.get('bullish_confirmed', False) else 'bearish'
+            matching_events = [event for event in exec_data.get('divergence_events', [])
+                               if event.get('direction') == direction]
+            if matching_events:
+                signal['execution_divergence'] = dict(matching_events[-1])
+                signal['entry_reason'] += (f"; {self.execution_timeframe} {direction} divergence confirmed "
+                                           f"at {matching_events[-1]['confirmed_at']}")
+            
             # Calculate comprehensive position sizing
             position_sizing = self.calculate_comprehensive_position_size(
                 symbol, current_price, strength, signal['stop_loss']
@@ -719,14 +812,19 @@ class MultiTimeframeDivergenceStrategy:
             signal['entry_reason'] = f'Error in signal generation: {str(e)}'
             return signal
 
-    def analyze_symbol(self, symbol: str, timeframe_data: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_symbol(self, symbol: str, timeframe_data: Dict[str, Dict[str, Any]],
+                       confirmation_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze a single symbol for multi-timeframe divergence signals."""
         try:
-            # Check for multi-timeframe confirmation
-            confirmation_result = self.check_divergence_confirmation(symbol, timeframe_data)
+            # Check for multi-timeframe confirmation (unless already computed for all symbols)
+            if confirmation_result is None:
+                confirmation_result = self.check_divergence_confirmation(symbol, timeframe_data)
             
             # Generate trading signal
             signal = self.generate_multi_timeframe_signal(symbol, confirmation_result)
+            signal[LATENCY_TRACE_KEY] = continue_trace(
+                (indicators.get(symbol) for indicators in timeframe_data.values()), 'signal'
+            )
             
             # Log analysis result
             if signal['signal_type'] != 'NO_SIGNAL':
@@ -922,14 +1020,15 @@ class MultiTimeframeDivergenceStrategy:
         self.logger.info("🚀 Starting Multi-Timeframe Divergence Analysis...")
         
         # Auto-generate fresh divergence indicators if requested
+        fresh_indicators = None
         if auto_generate_data:
             self.logger.info("📊 Auto-generating fresh divergence indicators...")
-            success = self._generate_fresh_divergence_data()
-            if not success:
+            fresh_indicators = self._generate_fresh_divergence_data()
+            if not fresh_indicators:
                 self.logger.warning("⚠️ Failed to generate fresh data, proceeding with existing data")
         
-        # Load data from all timeframes
-        timeframe_data = self.load_multi_timeframe_data()
+        # Load data from all timeframes (freshly generated indicators are used as-is)
+        timeframe_data = self.load_multi_timeframe_data(fresh_indicators)
         
         # Determine symbols to analyze
         if self.watchlist_symbols:
@@ -950,6 +1049,9 @@ class MultiTimeframeDivergenceStrategy:
         
         self.logger.info(f"📊 Analyzing {len(symbols_to_analyze)} symbols across {len(self.timeframes)} timeframes")
         
+        # Confirmation for every symbol in one pass over the symbols × timeframes matrix
+        confirmations = self.check_divergence_confirmations(timeframe_data, sorted(symbols_to_analyze))
+        
         # Analyze each symbol
         signals = {}
         confirmed_signals = 0
@@ -957,7 +1059,7 @@ class MultiTimeframeDivergenceStrategy:
         for symbol in sorted(symbols_to_analyze):
             # Only analyze if symbol has data in timeframes
             if any(symbol in tf_data for tf_data in timeframe_data.values()):
-                signal = self.analyze_symbol(symbol, timeframe_data)
+                signal = self.analyze_symbol(symbol, timeframe_data, confirmations[symbol])
                 signals[symbol] = signal
                 
                 if signal['signal_type'] in ['STRONG_BUY', 'BUY', 'STRONG_SELL', 'SELL']:
@@ -1027,8 +1129,8 @@ def save_signals_to_file(signals: Dict[str, Any]) -> bool:
         # Write to file in organized directory
         filename = 'divergence_signals_multi_timeframe.json'
         filepath = os.path.join(output_dir, filename)
-        with open(filepath, 'w') as f:
-            json.dump(signals_data, f, indent=2)
+        # Replace atomically: the trading engine reacts to the file changing
+        save_artifact(filepath, signals_data, records_key='signals')
         
         print(f"✅ Saved multi-timeframe divergence signals to {filepath}")
         print(f"📊 Summary: {signals_data['analysis_summary']['strong_buy']} STRONG_BUY, {signals_data['analysis_summary']['buy']} BUY, {signals_data['analysis_summary']['strong_sell']} STRONG_SELL, {signals_data['analysis_summary']['sell']} SELL")
@@ -3,14 +3,15 @@
 Divergence Trading Engine
 
 Specialized trading engine for divergence strategy signals that:
-1. Monitors divergence_data/divergence_signals_multi_timeframe.json
+1. Reacts to changes of divergence_data/divergence_signals_multi_timeframe.json
+   as they happen (file system events, or fast mtime polling)
 2. Executes trades automatically when divergence signals meet criteria
 3. Integrates with trading_config_live.json for risk management
 4. Provides enhanced divergence-specific features
 
 Key Features:
 - Multi-timeframe divergence signal monitoring
-- Automatic fresh data generation via divergence_indicators_calculator.py
+- Automatic fresh data generation by calling divergence_indicators_calculator in-process
 - Enhanced risk management for divergence trades
 - Position sizing based on divergence strength
 - Specialized logging and notifications for divergence trades
@@ -22,16 +23,21 @@ import json
 import os
 import time
 import threading
-import subprocess
-import sys
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 from dataclasses import dataclass
 from enum import Enum
 
 # Import existing handlers
-from order_handler import OrderHandler
+from order_handler import get_order_handler
+from order_book import API_TIME_FORMAT
+from latency_tracer import LATENCY_TRACE_KEY, get_latency_tracer, mark_stage
+from file_watcher import FileChangeWatcher
+from atomic_json import write_json_atomic
+from artifact_store import load_artifact_cached, load_artifact_records
+from divergence_indicators_calculator import run_all_timeframes_analysis
 
 class DivergenceSignalType(Enum):
     """Divergence signal types"""
@@ -87,6 +93,8 @@ class DivergenceTradeOrder:
     notes: str = ""
     divergence_strength: str = "weak"
     confirmed_timeframes: List[str] = None
+    latency_trace: Optional[Dict[str, float]] = None
+    schwab_order_id: Optional[str] = None
 
 class DivergenceTradingEngine:
     """
@@ -110,7 +118,7 @@ class DivergenceTradingEngine:
         self.logger = logging.getLogger(__name__)
         
         # Initialize handlers
-        self.order_handler = OrderHandler()
+        self.order_handler = get_order_handler()
         
         # Trading state
         self.active_orders: Dict[str, DivergenceTradeOrder] = {}
@@ -129,6 +137,14 @@ class DivergenceTradingEngine:
         self.auto_generate_data = True  # Auto-generate fresh divergence data
         self.data_generation_interval = 300  # 5 minutes
         self.last_data_generation = datetime.min
+        # Closed bars of a full history are reused for this long; runs in between
+        # only request the bars from the last closed one on
+        self.data_cache_seconds = self.config.get('data_cache_seconds', 900)
+        self.data_generation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='divergence-data')
+        self.data_generation_future = None
+        
+        # Wake up as soon as the strategy rewrites the signals file
+        self.signal_watcher = FileChangeWatcher(self.signals_file)
         
         self.logger.info("🎯 Divergence Trading Engine initialized")
         self.logger.info(f"📊 Signals file: {self.signals_file}")
@@ -263,8 +279,7 @@ class DivergenceTradingEngine:
                 signals_dict = self.processed_signals
                 
             os.makedirs('divergence_data', exist_ok=True)
-            with open(self.processed_signals_file, 'w') as f:
-                json.dump(signals_dict, f, indent=2)
+            write_json_atomic(self.processed_signals_file, signals_dict)
                 
         except Exception as e:
             self.logger.error(f"❌ Error saving processed signals: {e}")
@@ -276,6 +291,7 @@ class DivergenceTradingEngine:
             return
         
         self.running = True
+        self.signal_watcher.start()
         self.monitor_thread = threading.Thread(target=self._monitor_divergence_signals, daemon=True)
         self.monitor_thread.start()
         
@@ -284,8 +300,10 @@ class DivergenceTradingEngine:
     def stop_monitoring(self):
         """Stop the divergence signal monitoring"""
         self.running = False
+        self.signal_watcher.stop()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        self.data_generation_executor.shutdown(wait=False)
         
         # Save processed signals on shutdown
         try:
@@ -297,18 +315,40 @@ class DivergenceTradingEngine:
         self.logger.info("🛑 Divergence Trading Engine stopped")
 
     def _monitor_divergence_signals(self):
-        """Main monitoring loop for divergence signals"""
+        """
+        Main monitoring loop for divergence signals
+        
+        New signals are checked the moment the signals file changes; data
+        generation, a full signal re-check and order management run every
+        monitor_interval.
+        """
         self.logger.info("📡 Divergence signal monitoring loop started")
+        next_cycle = time.monotonic()
         
         while self.running:
             try:
-                # Auto-generate fresh divergence data if needed
+                # Wait for the signals file to change or the next periodic cycle
+                signals_changed = self.signal_watcher.wait(timeout=max(0.0, next_cycle - time.monotonic()))
+                if not self.running:
+                    break
+                
+                if signals_changed:
+                    self.logger.info("⚡ Divergence signals file changed - checking signals")
+                    self._check_divergence_signals()
+                
+                if time.monotonic() < next_cycle:
+                    continue
+                monitor_interval = self.config.get('monitor_interval', 30)
+                next_cycle = time.monotonic() + monitor_interval
+                
+                # Auto-generate fresh divergence data if needed (in the background)
                 if self.auto_generate_data and self._should_generate_fresh_data():
-                    self._generate_fresh_divergence_data()
+                    self._start_divergence_data_generation()
                 
                 # Check for divergence signals
-                self.logger.info("🔍 Checking divergence signals...")
-                self._check_divergence_signals()
+                if not signals_changed:
+                    self.logger.info("🔍 Checking divergence signals...")
+                    self._check_divergence_signals()
                 
                 # Manage existing orders
                 active_orders_count = len(self.active_orders)
@@ -316,10 +356,7 @@ class DivergenceTradingEngine:
                     self.logger.info(f"📋 Managing {active_orders_count} active divergence orders")
                     self._manage_existing_orders()
                 
-                # Sleep until next check
-                monitor_interval = self.config.get('monitor_interval', 30)
-                self.logger.info(f"⏰ Next divergence check in {monitor_interval} seconds...")
-                time.sleep(monitor_interval)
+                self.logger.info(f"⏰ Next divergence check in {monitor_interval} seconds (or on new signals)...")
                 
             except KeyboardInterrupt:
                 self.logger.info("⚠️ Received interrupt signal")
@@ -336,37 +373,32 @@ class DivergenceTradingEngine:
         except Exception:
             return True
 
+    def _start_divergence_data_generation(self):
+        """Run data generation on the background worker unless a run is still in progress"""
+        if self.data_generation_future is not None and not self.data_generation_future.done():
+            self.logger.debug("📊 Divergence data generation still running")
+            return
+        self.data_generation_future = self.data_generation_executor.submit(self._generate_fresh_divergence_data)
+
     def _generate_fresh_divergence_data(self) -> bool:
-        """Generate fresh divergence indicators using the calculator"""
+        """Generate fresh divergence indicators by calling the calculator in-process"""
         try:
             self.logger.info("📊 Auto-generating fresh divergence indicators...")
+            generation_start = time.monotonic()
             
-            result = subprocess.run(
-                [sys.executable, 'divergence_indicators_calculator.py'],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+            # Closed bars fetched by a previous run are reused (see data_cache_seconds)
+            results = run_all_timeframes_analysis(max_data_age=self.data_cache_seconds)
             
-            if result.returncode == 0:
-                self.logger.info("✅ Successfully generated fresh divergence indicators")
+            if results:
                 self.last_data_generation = datetime.now()
-                
-                # Log key output lines
-                output_lines = result.stdout.split('\n')
-                for line in output_lines:
-                    if any(keyword in line for keyword in ['ULTRA-PARALLEL', 'completed in', 'Created']):
-                        self.logger.info(f"   {line.strip()}")
+                symbols = max(len(indicators) for indicators in results.values())
+                self.logger.info(f"✅ Generated fresh divergence indicators for {symbols} symbols × "
+                                 f"{len(results)} timeframes in {time.monotonic() - generation_start:.1f}s")
                 return True
             else:
-                self.logger.error(f"❌ Divergence calculator failed with return code {result.returncode}")
-                if result.stderr:
-                    self.logger.error(f"   Error: {result.stderr.strip()}")
+                self.logger.error("❌ Divergence calculator produced no indicators")
                 return False
                 
-        except subprocess.TimeoutExpired:
-            self.logger.error("❌ Divergence calculator timed out after 5 minutes")
-            return False
         except Exception as e:
             self.logger.error(f"❌ Error generating fresh divergence data: {e}")
             return False
@@ -388,6 +420,13 @@ class DivergenceTradingEngine:
             actionable_signals = 0
             for symbol, signal_data in signals.items():
                 try:
+                    # The loaded signals are shared with other readers (load_artifact_cached):
+                    # stamp risk_check/submit/ack/fill on this evaluation's own copy of the trace
+                    trace = signal_data.get(LATENCY_TRACE_KEY)
+                    if trace:
+                        signal_data = dict(signal_data)
+                        signal_data[LATENCY_TRACE_KEY] = dict(trace)
+
                     if self._should_execute_divergence_trade(symbol, signal_data):
                         self._execute_divergence_trade(symbol, signal_data)
                         actionable_signals += 1
@@ -403,15 +442,13 @@ class DivergenceTradingEngine:
             self.logger.error(f"❌ Error checking divergence signals: {e}")
 
     def _load_divergence_signals(self) -> Optional[Dict[str, Any]]:
-        """Load divergence signals from JSON file"""
+        """Load divergence signals from the artifact store (re-read only when they change)"""
         try:
-            if not os.path.exists(self.signals_file):
+            data = load_artifact_cached(self.signals_file)
+            if data is None:
                 self.logger.debug(f"📄 Divergence signals file not found: {self.signals_file}")
                 return None
             
-            with open(self.signals_file, 'r') as f:
-                data = json.load(f)
-            
             self.logger.debug(f"📊 Loaded divergence signals from {self.signals_file}")
             return data
                 
@@ -422,6 +459,8 @@ class DivergenceTradingEngine:
     def _should_execute_divergence_trade(self, symbol: str, signal_data: Dict[str, Any]) -> bool:
         """Determine if a divergence trade should be executed"""
         try:
+            risk_check_started = time.monotonic()
+            
             # Check if auto_approve is enabled
             if not signal_data.get('auto_approve', False):
                 self.logger.debug(f"🔒 Auto-approve disabled for divergence {symbol}, skipping trade")
@@ -477,6 +516,8 @@ class DivergenceTradingEngine:
                 return False
 
             self.logger.info(f"✅ Divergence signal approved for execution: {symbol} {signal_type} (confidence: {confidence:.2f})")
+            if signal_data.get(LATENCY_TRACE_KEY):
+                mark_stage(signal_data[LATENCY_TRACE_KEY], 'risk_check', risk_check_started)
             
             return True
             
@@ -685,11 +726,14 @@ class DivergenceTradingEngine:
                 created_at=datetime.now(),
                 notes=f"Divergence trade: {signal.entry_reason}",
                 divergence_strength=signal.confirmation_strength,
-                confirmed_timeframes=signal.confirmed_timeframes
+                confirmed_timeframes=signal.confirmed_timeframes,
+                latency_trace=signal_data.get(LATENCY_TRACE_KEY)
             )
             
             # Submit order
             success = self._submit_divergence_order(trade_order)
+            get_latency_tracer().record('divergence', symbol, trade_order.latency_trace, trace_id=order_id,
+                                        outcome='submitted' if success else 'rejected')
             
             if success:
                 self.active_orders[order_id] = trade_order
@@ -759,15 +803,11 @@ class DivergenceTradingEngine:
             # Fallback to divergence indicators data
             for timeframe in ['1min', '5min', '15min']:
                 filepath = f'divergence_data/divergence_indicators_{timeframe}.json'
-                if os.path.exists(filepath):
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                    
-                    indicators = data.get('indicators', {})
-                    if symbol in indicators:
-                        current_price = indicators[symbol].get('current_price', 0)
-                        if current_price > 0:
-                            return float(current_price)
+                indicators = load_artifact_records(filepath, 'indicators', keys=[symbol])
+                if symbol in indicators:
+                    current_price = indicators[symbol].get('current_price', 0)
+                    if current_price > 0:
+                        return float(current_price)
             
             self.logger.warning(f"⚠️ Could not get current price for {symbol}")
             return 0.0
@@ -801,6 +841,9 @@ class DivergenceTradingEngine:
             has_profit_target = trade_order.profit_target > 0
             has_stop_loss = trade_order.stop_loss > 0
             
+            if trade_order.latency_trace is not None:
+                mark_stage(trade_order.latency_trace, 'submit')
+            
             if has_profit_target and has_stop_loss:
                 # Use OCO order with automatic targets
                 result = self.order_handler.place_stock_oco_order_with_targets(
@@ -829,10 +872,13 @@ class DivergenceTradingEngine:
             
             # Process result
             if result.get('status') == 'submitted':
+                if trade_order.latency_trace is not None:
+                    mark_stage(trade_order.latency_trace, 'ack')
                 trade_order.status = OrderStatus.SUBMITTED
                 trade_order.filled_price = result.get('fill_price', trade_order.entry_price)
                 
                 if 'order_id' in result:
+                    trade_order.schwab_order_id = str(result['order_id'])
                     trade_order.notes += f" | Schwab Order ID: {result['order_id']}"
                 
                 self.logger.info(f"✅ Divergence order submitted successfully: {result.get('order_id', 'N/A')}")
@@ -886,10 +932,13 @@ class DivergenceTradingEngine:
             if not self.active_orders:
                 return
             
-            # Check status of each active order
+            # One order listing per cycle covers every submitted order
+            schwab_orders = self._fetch_schwab_orders()
+            
+            # Reconcile each active order against the listing
             for order_id, order in list(self.active_orders.items()):
                 try:
-                    self._check_divergence_order_status(order)
+                    self._check_divergence_order_status(order, schwab_orders)
                     
                     # Remove completed orders
                     if order.status in [OrderStatus.FILLED, OrderStatus.CANCELLED, OrderStatus.REJECTED, OrderStatus.FAILED]:
@@ -907,23 +956,78 @@ class DivergenceTradingEngine:
         except Exception as e:
             self.logger.error(f"❌ Error managing existing divergence orders: {e}")
 
-    def _check_divergence_order_status(self, order: DivergenceTradeOrder):
-        """Check status of a divergence order"""
+    def _get_schwab_order_id(self, order: DivergenceTradeOrder) -> Optional[str]:
+        """Schwab order ID of a submitted divergence order, if known"""
+        if order.schwab_order_id:
+            return order.schwab_order_id
+        
+        # Orders created before the ID was stored separately only have it in the notes
+        if "Schwab Order ID:" in order.notes:
+            try:
+                return order.notes.split("Schwab Order ID: ")[1].split(" |")[0].strip()
+            except Exception:
+                pass
+        return None
+
+    def _fetch_schwab_orders(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Fetch every order entered since the oldest submitted divergence order in one request
+        
+        Returns:
+            Schwab orders by order ID (child orders of OCO/trigger orders included),
+            or None if the request failed
+        """
+        submitted = [
+            order for order in self.active_orders.values()
+            if order.status == OrderStatus.SUBMITTED and self._get_schwab_order_id(order)
+        ]
+        if not submitted:
+            return {}
+        
+        now = datetime.now(timezone.utc)
+        # created_at is local time; allow a minute for clock skew against enteredTime
+        oldest = min(order.created_at for order in submitted).astimezone(timezone.utc) - timedelta(minutes=1)
+        orders_response = self.order_handler.get_all_orders(
+            from_entered_time=oldest.strftime(API_TIME_FORMAT),
+            to_entered_time=(now + timedelta(minutes=1)).strftime(API_TIME_FORMAT)
+        )
+        
+        if not isinstance(orders_response, list):
+            error = orders_response.get('error') if isinstance(orders_response, dict) else type(orders_response)
+            self.logger.warning(f"⚠️ Batch order status request failed, checking orders individually: {error}")
+            return None
+        
+        schwab_orders = {}
+        pending = list(orders_response)
+        while pending:
+            schwab_order = pending.pop()
+            schwab_orders[str(schwab_order.get('orderId', ''))] = schwab_order
+            pending.extend(schwab_order.get('childOrderStrategies', []))
+        
+        self.logger.info(f"📋 Reconciling {len(submitted)} divergence orders against {len(schwab_orders)} Schwab orders")
+        return schwab_orders
+
+    def _check_divergence_order_status(self, order: DivergenceTradeOrder,
+                                       schwab_orders: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Check status of a divergence order
+        
+        Args:
+            order: Active divergence order
+            schwab_orders: Result of _fetch_schwab_orders(); orders missing from it
+                (or all orders, if None) are looked up individually
+        """
         try:
             if order.status != OrderStatus.SUBMITTED:
                 return
             
-            # Extract Schwab order ID if available
-            schwab_order_id = None
-            if "Schwab Order ID:" in order.notes:
-                try:
-                    schwab_order_id = order.notes.split("Schwab Order ID: ")[1].split(" |")[0].strip()
-                except Exception:
-                    pass
+            schwab_order_id = self._get_schwab_order_id(order)
             
             if schwab_order_id:
-                # Check status using order handler
-                status_result = self.order_handler.get_order_status(schwab_order_id)
+                status_result = (schwab_orders or {}).get(schwab_order_id)
+                if status_result is None:
+                    # Check status using order handler
+                    status_result = self.order_handler.get_order_status(schwab_order_id)
                 
                 if 'error' not in status_result:
                     schwab_status = status_result.get('status', '').upper()
@@ -933,6 +1037,10 @@ class DivergenceTradingEngine:
                         order.status = OrderStatus.FILLED
                         order.filled_at = datetime.now()
                         order.filled_price = order.entry_price  # Simplified
+                        if order.latency_trace is not None:
+                            mark_stage(order.latency_trace, 'fill')
+                            get_latency_tracer().record('divergence', order.symbol, order.latency_trace,
+                                                        trace_id=order.order_id, outcome='filled')
                     elif schwab_status in ['CANCELED', 'CANCELLED']:
                         order.status = OrderStatus.CANCELLED
                     elif schwab_status in ['REJECTED']:
@@ -987,8 +1095,7 @@ class DivergenceTradingEngine:
             trades_log.append(log_entry)
             
             os.makedirs('divergence_data', exist_ok=True)
-            with open(log_file, 'w') as f:
-                json.dump(trades_log, f, indent=2)
+            write_json_atomic(log_file, trades_log)
                 
             self.logger.info(f"📝 Logged divergence trade to {log_file}")
                 
@@ -34,6 +34,8 @@ import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
+from latency_tracer import LATENCY_TRACE_KEY, mark_stage
+
 # Import TA-Lib for technical analysis
 try:
     import talib
@@ -44,6 +46,7 @@ except ImportError:
 
 # Import our existing data handlers
 from historical_data_handler import HistoricalDataHandler
+from artifact_store import save_artifact
 
 class ExceedanceTimeframeConfig:
     """Configuration for different timeframes - focused on exceedance needs"""
@@ -263,9 +266,11 @@ class ExceedanceIndicatorsCalculator:
         """Calculate focused exceedance indicators for a symbol."""
         try:
             # Get data for this specific timeframe
+            trace = mark_stage(None, 'fetch')
             df = self.get_historical_data_for_timeframe(symbol)
             if df is None or len(df) < 50:
                 return self._create_empty_exceedance_indicators(symbol)
+            mark_stage(trace, 'compute')
             
             # Ensure numeric types
             for col in ['open', 'high', 'low', 'close', 'volume']:
@@ -308,7 +313,8 @@ class ExceedanceIndicatorsCalculator:
                 'lower_band': exceedance_data['lower_band'],
                 'band_range': exceedance_data['band_range'],
                 'band_stability': band_stability,
-                'market_condition': market_condition
+                'market_condition': market_condition,
+                LATENCY_TRACE_KEY: trace
             }
             
         except Exception as e:
@@ -432,21 +438,18 @@ def save_exceedance_indicators_for_timeframe(timeframe: str, indicators: Dict[st
         filename = ExceedanceTimeframeConfig.TIMEFRAMES[timeframe]["filename"]
         filepath = os.path.join(output_dir, filename)
         
-        # Convert numpy types to native Python types
-        clean_indicators = convert_numpy_types(indicators)
-        
         # Create comprehensive exceedance indicators data
         exceedance_data = {
             'strategy_name': f'Exceedance_Indicators_{timeframe.upper()}',
             'last_updated': datetime.now().isoformat(),
-            'total_symbols_analyzed': len(clean_indicators),
+            'total_symbols_analyzed': len(indicators),
             'analysis_summary': {
-                'symbols_with_data': len([s for s in clean_indicators.values() if 'error' not in s]),
-                'symbols_with_errors': len([s for s in clean_indicators.values() if 'error' in s]),
-                'high_exceedances': len([s for s in clean_indicators.values() if s.get('high_exceedance', 0) > 0]),
-                'low_exceedances': len([s for s in clean_indicators.values() if s.get('low_exceedance', 0) > 0])
+                'symbols_with_data': len([s for s in indicators.values() if 'error' not in s]),
+                'symbols_with_errors': len([s for s in indicators.values() if 'error' in s]),
+                'high_exceedances': len([s for s in indicators.values() if s.get('high_exceedance', 0) > 0]),
+                'low_exceedances': len([s for s in indicators.values() if s.get('low_exceedance', 0) > 0])
             },
-            'indicators': clean_indicators,
+            'indicators': indicators,
             'metadata': {
                 'analysis_type': 'exceedance_indicators',
                 'timeframe': timeframe,
@@ -457,9 +460,8 @@ def save_exceedance_indicators_for_timeframe(timeframe: str, indicators: Dict[st
             }
         }
         
-        # Write to timeframe-specific file in organized directory
-        with open(filepath, 'w') as f:
-            json.dump(exceedance_data, f, indent=2)
+        # Write to timeframe-specific file in organized directory (atomically)
+        save_artifact(filepath, exceedance_data, records_key='indicators')
         
         print(f"✅ Saved {timeframe} exceedance indicators to {filepath}")
         print(f"📊 Analysis: {exceedance_data['analysis_summary']['symbols_with_data']} symbols, {exceedance_data['analysis_summary']['high_exceedances']} high exc, {exceedance_data['analysis_summary']['low_exceedances']} low exc")
@@ -36,14 +36,19 @@ Each atomic method has a single responsibility and can be tested/debugged indepe
 
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 # Import existing handlers
-from order_handler import OrderHandler
+from order_handler import get_order_handler
 from current_positions_handler import CurrentPositionsHandler
+from order_book import OrderBook
+from latency_tracer import get_latency_tracer, mark_stage
+from artifact_store import load_artifact
 
 class ExceedanceTradingEngine:
     """
@@ -57,9 +62,22 @@ class ExceedanceTradingEngine:
         self.logger = logging.getLogger(__name__)
         
         # Initialize handlers
-        self.order_handler = OrderHandler()
+        self.order_handler = get_order_handler()
         self.position_handler = CurrentPositionsHandler()
         
+        # Indexed open-order book (shared state with the positions handler)
+        self.order_book = OrderBook(self.order_handler)
+        self.order_book_max_age = 2  # seconds
+        
+        # Submitted market orders whose latency trace still waits for its fill stamp:
+        # order_id -> (symbol, trace, trace_id, monotonic registration time)
+        self.pending_fills: Dict[str, Tuple[str, Dict[str, float], Optional[str], float]] = {}
+        self._pending_fills_lock = threading.Lock()
+        self.fill_poll_seconds = 1.0
+        self.fill_watch_timeout = 300  # seconds
+        self.fill_watch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='exceedance-fills')
+        self._fill_watch_future = None
+        
         # Configuration
         self.config = self.load_trading_config()
         
@@ -136,8 +154,7 @@ class ExceedanceTradingEngine:
                 self.logger.debug(f"📄 {positions_file} not found")
                 return {}
             
-            with open(positions_file, 'r') as f:
-                data = json.load(f)
+            data = load_artifact(positions_file)
             
             self.logger.debug(f"✅ Loaded positions data with {data.get('total_positions', 0)} positions")
             return data
@@ -364,7 +381,8 @@ class ExceedanceTradingEngine:
     # ATOMIC TRADE EXECUTION METHODS
     # ============================================================================
     
-    def place_market_order_atomic(self, symbol: str, action: str, quantity: int, current_price: float) -> Dict[str, Any]:
+    def place_market_order_atomic(self, symbol: str, action: str, quantity: int, current_price: float,
+                                  latency_trace: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         ATOMIC: Place a market order
         
@@ -373,6 +391,7 @@ class ExceedanceTradingEngine:
             action: Order action (BUY, SELL)
             quantity: Number of shares
             current_price: Current market price
+            latency_trace: Signal latency trace to stamp with submit/ack times
             
         Returns:
             Dict with order result
@@ -392,6 +411,8 @@ class ExceedanceTradingEngine:
             self.logger.info(f"📤 Placing {action} MARKET order: {symbol} {quantity}@${current_price:.2f}")
             
             # Submit market order
+            if latency_trace is not None:
+                mark_stage(latency_trace, 'submit')
             result = self.order_handler.place_market_order(
                 action_type=action,
                 symbol=symbol,
@@ -401,6 +422,8 @@ class ExceedanceTradingEngine:
             )
             
             if result.get('status') == 'submitted':
+                if latency_trace is not None:
+                    mark_stage(latency_trace, 'ack')
                 order_id = result.get('order_id', 'N/A')
                 self.logger.info(f"✅ {action} MARKET order submitted: {symbol} - Order ID: {order_id}")
                 return {
@@ -774,40 +797,25 @@ class ExceedanceTradingEngine:
             if order_types is None:
                 order_types = ['LIMIT', 'MARKET', 'STOP']
             
-            # Load current positions data to get open orders
-            positions_data = self.load_positions_data()
-            if not positions_data:
+            # Query the indexed order book instead of scanning current_positions.json
+            if self.order_book.refresh(max_age=self.order_book_max_age) is None:
                 return {
                     'success': False,
-                    'error': 'Failed to load positions data',
+                    'error': 'Failed to refresh open order book',
                     'existing_orders': []
                 }
             
-            existing_orders = []
-            positions = positions_data.get('positions', {})
-            
-            # Look for the symbol in positions
-            for position_key, position_data in positions.items():
-                position_symbol = position_data.get('symbol', '')
-                
-                if position_symbol == symbol:
-                    open_orders = position_data.get('open_orders', [])
-                    
-                    for order in open_orders:
-                        order_type = order.get('order_type', '')
-                        status = order.get('status', '')
-                        
-                        # Filter by order types and active status
-                        if order_type in order_types and status == 'WORKING':
-                            existing_orders.append({
-                                'order_id': order.get('order_id', ''),
-                                'instruction': order.get('instruction', ''),
-                                'order_type': order_type,
-                                'quantity': order.get('quantity', 0),
-                                'price': order.get('price', 0.0),
-                                'status': status
-                            })
-                    break
+            existing_orders = [
+                {
+                    'order_id': order.get('order_id', ''),
+                    'instruction': order.get('instruction', ''),
+                    'order_type': order.get('order_type', ''),
+                    'quantity': order.get('quantity', 0),
+                    'price': order.get('price', 0.0),
+                    'status': order.get('status', '')
+                }
+                for order in self.order_book.get_open_orders(symbol, order_types=order_types, statuses=['WORKING'])
+            ]
             
             return {
                 'success': True,
@@ -907,11 +915,79 @@ class ExceedanceTradingEngine:
                 }
             }
 
+    # ============================================================================
+    # FILL TRACKING
+    # ============================================================================
+
+    def watch_fill(self, order_id: str, symbol: str, latency_trace: Optional[Dict[str, float]],
+                   trace_id: Optional[str] = None):
+        """
+        Stamp 'fill' on a market order's latency trace once the order book sees it filled.
+
+        Args:
+            order_id: Schwab order id of the submitted market order
+            symbol: Stock symbol
+            latency_trace: Trace already recorded at submission
+            trace_id: Id the trace was recorded under, so the fill updates that record
+        """
+        if latency_trace is None or not order_id or order_id == 'N/A':
+            return
+        with self._pending_fills_lock:
+            self.pending_fills[str(order_id)] = (symbol, latency_trace, trace_id, time.monotonic())
+            if self._fill_watch_future is None:
+                self._fill_watch_future = self.fill_watch_executor.submit(self._watch_fills)
+
+    def _watch_fills(self):
+        """Refresh the order book until every pending market order is filled, closed or timed out"""
+        while True:
+            # Emptiness is checked and the watcher retired under the lock watch_fill
+            # registers under, so an order registered now always has a running watcher
+            with self._pending_fills_lock:
+                if not self.pending_fills:
+                    self._fill_watch_future = None
+                    return
+            try:
+                self.order_book.refresh(max_age=self.fill_poll_seconds)
+                self.check_pending_fills()
+            except Exception as e:
+                self.logger.error(f"❌ Error checking market order fills: {e}")
+            time.sleep(self.fill_poll_seconds)
+
+    def check_pending_fills(self) -> int:
+        """
+        Stamp and record the fills the order book has seen for pending market orders.
+
+        Returns:
+            Number of fills recorded
+        """
+        with self._pending_fills_lock:
+            pending = list(self.pending_fills.items())
+
+        filled = 0
+        for order_id, (symbol, latency_trace, trace_id, registered_at) in pending:
+            status = self.order_book.get_status(order_id)
+            if status == 'FILLED':
+                mark_stage(latency_trace, 'fill')
+                get_latency_tracer().record('exceedance', symbol, latency_trace,
+                                            trace_id=trace_id, outcome='filled')
+                filled += 1
+            elif status in ('CANCELED', 'REJECTED', 'EXPIRED'):
+                self.logger.info(f"📋 Market order {order_id} for {symbol} ended {status} without a fill")
+            elif time.monotonic() - registered_at > self.fill_watch_timeout:
+                self.logger.warning(f"⚠️ No fill seen for market order {order_id} ({symbol}) "
+                                    f"after {self.fill_watch_timeout}s")
+            else:
+                continue
+            with self._pending_fills_lock:
+                self.pending_fills.pop(order_id, None)
+        return filled
+
     # ============================================================================
     # COMPOSITE OPERATIONS (Orchestrate atomic methods)
     # ============================================================================
     
-    def execute_new_position_trade(self, symbol: str, quantity: int, current_price: float) -> Dict[str, Any]:
+    def execute_new_position_trade(self, symbol: str, quantity: int, current_price: float,
+                                   latency_trace: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         COMPOSITE: Execute a new position trade using atomic methods
         
@@ -919,6 +995,7 @@ class ExceedanceTradingEngine:
             symbol: Stock symbol
             quantity: Number of shares
             current_price: Current market price
+            latency_trace: Signal latency trace to stamp with submit/ack times
             
         Returns:
             Dict with trade execution result
@@ -947,7 +1024,7 @@ class ExceedanceTradingEngine:
             profit_target = profit_calc['profit_target']
             
             # Step 3: Place market order
-            market_result = self.place_market_order_atomic(symbol, 'BUY', quantity, current_price)
+            market_result = self.place_market_order_atomic(symbol, 'BUY', quantity, current_price, latency_trace)
             if not market_result['success']:
                 return {
                     'success': False,
@@ -999,7 +1076,8 @@ class ExceedanceTradingEngine:
                 'step': 'exception'
             }
 
-    def execute_scale_in_trade(self, symbol: str, requested_quantity: int, current_price: float) -> Dict[str, Any]:
+    def execute_scale_in_trade(self, symbol: str, requested_quantity: int, current_price: float,
+                               latency_trace: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         COMPOSITE: Execute a scale-in trade using atomic methods
         
@@ -1007,6 +1085,7 @@ class ExceedanceTradingEngine:
             symbol: Stock symbol
             requested_quantity: Requested number of shares
             current_price: Current market price
+            latency_trace: Signal latency trace to stamp with submit/ack times
             
         Returns:
             Dict with trade execution result
@@ -1065,7 +1144,7 @@ class ExceedanceTradingEngine:
             profit_target = profit_calc['profit_target']
             
             # Step 5: Place market order for additional shares
-            market_result = self.place_market_order_atomic(symbol, 'BUY', optimal_quantity, current_price)
+            market_result = self.place_market_order_atomic(symbol, 'BUY', optimal_quantity, current_price, latency_trace)
             if not market_result['success']:
                 return {
                     'success': False,
@@ -1779,7 +1858,7 @@ class ExceedanceTradingEngine:
 
     def cancel_existing_profit_targets(self, symbol: str) -> Dict[str, Any]:
         """
-        Cancel existing profit target (SELL limit) orders for a symbol using current_positions.json
+        Cancel existing profit target (SELL limit) orders for a symbol using the open order book
         
         Args:
             symbol: Stock symbol
@@ -1791,73 +1870,48 @@ class ExceedanceTradingEngine:
             print(f"\n🔍 DEBUG: Starting order cancellation process for {symbol}")
             self.logger.info(f"🔍 Looking for existing profit target orders for {symbol}")
             
-            # Load current positions data to get open orders
-            positions_data = self._load_current_positions_data()
-            if not positions_data:
-                print(f"❌ DEBUG: Failed to load current positions data")
+            # Look up the symbol's working profit targets in the order book
+            if self.order_book.refresh(max_age=self.order_book_max_age) is None:
+                print(f"❌ DEBUG: Failed to refresh open order book")
                 return {
                     'success': False,
-                    'error': 'Failed to load current positions data',
+                    'error': 'Failed to refresh open order book',
                     'cancelled_orders': 0
                 }
             
             cancelled_count = 0
-            positions = positions_data.get('positions', {})
             
-            print(f"🔍 DEBUG: Found {len(positions)} positions to check")
+            # Profit target orders: SELL for long positions, BUY_TO_COVER for short positions
+            profit_targets = self.order_book.get_open_orders(
+                symbol, order_types=['LIMIT'], statuses=['WORKING'], instructions=['SELL', 'BUY_TO_COVER']
+            )
+            print(f"🔍 DEBUG: Found {len(profit_targets)} working profit targets for {symbol}")
             
-            # Look for the symbol in positions
-            symbol_found = False
-            for position_key, position_data in positions.items():
-                position_symbol = position_data.get('symbol', '')
-                
-                if position_symbol == symbol:
-                    symbol_found = True
-                    open_orders = position_data.get('open_orders', [])
-                    print(f"🔍 DEBUG: Found {len(open_orders)} open orders for {symbol}")
+            for order in profit_targets:
+                try:
+                    order_id = order.get('order_id', '')
+                    price = order.get('price', 0)
+                    quantity = order.get('quantity', 0)
                     
-                    # Look for SELL limit orders (profit targets)
-                    for order in open_orders:
-                        try:
-                            order_id = order.get('order_id', '')
-                            instruction = order.get('instruction', '')
-                            order_type = order.get('order_type', '')
-                            status = order.get('status', '')
-                            price = order.get('price', 0)
-                            quantity = order.get('quantity', 0)
-                            
-                            print(f"🔍 DEBUG: Order details - ID:{order_id} {instruction} {order_type} {quantity}@${price} Status:{status}")
-                            
-                            # Look for profit target orders (SELL for long positions, BUY_TO_COVER for short positions) that are WORKING
-                            if (instruction in ['SELL', 'BUY_TO_COVER'] and 
-                                order_type == 'LIMIT' and
-                                status == 'WORKING'):
-                                
-                                print(f"🚫 DEBUG: Found matching profit target to cancel: Order {order_id} - SELL {quantity} {symbol} @ ${price}")
-                                self.logger.info(f"🚫 Cancelling profit target: Order {order_id} - SELL {quantity} {symbol} @ ${price}")
-                                
-                                cancel_result = self.order_handler.cancel_order(str(order_id))
-                                print(f"🚫 DEBUG: Cancel result: {cancel_result}")
-                                
-                                # API returns 200 with empty body on success, or error dict on failure
-                                if 'error' not in cancel_result:
-                                    cancelled_count += 1
-                                    print(f"✅ DEBUG: Successfully cancelled order {order_id}")
-                                    self.logger.info(f"✅ Cancelled order {order_id}")
-                                else:
-                                    print(f"❌ DEBUG: Failed to cancel order {order_id}: {cancel_result.get('error', 'Unknown')}")
-                                    self.logger.warning(f"⚠️ Failed to cancel order {order_id}: {cancel_result.get('error', 'Unknown')}")
-                        
-                        except Exception as e:
-                            print(f"❌ DEBUG: Error processing order: {e}")
-                            self.logger.warning(f"⚠️ Error processing order: {e}")
-                            continue
+                    print(f"🚫 DEBUG: Found matching profit target to cancel: Order {order_id} - {order.get('instruction', '')} {quantity} {symbol} @ ${price}")
+                    self.logger.info(f"🚫 Cancelling profit target: Order {order_id} - {order.get('instruction', '')} {quantity} {symbol} @ ${price}")
                     
-                    break  # Found the symbol, no need to continue
-            
-            if not symbol_found:
-                print(f"ℹ️ DEBUG: Symbol {symbol} not found in current positions")
-                self.logger.info(f"ℹ️ Symbol {symbol} not found in current positions")
+                    cancel_result = self.order_handler.cancel_order(str(order_id))
+                    print(f"🚫 DEBUG: Cancel result: {cancel_result}")
+                    
+                    # API returns 200 with empty body on success, or error dict on failure
+                    if 'error' not in cancel_result:
+                        cancelled_count += 1
+                        print(f"✅ DEBUG: Successfully cancelled order {order_id}")
+                        self.logger.info(f"✅ Cancelled order {order_id}")
+                    else:
+                        print(f"❌ DEBUG: Failed to cancel order {order_id}: {cancel_result.get('error', 'Unknown')}")
+                        self.logger.warning(f"⚠️ Failed to cancel order {order_id}: {cancel_result.get('error', 'Unknown')}")
+                
+                except Exception as e:
+                    print(f"❌ DEBUG: Error processing order: {e}")
+                    self.logger.warning(f"⚠️ Error processing order: {e}")
+                    continue
             
             print(f"🔍 DEBUG: Cancellation complete. Cancelled {cancelled_count} orders for {symbol}")
             
@@ -1881,24 +1935,6 @@ class ExceedanceTradingEngine:
                 'cancelled_orders': 0
             }
 
-    def _load_current_positions_data(self) -> Dict[str, Any]:
-        """Load current positions data from current_positions.json"""
-        try:
-            positions_file = 'current_positions.json'
-            if not os.path.exists(positions_file):
-                print(f"❌ DEBUG: {positions_file} not found")
-                return {}
-            
-            with open(positions_file, 'r') as f:
-                data = json.load(f)
-            
-            print(f"✅ DEBUG: Loaded current positions data with {data.get('total_positions', 0)} positions")
-            return data
-            
-        except Exception as e:
-            print(f"❌ DEBUG: Error loading current positions data: {e}")
-            return {}
-
     def _execute_exceedance_trade(self, symbol: str, signal_data: Dict[str, Any]) -> bool:
         """
         Execute exceedance trade (called by strategy script)
@@ -29,12 +29,20 @@ import pytz
 import subprocess
 import sys
 import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from enum import Enum
 
 # Import trading engine for execution
 from exceedance_trading_engine import ExceedanceTradingEngine
+from signal_journal import SignalJournal
+from artifact_store import load_artifact_cached, load_artifact_records, save_artifact
+from bar_clock import BarClock
+from latency_tracer import LATENCY_TRACE_KEY, continue_trace, get_latency_tracer, mark_stage
+from exceedance_indicators_calculator import (
+    ExceedanceIndicatorsCalculator, convert_numpy_types, save_exceedance_indicators_for_timeframe
+)
 import hashlib
 
 class ExceedenceStrategy:
@@ -49,7 +57,21 @@ class ExceedenceStrategy:
         self.logger = logging.getLogger(__name__)
         
         # Load PML trading configuration
-        self.trading_config = self._load_trading_config()
+        self.trading_config_mtime = self._get_mtime('trading_config_live.json')
+        self.apply_trading_config(self._load_trading_config())
+        
+        self.logger.info("ExceedenceStrategy initialized:")
+        self.logger.info(f"  Strategy allocation: {self.strategy_allocation_pct*100:.1f}%")
+        self.logger.info(f"  Position size: {self.position_size_pct*100:.1f}%")
+        self.logger.info(f"  Max shares: {self.max_shares}")
+        self.logger.info(f"  Auto approve: {self.auto_approve}")
+        
+        # Debug: Print the actual PML config to verify auto_approve loading
+        print(f"🔧 DEBUG: PML auto_approve from config: {self.pml_config.get('auto_approve', 'NOT_FOUND')}")
+
+    def apply_trading_config(self, trading_config: Dict[str, Any]):
+        """Apply PML strategy and account risk settings from a trading configuration"""
+        self.trading_config = trading_config
         self.pml_config = self.trading_config.get('strategies', {}).get('pml', {})
         # Load account risk limits
         self.account_risk = self.trading_config.get('risk_management', {}).get('account_limits', {})
@@ -70,15 +92,29 @@ class ExceedenceStrategy:
         self.position_size_pct = self.risk_mgmt.get('position_size', 15.0) / 100.0
         self.max_shares = self.risk_mgmt.get('max_contracts', 1000)
         self.auto_approve = self.pml_config.get('auto_approve', False)
+
+    def reload_trading_config_if_changed(self) -> bool:
+        """
+        Re-apply trading_config_live.json if it changed on disk since it was last loaded.
         
-        self.logger.info("ExceedenceStrategy initialized:")
-        self.logger.info(f"  Strategy allocation: {self.strategy_allocation_pct*100:.1f}%")
-        self.logger.info(f"  Position size: {self.position_size_pct*100:.1f}%")
-        self.logger.info(f"  Max shares: {self.max_shares}")
-        self.logger.info(f"  Auto approve: {self.auto_approve}")
+        Returns:
+            True if the configuration was reloaded
+        """
+        mtime = self._get_mtime('trading_config_live.json')
+        if mtime is None or mtime == self.trading_config_mtime:
+            return False
         
-        # Debug: Print the actual PML config to verify auto_approve loading
-        print(f"🔧 DEBUG: PML auto_approve from config: {self.pml_config.get('auto_approve', 'NOT_FOUND')}")
+        self.trading_config_mtime = mtime
+        self.apply_trading_config(self._load_trading_config())
+        self.logger.info(f"🔄 Trading config changed - reloaded (auto approve: {self.auto_approve})")
+        return True
+
+    def _get_mtime(self, filepath: str) -> Optional[float]:
+        """File modification time, or None if it does not exist"""
+        try:
+            return os.stat(filepath).st_mtime_ns
+        except OSError:
+            return None
 
     def _load_trading_config(self) -> Dict[str, Any]:
         """Load trading configuration from trading_config_live.json"""
@@ -106,10 +142,7 @@ class ExceedenceStrategy:
                 self.logger.warning(f"Exceedance indicators file not found: {filepath}")
                 return {}
             
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            indicators = data.get('indicators', {})
+            indicators = load_artifact_records(filepath, 'indicators')
             self.logger.info(f"Loaded 5min exceedance indicators for {len(indicators)} symbols")
             return indicators
             
@@ -199,12 +232,10 @@ class ExceedenceStrategy:
     def load_account_data(self) -> Dict[str, Any]:
         """Load account data from account_data.json"""
         try:
-            if not os.path.exists('account_data.json'):
+            data = load_artifact_cached('account_data.json')
+            if data is None:
                 return {}
             
-            with open('account_data.json', 'r') as f:
-                data = json.load(f)
-            
             # Extract first account data
             account_data = data.get('account_data', {})
             if account_data:
@@ -225,13 +256,11 @@ class ExceedenceStrategy:
         """
         try:
             # Load P&L statistics to get daily P&L
-            if not os.path.exists('pnl_statistics.json'):
+            pnl_data = load_artifact_cached('pnl_statistics.json')
+            if pnl_data is None:
                 self.logger.debug("P&L statistics file not found, assuming no daily loss")
                 return True, 0.0
             
-            with open('pnl_statistics.json', 'r') as f:
-                pnl_data = json.load(f)
-            
             # Get daily P&L from statistics
             daily_pnl = pnl_data.get('daily_pnl', 0.0)
             daily_loss_limit = self.risk_limits['daily_loss_limit']
@@ -317,13 +346,11 @@ class ExceedenceStrategy:
         """Load current positions from current_positions.json (same source as trading engine)"""
         try:
             positions_file = 'current_positions.json'
-            if not os.path.exists(positions_file):
+            data = load_artifact_cached(positions_file)
+            if data is None:
                 self.logger.debug(f"📄 {positions_file} not found")
                 return {}
             
-            with open(positions_file, 'r') as f:
-                data = json.load(f)
-            
             positions = {}
             
             # Extract positions from current_positions.json structure
@@ -553,6 +580,7 @@ def analyze_symbol(symbol: str, exceedance_indicators: Dict[str, Any],
     try:
         # Generate trading signal
         signal = strategy.generate_trading_signal(symbol, exceedance_indicators)
+        signal[LATENCY_TRACE_KEY] = continue_trace([exceedance_indicators], 'signal')
         
         # Print summary with scale-in information
         current_price = exceedance_indicators.get('current_price', 0.0)
@@ -619,6 +647,7 @@ def execute_immediate_trade(trading_engine: ExceedanceTradingEngine, signal: Dic
         quantity = signal.get('position_size', 0)
         current_price = signal.get('current_price', 0.0)
         is_scale_in = signal.get('is_scale_in', False)
+        latency_trace = mark_stage(signal.get(LATENCY_TRACE_KEY), 'risk_check')
         
         # Validate trade parameters using atomic method
         validation = trading_engine.validate_trade_params(symbol, quantity, current_price)
@@ -643,13 +672,18 @@ def execute_immediate_trade(trading_engine: ExceedanceTradingEngine, signal: Dic
         # Use appropriate atomic method based on trade type
         if is_scale_in:
             print(f"   🔄 Using atomic scale-in trade execution")
-            result = trading_engine.execute_scale_in_trade(symbol, quantity, current_price)
+            result = trading_engine.execute_scale_in_trade(symbol, quantity, current_price, latency_trace)
         else:
             print(f"   🎯 Using atomic new position trade execution")
-            result = trading_engine.execute_new_position_trade(symbol, quantity, current_price)
+            result = trading_engine.execute_new_position_trade(symbol, quantity, current_price, latency_trace)
+        
+        get_latency_tracer().record('exceedance', symbol, latency_trace, trace_id=signal.get('signal_id'),
+                                    outcome='submitted' if result.get('success', False) else 'rejected')
         
         if result.get('success', False):
             market_order_id = result.get('market_order_id', 'N/A')
+            # Recorded again under the same trace_id once the order book sees the fill
+            trading_engine.watch_fill(market_order_id, symbol, latency_trace, trace_id=signal.get('signal_id'))
             profit_order_id = result.get('profit_order_id', 'N/A')
             print(f"✅ {trade_type} ATOMIC trade completed successfully")
             print(f"   Market Order ID: {market_order_id}")
@@ -863,17 +897,23 @@ def generate_signal_id(signal: Dict[str, Any]) -> str:
         print(f"❌ Error generating signal ID: {e}")
         return f"{signal.get('symbol', 'UNK')}_{int(time.time())}"
 
+EXECUTED_SIGNALS_JOURNAL = 'executed_exceedance_signals.jsonl'
+LEGACY_EXECUTED_SIGNALS_FILE = 'executed_exceedance_signals.json'
+_executed_signal_journal = None
+_executed_signal_journal_lock = threading.Lock()
+
+def get_executed_signal_journal() -> SignalJournal:
+    """Get the process-wide executed signal journal (opened on first use)"""
+    global _executed_signal_journal
+    with _executed_signal_journal_lock:
+        if _executed_signal_journal is None:
+            _executed_signal_journal = SignalJournal(EXECUTED_SIGNALS_JOURNAL, legacy_file=LEGACY_EXECUTED_SIGNALS_FILE)
+        return _executed_signal_journal
+
 def load_executed_signals() -> Dict[str, Dict[str, Any]]:
     """Load previously executed signals to prevent duplicates"""
     try:
-        filepath = 'executed_exceedance_signals.json'
-        if not os.path.exists(filepath):
-            return {}
-        
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        
-        return data.get('executed_signals', {})
+        return get_executed_signal_journal().all_entries()
         
     except Exception as e:
         print(f"❌ Error loading executed signals: {e}")
@@ -882,40 +922,11 @@ def load_executed_signals() -> Dict[str, Dict[str, Any]]:
 def save_executed_signal(signal_id: str, signal: Dict[str, Any], execution_result: Dict[str, Any]) -> bool:
     """Save executed signal to prevent duplicate trades"""
     try:
-        filepath = 'executed_exceedance_signals.json'
-        
-        # Load existing executed signals
-        executed_signals = load_executed_signals()
-        
-        # Add new executed signal
-        executed_signals[signal_id] = {
+        get_executed_signal_journal().record(signal_id, {
             'signal': signal,
             'execution_result': execution_result,
-            'executed_at': datetime.now().isoformat(),
-            'signal_id': signal_id
-        }
-        
-        # Create complete data structure
-        executed_data = {
-            'strategy_name': 'Exceedance_Strategy_Executed_Signals',
-            'last_updated': datetime.now().isoformat(),
-            'total_executed_signals': len(executed_signals),
-            'executed_signals': executed_signals,
-            'metadata': {
-                'purpose': 'prevent_duplicate_trades_on_same_bar',
-                'signal_id_method': 'symbol_price_bar_number_scale_in_flag',
-                'signal_id_format': 'SYMBOL_PRICE_BAR#_SCALETYPE',
-                'bar_calculation': '5min_bars_from_630am_est_930am_pst',
-                'retention_policy': 'daily_reset_via_bar_number_progression',
-                'duplicate_prevention': 'same_symbol_same_bar_same_price_same_type',
-                'version': '1.0.0'
-            }
-        }
-        
-        # Save to file
-        with open(filepath, 'w') as f:
-            json.dump(executed_data, f, indent=2)
-        
+            'executed_at': datetime.now().isoformat()
+        })
         return True
         
     except Exception as e:
@@ -926,11 +937,10 @@ def is_signal_already_executed(signal: Dict[str, Any]) -> Tuple[bool, str]:
     """Check if signal has already been executed today"""
     try:
         signal_id = generate_signal_id(signal)
-        executed_signals = load_executed_signals()
+        entry = get_executed_signal_journal().get(signal_id)
         
-        if signal_id in executed_signals:
-            executed_at = executed_signals[signal_id].get('executed_at', 'unknown')
-            return True, executed_at
+        if entry is not None:
+            return True, entry.get('executed_at', 'unknown')
         
         return False, ''
         
@@ -972,8 +982,7 @@ def save_exceedence_signals_to_file(exceedence_signals: Dict[str, Any]) -> bool:
         
         # Write to dedicated exceedance signals file
         filepath = 'exceedence_signals.json'
-        with open(filepath, 'w') as f:
-            json.dump(exceedence_data, f, indent=2)
+        save_artifact(filepath, exceedence_data, records_key='signals')
         
         print(f"✅ Saved exceedance signals to {filepath}")
         print(f"📊 Analysis: {exceedence_data['analysis_summary']['buy']} BUY signals generated")
@@ -1013,85 +1022,17 @@ def get_strategy_timeframe() -> int:
         print(f"❌ Error getting strategy timeframe: {e}")
         return 5  # Default to 5-minute
 
-def should_run_analysis() -> bool:
-    """Check if we should run analysis at the end of the data cycle (auto-detect timeframe)"""
-    # Auto-detect timeframe from strategy configuration
-    timeframe_minutes = get_strategy_timeframe()
-    
-    current_time = datetime.now(pytz.timezone('America/Los_Angeles'))
-    minutes_since_hour = current_time.minute
-    seconds = current_time.second
-    
-    # Run analysis in the last 7 seconds of each timeframe bar
-    if timeframe_minutes == 1:
-        # 1-minute: run in last 7 seconds of each minute
-        return seconds >= 53 and seconds <= 59
-    elif timeframe_minutes == 5:
-        # 5-minute: run in last 7 seconds of each 5-minute bar
-        # 5-minute bars: 0-4, 5-9, 10-14, 15-19, etc.
-        current_5min_bar = minutes_since_hour // 5
-        end_of_5min_bar = (current_5min_bar + 1) * 5 - 1  # 4, 9, 14, 19, etc.
-        return minutes_since_hour == end_of_5min_bar and seconds >= 53 and seconds <= 59
-    elif timeframe_minutes == 15:
-        # 15-minute: run in last 7 seconds of each 15-minute bar
-        # 15-minute bars: 0-14, 15-29, 30-44, 45-59
-        current_15min_bar = minutes_since_hour // 15
-        end_of_15min_bar = (current_15min_bar + 1) * 15 - 1  # 14, 29, 44, 59
-        return minutes_since_hour == end_of_15min_bar and seconds >= 53 and seconds <= 59
-    elif timeframe_minutes == 30:
-        # 30-minute: run in last 7 seconds of each 30-minute bar
-        # 30-minute bars: 0-29, 30-59
-        current_30min_bar = minutes_since_hour // 30
-        end_of_30min_bar = (current_30min_bar + 1) * 30 - 1  # 29, 59
-        return minutes_since_hour == end_of_30min_bar and seconds >= 53 and seconds <= 59
-    else:
-        # Default to 1-minute behavior for unsupported timeframes
-        return seconds >= 53 and seconds <= 59
-
-def wait_for_analysis_window():
-    """Wait until we're in the analysis window (auto-detect timeframe)"""
-    timeframe_minutes = get_strategy_timeframe()
-    
-    # Get current time info for debugging
-    current_time = datetime.now(pytz.timezone('America/Los_Angeles'))
-    minutes_since_hour = current_time.minute
-    seconds = current_time.second
-    
-    # Calculate next analysis window
-    if timeframe_minutes == 5:
-        current_5min_bar = minutes_since_hour // 5
-        end_of_5min_bar = (current_5min_bar + 1) * 5 - 1  # 4, 9, 14, 19, etc.
-        next_analysis_minute = end_of_5min_bar
-        
-        print(f"⏰ Current time: {current_time.strftime('%H:%M:%S')} (minute {minutes_since_hour}, second {seconds})")
-        print(f"📊 Next analysis window: minute {next_analysis_minute} at 53-59 seconds")
-        
-        # If we're already past the current bar's analysis window, wait for next bar
-        if minutes_since_hour > end_of_5min_bar or (minutes_since_hour == end_of_5min_bar and seconds > 59):
-            next_analysis_minute = ((current_5min_bar + 2) * 5) - 1
-            if next_analysis_minute >= 60:
-                next_analysis_minute = next_analysis_minute - 60
-            print(f"📊 Waiting for next bar analysis window: minute {next_analysis_minute} at 53-59 seconds")
-    
-    # Add timeout to prevent infinite waiting
-    max_wait_time = 300  # 5 minutes max wait
-    start_wait = time.time()
-    
-    while not should_run_analysis():
-        # Check for timeout
-        if time.time() - start_wait > max_wait_time:
-            print(f"⚠️ Timeout reached ({max_wait_time}s), proceeding with analysis")
-            break
-        time.sleep(0.5)
+# Analysis starts 7 seconds before bar close (the legacy 53-59s window of the last bar minute)
+ANALYSIS_OFFSET_SECONDS = -7.0
 
 def run_continuous_exceedance_monitoring(execute_trades: bool = False):
-    """Run continuous exceedance monitoring with time constraints"""
+    """Run exceedance analysis on every bar, triggered by the bar clock"""
     timeframe_minutes = get_strategy_timeframe()
     
     print("🚀 Starting Continuous Exceedance Strategy Monitoring")
     print("=" * 60)
     print(f"📋 Long positions only | {timeframe_minutes}min timeframe | PML risk management")
-    print(f"⏰ Analysis runs at end of each {timeframe_minutes}-minute bar (53-59 seconds)")
+    print(f"⏰ Analysis runs {-ANALYSIS_OFFSET_SECONDS:.0f}s before each {timeframe_minutes}-minute bar close")
     if execute_trades:
         print("🎯 Trade execution enabled for auto-approved signals")
     print("🔄 Press Ctrl+C to stop")
@@ -1110,98 +1051,288 @@ def run_continuous_exceedance_monitoring(execute_trades: bool = False):
             print("⚠️ Continuing with signal generation only")
             execute_trades = False
     
-    try:
-        while True:
-            # Wait for analysis window (53-59 seconds)
-            wait_for_analysis_window()
-            
-            cycle_count += 1
-            current_time = datetime.now(pytz.timezone('America/Los_Angeles'))
-            
-            print(f"\n🔄 Analysis Cycle #{cycle_count} - {current_time.strftime('%H:%M:%S')} PT")
-            print("-" * 50)
-            
-            # Run analysis with fresh data reload and pass trading engine
-            exceedence_signals = run_exceedence_analysis(reload_data=True, execute_trades=execute_trades, trading_engine=trading_engine)
-            
-            if exceedence_signals:
-                # Save signals to file
-                save_exceedence_signals_to_file(exceedence_signals)
-                
-                # Check for BUY signals and execute trades if auto-approved
-                buy_signals = [s for s in exceedence_signals.values() if s['signal_type'] == 'BUY']
-                executed_trades = 0
+    def on_bar_close(bar_close: float):
+        nonlocal cycle_count, trading_engine
+        
+        cycle_count += 1
+        current_time = datetime.now(pytz.timezone('America/Los_Angeles'))
+        
+        print(f"\n🔄 Analysis Cycle #{cycle_count} - {current_time.strftime('%H:%M:%S')} PT")
+        print("-" * 50)
+        
+        # Run analysis with fresh data reload and pass trading engine
+        exceedence_signals = run_exceedence_analysis(reload_data=True, execute_trades=execute_trades, trading_engine=trading_engine)
+        
+        if exceedence_signals:
+            # Save signals to file
+            save_exceedence_signals_to_file(exceedence_signals)
+            
+            # Check for BUY signals and execute trades if auto-approved
+            buy_signals = [s for s in exceedence_signals.values() if s['signal_type'] == 'BUY']
+            executed_trades = 0
+            
+            if buy_signals:
+                # Initialize trading engine for this pass
+                try:
+                    trading_engine = ExceedanceTradingEngine()
+                    print("🎯 Trading engine initialized for this analysis pass")
+                except Exception as e:
+                    print(f"❌ Failed to initialize trading engine: {e}")
+                    trading_engine = None
                 
-                if buy_signals:
-                    # Initialize trading engine for this pass
-                    try:
-                        trading_engine = ExceedanceTradingEngine()
-                        print("🎯 Trading engine initialized for this analysis pass")
-                    except Exception as e:
-                        print(f"❌ Failed to initialize trading engine: {e}")
-                        trading_engine = None
+                for signal in buy_signals:
+                    # Check if signal has already been executed to prevent duplicates
+                    already_executed, executed_at = is_signal_already_executed(signal)
+                    if already_executed:
+                        print(f"⚠️ DUPLICATE PREVENTED: {signal['symbol']} already executed at {executed_at}")
+                        continue
                     
-                    for signal in buy_signals:
-                        # Check if signal has already been executed to prevent duplicates
-                        already_executed, executed_at = is_signal_already_executed(signal)
-                        if already_executed:
-                            print(f"⚠️ DUPLICATE PREVENTED: {signal['symbol']} already executed at {executed_at}")
-                            continue
-                        
-                        # Execute trade if auto-approved and trading engine is available
-                        if signal.get('auto_approve', False) and trading_engine:
-                            try:
-                                print(f"🎯 EXECUTING TRADE: {signal['symbol']} (Signal ID: {signal.get('signal_id', 'N/A')})")
+                    # Execute trade if auto-approved and trading engine is available
+                    if signal.get('auto_approve', False) and trading_engine:
+                        try:
+                            print(f"🎯 EXECUTING TRADE: {signal['symbol']} (Signal ID: {signal.get('signal_id', 'N/A')})")
+                            
+                            # Use new OTA market order for immediate execution
+                            success = execute_immediate_trade(trading_engine, signal)
+                            
+                            if success:
+                                print(f"✅ OTA Trade executed: {signal['symbol']} {signal['position_size']} shares at MARKET → ${signal.get('profit_target', 'N/A'):.2f}")
+                                executed_trades += 1
                                 
-                                # Use new OTA market order for immediate execution
-                                success = execute_immediate_trade(trading_engine, signal)
+                                # Save executed signal to prevent duplicates
+                                signal_id = signal.get('signal_id', generate_signal_id(signal))
+                                execution_result = {
+                                    'success': True,
+                                    'symbol': signal['symbol'],
+                                    'quantity': signal['position_size'],
+                                    'profit_target': signal.get('profit_target', 0),
+                                    'executed_at': datetime.now().isoformat()
+                                }
+                                save_executed_signal(signal_id, signal, execution_result)
+                                print(f"💾 Saved executed signal: {signal_id}")
                                 
-                                if success:
-                                    print(f"✅ OTA Trade executed: {signal['symbol']} {signal['position_size']} shares at MARKET → ${signal.get('profit_target', 'N/A'):.2f}")
-                                    executed_trades += 1
-                                    
-                                    # Save executed signal to prevent duplicates
-                                    signal_id = signal.get('signal_id', generate_signal_id(signal))
-                                    execution_result = {
-                                        'success': True,
-                                        'symbol': signal['symbol'],
-                                        'quantity': signal['position_size'],
-                                        'profit_target': signal.get('profit_target', 0),
-                                        'executed_at': datetime.now().isoformat()
-                                    }
-                                    save_executed_signal(signal_id, signal, execution_result)
-                                    print(f"💾 Saved executed signal: {signal_id}")
-                                    
-                                else:
-                                    print(f"❌ OTA Trade failed: {signal['symbol']} - execution error")
-                            except Exception as e:
-                                print(f"❌ OTA Trade failed: {signal['symbol']} - {e}")
-                        elif signal.get('auto_approve', False):
-                            print(f"🔧 Debug: Auto-approved signal but trading engine failed to initialize: {signal['symbol']}")
-                        else:
-                            print(f"🔧 Debug: Signal not auto-approved: {signal['symbol']} auto_approve={signal.get('auto_approve')}")
-                
-                # Only show summary if trades were executed
-                if executed_trades > 0:
-                    print(f"📊 Executed {executed_trades} of {len(buy_signals)} signals")
-                elif len(buy_signals) > 0:
-                    print(f"📊 Generated {len(buy_signals)} signals (no auto-approved trades)")
-                else:
-                    print(f"📊 No BUY signals from {len(exceedence_signals)} symbols")
+                            else:
+                                print(f"❌ OTA Trade failed: {signal['symbol']} - execution error")
+                        except Exception as e:
+                            print(f"❌ OTA Trade failed: {signal['symbol']} - {e}")
+                    elif signal.get('auto_approve', False):
+                        print(f"🔧 Debug: Auto-approved signal but trading engine failed to initialize: {signal['symbol']}")
+                    else:
+                        print(f"🔧 Debug: Signal not auto-approved: {signal['symbol']} auto_approve={signal.get('auto_approve')}")
+            
+            # Only show summary if trades were executed
+            if executed_trades > 0:
+                print(f"📊 Executed {executed_trades} of {len(buy_signals)} signals")
+            elif len(buy_signals) > 0:
+                print(f"📊 Generated {len(buy_signals)} signals (no auto-approved trades)")
             else:
-                print("❌ No analysis data available")
-            
-            # Wait until next minute starts (avoid running multiple times in same minute)
-            while should_run_analysis():
-                time.sleep(0.5)
-            
-            # Brief pause before next cycle
-            time.sleep(1)
-            
+                print(f"📊 No BUY signals from {len(exceedence_signals)} symbols")
+        else:
+            print("❌ No analysis data available")
+        
+    clock = BarClock()
+    clock.subscribe(timeframe_minutes, on_bar_close, offset_seconds=ANALYSIS_OFFSET_SECONDS)
+    
+    try:
+        clock.run()
     except KeyboardInterrupt:
         print(f"\n🛑 Stopping continuous monitoring after {cycle_count} cycles")
         print("👋 Exceedance Strategy Monitor stopped")
 
+class ExceedanceStrategyDaemon:
+    """
+    Long-running exceedance strategy process.
+    
+    Indicator calculation, signal generation and order execution share one
+    process: the strategy, trading engine and per-thread indicator calculators
+    live across bars, trading_config_live.json is hot-reloaded when its mtime
+    changes, and files are written only after orders have been submitted.
+    Each bar's analysis is fired by the bar clock at a fixed offset from the bar close and
+    the bar-close-to-order latency of every submitted order is recorded.
+    """
+    
+    def __init__(self, timeframe_minutes: int = 5, analysis_offset_seconds: float = ANALYSIS_OFFSET_SECONDS,
+                 execute_trades: bool = True, max_workers: int = 20):
+        """
+        Initialize the daemon.
+        
+        Args:
+            timeframe_minutes: Bar size
+            analysis_offset_seconds: Analysis start relative to bar close (negative = before close,
+                -7 matches the legacy 53-59s analysis window)
+            execute_trades: Submit orders for auto-approved signals
+            max_workers: Threads used for indicator and signal calculation
+        """
+        self.timeframe_minutes = timeframe_minutes
+        self.timeframe_key = f"{timeframe_minutes}min"
+        self.analysis_offset_seconds = analysis_offset_seconds
+        self.execute_trades = execute_trades
+        self.running = False
+        
+        self.strategy = ExceedenceStrategy()
+        self.trading_engine = None
+        if execute_trades:
+            try:
+                self.trading_engine = ExceedanceTradingEngine()
+                print("🎯 Trading engine initialized for daemon")
+            except Exception as e:
+                print(f"❌ Failed to initialize trading engine: {e}")
+                print("⚠️ Continuing with signal generation only")
+        
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='exceedance')
+        self.clock = BarClock()
+        self._calculators = threading.local()
+        
+        # Bar close -> order submission latency (seconds) of recent orders
+        self.order_latencies = deque(maxlen=500)
+        self.cycle_count = 0
+    
+    def run(self):
+        """Run one analysis per bar until interrupted"""
+        self.running = True
+        print("🚀 Starting Exceedance Strategy Daemon")
+        print("=" * 60)
+        print(f"📋 Long positions only | {self.timeframe_minutes}min timeframe | PML risk management")
+        print(f"⏰ Analysis at bar close {self.analysis_offset_seconds:+.1f}s")
+        print("🔄 Press Ctrl+C to stop")
+        
+        self.clock.subscribe(self.timeframe_minutes, self.run_cycle, offset_seconds=self.analysis_offset_seconds)
+        try:
+            self.clock.run()
+        except KeyboardInterrupt:
+            print(f"\n🛑 Stopping exceedance daemon after {self.cycle_count} cycles")
+        finally:
+            self.running = False
+            self.clock.stop()
+            self.executor.shutdown(wait=False)
+    
+    def run_cycle(self, bar_close: float) -> Dict[str, Any]:
+        """Calculate indicators, generate signals and submit orders for one bar"""
+        self.cycle_count += 1
+        cycle_start = time.time()
+        print(f"\n🔄 Analysis Cycle #{self.cycle_count} - bar close "
+              f"{datetime.fromtimestamp(bar_close).strftime('%H:%M:%S')}")
+        print("-" * 50)
+        
+        if self.strategy.reload_trading_config_if_changed() and self.trading_engine:
+            self.trading_engine.config = self.trading_engine.load_trading_config()
+        
+        symbols = self.strategy.load_watchlist_from_pml_strategy()
+        if not symbols:
+            print("❌ No symbols in PML watchlist")
+            return {}
+        
+        indicators = self.calculate_indicators(symbols)
+        indicators_done = time.time()
+        
+        signals = self.generate_signals(indicators)
+        signals_done = time.time()
+        
+        executed = self.execute_signals(signals, bar_close) if self.trading_engine else 0
+        
+        # Persist for the dashboard and other readers once orders are out
+        save_exceedance_indicators_for_timeframe(self.timeframe_key, indicators)
+        save_exceedence_signals_to_file(signals)
+        
+        buy_count = len([signal for signal in signals.values() if signal['signal_type'] == 'BUY'])
+        print(f"⏱️ Indicators {indicators_done - cycle_start:.2f}s | signals {signals_done - indicators_done:.2f}s | "
+              f"cycle {time.time() - cycle_start:.2f}s | {buy_count} BUY, {executed} executed")
+        self.log_latency_summary()
+        return signals
+    
+    def calculate_indicators(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Calculate this timeframe's exceedance indicators in-process, one symbol per worker"""
+        futures = {self.executor.submit(self._calculate_symbol, symbol): symbol for symbol in symbols}
+        indicators = {}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                indicators[symbol] = future.result(timeout=45)
+            except Exception as e:
+                print(f"  ❌ Error calculating indicators for {symbol}: {e}")
+                indicators[symbol] = {
+                    'symbol': symbol,
+                    'timeframe': self.timeframe_key,
+                    'timestamp': datetime.now().isoformat(),
+                    'error': str(e),
+                    'trading_signal': 'NO_SIGNAL'
+                }
+        return convert_numpy_types(indicators)
+    
+    def _calculate_symbol(self, symbol: str) -> Dict[str, Any]:
+        """Indicators for one symbol using this worker thread's calculator"""
+        calculator = getattr(self._calculators, 'calculator', None)
+        if calculator is None:
+            calculator = ExceedanceIndicatorsCalculator(self.timeframe_key)
+            self._calculators.calculator = calculator
+        return calculator.calculate_exceedance_indicators(symbol)
+    
+    def generate_signals(self, indicators: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Generate signals for every symbol with indicator data"""
+        futures = [
+            self.executor.submit(analyze_symbol, symbol, symbol_indicators, self.strategy)
+            for symbol, symbol_indicators in indicators.items()
+            if 'error' not in symbol_indicators
+        ]
+        return dict(future.result(timeout=30) for future in futures)
+    
+    def execute_signals(self, signals: Dict[str, Dict[str, Any]], bar_close: float) -> int:
+        """Submit auto-approved BUY signals not yet executed; returns the number executed"""
+        executed_trades = 0
+        for signal in signals.values():
+            if signal['signal_type'] != 'BUY':
+                continue
+            if not signal.get('auto_approve', False):
+                print(f"🔧 Debug: Signal not auto-approved: {signal['symbol']} auto_approve={signal.get('auto_approve')}")
+                continue
+            
+            already_executed, executed_at = is_signal_already_executed(signal)
+            if already_executed:
+                print(f"⚠️ DUPLICATE PREVENTED: {signal['symbol']} already executed at {executed_at}")
+                continue
+            
+            try:
+                print(f"🎯 EXECUTING TRADE: {signal['symbol']} (Signal ID: {signal.get('signal_id', 'N/A')})")
+                success = execute_immediate_trade(self.trading_engine, signal)
+                submitted_at = time.time()
+            except Exception as e:
+                print(f"❌ OTA Trade failed: {signal['symbol']} - {e}")
+                continue
+            
+            if not success:
+                print(f"❌ OTA Trade failed: {signal['symbol']} - execution error")
+                continue
+            
+            latency = submitted_at - bar_close
+            self.order_latencies.append(latency)
+            executed_trades += 1
+            print(f"✅ OTA Trade executed: {signal['symbol']} {signal['position_size']} shares "
+                  f"({latency * 1000:+.0f} ms from bar close)")
+            
+            signal_id = signal.get('signal_id', generate_signal_id(signal))
+            save_executed_signal(signal_id, signal, {
+                'success': True,
+                'symbol': signal['symbol'],
+                'quantity': signal['position_size'],
+                'profit_target': signal.get('profit_target', 0),
+                'executed_at': datetime.now().isoformat(),
+                'bar_close_to_order_ms': round(latency * 1000, 1)
+            })
+        
+        return executed_trades
+    
+    def log_latency_summary(self):
+        """Print bar-close-to-order latency percentiles of recent orders"""
+        if not self.order_latencies:
+            return
+        latencies = sorted(self.order_latencies)
+        
+        def percentile(pct):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * pct))] * 1000
+        
+        print(f"📈 Bar close -> order ({len(latencies)} orders): p50 {percentile(0.5):+.0f} ms, "
+              f"p95 {percentile(0.95):+.0f} ms, max {latencies[-1] * 1000:+.0f} ms")
+
 def main():
     """Main function with options for single run or continuous monitoring"""
     import sys
@@ -1209,7 +1340,10 @@ def main():
     # Check command line arguments
     execute_trades = False
     if len(sys.argv) > 1:
-        if sys.argv[1] == '--continuous':
+        if sys.argv[1] == '--daemon':
+            ExceedanceStrategyDaemon().run()
+            return
+        elif sys.argv[1] == '--continuous':
             # Check for trade execution flag
             if len(sys.argv) > 2 and sys.argv[2] == '--execute-trades':
                 execute_trades = True
@@ -1222,7 +1356,8 @@ def main():
         elif sys.argv[1] == '--execute-trades':
             execute_trades = True
         else:
-            print("Usage: python3 exceedence_strategy_signals.py [--continuous|--single] [--execute-trades]")
+            print("Usage: python3 exceedence_strategy_signals.py [--daemon|--continuous|--single] [--execute-trades]")
+            print("  --daemon: Run indicators, signals and execution in one long-lived process (executes auto-approved signals)")
             print("  --continuous: Run continuous monitoring with time constraints")
             print("  --single: Run single analysis cycle")
             print("  --execute-trades: Enable automatic trade execution for auto-approved signals")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+File Change Watcher
+
+Wakes a waiting thread as soon as a watched file is rewritten, so the engines
+that consume the JSON files written by strategy processes react within
+milliseconds instead of on their next polling cycle.
+
+Uses watchdog (inotify / FSEvents / kqueue) when it is installed and falls back
+to checking the file's mtime every poll_interval seconds. Writers in the same
+process can call notify() to skip the file system round trip entirely.
+
+Writers should replace the file atomically (temp file + os.replace) so a
+woken reader never sees a partially written file.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+
+class _FileEventHandler(FileSystemEventHandler):
+    """Forwards watchdog events for the watched path to its FileChangeWatcher"""
+
+    def __init__(self, watcher: 'FileChangeWatcher'):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        # Atomic replaces arrive as a move onto the watched path
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path and os.path.abspath(os.fsdecode(path)) == self.watcher.path:
+                self.watcher.check()
+                return
+
+
+class FileChangeWatcher:
+    """Blocks until a file is modified, created or replaced"""
+
+    def __init__(self, path: str, poll_interval: float = 0.1):
+        """
+        Initialize the watcher.
+
+        Args:
+            path: File to watch (does not need to exist yet)
+            poll_interval: Seconds between mtime checks when watchdog is unavailable
+        """
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self._changed = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._signature = self._get_signature()
+        self._observer = None
+
+    @property
+    def uses_os_events(self) -> bool:
+        """Whether changes are delivered by watchdog rather than polling."""
+        return self._observer is not None
+
+    def start(self) -> 'FileChangeWatcher':
+        """Start watching (a no-op beyond polling if watchdog is not installed)."""
+        self._stopped.clear()
+        if Observer is not None and self._observer is None:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            observer = Observer()
+            observer.schedule(_FileEventHandler(self), directory, recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+            logger.info(f"👀 Watching {self.path} for changes (file system events)")
+        elif Observer is None:
+            logger.info(f"👀 Watching {self.path} for changes (polling every {self.poll_interval}s, "
+                        f"install watchdog for file system events)")
+        return self
+
+    def stop(self):
+        """Stop watching and release any thread blocked in wait()."""
+        self._stopped.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+
+    def notify(self):
+        """Signal a change written by this process."""
+        with self._lock:
+            self._signature = self._get_signature()
+        self._changed.set()
+
+    def check(self) -> bool:
+        """Compare the file against the last seen version and signal if it changed."""
+        signature = self._get_signature()
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+        self._changed.set()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the file changes.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the file changed since the last wait(), False on timeout or stop()
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._observer is None:
+                self.check()
+            if self._changed.is_set():
+                self._changed.clear()
+                return not self._stopped.is_set()
+            if self._stopped.is_set():
+                return False
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            if self._observer is None:
+                remaining = self.poll_interval if remaining is None else min(self.poll_interval, remaining)
+            self._changed.wait(remaining)
+
+    def _get_signature(self):
+        """(inode, mtime, size) of the file, or None if it does not exist"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
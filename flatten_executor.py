@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Flatten Executor
+
+Cancels working orders and closes positions for every symbol concurrently,
+with bounded parallelism. The order handler's requests share the process-wide
+Schwab API rate limit.
+
+Each symbol is one leg: its working orders are cancelled first (so a
+resting stop or target cannot fill against the closing order), then the
+closing market order is placed. Legs run in parallel on a thread pool, so
+the last closing order goes out roughly one API round trip after the first
+instead of after every preceding leg.
+
+Per-leg results and timing are collected, and the total flatten latency
+(start until the last closing order was submitted) is reported as
+``flatten_metrics``.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+WORKING_ORDER_STATUSES = ('WORKING', 'QUEUED', 'PENDING_ACTIVATION')
+
+logger = logging.getLogger(__name__)
+
+
+class FlattenExecutor:
+    """Parallel cancel-and-close for all positions"""
+
+    def __init__(self, order_handler, max_workers: int = 8):
+        """
+        Initialize the executor.
+
+        Args:
+            order_handler: OrderHandler used for cancel_order/place_market_order
+            max_workers: Maximum legs in flight at once
+        """
+        self.order_handler = order_handler
+        self.max_workers = max_workers
+
+    def flatten(self, positions_data: Dict[str, Any], cancel_orders: bool = True,
+                close_positions: bool = True) -> Dict[str, Any]:
+        """
+        Cancel working orders and close positions for every symbol in parallel.
+
+        Args:
+            positions_data: Contents of current_positions.json
+            cancel_orders: Cancel working orders
+            close_positions: Place closing market orders
+
+        Returns:
+            Dict with orders_cancelled, orders_cancel_failed, positions_closed,
+            positions_close_failed, cancelled_orders, closed_positions, failed_orders,
+            failed_positions, legs (per-symbol results and timing) and flatten_metrics
+        """
+        positions = list(positions_data.get('positions', {}).values())
+        start = time.perf_counter()
+
+        if positions:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(positions)),
+                                    thread_name_prefix='flatten') as executor:
+                legs = list(executor.map(
+                    lambda position: self._run_leg(position, start, cancel_orders, close_positions),
+                    positions
+                ))
+        else:
+            legs = []
+
+        total_seconds = time.perf_counter() - start
+        cancelled_orders = [order for leg in legs for order in leg['cancelled_orders']]
+        failed_orders = [order for leg in legs for order in leg['failed_orders']]
+        closed_positions = [leg['closed_position'] for leg in legs if leg['closed_position']]
+        failed_positions = [leg['failed_position'] for leg in legs if leg['failed_position']]
+        metrics = self._summarize(legs, total_seconds)
+        result = {
+            'orders_cancelled': len(cancelled_orders),
+            'orders_cancel_failed': len(failed_orders),
+            'positions_closed': len(closed_positions),
+            'positions_close_failed': len(failed_positions),
+            'cancelled_orders': cancelled_orders,
+            'closed_positions': closed_positions,
+            'failed_orders': failed_orders,
+            'failed_positions': failed_positions,
+            'legs': legs,
+            'flatten_metrics': metrics
+        }
+
+        logger.info(f"⚡ Flattened {len(legs)} symbols in {metrics['flatten_latency_ms']:.0f} ms "
+                    f"(first order at {metrics['first_order_ms']} ms, last at {metrics['last_order_ms']} ms, "
+                    f"{self.max_workers} workers)")
+        return result
+
+    def _run_leg(self, position: Dict[str, Any], start: float, cancel_orders: bool,
+                 close_positions: bool) -> Dict[str, Any]:
+        """Cancel one symbol's working orders, then close its position."""
+        symbol = position.get('symbol', '')
+        leg_start = time.perf_counter()
+        leg = {
+            'symbol': symbol,
+            'cancelled_orders': [],
+            'failed_orders': [],
+            'closed_position': None,
+            'failed_position': None,
+            'cancel_ms': 0.0,
+            'order_ms': None,
+            'order_submitted_ms': None
+        }
+
+        if cancel_orders:
+            for order in position.get('open_orders', []):
+                if order.get('status', '') in WORKING_ORDER_STATUSES:
+                    self._cancel(order, symbol, leg)
+            leg['cancel_ms'] = round((time.perf_counter() - leg_start) * 1000, 1)
+
+        quantity = position.get('quantity', 0)
+        if close_positions and quantity != 0:
+            order_start = time.perf_counter()
+            self._close(position, symbol, quantity, leg)
+            order_end = time.perf_counter()
+            leg['order_ms'] = round((order_end - order_start) * 1000, 1)
+            leg['order_submitted_ms'] = round((order_end - start) * 1000, 1)
+
+        leg['leg_ms'] = round((time.perf_counter() - leg_start) * 1000, 1)
+        return leg
+
+    def _cancel(self, order: Dict[str, Any], symbol: str, leg: Dict[str, Any]):
+        order_id = order.get('order_id', '')
+        try:
+            cancel_result = self.order_handler.cancel_order(str(order_id))
+        except Exception as e:
+            cancel_result = {'error': str(e)}
+
+        # API returns 200 with empty body on success, or error dict on failure
+        if 'error' not in cancel_result:
+            leg['cancelled_orders'].append({
+                'order_id': order_id,
+                'symbol': order.get('symbol') or symbol,
+                'instruction': order.get('instruction', ''),
+                'quantity': order.get('quantity', 0),
+                'price': order.get('price', 0)
+            })
+            logger.info(f"✅ Cancelled order {order_id} ({symbol})")
+        else:
+            leg['failed_orders'].append({
+                'order_id': order_id,
+                'symbol': symbol,
+                'error': cancel_result.get('error', 'Unknown error')
+            })
+            logger.warning(f"❌ Failed to cancel order {order_id} ({symbol}): {cancel_result.get('error', 'Unknown')}")
+
+    def _close(self, position: Dict[str, Any], symbol: str, quantity: float, leg: Dict[str, Any]):
+        # Long positions are sold, short positions are covered
+        instruction = 'SELL' if quantity > 0 else 'BUY_TO_COVER'
+        close_quantity = abs(quantity)
+        try:
+            order_result = self.order_handler.place_market_order(instruction, symbol, close_quantity)
+        except Exception as e:
+            order_result = {'status': 'error', 'reason': str(e)}
+
+        if order_result.get('status') == 'submitted':
+            leg['closed_position'] = {
+                'symbol': symbol,
+                'instruction': instruction,
+                'quantity': close_quantity,
+                'order_id': order_result.get('order_id', 'unknown'),
+                'position_type': position.get('position_type', '')
+            }
+            logger.info(f"✅ Closing order placed: {instruction} {close_quantity} {symbol}")
+        else:
+            leg['failed_position'] = {
+                'symbol': symbol,
+                'quantity': quantity,
+                'error': order_result.get('reason', 'Unknown error')
+            }
+            logger.error(f"❌ Failed to close position {symbol}: {order_result.get('reason', 'Unknown')}")
+
+    def _summarize(self, legs: List[Dict[str, Any]], total_seconds: float) -> Dict[str, Optional[float]]:
+        """Total flatten latency and the spread between the first and last closing order."""
+        submitted = sorted(leg['order_submitted_ms'] for leg in legs if leg['order_submitted_ms'] is not None)
+        order_times = [leg['order_ms'] for leg in legs if leg['order_ms'] is not None]
+        return {
+            'flatten_latency_ms': round(total_seconds * 1000, 1),
+            'first_order_ms': submitted[0] if submitted else None,
+            'last_order_ms': submitted[-1] if submitted else None,
+            'avg_order_ms': round(sum(order_times) / len(order_times), 1) if order_times else None,
+            'max_order_ms': max(order_times) if order_times else None,
+            'legs': len(legs),
+            'max_workers': self.max_workers
+        }
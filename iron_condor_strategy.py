@@ -30,6 +30,7 @@ import json
 # Import our existing handlers
 from historical_data_handler import HistoricalDataHandler
 from options_data_handler import OptionsDataHandler
+from artifact_store import load_artifact, save_artifact
 
 class SignalType(Enum):
     """Trading signal types"""
@@ -1373,7 +1374,6 @@ def run_iron_condor_analysis_for_watchlist() -> Dict[str, Any]:
 def save_iron_condor_signals_to_file(iron_condor_signals: Dict[str, Any]) -> bool:
     """Save Iron Condor signals to dedicated iron_condor_signals.json file"""
     try:
-        import json
         import os
         
         script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1403,8 +1403,7 @@ def save_iron_condor_signals_to_file(iron_condor_signals: Dict[str, Any]) -> boo
         }
         
         # Write to dedicated Iron Condor signals file
-        with open(iron_condor_signals_path, 'w') as f:
-            json.dump(iron_condor_data, f, indent=2)
+        save_artifact(iron_condor_signals_path, iron_condor_data, records_key='signals')
         
         print(f"✅ Saved Iron Condor signals to {iron_condor_signals_path}")
         print(f"📊 Analysis: {iron_condor_data['analysis_summary']['strong_buy']} STRONG_BUY, {iron_condor_data['analysis_summary']['buy']} BUY, {iron_condor_data['analysis_summary']['hold']} HOLD")
@@ -1443,8 +1442,7 @@ def update_existing_iron_condor_signals_auto_approve():
             print(f"Warning: Could not read auto_approve config: {e}")
         
         # Load existing Iron Condor signals
-        with open(iron_condor_signals_path, 'r') as f:
-            iron_condor_data = json.load(f)
+        iron_condor_data = load_artifact(iron_condor_signals_path)
         
         # Update auto_approve for all signals
         signals_updated = 0
@@ -1463,8 +1461,7 @@ def update_existing_iron_condor_signals_auto_approve():
         iron_condor_data['metadata']['auto_approve_status'] = auto_approve
         
         # Save updated Iron Condor signals
-        with open(iron_condor_signals_path, 'w') as f:
-            json.dump(iron_condor_data, f, indent=2)
+        save_artifact(iron_condor_signals_path, iron_condor_data, records_key='signals')
         
         print(f"✅ Updated {signals_updated} Iron Condor signals with auto_approve: {auto_approve}")
         return True
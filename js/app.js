@@ -118,7 +118,8 @@ class VolFlowApp {
             // Subscribe to all data types
             this.modules.websocket.subscribe([
                 'pml_signals', 'iron_condor_signals', 'divergence_signals',
-                'watchlist_data', 'positions', 'account_data', 'market_status', 'trading_statistics'
+                'watchlist_data', 'positions', 'account_data', 'market_status', 'trading_statistics',
+                'signal_latency'
             ]);
             
             // Stop fallback auto-refresh since WebSocket is active
@@ -195,7 +196,7 @@ class VolFlowApp {
             }
             
             // Route strategy signals
-            if (data.pml_signals || data.iron_condor_signals || data.divergence_signals) {
+            if (data.pml_signals || data.iron_condor_signals || data.divergence_signals || data.signal_latency) {
                 console.log('🎯 Routing strategy signals to strategy manager');
                 this.modules.strategy.updateFromWebSocket(data);
             }
@@ -914,6 +914,56 @@ class StrategyManager {
             console.log('📈 Processing Divergence signals from PostgreSQL WebSocket');
             this.updateStrategyCardFromWebSocket('divergence', data.divergence_signals);
         }
+        
+        if (data.signal_latency) {
+            console.log('⏱️ Processing signal latency summary');
+            this.updateStrategyLatency(data.signal_latency);
+        }
+    }
+    
+    updateStrategyLatency(latencySummary) {
+        // Traced strategy name -> strategy card (the PML card runs the exceedance strategy)
+        const cards = { exceedance: 'pml', divergence: 'divergence' };
+        const segments = [
+            ['signal_to_ack', 'Signal → Ack'],
+            ['end_to_end', 'Fetch → Ack'],
+            ['ack_to_fill', 'Ack → Fill']
+        ];
+        const strategies = latencySummary.strategies || {};
+        
+        Object.entries(cards).forEach(([strategy, card]) => {
+            const latencyElement = document.getElementById(`${card}-latency`);
+            const stats = strategies[strategy];
+            if (!latencyElement || !stats) {
+                return;
+            }
+            
+            const rows = segments
+                .filter(([key]) => stats.segments && stats.segments[key])
+                .map(([key, label]) => {
+                    const segment = stats.segments[key];
+                    return `
+                        <div class="latency-row">
+                            <span class="latency-label">${label}</span>
+                            <span class="latency-value">p50 ${this.formatLatency(segment.p50)}</span>
+                            <span class="latency-value">p95 ${this.formatLatency(segment.p95)}</span>
+                            <span class="latency-value">p99 ${this.formatLatency(segment.p99)}</span>
+                        </div>
+                    `;
+                }).join('');
+            
+            latencyElement.innerHTML = rows ? `
+                <div class="latency-header">
+                    <i class="fas fa-stopwatch"></i>
+                    <span>Latency (last ${stats.traces} orders)</span>
+                </div>
+                ${rows}
+            ` : '';
+        });
+    }
+    
+    formatLatency(ms) {
+        return ms >= 1000 ? `${(ms / 1000).toFixed(2)}s` : `${Math.round(ms)}ms`;
     }
     
     updateStrategyCardFromWebSocket(strategyType, signals) {
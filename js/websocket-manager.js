@@ -1,4 +1,112 @@
 // WebSocket connection management for real-time data streaming
+
+// Minimal MessagePack decoder for binary data frames (server negotiates
+// the 'volflow.msgpack' subprotocol when MessagePack is available)
+class MessagePackDecoder {
+    constructor(buffer) {
+        this.view = new DataView(buffer);
+        this.bytes = new Uint8Array(buffer);
+        this.offset = 0;
+        this.textDecoder = new TextDecoder('utf-8');
+    }
+    
+    static decode(buffer) {
+        return new MessagePackDecoder(buffer).read();
+    }
+    
+    read() {
+        const type = this.view.getUint8(this.offset++);
+        
+        if (type <= 0x7f) return type;                                  // positive fixint
+        if (type >= 0xe0) return type - 0x100;                          // negative fixint
+        if ((type & 0xf0) === 0x80) return this.readMap(type & 0x0f);   // fixmap
+        if ((type & 0xf0) === 0x90) return this.readArray(type & 0x0f); // fixarray
+        if ((type & 0xe0) === 0xa0) return this.readString(type & 0x1f); // fixstr
+        
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return this.readBinary(this.readUint(1));
+            case 0xc5: return this.readBinary(this.readUint(2));
+            case 0xc6: return this.readBinary(this.readUint(4));
+            case 0xc7: return this.readExt(this.readUint(1));
+            case 0xc8: return this.readExt(this.readUint(2));
+            case 0xc9: return this.readExt(this.readUint(4));
+            case 0xca: { const value = this.view.getFloat32(this.offset); this.offset += 4; return value; }
+            case 0xcb: { const value = this.view.getFloat64(this.offset); this.offset += 8; return value; }
+            case 0xcc: return this.readUint(1);
+            case 0xcd: return this.readUint(2);
+            case 0xce: return this.readUint(4);
+            case 0xcf: return this.readUint(8);
+            case 0xd0: { const value = this.view.getInt8(this.offset); this.offset += 1; return value; }
+            case 0xd1: { const value = this.view.getInt16(this.offset); this.offset += 2; return value; }
+            case 0xd2: { const value = this.view.getInt32(this.offset); this.offset += 4; return value; }
+            case 0xd3: { const value = Number(this.view.getBigInt64(this.offset)); this.offset += 8; return value; }
+            case 0xd4: return this.readExt(1);
+            case 0xd5: return this.readExt(2);
+            case 0xd6: return this.readExt(4);
+            case 0xd7: return this.readExt(8);
+            case 0xd8: return this.readExt(16);
+            case 0xd9: return this.readString(this.readUint(1));
+            case 0xda: return this.readString(this.readUint(2));
+            case 0xdb: return this.readString(this.readUint(4));
+            case 0xdc: return this.readArray(this.readUint(2));
+            case 0xdd: return this.readArray(this.readUint(4));
+            case 0xde: return this.readMap(this.readUint(2));
+            case 0xdf: return this.readMap(this.readUint(4));
+            default: throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+        }
+    }
+    
+    readUint(size) {
+        let value;
+        switch (size) {
+            case 1: value = this.view.getUint8(this.offset); break;
+            case 2: value = this.view.getUint16(this.offset); break;
+            case 4: value = this.view.getUint32(this.offset); break;
+            default: value = Number(this.view.getBigUint64(this.offset)); break;
+        }
+        this.offset += size;
+        return value;
+    }
+    
+    readString(length) {
+        const value = this.textDecoder.decode(this.bytes.subarray(this.offset, this.offset + length));
+        this.offset += length;
+        return value;
+    }
+    
+    readBinary(length) {
+        const value = this.bytes.slice(this.offset, this.offset + length);
+        this.offset += length;
+        return value;
+    }
+    
+    readExt(length) {
+        // Extension types are not produced by the server; skip type byte and payload
+        this.offset += 1;
+        return this.readBinary(length);
+    }
+    
+    readArray(length) {
+        const value = new Array(length);
+        for (let i = 0; i < length; i++) {
+            value[i] = this.read();
+        }
+        return value;
+    }
+    
+    readMap(length) {
+        const value = {};
+        for (let i = 0; i < length; i++) {
+            const key = this.read();
+            value[key] = this.read();
+        }
+        return value;
+    }
+}
+
 class WebSocketManager {
     constructor() {
         console.log('🔍 DEBUG: WebSocketManager constructor called');
@@ -26,12 +134,14 @@ class WebSocketManager {
             const wsUrl = 'ws://localhost:8765';
             console.log(`📡 WebSocket URL: ${wsUrl}`);
             console.log('🔍 DEBUG: Creating new WebSocket instance...');
-            this.ws = new WebSocket(wsUrl);
+            // Offer MessagePack first; the server falls back to JSON if it lacks msgpack
+            this.ws = new WebSocket(wsUrl, ['volflow.msgpack', 'volflow.json']);
+            this.ws.binaryType = 'arraybuffer';
             console.log('🔍 DEBUG: WebSocket instance created:', !!this.ws);
             
             this.ws.onopen = () => {
                 console.log('🔍 DEBUG: WebSocket onopen event fired');
-                console.log('✅ WebSocket connected');
+                console.log(`✅ WebSocket connected (encoding: ${this.ws.protocol || 'json'}, extensions: ${this.ws.extensions || 'none'})`);
                 this.connected = true;
                 this.reconnectAttempts = 0;
                 this.updateConnectionStatus('connected');
@@ -41,7 +151,10 @@ class WebSocketManager {
             
             this.ws.onmessage = (event) => {
                 try {
-                    const data = JSON.parse(event.data);
+                    // Binary frames are MessagePack; text frames are JSON
+                    const data = event.data instanceof ArrayBuffer
+                        ? MessagePackDecoder.decode(event.data)
+                        : JSON.parse(event.data);
                     console.log('📡 Received WebSocket data:', data.timestamp || data.type);
                     
                     // Route strategy and trading configuration messages to strategy manager
@@ -152,8 +265,21 @@ class WebSocketManager {
         this.send({ type: 'request_data' });
     }
     
-    subscribe(dataTypes) {
-        this.send({ type: 'subscribe', data_types: dataTypes });
+    requestWireMetrics() {
+        this.send({ type: 'get_wire_metrics' });
+    }
+    
+    // dataTypes: array of data types, or object of data type -> symbols (null for all)
+    subscribe(dataTypes, symbols = null) {
+        const message = { type: 'subscribe', data_types: dataTypes };
+        if (symbols) {
+            message.symbols = symbols;
+        }
+        this.send(message);
+    }
+    
+    unsubscribe(dataTypes) {
+        this.send({ type: 'unsubscribe', data_types: dataTypes });
     }
     
     on(event, callback) {
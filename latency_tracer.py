@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Signal Latency Tracer
+
+Stamps each signal with monotonic timestamps as it moves through the pipeline
+and keeps per-strategy latency percentiles:
+
+    fetch       market data request started
+    compute     indicator calculation started (data received)
+    signal      trading signal generated
+    risk_check  risk / approval checks started
+    submit      order request sent to the broker
+    ack         broker accepted the order
+    fill        fill observed
+
+A trace is a plain {stage: seconds} dict carried on indicator and signal
+records under the 'latency_trace' key, so it survives the JSON files that
+connect the calculator, strategy and engine processes. time.monotonic() is a
+host-wide clock, so stamps taken in different processes on the same machine
+are directly comparable.
+
+Completed traces are appended to latency_traces.jsonl and the p50/p95/p99 of
+every stage-to-stage segment per strategy are written to latency_summary.json
+for the dashboard.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable
+
+from atomic_json import write_json_atomic
+
+LATENCY_TRACE_KEY = 'latency_trace'
+STAGES = ('fetch', 'compute', 'signal', 'risk_check', 'submit', 'ack', 'fill')
+LATENCY_TRACES_FILE = 'latency_traces.jsonl'
+LATENCY_SUMMARY_FILE = 'latency_summary.json'
+
+
+def mark_stage(trace: Optional[Dict[str, float]], stage: str, at: Optional[float] = None) -> Dict[str, float]:
+    """
+    Stamp a stage on a trace.
+
+    Args:
+        trace: Existing trace, or None to start one
+        stage: One of STAGES
+        at: time.monotonic() value (defaults to now)
+
+    Returns:
+        The trace (created if None was given)
+    """
+    if trace is None:
+        trace = {}
+    trace[stage] = round(time.monotonic() if at is None else at, 6)
+    return trace
+
+
+def continue_trace(records: Iterable[Optional[Dict[str, Any]]], stage: str) -> Dict[str, float]:
+    """
+    Start a downstream trace from the traces carried by upstream records and stamp a stage.
+
+    When several records feed one signal (e.g. one indicator set per timeframe),
+    the latest stamp of each stage is kept: the slowest input is what the
+    signal waited for.
+    """
+    trace = {}
+    for record in records:
+        for upstream_stage, stamp in ((record or {}).get(LATENCY_TRACE_KEY) or {}).items():
+            trace[upstream_stage] = max(stamp, trace.get(upstream_stage, stamp))
+    return mark_stage(trace, stage)
+
+
+def trace_segments(trace: Dict[str, float]) -> Dict[str, float]:
+    """Milliseconds between consecutive stamped stages, plus signal_to_ack and end_to_end."""
+    stamped = [stage for stage in STAGES if stage in trace]
+    segments = {
+        f"{start}_to_{end}": round((trace[end] - trace[start]) * 1000, 3)
+        for start, end in zip(stamped, stamped[1:])
+    }
+    if 'signal' in trace and 'ack' in trace:
+        segments['signal_to_ack'] = round((trace['ack'] - trace['signal']) * 1000, 3)
+    if 'ack' in trace and stamped[0] != 'ack':
+        segments['end_to_end'] = round((trace['ack'] - trace[stamped[0]]) * 1000, 3)
+    return segments
+
+
+def load_latency_summary(summary_file: str = LATENCY_SUMMARY_FILE) -> Optional[Dict[str, Any]]:
+    """Read the persisted per-strategy latency summary (None if not written yet)."""
+    try:
+        with open(summary_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class LatencyTracer:
+    """Persists completed signal traces and maintains per-strategy percentiles"""
+
+    def __init__(self, trace_file: str = LATENCY_TRACES_FILE, summary_file: str = LATENCY_SUMMARY_FILE,
+                 window: int = 500):
+        """
+        Initialize the tracer, reloading the most recent traces from the trace file.
+
+        Args:
+            trace_file: JSON Lines file completed traces are appended to
+            summary_file: Percentile summary rewritten after every record
+            window: Most recent traces per strategy used for percentiles
+        """
+        self.trace_file = trace_file
+        self.summary_file = summary_file
+        self.window = window
+        # strategy -> trace_id -> segments (latest record of each trace wins)
+        self.recent: Dict[str, OrderedDict] = {}
+        # Strategies traced by this process; the summary file is shared with other
+        # processes, which own the entries for their own strategies
+        self.recorded_strategies = set()
+        self._lock = threading.Lock()
+        self._load_recent()
+
+    def record(self, strategy: str, symbol: str, trace: Optional[Dict[str, float]],
+               trace_id: Optional[str] = None, outcome: str = 'submitted') -> Optional[Dict[str, Any]]:
+        """
+        Persist a trace and refresh the strategy's percentiles.
+
+        Recording the same trace_id again (e.g. once more when the fill arrives)
+        replaces its earlier segments in the percentile window.
+
+        Args:
+            strategy: Strategy name ('exceedance', 'divergence', ...)
+            symbol: Traded symbol
+            trace: {stage: monotonic seconds}
+            trace_id: Stable id of the signal/order (defaults to strategy_symbol_<signal stamp>)
+            outcome: 'submitted', 'rejected', 'filled', ...
+
+        Returns:
+            The persisted entry, or None if the trace was empty or inconsistent
+        """
+        if not trace:
+            return None
+        segments = trace_segments(trace)
+        if any(value < 0 for value in segments.values()):
+            # Stamps from before a reboot (stale signal file); not comparable
+            return None
+
+        entry = {
+            'trace_id': trace_id or f"{strategy}_{symbol}_{trace.get('signal', min(trace.values()))}",
+            'strategy': strategy,
+            'symbol': symbol,
+            'outcome': outcome,
+            'recorded_at': datetime.now().isoformat(),
+            'stages': trace,
+            'segments_ms': segments
+        }
+
+        with self._lock:
+            with open(self.trace_file, 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self._remember(entry)
+            self.recorded_strategies.add(strategy)
+            summary = self._summarize()
+            persisted = load_latency_summary(self.summary_file) or {}
+            strategies = persisted.get('strategies', {})
+            strategies.update({name: summary['strategies'][name] for name in self.recorded_strategies})
+            summary['strategies'] = strategies
+            write_json_atomic(self.summary_file, summary)
+
+        return entry
+
+    def summary(self) -> Dict[str, Any]:
+        """p50/p95/p99 of every segment per strategy."""
+        with self._lock:
+            return self._summarize()
+
+    def _remember(self, entry: Dict[str, Any]):
+        traces = self.recent.setdefault(entry['strategy'], OrderedDict())
+        traces.pop(entry['trace_id'], None)
+        traces[entry['trace_id']] = entry['segments_ms']
+        while len(traces) > self.window:
+            traces.popitem(last=False)
+
+    def _summarize(self) -> Dict[str, Any]:
+        strategies = {}
+        for strategy, traces in self.recent.items():
+            values_by_segment = {}
+            for segments in traces.values():
+                for segment, value in segments.items():
+                    values_by_segment.setdefault(segment, []).append(value)
+            strategies[strategy] = {
+                'traces': len(traces),
+                'segments': {
+                    segment: self._percentiles(values)
+                    for segment, values in values_by_segment.items()
+                }
+            }
+        return {
+            'updated_at': datetime.now().isoformat(),
+            'stages': list(STAGES),
+            'strategies': strategies
+        }
+
+    @staticmethod
+    def _percentiles(values) -> Dict[str, float]:
+        values = sorted(values)
+
+        def percentile(pct):
+            return values[min(len(values) - 1, int(len(values) * pct))]
+
+        return {
+            'count': len(values),
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': values[-1]
+        }
+
+    def _load_recent(self):
+        """Rebuild the percentile window from the end of the trace file."""
+        try:
+            with open(self.trace_file, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                # Enough of the tail for a full window across a few strategies
+                f.seek(max(0, f.tell() - self.window * 4 * 1024))
+                lines = f.read().splitlines()
+        except OSError:
+            return
+
+        for raw_line in lines:
+            try:
+                entry = json.loads(raw_line)
+            except ValueError:
+                continue  # Partial first line of the tail
+            if isinstance(entry, dict) and entry.get('strategy') and entry.get('trace_id'):
+                self._remember(entry)
+
+
+_latency_tracer = None
+_latency_tracer_lock = threading.Lock()
+
+
+def get_latency_tracer() -> LatencyTracer:
+    """Get the process-wide latency tracer."""
+    global _latency_tracer
+    if _latency_tracer is None:
+        with _latency_tracer_lock:
+            if _latency_tracer is None:
+                _latency_tracer = LatencyTracer()
+    return _latency_tracer
@@ -1,12 +1,12 @@
 import os
 import requests
 import time
-import json
 import psycopg2
 import psycopg2.extras
 from connection_manager import ensure_valid_tokens, make_authenticated_request, handle_api_response
 from datetime import datetime, timedelta
 from config_loader import get_config
+from artifact_store import save_artifact
 
 class OptionsDataHandler:
     def __init__(self):
@@ -590,8 +590,7 @@ class OptionsDataHandler:
     def save_options_data_to_json(self, options_data, filename='options_data.json'):
         """Save options data to JSON file."""
         try:
-            with open(filename, 'w') as f:
-                json.dump(options_data, f, indent=2, default=str)
+            save_artifact(filename, options_data, records_key='symbols', default=str)
             print(f"✅ Options data saved to {filename}")
             return True
         except Exception as e:
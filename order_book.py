@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Open Order Book
+
+In-memory book of open Schwab orders indexed by symbol and order id:
+1. Incremental refresh via fromEnteredTime (only orders entered since the last
+   refresh, plus the window still covering orders that are open)
+2. Status-change events for new, filled, cancelled or replaced orders
+3. O(1) lookups for trading engines instead of parsing current_positions.json
+4. Book state persisted to open_order_book.json so short-lived handler
+   processes continue the incremental refresh where the last one stopped
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Callable
+
+from atomic_json import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+OPEN_ORDER_STATUSES = {
+    "WORKING", "QUEUED", "ACCEPTED", "AWAITING_PARENT_ORDER",
+    "AWAITING_CONDITION", "AWAITING_STOP_CONDITION", "PENDING_ACTIVATION"
+}
+
+API_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+
+
+def extract_order_symbol(order: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract symbol from order data.
+
+    Args:
+        order: Order data from Schwab API
+
+    Returns:
+        Symbol string or None if not found
+    """
+    try:
+        # Check orderLegCollection for symbol
+        if 'orderLegCollection' in order and len(order['orderLegCollection']) > 0:
+            leg = order['orderLegCollection'][0]
+            if 'instrument' in leg and 'symbol' in leg['instrument']:
+                return leg['instrument']['symbol']
+
+        # Fallback: check if there's a direct symbol field
+        if 'symbol' in order:
+            return order['symbol']
+
+        return None
+
+    except Exception as e:
+        logger.warning(f"Error extracting symbol from order: {e}")
+        return None
+
+
+def process_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process raw order data into structured format.
+
+    Args:
+        order: Raw order data from Schwab API
+
+    Returns:
+        Processed order data
+    """
+    try:
+        # Extract basic order information
+        processed_order = {
+            'order_id': order.get('orderId', ''),
+            'status': order.get('status', ''),
+            'order_type': order.get('orderType', ''),
+            'session': order.get('session', ''),
+            'duration': order.get('duration', ''),
+            'entered_time': order.get('enteredTime', ''),
+            'close_time': order.get('closeTime', ''),
+            'price': order.get('price', 0),
+            'stop_price': order.get('stopPrice', 0),
+            'quantity': 0,
+            'filled_quantity': order.get('filledQuantity', 0),
+            'remaining_quantity': order.get('remainingQuantity', 0),
+            'instruction': '',
+            'asset_type': '',
+            'symbol': '',
+            'order_source': 'schwab_api'
+        }
+
+        # Extract leg information
+        if 'orderLegCollection' in order and len(order['orderLegCollection']) > 0:
+            leg = order['orderLegCollection'][0]
+            processed_order['instruction'] = leg.get('instruction', '')
+            processed_order['quantity'] = leg.get('quantity', 0)
+
+            if 'instrument' in leg:
+                instrument = leg['instrument']
+                processed_order['symbol'] = instrument.get('symbol', '')
+                processed_order['asset_type'] = instrument.get('assetType', '')
+
+        # Calculate remaining quantity if not provided
+        if processed_order['remaining_quantity'] == 0 and processed_order['quantity'] > 0:
+            processed_order['remaining_quantity'] = processed_order['quantity'] - processed_order['filled_quantity']
+
+        # Add order strategy information
+        processed_order['order_strategy_type'] = order.get('orderStrategyType', '')
+        processed_order['complex_order_strategy_type'] = order.get('complexOrderStrategyType', '')
+
+        # Add child orders information if present
+        if 'childOrderStrategies' in order:
+            processed_order['has_child_orders'] = True
+            processed_order['child_orders_count'] = len(order['childOrderStrategies'])
+        else:
+            processed_order['has_child_orders'] = False
+            processed_order['child_orders_count'] = 0
+
+        return processed_order
+
+    except Exception as e:
+        logger.warning(f"Error processing order data: {e}")
+        return {
+            'order_id': order.get('orderId', 'unknown'),
+            'status': order.get('status', 'unknown'),
+            'error': f'Processing error: {str(e)}',
+            'order_source': 'schwab_api'
+        }
+
+
+def _parse_entered_time(value: str) -> Optional[datetime]:
+    """Parse a Schwab enteredTime (e.g. 2024-01-02T14:30:00+0000) as an aware UTC datetime."""
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%S.%f%z'):
+        try:
+            return datetime.strptime(value.replace('Z', '+0000'), fmt).astimezone(timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+class OrderBook:
+    """
+    Thread-safe in-memory open-order book refreshed incrementally from the Schwab API.
+    """
+
+    def __init__(self, order_handler, state_file: str = 'open_order_book.json',
+                 overlap_seconds: int = 60):
+        """
+        Initialize the order book.
+
+        Args:
+            order_handler: OrderHandler used for get_all_orders requests
+            state_file: Path of the persisted book state
+            overlap_seconds: Re-read window before the cursor to tolerate clock skew
+        """
+        self.order_handler = order_handler
+        self.state_file = state_file
+        self.overlap = timedelta(seconds=overlap_seconds)
+
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        # Open orders only: order_id -> processed order, symbol -> {order_id: order}
+        self._orders_by_id: Dict[str, Dict[str, Any]] = {}
+        self._orders_by_symbol: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Last (status, enteredTime) seen for every order inside the refresh window
+        self._known_status: Dict[str, tuple] = {}
+        self._watermark: Optional[datetime] = None
+        self.refreshed_at = 0.0
+        self._state_mtime = 0.0
+
+        self._load_state()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Get an open order by id."""
+        with self._lock:
+            return self._orders_by_id.get(str(order_id))
+
+    def get_status(self, order_id: str) -> Optional[str]:
+        """Last status seen for an order inside the refresh window (open or closed), or None."""
+        with self._lock:
+            known = self._known_status.get(str(order_id))
+        return known[0] if known else None
+
+    def get_open_orders(self, symbol: str, order_types: List[str] = None,
+                        statuses: List[str] = None, instructions: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get open orders for a symbol with optional filtering.
+
+        Args:
+            symbol: Stock symbol
+            order_types: Only include these order types (e.g. ['LIMIT'])
+            statuses: Only include these statuses (e.g. ['WORKING'])
+            instructions: Only include these instructions (e.g. ['SELL'])
+
+        Returns:
+            List of processed open orders
+        """
+        with self._lock:
+            orders = list(self._orders_by_symbol.get(symbol, {}).values())
+
+        return [
+            order for order in orders
+            if (order_types is None or order.get('order_type') in order_types)
+            and (statuses is None or order.get('status') in statuses)
+            and (instructions is None or order.get('instruction') in instructions)
+        ]
+
+    def has_open_orders(self, symbol: str) -> bool:
+        """Check whether a symbol has any open orders."""
+        with self._lock:
+            return bool(self._orders_by_symbol.get(symbol))
+
+    def open_orders_by_symbol(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get all open orders grouped by symbol."""
+        with self._lock:
+            return {symbol: list(orders.values()) for symbol, orders in self._orders_by_symbol.items() if orders}
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback for order status-change events.
+
+        Each event is a dict with order_id, symbol, old_status (None for a newly
+        seen order), new_status and the processed order.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, max_age: float = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Pull orders entered since the last refresh and apply them to the book.
+
+        The request window starts at the earlier of the cursor and the oldest
+        still-open order, so status changes on open orders are always seen while
+        closed history is never downloaded twice.
+
+        Args:
+            max_age: Skip the API call if the book was refreshed (by this or
+                another process) within this many seconds
+
+        Returns:
+            List of status-change events, or None if the refresh failed
+        """
+        with self._lock:
+            self._reload_if_newer()
+            if max_age is not None:
+                if time.time() - self.refreshed_at <= max_age:
+                    return []
+
+            if not self.order_handler:
+                logger.warning("OrderHandler not available - cannot refresh order book")
+                return None
+
+            now = datetime.now(timezone.utc)
+            from_time = self._window_start(now)
+
+            orders_response = self.order_handler.get_all_orders(
+                from_entered_time=from_time.strftime(API_TIME_FORMAT),
+                to_entered_time=(now + timedelta(minutes=1)).strftime(API_TIME_FORMAT),
+                max_results=3000
+            )
+
+            if not isinstance(orders_response, list):
+                if isinstance(orders_response, dict) and 'error' in orders_response:
+                    logger.error(f"Error refreshing order book: {orders_response['error']}")
+                else:
+                    logger.warning(f"Unexpected orders response format: {type(orders_response)}")
+                return None
+
+            events = self._apply_orders(orders_response)
+
+            newest = max(
+                (t for t in (_parse_entered_time(o.get('enteredTime', '')) for o in orders_response) if t),
+                default=None
+            )
+            if newest and (self._watermark is None or newest > self._watermark):
+                self._watermark = newest
+            elif self._watermark is None:
+                self._watermark = now
+
+            self._prune_known_status(self._window_start(now))
+            self.refreshed_at = time.time()
+            self._save_state()
+
+            logger.info(f"Order book refreshed from {from_time.isoformat()}: {len(orders_response)} orders, "
+                        f"{len(self._orders_by_id)} open, {len(events)} status changes")
+
+        for event in events:
+            for callback in list(self._listeners):
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.warning(f"Order book listener failed: {e}")
+
+        return events
+
+    def _window_start(self, now: datetime) -> datetime:
+        """Start of the next refresh window (caller holds the lock)."""
+        if self._watermark is None:
+            # First refresh: today's orders, as the positions handler always requested
+            return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        start = self._watermark
+        for order in self._orders_by_id.values():
+            entered = _parse_entered_time(order.get('entered_time', ''))
+            if entered and entered < start:
+                start = entered
+        return start - self.overlap
+
+    def _apply_orders(self, raw_orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply fetched orders to the indexes and collect status changes (caller holds the lock)."""
+        events = []
+        for raw_order in raw_orders:
+            order = process_order(raw_order)
+            order_id = str(order.get('order_id', ''))
+            if not order_id:
+                continue
+
+            symbol = order.get('symbol') or extract_order_symbol(raw_order) or ''
+            status = order.get('status', '')
+            old_status = self._known_status.get(order_id, (None, ''))[0]
+            self._known_status[order_id] = (status, order.get('entered_time', ''))
+
+            if status in OPEN_ORDER_STATUSES and symbol:
+                previous = self._orders_by_id.get(order_id)
+                if previous and previous.get('symbol') != symbol:
+                    self._remove_order(order_id)
+                self._orders_by_id[order_id] = order
+                self._orders_by_symbol.setdefault(symbol, {})[order_id] = order
+            elif order_id in self._orders_by_id:
+                self._remove_order(order_id)
+
+            if old_status != status:
+                events.append({
+                    'order_id': order_id,
+                    'symbol': symbol,
+                    'old_status': old_status,
+                    'new_status': status,
+                    'order': order
+                })
+        return events
+
+    def _remove_order(self, order_id: str):
+        """Drop an order from both indexes (caller holds the lock)."""
+        order = self._orders_by_id.pop(order_id, None)
+        if not order:
+            return
+        symbol_orders = self._orders_by_symbol.get(order.get('symbol', ''))
+        if symbol_orders is not None:
+            symbol_orders.pop(order_id, None)
+            if not symbol_orders:
+                del self._orders_by_symbol[order.get('symbol', '')]
+
+    def _prune_known_status(self, window_start: datetime):
+        """Forget closed orders the next refresh window no longer covers (caller holds the lock)."""
+        self._known_status = {
+            order_id: (status, entered_time)
+            for order_id, (status, entered_time) in self._known_status.items()
+            if order_id in self._orders_by_id
+            or (_parse_entered_time(entered_time) or window_start) >= window_start
+        }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load_state(self):
+        """Load the persisted book written by a previous refresh."""
+        try:
+            if not os.path.exists(self.state_file):
+                return
+            state_mtime = os.path.getmtime(self.state_file)
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load order book state: {e}")
+            return
+
+        with self._lock:
+            self._orders_by_id = {}
+            self._orders_by_symbol = {}
+            for order_id, order in state.get('open_orders', {}).items():
+                self._orders_by_id[order_id] = order
+                self._orders_by_symbol.setdefault(order.get('symbol', ''), {})[order_id] = order
+            self._known_status = {
+                order_id: tuple(entry) for order_id, entry in state.get('known_status', {}).items()
+            }
+            watermark = state.get('watermark')
+            self._watermark = datetime.fromisoformat(watermark) if watermark else None
+            self.refreshed_at = state.get('refreshed_at', 0.0)
+            self._state_mtime = state_mtime
+
+    def _reload_if_newer(self):
+        """Pick up a refresh done by another process (caller holds the lock)."""
+        try:
+            if os.path.getmtime(self.state_file) > self._state_mtime:
+                self._load_state()
+        except OSError:
+            pass
+
+    def _save_state(self):
+        """Persist the book atomically (caller holds the lock)."""
+        state = {
+            'refreshed_at': self.refreshed_at,
+            'watermark': self._watermark.isoformat() if self._watermark else None,
+            'open_orders': self._orders_by_id,
+            'known_status': self._known_status
+        }
+        try:
+            write_json_atomic(self.state_file, state, default=str)
+            self._state_mtime = os.path.getmtime(self.state_file)
+        except OSError as e:
+            logger.warning(f"Could not save order book state: {e}")
@@ -8,15 +8,21 @@ Makes actual API requests to Charles Schwab using connection_manager.
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Union, Any
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 import logging
-import requests
+import threading
 import json
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 import connection_manager
 
+# Same buffer ensure_valid_tokens refreshes within
+TOKEN_REFRESH_BUFFER = timedelta(minutes=2)
+# Orders kept in memory by a long-lived handler
+ORDER_HISTORY_LIMIT = 1000
+
 class OrderHandler:
     """
     Charles Schwab order handler for managing different types of trading orders.
@@ -31,34 +37,112 @@ class OrderHandler:
     def __init__(self):
         """
         Initialize the order handler with Schwab API integration.
+
+        Prefer get_order_handler(): one long-lived handler per process shares the
+        account lookup, token state and pooled HTTP connections across callers.
         """
-        self.order_history = []
-        
+        self.order_history = deque(maxlen=ORDER_HISTORY_LIMIT)
+
+        # Setup logging
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+        # Pooled session and rate limit shared with the rest of the process
+        self.session = connection_manager.get_http_session()
+        self.rate_limiter = connection_manager.get_rate_limiter()
+
         # Get valid tokens and account info using connection manager
-        self.tokens = connection_manager.ensure_valid_tokens()
-        if not self.tokens:
-            raise ValueError("Failed to get valid Schwab API tokens")
-        
+        self.tokens = None
+        self.tokens_expire_at = None
+        self._token_lock = threading.Lock()
+        with self._token_lock:
+            self._load_tokens()
+
         self.account_numbers = connection_manager.get_account_numbers(self.tokens['access_token'])
         if not self.account_numbers or len(self.account_numbers) == 0:
             raise ValueError("No account numbers found")
-        
+
         # Use the first account
         self.account_number = self.account_numbers[0]['hashValue']
-        
-        # Setup logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
-        
+
         self.logger.info(f"OrderHandler initialized with account: {self.account_number}")
 
+    def _load_tokens(self):
+        """Load tokens via the connection manager, which refreshes them if they are about to expire."""
+        tokens = connection_manager.ensure_valid_tokens()
+        if not tokens:
+            raise ValueError("Failed to get valid Schwab API tokens")
+        self._set_tokens(tokens)
+
+    def _set_tokens(self, tokens: Dict[str, Any]):
+        self.tokens = tokens
+        try:
+            self.tokens_expire_at = datetime.fromisoformat(tokens.get('expires_at'))
+        except (TypeError, ValueError):
+            self.tokens_expire_at = None  # Unknown expiry: reload on next use
+
+    def _get_access_token(self, rejected_token: str = None) -> str:
+        """
+        Get a valid access token, going back to the token store only when needed.
+
+        Parameters:
+            rejected_token: Token the API just answered 401 for; forces a refresh
+                unless another thread already replaced it
+
+        Returns:
+            Access token
+        """
+        with self._token_lock:
+            if rejected_token is not None:
+                if self.tokens['access_token'] == rejected_token:
+                    # Another process may already have stored refreshed tokens
+                    self._load_tokens()
+                if self.tokens['access_token'] == rejected_token:
+                    self.logger.warning("🔑 Access token rejected, refreshing tokens")
+                    new_tokens = connection_manager.refresh_tokens(self.tokens.get('refresh_token'))
+                    if not new_tokens:
+                        raise ValueError("Failed to refresh Schwab API tokens")
+                    self._set_tokens(new_tokens)
+            elif self.tokens_expire_at is None or datetime.now() >= self.tokens_expire_at - TOKEN_REFRESH_BUFFER:
+                self._load_tokens()
+            return self.tokens['access_token']
+
     def _get_auth_headers(self):
         """Get authorization headers for API requests."""
         return {
-            "Authorization": f"Bearer {self.tokens['access_token']}",
+            "Authorization": f"Bearer {self._get_access_token()}",
             "Accept": "application/json"
         }
 
+    def _request(self, method: str, url: str, **kwargs):
+        """
+        Make an authenticated Schwab API request on the pooled session.
+
+        Waits for the shared rate limiter, and retries once with refreshed
+        tokens if the access token is rejected (401).
+
+        Parameters:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to requests (json, params, headers, timeout)
+
+        Returns:
+            requests.Response
+        """
+        headers = {"Accept": "application/json", **kwargs.pop('headers', {})}
+        kwargs.setdefault('timeout', connection_manager.REQUEST_TIMEOUT)
+        access_token = self._get_access_token()
+
+        headers["Authorization"] = f"Bearer {access_token}"
+        self.rate_limiter.acquire()
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        if response.status_code != 401:
+            return response
+
+        headers["Authorization"] = f"Bearer {self._get_access_token(rejected_token=access_token)}"
+        self.rate_limiter.acquire()
+        return self.session.request(method, url, headers=headers, **kwargs)
+
     def get_account(self) -> Dict[str, Any]:
         """
         Get account information and balances
@@ -66,15 +150,11 @@ class OrderHandler:
         Returns:
             Dict containing account information
         """
-        tokens = connection_manager.ensure_valid_tokens()
-        access_token = tokens["access_token"]
-        
         if not self.account_number:
             # Get accounts linked to the user
             accounts_url = "https://api.schwabapi.com/trader/v1/accounts"
-            headers = self._get_auth_headers()
             
-            response = requests.get(accounts_url, headers=headers)
+            response = self._request('GET', accounts_url)
             
             if response.status_code == 200:
                 accounts = response.json()
@@ -90,10 +170,8 @@ class OrderHandler:
         
         # Get account details
         account_url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}"
-        headers = self._get_auth_headers()
         
-        response = requests.get(account_url, headers=headers, 
-                              params={"fields": "positions"})
+        response = self._request('GET', account_url, params={"fields": "positions"})
         
         if response.status_code == 200:
             return response.json()
@@ -160,13 +238,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -281,13 +353,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -438,13 +504,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -552,13 +612,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -668,13 +722,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -732,7 +780,7 @@ class OrderHandler:
         if not self.order_history:
             return pd.DataFrame()
         
-        return pd.DataFrame(self.order_history)
+        return pd.DataFrame(list(self.order_history))
     
     def get_order_status(self, order_id: str) -> Dict[str, Any]:
         """
@@ -748,10 +796,9 @@ class OrderHandler:
             return {"error": "No account number available"}
         
         url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders/{order_id}"
-        headers = self._get_auth_headers()
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request('GET', url)
             
             if response.status_code == 200:
                 return response.json()
@@ -786,7 +833,6 @@ class OrderHandler:
             return {"error": "No account number available"}
         
         url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-        headers = self._get_auth_headers()
         
         params = {"maxResults": max_results}
         if from_entered_time:
@@ -797,7 +843,7 @@ class OrderHandler:
             params["status"] = status
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request('GET', url, params=params)
             
             if response.status_code == 200:
                 return response.json()
@@ -824,10 +870,9 @@ class OrderHandler:
             return {"error": "No account number available"}
         
         url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders/{order_id}"
-        headers = self._get_auth_headers()
         
         try:
-            response = requests.delete(url, headers=headers)
+            response = self._request('DELETE', url)
             
             if response.status_code == 200:
                 return {"status": "SUCCESS", "message": "Order cancelled successfully"}
@@ -855,14 +900,8 @@ class OrderHandler:
             return {"error": "No account number available"}
         
         url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders/{order_id}"
-        headers = {
-            "Authorization": f"Bearer {self.tokens['access_token']}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
         try:
-            response = requests.put(url, json=new_order_payload, headers=headers)
+            response = self._request('PUT', url, json=new_order_payload)
             
             if response.status_code in [200, 201]:
                 return {"status": "SUCCESS", "message": "Order replaced successfully"}
@@ -937,13 +976,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -1059,13 +1092,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -1194,13 +1221,7 @@ class OrderHandler:
         try:
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_data, headers=headers)
+            response = self._request('POST', url, json=order_data)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -1384,13 +1405,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -1612,13 +1627,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -1816,13 +1825,7 @@ class OrderHandler:
             
             # Make API request to Schwab
             url = f"https://api.schwabapi.com/trader/v1/accounts/{self.account_number}/orders"
-            headers = {
-                "Authorization": f"Bearer {self.tokens['access_token']}",
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            response = requests.post(url, json=order_payload, headers=headers)
+            response = self._request('POST', url, json=order_payload)
             
             if response.status_code in [200, 201]:
                 order_id = response.headers.get('Location', '').split('/')[-1]
@@ -1912,6 +1915,20 @@ class OrderHandler:
         return self.place_stock_ota_market_with_profit_target("SELL_SHORT", symbol, shares, profit_target, timestamp)
 
 
+_order_handler = None
+_order_handler_lock = threading.Lock()
+
+
+def get_order_handler() -> OrderHandler:
+    """Get the process-wide order handler (account lookup done once, tokens refreshed as needed)."""
+    global _order_handler
+    if _order_handler is None:
+        with _order_handler_lock:
+            if _order_handler is None:
+                _order_handler = OrderHandler()
+    return _order_handler
+
+
 def main():
     """Command-line interface for OrderHandler."""
     import argparse
@@ -1,9 +1,12 @@
 import os
-import json
+import time
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from config_loader import get_config
+from atomic_json import write_json_atomic
+from artifact_store import load_artifact, save_artifact
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
@@ -30,12 +33,14 @@ class PnLDataHandler:
         self.breakeven_trades = []
         
 
-    def calculate_win_loss_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def calculate_win_loss_stats(self, df: pd.DataFrame, batch: bool = True) -> Dict[str, Any]:
         """
         Calculate comprehensive win/loss statistics for trades and automatically update pnl_statistics.json.
         
         Args:
             df (pd.DataFrame): DataFrame containing transaction data
+            batch (bool): Use the vectorized all-symbols matcher (default: True).
+                False falls back to the per-symbol iterrows path.
             
         Returns:
             Dict[str, Any]: Comprehensive statistics including overall, long, and short performance
@@ -74,16 +79,21 @@ class PnLDataHandler:
         short_win_amounts = []
         short_loss_amounts = []
         
-        for symbol in symbols:
-            # Filter for this symbol
-            symbol_trades = trade_df[trade_df['symbol'] == symbol].sort_values('date')
-            
-            # Skip symbols with less than 2 trades (need at least a buy and sell)
-            if len(symbol_trades) < 2:
-                continue
+        if batch:
+            symbol_results = self._analyze_symbols_batch(trade_df)
+        else:
+            symbol_results = {}
+            for symbol in symbols:
+                # Filter for this symbol
+                symbol_trades = trade_df[trade_df['symbol'] == symbol].sort_values('date')
                 
-            symbol_result = self._analyze_symbol_trades(symbol, symbol_trades)
-            
+                # Skip symbols with less than 2 trades (need at least a buy and sell)
+                if len(symbol_trades) < 2:
+                    continue
+                    
+                symbol_results[symbol] = self._analyze_symbol_trades(symbol, symbol_trades)
+        
+        for symbol, symbol_result in symbol_results.items():
             if symbol_result:
                 # Update overall stats
                 stats['overall']['wins'] += symbol_result['total']['wins']
@@ -210,8 +220,7 @@ class PnLDataHandler:
             }
             
             # Write to pnl_statistics.json in root directory
-            with open('pnl_statistics.json', 'w') as f:
-                json.dump(pnl_data, f, indent=2)
+            save_artifact('pnl_statistics.json', pnl_data)
             
             return True
             
@@ -363,6 +372,242 @@ class PnLDataHandler:
         
         return result if result['total']['wins'] + result['total']['losses'] > 0 else None
 
+    def _match_average_cost_batch(self, symbol_codes: np.ndarray, quantities: np.ndarray,
+                                  amounts: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run long/short average-cost matching for every symbol at once.
+
+        Rows must be sorted by symbol and then chronologically. Net position is a
+        per-symbol cumulative sum of signed quantities, and the open cost basis
+        follows the affine recurrence cost[t] = keep[t] * cost[t-1] + opened[t] * price[t],
+        where keep is the fraction of the prior position left after a close (0 when
+        the position goes flat or flips). Each run between resets is solved with a
+        segmented cumprod/cumsum, so no Python loop touches individual fills.
+
+        Args:
+            symbol_codes (np.ndarray): Integer symbol code per row
+            quantities (np.ndarray): Signed share quantity per row (+buy, -sell)
+            amounts (np.ndarray): Transaction net amount per row
+
+        Returns:
+            Dict[str, np.ndarray]: Per-row closing shares, prior position, entry basis,
+                fill price and realized P&L
+        """
+        n = len(quantities)
+        shares = np.abs(quantities)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price = np.abs(amounts) / shares
+
+        # Net position after each fill, accumulated independently per symbol
+        group_start = np.ones(n, dtype=bool)
+        group_start[1:] = symbol_codes[1:] != symbol_codes[:-1]
+        position_after = pd.Series(quantities).groupby(symbol_codes).cumsum().to_numpy(copy=True)
+        position_after[np.abs(position_after) < 1e-9] = 0.0
+        position_before = np.empty(n)
+        position_before[0] = 0.0
+        position_before[1:] = position_after[:-1]
+        position_before[group_start] = 0.0
+        prior_shares = np.abs(position_before)
+
+        # Split each fill into the part closing the prior position and the part opening a new one
+        is_closing = np.sign(quantities) == -np.sign(position_before)
+        closing = np.where(is_closing, np.minimum(shares, prior_shares), 0.0)
+        opening = shares - closing
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep = np.where(prior_shares > 0, (prior_shares - closing) / prior_shares, 0.0)
+        keep[group_start] = 0.0
+
+        # Segmented solve of the cost recurrence; every keep == 0 starts a fresh run.
+        # Runs with many partial closes are cut into blocks spanning at most e^-600 of
+        # cumulative shrinkage so the running product never underflows.
+        run_start = keep == 0
+        segment = np.cumsum(run_start)
+        log_growth = pd.Series(np.log(np.where(run_start, 1.0, keep))).groupby(segment).cumsum().to_numpy()
+        band = np.floor(-log_growth / 600.0)
+        block_start = run_start.copy()
+        block_start[1:] |= band[1:] != band[:-1]
+        block = np.cumsum(block_start)
+
+        base = np.zeros(n)
+        carried_starts = np.flatnonzero(block_start & ~run_start)
+        base[carried_starts] = log_growth[carried_starts - 1]
+        base = pd.Series(base).groupby(block).transform('first').to_numpy()
+        growth = np.exp(log_growth - base)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            opened_cost = np.where(closing > 0, opening * price, np.abs(amounts))
+            scaled = pd.Series(opened_cost / growth).groupby(block).cumsum().to_numpy()
+        open_cost = growth * scaled
+
+        # Carry the open cost into blocks that continue a run (rare; only extreme runs)
+        if len(carried_starts):
+            block_ends = np.append(np.flatnonzero(block_start)[1:] - 1, n - 1)
+            for start in carried_starts.tolist():
+                end = block_ends[block[start] - 1]
+                open_cost[start:end + 1] += open_cost[start - 1] * growth[start:end + 1]
+
+        cost_before = np.empty(n)
+        cost_before[0] = 0.0
+        cost_before[1:] = open_cost[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entry_basis = np.where(prior_shares > 0, cost_before / prior_shares, 0.0)
+
+        realized = np.where(position_before > 0, price * closing - entry_basis * closing,
+                            entry_basis * closing - price * closing)
+
+        return {
+            'closing': closing,
+            'position_before': position_before,
+            'entry_basis': entry_basis,
+            'price': price,
+            'realized': realized
+        }
+
+    def _analyze_symbols_batch(self, trade_df: pd.DataFrame) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Analyze trades for all symbols in one vectorized pass.
+
+        Produces the same per-symbol structure as _analyze_symbol_trades, keyed by
+        symbol in order of first appearance, for full recomputes over large histories.
+
+        Args:
+            trade_df (pd.DataFrame): Trades with symbol, quantity, amount and date columns
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: Analysis results per symbol
+        """
+        fills = trade_df[trade_df['symbol'].notna() & (trade_df['quantity'] != 0) & trade_df['quantity'].notna()]
+        if fills.empty:
+            return {}
+
+        symbol_codes, symbol_names = pd.factorize(fills['symbol'])
+        by_date = fills['date'].argsort(kind='stable').to_numpy()
+        order = by_date[np.argsort(symbol_codes[by_date], kind='stable')]
+
+        symbol_codes = symbol_codes[order]
+        quantities = fills['quantity'].to_numpy(dtype=float)[order]
+        amounts = fills['amount'].to_numpy(dtype=float)[order]
+        dates = fills['date'].iloc[order]
+
+        matched = self._match_average_cost_batch(symbol_codes, quantities, amounts)
+
+        close_idx = np.flatnonzero(matched['closing'] > 0)
+        if len(close_idx) == 0:
+            return {}
+
+        close_codes = symbol_codes[close_idx]
+        close_shares = matched['closing'][close_idx]
+        close_entry = matched['entry_basis'][close_idx]
+        close_exit = matched['price'][close_idx]
+        close_pl = matched['realized'][close_idx]
+        close_is_long = matched['position_before'][close_idx] > 0
+        close_dates = list(dates.iloc[close_idx])
+
+        breakeven = np.abs(close_pl) < 0.01
+        winning = ~breakeven & (close_pl > 0)
+        losing = ~breakeven & ~winning
+
+        results = {}
+        codes_present, starts = np.unique(close_codes, return_index=True)
+        ends = np.append(starts[1:], len(close_codes))
+
+        for code, start, end in zip(codes_present.tolist(), starts.tolist(), ends.tolist()):
+            symbol = symbol_names[code]
+            window = slice(start, end)
+            pl = close_pl[window]
+            is_long = close_is_long[window]
+            wins = winning[window]
+            losses = losing[window]
+
+            result = {
+                'symbol': symbol,
+                'total': {'wins': int(wins.sum()), 'losses': int(losses.sum()), 'profit_loss': float(pl.sum())},
+                'long': {'wins': int((wins & is_long).sum()), 'losses': int((losses & is_long).sum()),
+                         'profit_loss': float(pl[is_long].sum())},
+                'short': {'wins': int((wins & ~is_long).sum()), 'losses': int((losses & ~is_long).sum()),
+                          'profit_loss': float(pl[~is_long].sum())},
+                'win_amounts': pl[wins].tolist(),
+                'loss_amounts': pl[losses].tolist(),
+                'long_win_amounts': pl[wins & is_long].tolist(),
+                'long_loss_amounts': pl[losses & is_long].tolist(),
+                'short_win_amounts': pl[wins & ~is_long].tolist(),
+                'short_loss_amounts': pl[losses & ~is_long].tolist(),
+                'winning_trades': [],
+                'losing_trades': [],
+                'breakeven_trades': []
+            }
+
+            if result['total']['wins'] + result['total']['losses'] == 0:
+                results[symbol] = None
+                continue
+
+            buckets = np.where(breakeven[window], 0, np.where(wins, 1, 2)).tolist()
+            targets = (result['breakeven_trades'], result['winning_trades'], result['losing_trades'])
+            for bucket, side, shares, entry, exit_price, trade_pl, exit_date in zip(
+                    buckets, is_long.tolist(), close_shares[window].tolist(), close_entry[window].tolist(),
+                    close_exit[window].tolist(), pl.tolist(), close_dates[start:end]):
+                targets[bucket].append(self._create_trade_record(
+                    symbol, 'long' if side else 'short', shares, entry, exit_price, trade_pl, exit_date
+                ))
+
+            results[symbol] = result
+
+        return results
+
+    def benchmark_batch_pnl(self, sizes: Tuple[int, ...] = (10_000, 100_000, 1_000_000),
+                            symbol_count: int = 500, legacy_max_rows: int = 10_000) -> List[Dict[str, Any]]:
+        """
+        Benchmark the vectorized matcher on synthetic transaction histories.
+
+        Args:
+            sizes (Tuple[int, ...]): Transaction counts to benchmark
+            symbol_count (int): Number of distinct synthetic symbols
+            legacy_max_rows (int): Also time the iterrows path up to this many rows
+
+        Returns:
+            List[Dict[str, Any]]: Timing results per size
+        """
+        rng = np.random.default_rng(42)
+        results = []
+
+        print(f"{'rows':>10} {'batch_s':>10} {'batch_rows/s':>14} {'legacy_s':>10} {'legacy_rows/s':>14}")
+        for size in sizes:
+            quantities = rng.integers(1, 100, size) * rng.choice([-1, 1], size)
+            prices = rng.uniform(5, 500, size).round(2)
+            trade_df = pd.DataFrame({
+                'symbol': np.array([f"SYM{i:04d}" for i in range(symbol_count)])[rng.integers(0, symbol_count, size)],
+                'quantity': quantities.astype(float),
+                'amount': -quantities * prices,
+                'date': pd.Timestamp('2020-01-01', tz='UTC') + pd.to_timedelta(np.arange(size), unit='s')
+            })
+            trade_df['trade_type'] = np.where(trade_df['quantity'] > 0, 'Buy', 'Sell')
+
+            start = time.perf_counter()
+            self._analyze_symbols_batch(trade_df)
+            batch_seconds = time.perf_counter() - start
+
+            legacy_seconds = None
+            if size <= legacy_max_rows:
+                start = time.perf_counter()
+                for symbol in trade_df['symbol'].unique():
+                    self._analyze_symbol_trades(symbol, trade_df[trade_df['symbol'] == symbol].sort_values('date'))
+                legacy_seconds = time.perf_counter() - start
+
+            result = {
+                'rows': size,
+                'batch_seconds': batch_seconds,
+                'batch_rows_per_second': size / batch_seconds,
+                'legacy_seconds': legacy_seconds,
+                'legacy_rows_per_second': size / legacy_seconds if legacy_seconds else None
+            }
+            results.append(result)
+
+            legacy_text = f"{legacy_seconds:>10.3f} {size / legacy_seconds:>14,.0f}" if legacy_seconds else f"{'-':>10} {'-':>14}"
+            print(f"{size:>10,} {batch_seconds:>10.3f} {size / batch_seconds:>14,.0f} {legacy_text}")
+
+        return results
+
     def _create_trade_record(self, symbol: str, trade_type: str, shares: float, 
                            entry_price: float, exit_price: float, pl: float, 
                            exit_date: datetime) -> Dict[str, Any]:
@@ -556,8 +801,7 @@ class PnLDataHandler:
         full_path = os.path.join(transaction_dir, filename)
         
         # Write to file
-        with open(full_path, 'w') as f:
-            json.dump(output, f, indent=2)
+        write_json_atomic(full_path, output)
         
         print(f"Saved P&L analysis to {full_path}")
         return output
@@ -830,8 +1074,7 @@ class PnLDataHandler:
             }
             
             # Write to pnl_statistics.json in root directory
-            with open('pnl_statistics.json', 'w') as f:
-                json.dump(pnl_data, f, indent=2)
+            save_artifact('pnl_statistics.json', pnl_data)
             
             print(f"✅ Created pnl_statistics.json for database insertion")
             print(f"📊 Statistics: {pnl_data['statistics']['overall_performance']['total_trades']} trades, "
@@ -860,8 +1103,7 @@ class PnLDataHandler:
                 print(f"❌ Transaction file {filename} not found")
                 return pd.DataFrame()
             
-            with open(filename, 'r') as f:
-                data = json.load(f)
+            data = load_artifact(filename)
             
             transactions = data.get('transactions', [])
             if not transactions:
@@ -947,4 +1189,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        PnLDataHandler().benchmark_batch_pnl()
+    else:
+        main()
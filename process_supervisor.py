@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Process Supervisor
+
+Owns the long-running child processes (realtime monitor, strategy scripts)
+started by the WebSocket server and the realtime monitor. Every started
+process is recorded in a registry (PID + kernel start time), so status
+checks are O(1) lookups instead of scans over every process on the host:
+
+- Children started by this supervisor are polled with waitpid (Popen.poll)
+- Processes adopted from the registry file after a restart are watched
+  through a pidfd where available, else by PID + start time
+
+Restart policies ('never', 'on-failure', 'always') with a restart limit and
+cooldown are applied by check().
+"""
+
+import json
+import logging
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import psutil
+
+from atomic_json import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+RESTART_NEVER = 'never'
+RESTART_ON_FAILURE = 'on-failure'
+RESTART_ALWAYS = 'always'
+
+
+def _process_start_time(pid: int) -> Optional[float]:
+    """Kernel start time of a PID (distinguishes a reused PID), or None if it is gone."""
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+class ManagedProcess:
+    """A supervised process and its restart policy"""
+
+    def __init__(self, name: str, command: List[str], restart_policy: str = RESTART_NEVER,
+                 max_restarts: int = 3, restart_cooldown: float = 30, new_session: bool = False):
+        self.name = name
+        self.command = command
+        self.restart_policy = restart_policy
+        self.max_restarts = max_restarts
+        self.restart_cooldown = restart_cooldown
+        self.new_session = new_session
+
+        self.pid: Optional[int] = None
+        self.start_time: Optional[float] = None
+        self.started_at: Optional[str] = None
+        self.popen: Optional[subprocess.Popen] = None
+        self.pidfd: Optional[int] = None
+        self.exit_code: Optional[int] = None
+        self.restart_count = 0
+        self.last_restart = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Registry record."""
+        return {
+            'command': self.command,
+            'pid': self.pid,
+            'start_time': self.start_time,
+            'started_at': self.started_at,
+            'restart_policy': self.restart_policy,
+            'max_restarts': self.max_restarts,
+            'restart_cooldown': self.restart_cooldown,
+            'new_session': self.new_session,
+            'restart_count': self.restart_count
+        }
+
+
+class ProcessSupervisor:
+    """Starts, stops and watches named child processes"""
+
+    def __init__(self, registry_file: str = 'process_registry.json', log_dir: str = 'process_logs'):
+        """
+        Initialize the supervisor and adopt live processes from the registry.
+
+        Args:
+            registry_file: JSON file recording PID and start time per process name
+            log_dir: Directory receiving each process's stdout/stderr
+        """
+        self.registry_file = registry_file
+        self.log_dir = log_dir
+        self.processes: Dict[str, ManagedProcess] = {}
+        self._lock = threading.RLock()
+
+        self._load_registry()
+
+    def start(self, name: str, command: List[str], restart_policy: str = RESTART_NEVER,
+              max_restarts: int = 3, restart_cooldown: float = 30,
+              new_session: bool = False) -> ManagedProcess:
+        """
+        Start a named process unless it is already running.
+
+        Args:
+            name: Registry name (one live process per name)
+            command: Command line
+            restart_policy: RESTART_NEVER, RESTART_ON_FAILURE or RESTART_ALWAYS
+            max_restarts: Restarts allowed by check() before giving up
+            restart_cooldown: Minimum seconds between restarts
+            new_session: Start in its own process group (stop() signals the group)
+
+        Returns:
+            The managed process (already running, or just started)
+        """
+        with self._lock:
+            managed = self.processes.get(name)
+            if managed and self._is_alive(managed):
+                return managed
+
+            managed = ManagedProcess(name, command, restart_policy, max_restarts,
+                                     restart_cooldown, new_session)
+            self._spawn(managed)
+            self.processes[name] = managed
+            self._save_registry()
+            return managed
+
+    def is_running(self, name: str) -> bool:
+        """Whether the named process is alive (no process table scan)."""
+        with self._lock:
+            managed = self.processes.get(name)
+            return bool(managed and self._is_alive(managed))
+
+    def get(self, name: str) -> Optional[ManagedProcess]:
+        """Managed process by name."""
+        return self.processes.get(name)
+
+    def stop(self, name: str, timeout: float = 10, kill_timeout: float = 5) -> bool:
+        """
+        Terminate a named process (SIGTERM, then SIGKILL after timeout).
+
+        Args:
+            name: Registry name
+            timeout: Seconds to wait after SIGTERM
+            kill_timeout: Seconds to wait after SIGKILL
+
+        Returns:
+            True if a running process was stopped
+        """
+        with self._lock:
+            managed = self.processes.pop(name, None)
+            self._save_registry()
+
+        if not managed or not self._is_alive(managed):
+            if managed:
+                self._close_pidfd(managed)
+            return False
+
+        logger.info(f"🛑 Stopping {name} (PID {managed.pid})")
+        self._signal(managed, signal.SIGTERM)
+        if not self._wait(managed, timeout):
+            logger.warning(f"⚠️ {name} did not terminate gracefully, killing...")
+            self._signal(managed, signal.SIGKILL)
+            self._wait(managed, kill_timeout)
+
+        self._close_pidfd(managed)
+        logger.info(f"✅ {name} stopped")
+        return True
+
+    def check(self) -> List[Dict[str, Any]]:
+        """
+        Reap exited processes and apply their restart policies.
+
+        Returns:
+            One event per exited process: name, pid, exit_code and whether it was restarted
+        """
+        events = []
+        with self._lock:
+            for name, managed in list(self.processes.items()):
+                if self._is_alive(managed):
+                    continue
+
+                event = {'name': name, 'pid': managed.pid, 'exit_code': managed.exit_code, 'restarted': False}
+                self._close_pidfd(managed)
+
+                decision = self._restart_decision(managed)
+                if decision == 'wait':
+                    # Cooldown still running; keep the record so a later check restarts it
+                    continue
+
+                if decision == 'restart':
+                    logger.warning(f"💥 {name} exited (PID {managed.pid}, code {managed.exit_code}) - restarting "
+                                   f"({managed.restart_count + 1}/{managed.max_restarts})")
+                    managed.restart_count += 1
+                    managed.last_restart = time.time()
+                    try:
+                        self._spawn(managed)
+                        event['restarted'] = True
+                    except Exception as e:
+                        logger.error(f"❌ Error restarting {name}: {e}")
+                        del self.processes[name]
+                else:
+                    logger.info(f"ℹ️ {name} exited (PID {managed.pid}, code {managed.exit_code})")
+                    del self.processes[name]
+
+                events.append(event)
+
+            if events:
+                self._save_registry()
+        return events
+
+    def status(self, name: str) -> Dict[str, Any]:
+        """Status of a named process without touching other processes."""
+        with self._lock:
+            managed = self.processes.get(name)
+            if not managed:
+                return {'name': name, 'is_running': False, 'pid': None}
+            running = self._is_alive(managed)
+            return {
+                'name': name,
+                'is_running': running,
+                'pid': managed.pid if running else None,
+                'start_time': managed.start_time,
+                'started_at': managed.started_at,
+                'exit_code': managed.exit_code,
+                'restart_count': managed.restart_count
+            }
+
+    def tail_log(self, name: str, lines: int = 20) -> str:
+        """Last lines of a process's output log (used to report failed starts)."""
+        try:
+            with open(self._log_path(name), 'r', errors='replace') as f:
+                return ''.join(deque(f, maxlen=lines)).strip()
+        except OSError:
+            return ''
+
+    def _spawn(self, managed: ManagedProcess):
+        """Start the process and record its PID and start time."""
+        os.makedirs(self.log_dir, exist_ok=True)
+        with open(self._log_path(managed.name), 'ab') as log_file:
+            managed.popen = subprocess.Popen(
+                managed.command,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                cwd=os.getcwd(),
+                start_new_session=managed.new_session
+            )
+        managed.pid = managed.popen.pid
+        managed.start_time = _process_start_time(managed.pid)
+        managed.started_at = datetime.now().isoformat()
+        managed.exit_code = None
+        managed.pidfd = None
+        logger.info(f"🚀 Started {managed.name} with PID {managed.pid}")
+
+    def _restart_decision(self, managed: ManagedProcess) -> str:
+        """'restart', 'wait' (cooldown) or 'stop' for an exited process."""
+        if managed.restart_policy == RESTART_NEVER:
+            return 'stop'
+        if managed.restart_policy == RESTART_ON_FAILURE and managed.exit_code == 0:
+            return 'stop'
+        if managed.restart_count >= managed.max_restarts:
+            logger.error(f"❌ {managed.name} reached max restarts ({managed.max_restarts})")
+            return 'stop'
+        if time.time() - managed.last_restart < managed.restart_cooldown:
+            return 'wait'
+        return 'restart'
+
+    def _is_alive(self, managed: ManagedProcess) -> bool:
+        """O(1) liveness: waitpid for children, pidfd or PID + start time for adopted processes."""
+        if managed.exit_code is not None:
+            return False
+
+        if managed.popen is not None:
+            managed.exit_code = managed.popen.poll()
+            return managed.exit_code is None
+
+        if managed.pidfd is not None:
+            poller = select.poll()
+            poller.register(managed.pidfd, select.POLLIN)
+            if poller.poll(0):
+                managed.exit_code = -1  # Not our child; the real exit status is unavailable
+                return False
+            return True
+
+        if _process_start_time(managed.pid) != managed.start_time:
+            managed.exit_code = -1
+            return False
+        return True
+
+    def _wait(self, managed: ManagedProcess, timeout: float) -> bool:
+        """Wait for the process to exit."""
+        if managed.popen is not None:
+            try:
+                managed.exit_code = managed.popen.wait(timeout=timeout)
+                return True
+            except subprocess.TimeoutExpired:
+                return False
+
+        if managed.pidfd is not None:
+            poller = select.poll()
+            poller.register(managed.pidfd, select.POLLIN)
+            if poller.poll(timeout * 1000):
+                managed.exit_code = -1
+                return True
+            return False
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self._is_alive(managed):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _signal(self, managed: ManagedProcess, sig: int):
+        """Signal the process, or its whole group when it has its own session."""
+        try:
+            if managed.pidfd is not None and hasattr(signal, 'pidfd_send_signal') and not managed.new_session:
+                signal.pidfd_send_signal(managed.pidfd, sig)
+            elif managed.new_session:
+                os.killpg(managed.pid, sig)
+            else:
+                os.kill(managed.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _close_pidfd(self, managed: ManagedProcess):
+        if managed.pidfd is not None:
+            os.close(managed.pidfd)
+            managed.pidfd = None
+
+    def _log_path(self, name: str) -> str:
+        return os.path.join(self.log_dir, f"{name}.log")
+
+    def _load_registry(self):
+        """Adopt registry entries whose PID still belongs to the recorded process."""
+        if not os.path.exists(self.registry_file):
+            return
+        try:
+            with open(self.registry_file, 'r') as f:
+                registry = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Could not read process registry {self.registry_file}: {e}")
+            return
+
+        for name, record in registry.items():
+            pid = record.get('pid')
+            if not pid or _process_start_time(pid) != record.get('start_time'):
+                continue
+
+            managed = ManagedProcess(
+                name, record.get('command', []),
+                record.get('restart_policy', RESTART_NEVER),
+                record.get('max_restarts', 3),
+                record.get('restart_cooldown', 30),
+                record.get('new_session', False)
+            )
+            managed.pid = pid
+            managed.start_time = record['start_time']
+            managed.started_at = record.get('started_at')
+            managed.restart_count = record.get('restart_count', 0)
+            if hasattr(os, 'pidfd_open'):
+                try:
+                    managed.pidfd = os.pidfd_open(pid)
+                except OSError:
+                    continue
+            self.processes[name] = managed
+            logger.info(f"🔍 Adopted running {name} process PID {pid}")
+
+        self._save_registry()
+
+    def _save_registry(self):
+        """Persist the registry atomically."""
+        registry = {name: managed.to_dict() for name, managed in self.processes.items()}
+        try:
+            write_json_atomic(self.registry_file, registry)
+        except OSError as e:
+            logger.error(f"❌ Error saving process registry: {e}")
+
+
+# Supervisors shared within a process, keyed by registry file
+_supervisors: Dict[str, ProcessSupervisor] = {}
+_supervisors_lock = threading.Lock()
+
+
+def get_process_supervisor(registry_file: str = 'process_registry.json') -> ProcessSupervisor:
+    """Get the shared supervisor for a registry file."""
+    with _supervisors_lock:
+        if registry_file not in _supervisors:
+            _supervisors[registry_file] = ProcessSupervisor(registry_file)
+        return _supervisors[registry_file]
@@ -18,7 +18,6 @@ import time
 import threading
 import os
 import subprocess
-import psutil
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 import logging
@@ -34,6 +33,7 @@ from connection_manager import get_all_positions, make_authenticated_request, ha
 from db_inserter import DatabaseInserter
 from api_status_exporter import APIStatusExporter
 from symbols_monitor_handler import SymbolsMonitorHandler
+from process_supervisor import get_process_supervisor, RESTART_ON_FAILURE
 
 class RealTimeMonitor:
     """Simplified Real-time Monitor for essential account data only."""    
@@ -101,13 +101,11 @@ class RealTimeMonitor:
         self.db_inserter_running = False
         self.db_inserter_thread = None
         
-        # Exceedance strategy monitoring
-        self.exceedance_process = None
-        self.exceedance_pid = None
-        self.exceedance_restart_attempts = 0
+        # Exceedance strategy monitoring - supervised child restarted on crash (max 3, 30s apart)
+        self.process_supervisor = get_process_supervisor('realtime_monitor_processes.json')
         self.exceedance_max_restart_attempts = 3
-        self.exceedance_last_restart_time = 0
         self.exceedance_restart_cooldown = 30  # seconds
+        self.exceedance_restarts_exhausted = False
         self.exceedance_script = 'exceedence_strategy_signals.py'
         self.trading_config_file = 'trading_config_live.json'
         
@@ -492,6 +490,9 @@ class RealTimeMonitor:
             running_state = pml_config.get('running_state', {})
             is_running_config = running_state.get('is_running', False)
             
+            # Reap a crashed process first; the supervisor restarts it within its restart limits
+            self._check_exceedance_process_health()
+            
             # Get current process status
             process_actually_running = self._is_exceedance_process_running()
             
@@ -499,6 +500,13 @@ class RealTimeMonitor:
             
             # Decision logic
             if is_running_config and not process_actually_running:
+                if self.process_supervisor.get(self.exceedance_script):
+                    self.logger.debug("⏳ Exceedance process crashed - waiting for restart cooldown")
+                    return
+                if self.exceedance_restarts_exhausted:
+                    self.logger.debug("⏸️ Exceedance process keeps crashing - waiting for PML to be toggled off and on")
+                    return
+                
                 # Should be running but isn't - start it
                 self.logger.info("🚀 Config says PML running=true but exceedance process not found - starting exceedance strategy")
                 self._start_exceedance_process()
@@ -509,12 +517,11 @@ class RealTimeMonitor:
                 self._stop_exceedance_process()
                 
             elif is_running_config and process_actually_running:
-                # Should be running and is - check health
                 self.logger.debug("✅ Config and process state match - exceedance strategy running")
-                self._check_exceedance_process_health()
                 
             else:
                 # Should not be running and isn't - all good
+                self.exceedance_restarts_exhausted = False
                 self.logger.debug("✅ Config and process state match - exceedance strategy stopped")
             
         except Exception as e:
@@ -523,37 +530,7 @@ class RealTimeMonitor:
     def _is_exceedance_process_running(self):
         """Check if exceedance strategy process is currently running."""
         try:
-            # First check our tracked PID
-            if self.exceedance_pid and psutil.pid_exists(self.exceedance_pid):
-                try:
-                    proc = psutil.Process(self.exceedance_pid)
-                    cmdline = proc.cmdline()
-                    if any(self.exceedance_script in arg for arg in cmdline):
-                        return True
-                except psutil.NoSuchProcess:
-                    pass
-            
-            # Fallback: search all processes
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    cmdline = proc.info['cmdline']
-                    if cmdline and any(self.exceedance_script in arg for arg in cmdline):
-                        # Update our tracking if we found it
-                        if not self.exceedance_pid:
-                            self.exceedance_pid = proc.info['pid']
-                            self.logger.info(f"🔍 Found existing exceedance process PID: {self.exceedance_pid}")
-                        return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            
-            # Clear tracking if not found
-            if self.exceedance_pid:
-                self.logger.debug("🔍 Exceedance process not found - clearing tracking")
-                self.exceedance_process = None
-                self.exceedance_pid = None
-            
-            return False
-            
+            return self.process_supervisor.is_running(self.exceedance_script)
         except Exception as e:
             self.logger.error(f"❌ Error checking if exceedance process is running: {e}")
             return False
@@ -568,172 +545,56 @@ class RealTimeMonitor:
             
             self.logger.info(f"🚀 Starting exceedance strategy: {self.exceedance_script}")
             
-            # Start the process with --continuous flag for persistent operation
-            self.exceedance_process = subprocess.Popen([
-                'python3', self.exceedance_script, '--continuous'
-            ], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            cwd=os.getcwd()
+            # Daemon mode keeps indicators, signals and execution in one long-lived process
+            exceedance_process = self.process_supervisor.start(
+                self.exceedance_script,
+                ['python3', self.exceedance_script, '--daemon'],
+                restart_policy=RESTART_ON_FAILURE,
+                max_restarts=self.exceedance_max_restart_attempts,
+                restart_cooldown=self.exceedance_restart_cooldown
             )
             
-            self.exceedance_pid = self.exceedance_process.pid
-            
-            self.logger.info(f"✅ Started exceedance strategy process with PID: {self.exceedance_pid}")
+            self.logger.info(f"✅ Started exceedance strategy process with PID: {exceedance_process.pid}")
             
             # Give process time to initialize
             time.sleep(2)
             
             # Check if it's still running
-            if self.exceedance_process.poll() is None:
+            if self._is_exceedance_process_running():
                 self.logger.info("✅ Exceedance strategy process is running successfully")
-                # Reset restart attempts on successful start
-                self.exceedance_restart_attempts = 0
             else:
-                # Process failed to start - get error details
-                return_code = self.exceedance_process.returncode
-                stderr_output = ""
-                stdout_output = ""
-                
-                try:
-                    stdout_output, stderr_output = self.exceedance_process.communicate(timeout=5)
-                    if isinstance(stdout_output, bytes):
-                        stdout_output = stdout_output.decode('utf-8')
-                    if isinstance(stderr_output, bytes):
-                        stderr_output = stderr_output.decode('utf-8')
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Could not get process output: {e}")
-                
+                return_code = self.process_supervisor.status(self.exceedance_script).get('exit_code')
                 self.logger.error(f"❌ Exceedance strategy process failed to start (return code: {return_code})")
-                if stderr_output:
-                    self.logger.error(f"❌ Process stderr: {stderr_output.strip()}")
-                if stdout_output:
-                    self.logger.info(f"ℹ️ Process stdout: {stdout_output.strip()}")
-                
-                self.exceedance_process = None
-                self.exceedance_pid = None
+                output = self.process_supervisor.tail_log(self.exceedance_script)
+                if output:
+                    self.logger.error(f"❌ Process output: {output}")
+                self.process_supervisor.stop(self.exceedance_script)
             
         except Exception as e:
             self.logger.error(f"❌ Error starting exceedance process: {e}")
-            self.exceedance_process = None
-            self.exceedance_pid = None
 
     def _stop_exceedance_process(self):
         """Stop the exceedance strategy process."""
         try:
-            if not self.exceedance_pid:
+            if not self.process_supervisor.stop(self.exceedance_script):
                 self.logger.info("ℹ️ No exceedance process to stop")
-                return
-            
-            self.logger.info(f"🛑 Stopping exceedance strategy process PID: {self.exceedance_pid}")
-            
-            # Try to terminate gracefully first
-            if psutil.pid_exists(self.exceedance_pid):
-                try:
-                    proc = psutil.Process(self.exceedance_pid)
-                    proc.terminate()
-                    
-                    # Wait for graceful termination
-                    try:
-                        proc.wait(timeout=10)
-                        self.logger.info("✅ Exceedance process terminated gracefully")
-                    except psutil.TimeoutExpired:
-                        self.logger.warning("⚠️ Process didn't terminate gracefully, killing...")
-                        proc.kill()
-                        proc.wait(timeout=5)
-                        self.logger.info("✅ Exceedance process killed")
-                        
-                except psutil.NoSuchProcess:
-                    self.logger.info("ℹ️ Process already terminated")
-            
-            # Clear tracking
-            self.exceedance_process = None
-            self.exceedance_pid = None
             
         except Exception as e:
             self.logger.error(f"❌ Error stopping exceedance process: {e}")
-            # Clear tracking anyway
-            self.exceedance_process = None
-            self.exceedance_pid = None
 
     def _check_exceedance_process_health(self):
-        """Check if the exceedance process is still healthy and restart if crashed."""
+        """Reap a crashed exceedance process; the supervisor restarts it within its restart limits."""
         try:
-            if not self.exceedance_pid:
-                return
-            
-            # Check if process still exists
-            if not psutil.pid_exists(self.exceedance_pid):
-                self.logger.warning(f"⚠️ Exceedance process PID {self.exceedance_pid} no longer exists")
-                self._handle_exceedance_process_crash()
-                return
-            
-            # Check if it's still our process
-            try:
-                proc = psutil.Process(self.exceedance_pid)
-                cmdline = proc.cmdline()
-                
-                if not any(self.exceedance_script in arg for arg in cmdline):
-                    self.logger.warning(f"⚠️ PID {self.exceedance_pid} is not our exceedance process anymore")
-                    self._handle_exceedance_process_crash()
-                    return
-                
-                # Process is healthy
-                self.logger.debug(f"✅ Exceedance process PID {self.exceedance_pid} is healthy")
-                
-            except psutil.NoSuchProcess:
-                self.logger.warning(f"⚠️ Exceedance process PID {self.exceedance_pid} disappeared")
-                self._handle_exceedance_process_crash()
+            for event in self.process_supervisor.check():
+                if event['restarted']:
+                    self.logger.info(f"🔄 Restarted {event['name']} after crash (exit code {event['exit_code']})")
+                else:
+                    self.logger.error(f"💥 {event['name']} exited (PID {event['pid']}, exit code {event['exit_code']}) - not restarting")
+                    self.exceedance_restarts_exhausted = event['exit_code'] != 0
                 
         except Exception as e:
             self.logger.error(f"❌ Error checking exceedance process health: {e}")
 
-    def _handle_exceedance_process_crash(self):
-        """Handle exceedance process crash and attempt restart if appropriate."""
-        self.logger.error(f"💥 Exceedance process crashed or disappeared (PID: {self.exceedance_pid})")
-        
-        # Clear process tracking
-        self.exceedance_process = None
-        self.exceedance_pid = None
-        
-        # Check if we should restart based on config
-        try:
-            if not os.path.exists(self.trading_config_file):
-                self.logger.warning("⚠️ Config file not found - cannot determine restart policy")
-                return
-            
-            with open(self.trading_config_file, 'r') as f:
-                config = json.load(f)
-            
-            # Check if config still says it should be running
-            pml_config = config.get('strategies', {}).get('pml', {})
-            running_state = pml_config.get('running_state', {})
-            is_running_config = running_state.get('is_running', False)
-            
-            if is_running_config:
-                # Check restart limits and cooldown
-                current_time = time.time()
-                
-                if self.exceedance_restart_attempts >= self.exceedance_max_restart_attempts:
-                    self.logger.error(f"❌ Max restart attempts ({self.exceedance_max_restart_attempts}) reached - not restarting")
-                    return
-                
-                if current_time - self.exceedance_last_restart_time < self.exceedance_restart_cooldown:
-                    self.logger.warning(f"⏳ Restart cooldown active - waiting {self.exceedance_restart_cooldown}s between restarts")
-                    return
-                
-                # Attempt restart
-                self.logger.info("🔄 Attempting to restart exceedance strategy after crash...")
-                self.exceedance_restart_attempts += 1
-                self.exceedance_last_restart_time = current_time
-                self._start_exceedance_process()
-                
-            else:
-                self.logger.info("ℹ️ Config says should not be running - not restarting after crash")
-                
-        except Exception as e:
-            self.logger.error(f"❌ Error handling exceedance process crash: {e}")
-
     def _monitor_auto_timer_strategies(self):
         """Monitor auto-timer flags and automatically start/stop strategies based on market hours."""
         try:
@@ -3,10 +3,14 @@ import requests
 import pandas as pd
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from connection_manager import ensure_valid_tokens
+from connection_manager import ensure_valid_tokens, get_http_session, get_rate_limiter
 from config_loader import get_config
+from atomic_json import write_json_atomic
+from artifact_store import save_artifact
 
 class SchwabTransactionHandler:
     """
@@ -29,6 +33,7 @@ class SchwabTransactionHandler:
             self.rate_limit_delay = self.api_config.get('rate_limit_delay', 60)
             self.base_url = self.api_config.get('base_url', 'https://api.schwabapi.com')
             self.request_timeout = self.api_config.get('request_timeout', 10)
+            self.max_account_workers = self.api_config.get('max_account_workers', 4)
         else:
             # Fallback defaults if config is not available
             self.max_retries = 5
@@ -36,10 +41,25 @@ class SchwabTransactionHandler:
             self.rate_limit_delay = 60
             self.base_url = 'https://api.schwabapi.com'
             self.request_timeout = 10
+            self.max_account_workers = 4
+        
+        # Pooled session and rate limiter shared with concurrent per-account fetches
+        self.session = get_http_session()
+        self.rate_limiter = get_rate_limiter()
         
         # Load trading configuration for lookback period
         self.trading_config = self.load_trading_config()
         
+        # Incremental sync: per-account cursor plus an append-only local store of raw transactions
+        self.last_sync_changed = False
+        self.transaction_dir = "transaction_data"
+        self.sync_state_file = os.path.join(self.transaction_dir, "transaction_sync_state.json")
+        self.store_file = os.path.join(self.transaction_dir, "transactions_store.jsonl")
+        self._store_lock = threading.RLock()
+        self.sync_state = self.load_sync_state()
+        self._store = {}
+        self._store_offset = 0
+        
     def load_trading_config(self) -> Dict[str, Any]:
         """
         Load trading configuration from trading_config_live.json
@@ -83,6 +103,226 @@ class SchwabTransactionHandler:
             print(f"❌ Error getting lookback period: {e}")
             return None
 
+    def load_sync_state(self) -> Dict[str, Any]:
+        """
+        Load the persistent sync cursor (last seen activityId/time per account).
+        
+        Returns:
+            Dict[str, Any]: Sync state with an 'accounts' mapping keyed by account hash
+        """
+        try:
+            if os.path.exists(self.sync_state_file):
+                with open(self.sync_state_file, 'r') as f:
+                    state = json.load(f)
+                state.setdefault('accounts', {})
+                return state
+        except Exception as e:
+            print(f"⚠️ Error loading transaction sync state, starting fresh: {e}")
+        return {'accounts': {}}
+    
+    def save_sync_state(self) -> bool:
+        """
+        Persist the sync cursor atomically.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            os.makedirs(self.transaction_dir, exist_ok=True)
+            with self._store_lock:
+                write_json_atomic(self.sync_state_file, self.sync_state)
+            return True
+        except Exception as e:
+            print(f"❌ Error saving transaction sync state: {e}")
+            return False
+    
+    @staticmethod
+    def _transaction_key(txn: Dict) -> str:
+        """Stable dedupe key for a raw Schwab transaction."""
+        key = txn.get('activityId', txn.get('transactionId'))
+        if key is not None:
+            return str(key)
+        return f"{txn.get('time', '')}|{txn.get('netAmount', '')}|{txn.get('description', '')}"
+    
+    @staticmethod
+    def _transaction_time(txn: Dict) -> str:
+        """ISO timestamp string used for cursor and window comparisons."""
+        return str(txn.get('time', txn.get('tradeDate', txn.get('transactionDate', ''))))
+    
+    def _load_transaction_store(self) -> Dict[str, Dict]:
+        """
+        Load the append-only transaction store, reading only lines added since the last call.
+        
+        Returns:
+            Dict[str, Dict]: Stored records keyed by transaction key
+        """
+        with self._store_lock:
+            if not os.path.exists(self.store_file):
+                self._store = {}
+                self._store_offset = 0
+                return self._store
+        
+            # Store was compacted (or replaced) underneath us: reread from the start
+            if os.path.getsize(self.store_file) < self._store_offset:
+                self._store = {}
+                self._store_offset = 0
+        
+            with open(self.store_file, 'r') as f:
+                f.seek(self._store_offset)
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # Partial trailing write; pick it up next time
+                    self._store_offset += len(line.encode('utf-8'))
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._store[record['key']] = record
+        
+            return self._store
+    
+    def _append_to_store(self, records: List[Dict]) -> None:
+        """
+        Append new records to the local transaction store.
+        
+        Args:
+            records (List[Dict]): Records with key, account_hash, display_name and transaction
+        """
+        if not records:
+            return
+        
+        with self._store_lock:
+            os.makedirs(self.transaction_dir, exist_ok=True)
+            with open(self.store_file, 'a') as f:
+                f.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+            self._load_transaction_store()
+    
+    def compact_transaction_store(self, keep_from_date: str) -> int:
+        """
+        Rewrite the store keeping only transactions on or after keep_from_date.
+        
+        Args:
+            keep_from_date (str): Oldest date to keep in YYYY-MM-DD format
+            
+        Returns:
+            int: Number of records dropped
+        """
+        with self._store_lock:
+            store = self._load_transaction_store()
+            kept = [record for record in store.values()
+                    if self._transaction_time(record['transaction'])[:10] >= keep_from_date]
+            dropped = len(store) - len(kept)
+        
+            if dropped > 0:
+                temp_file = f"{self.store_file}.tmp"
+                with open(temp_file, 'w') as f:
+                    f.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in kept))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.store_file)
+                self._store = {}
+                self._store_offset = 0
+                self._load_transaction_store()
+            
+                # Anything older than the compaction point must be re-fetched if requested again
+                for account_state in self.sync_state['accounts'].values():
+                    if account_state.get('covered_from', '') < keep_from_date:
+                        account_state['covered_from'] = keep_from_date
+                print(f"🗜️ Compacted transaction store: dropped {dropped} records older than {keep_from_date}")
+        
+            self.sync_state['last_compacted'] = datetime.now().strftime("%Y-%m-%d")
+            self.save_sync_state()
+            return dropped
+    
+    def sync_account_transactions(self, account_hash: str, display_name: str,
+                                  from_date: str, to_date: str) -> int:
+        """
+        Fetch only the transactions newer than the account's cursor and merge them into the store.
+        
+        The first sync (or a lookback that reaches past what the store covers) fetches the full
+        window; afterwards only the day of the last seen transaction onward is requested, and
+        overlap is removed by activityId.
+        
+        Args:
+            account_hash (str): Account hash ID
+            display_name (str): Account display name
+            from_date (str): Start of the requested lookback window (YYYY-MM-DD)
+            to_date (str): End of the requested window (YYYY-MM-DD)
+            
+        Returns:
+            int: Number of new transactions appended to the store
+        """
+        with self._store_lock:
+            account_state = dict(self.sync_state['accounts'].get(account_hash) or {})
+        
+        if not account_state or account_state.get('covered_from', from_date) > from_date:
+            fetch_from = from_date
+            print(f"Full sync for {display_name}: {fetch_from} to {to_date}")
+        else:
+            fetch_from = max(account_state.get('last_time', '')[:10] or from_date, from_date)
+            print(f"Incremental sync for {display_name}: {fetch_from} to {to_date}")
+        
+        txns = self.get_transactions(
+            account_hash=account_hash,
+            from_date=fetch_from,
+            to_date=to_date,
+            transaction_type="TRADE",
+            max_results=500
+        )
+        
+        if not isinstance(txns, list):
+            return 0
+        
+        with self._store_lock:
+            store = self._load_transaction_store()
+            new_records = []
+            seen = set()
+            for txn in txns:
+                key = self._transaction_key(txn)
+                if key in store or key in seen:
+                    continue
+                seen.add(key)
+                new_records.append({
+                    'key': key,
+                    'account_hash': account_hash,
+                    'display_name': display_name,
+                    'transaction': txn
+                })
+            
+            self._append_to_store(new_records)
+            
+            # Advance the cursor to the newest transaction seen for this account
+            for txn in txns:
+                txn_time = self._transaction_time(txn)
+                if txn_time >= account_state.get('last_time', ''):
+                    account_state['last_time'] = txn_time
+                    account_state['last_activity_id'] = self._transaction_key(txn)
+            account_state['covered_from'] = min(account_state.get('covered_from', fetch_from), fetch_from)
+            account_state['last_synced'] = datetime.now().isoformat()
+            self.sync_state['accounts'][account_hash] = account_state
+            self.save_sync_state()
+        
+        return len(new_records)
+    
+    def get_stored_transactions(self, account_hash: str, from_date: str) -> List[Dict]:
+        """
+        Serve an account's lookback window from the local store.
+        
+        Args:
+            account_hash (str): Account hash ID
+            from_date (str): Oldest date to include (YYYY-MM-DD)
+            
+        Returns:
+            List[Dict]: Raw transaction dictionaries in the window
+        """
+        with self._store_lock:
+            store = self._load_transaction_store()
+            return [record['transaction'] for record in store.values()
+                    if record['account_hash'] == account_hash
+                    and self._transaction_time(record['transaction'])[:10] >= from_date]
+
     def get_account_numbers(self) -> List[Dict]:
         """
         Get all available account numbers and details.
@@ -104,7 +344,8 @@ class SchwabTransactionHandler:
                     "Accept": "application/json"
                 }
                 
-                response = requests.get(url, headers=headers, timeout=self.request_timeout)
+                self.rate_limiter.acquire()
+                response = self.session.get(url, headers=headers, timeout=self.request_timeout)
                 response.raise_for_status()
                 
                 accounts = response.json()
@@ -149,7 +390,7 @@ class SchwabTransactionHandler:
                         to_date: Optional[str] = None,
                         transaction_type: Optional[str] = None,
                         symbol: Optional[str] = None,
-                        max_results: int = 100) -> List[Dict]:
+                        max_results: int = 100) -> Optional[List[Dict]]:
         """
         Get transaction history for a specified account.
         
@@ -162,7 +403,7 @@ class SchwabTransactionHandler:
             max_results (int): Maximum number of results to return (default: 100)
         
         Returns:
-            List[Dict]: List of transaction dictionaries
+            Optional[List[Dict]]: List of transaction dictionaries, None if the request failed
         """
         # Set default end date if not specified
         if not to_date:
@@ -203,7 +444,8 @@ class SchwabTransactionHandler:
                     "Accept": "application/json"
                 }
                 
-                response = requests.get(url, headers=headers, params=params, timeout=20)
+                self.rate_limiter.acquire()
+                response = self.session.get(url, headers=headers, params=params, timeout=20)
                 response.raise_for_status()
                 
                 # Parse and return the results
@@ -226,7 +468,7 @@ class SchwabTransactionHandler:
                         retry_delay *= 2  # Exponential backoff
                     else:
                         print("Maximum retry attempts reached")
-                        return []
+                        return None
                         
             except requests.exceptions.RequestException as e:
                 print(f"Request failed on attempt {attempt + 1}: {e}")
@@ -235,8 +477,10 @@ class SchwabTransactionHandler:
                     retry_delay *= 2  # Exponential backoff
                 else:
                     print("Maximum retry attempts reached")
-                    return []
-    
+                    return None
+        
+        return None
+
     def get_transaction_details(self, account_hash: str, transaction_id: str) -> Dict:
         """
         Get detailed information about a specific transaction.
@@ -262,7 +506,8 @@ class SchwabTransactionHandler:
                     "Accept": "application/json"
                 }
                 
-                response = requests.get(url, headers=headers, timeout=self.request_timeout)
+                self.rate_limiter.acquire()
+                response = self.session.get(url, headers=headers, timeout=self.request_timeout)
                 response.raise_for_status()
                 
                 return response.json()
@@ -405,8 +650,6 @@ class SchwabTransactionHandler:
     def create_transactions_json(self, df: pd.DataFrame) -> bool:
         """Create transactions.json file for database insertion matching the transactions table schema"""
         try:
-            import json
-            
             if df.empty:
                 print("❌ No transaction data available")
                 return False
@@ -444,8 +687,7 @@ class SchwabTransactionHandler:
                 transactions_data['transactions'].append(transaction_record)
             
             # Write to transactions.json in root directory
-            with open('transactions.json', 'w') as f:
-                json.dump(transactions_data, f, indent=2)
+            save_artifact('transactions.json', transactions_data)
             
             print(f"✅ Created transactions.json with {len(df)} transactions")
             print(f"📊 Transactions processed from {len(df['account_name'].unique()) if 'account_name' in df.columns else 1} accounts")
@@ -469,14 +711,14 @@ class SchwabTransactionHandler:
                     'transactions_processed': 0
                 }
             
-            # Create transactions.json
-            json_created = self.create_transactions_json(df)
+            # Create transactions.json only when the sync brought in something new
+            json_created = self.create_transactions_json(df) if self.last_sync_changed else False
             
             return {
                 'success': True,
                 'transactions_processed': len(df),
                 'json_created': json_created,
-                'csv_created': True,
+                'csv_created': self.last_sync_changed,
                 'last_updated': datetime.now().isoformat()
             }
             
@@ -492,6 +734,10 @@ class SchwabTransactionHandler:
         """
         Get transactions for all accounts over the specified period and automatically update transactions.json.
         
+        Each account is synced incrementally from its cursor into the local store, and the lookback
+        window is then served from that store. transactions.json and CSVs are only rewritten when
+        new transactions arrived or the window moved.
+        
         Args:
             days (int, optional): Number of days to look back (default: None, uses config lookback period)
             csv_output (bool): Whether to save results to CSV files (default: True)
@@ -517,25 +763,34 @@ class SchwabTransactionHandler:
             return pd.DataFrame()
         
         all_data = []
+        new_count = 0
+        window_changed = self.sync_state.get('exported_from') != from_date or not os.path.exists('transactions.json')
         
-        for i, account in enumerate(accounts):
-            account_hash = account.get('hashValue')
-            display_name = account.get('displayName', f'Account {i+1}')
-            
-            print(f"\nFetching transactions for {display_name} ({account_hash})")
-            print(f"Date range: {from_date} to {to_date}")
+        account_names = [(account.get('hashValue'), account.get('displayName', f'Account {i+1}'))
+                         for i, account in enumerate(accounts)]
+        
+        # Sync accounts concurrently (bounded, sharing the pooled session and rate limiter);
+        # results are collected in account order so the merged output is deterministic
+        print(f"\nSyncing transactions for {len(account_names)} accounts, date range: {from_date} to {to_date}")
+        max_workers = max(1, min(self.max_account_workers, len(account_names)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.sync_account_transactions, account_hash, display_name, from_date, to_date)
+                       for account_hash, display_name in account_names]
+        
+        for (account_hash, display_name), future in zip(account_names, futures):
+            try:
+                added = future.result()
+            except Exception as e:
+                print(f"❌ Error syncing transactions for {display_name}: {e}")
+                added = 0
+            new_count += added
             
-            txns = self.get_transactions(
-                account_hash=account_hash,
-                from_date=from_date,
-                to_date=to_date,
-                transaction_type="TRADE",  # Add default filter for trade transactions
-                max_results=500
-            )
+            # Serve the lookback window from the local store
+            txns = self.get_stored_transactions(account_hash, from_date)
             
             if txns:
                 df = self.process_transactions(txns)
-                print(f"Found {len(df)} transactions")
+                print(f"Found {len(df)} transactions ({added} new)")
                 
                 # Add account info to dataframe
                 df['account_name'] = display_name
@@ -543,35 +798,45 @@ class SchwabTransactionHandler:
                 
                 all_data.append(df)
                 
-                # Save individual account data if requested
-                if csv_output:
+                # Save individual account data if requested and it changed
+                if csv_output and (added > 0 or window_changed):
                     account_filename = f"schwab_transactions_{display_name.replace(' ', '_')}_{from_date}_{to_date}.csv"
                     self.save_to_csv(df, account_filename)
             else:
                 print("No transactions found for this account")
+        
+        # Only rewrite outputs when new transactions arrived or the window moved
+        outputs_stale = new_count > 0 or window_changed
+        self.last_sync_changed = outputs_stale
+        
+        # Drop store entries that fell out of the lookback window once a day
+        if self.sync_state.get('last_compacted') != to_date:
+            self.compact_transaction_store(from_date)
                 
         # Combine all account data if we have multiple accounts
         if len(all_data) > 1:
             combined_df = pd.concat(all_data, ignore_index=True)
             print(f"\nCombined data: {len(combined_df)} transactions across {len(all_data)} accounts")
             
-            if csv_output:
+            if csv_output and outputs_stale:
                 combined_filename = f"schwab_transactions_all_accounts_{from_date}_{to_date}.csv"
                 self.save_to_csv(combined_df, combined_filename)
                 
-            # Automatically update transactions.json every time this method is called
-            if not combined_df.empty:
+            # Update transactions.json whenever the served window changed
+            if not combined_df.empty and outputs_stale:
                 try:
-                    self._update_transactions_json(combined_df)
+                    if self._update_transactions_json(combined_df):
+                        self._mark_exported(from_date)
                 except Exception as e:
                     print(f"Warning: Failed to update transactions.json: {e}")
                     
             return combined_df
         elif len(all_data) == 1:
-            # Automatically update transactions.json every time this method is called
-            if not all_data[0].empty:
+            # Update transactions.json whenever the served window changed
+            if not all_data[0].empty and outputs_stale:
                 try:
-                    self._update_transactions_json(all_data[0])
+                    if self._update_transactions_json(all_data[0]):
+                        self._mark_exported(from_date)
                 except Exception as e:
                     print(f"Warning: Failed to update transactions.json: {e}")
             return all_data[0]
@@ -579,6 +844,11 @@ class SchwabTransactionHandler:
             print("\nNo transaction data found for any accounts")
             return pd.DataFrame()
 
+    def _mark_exported(self, from_date: str) -> None:
+        """Record the window last written to transactions.json."""
+        self.sync_state['exported_from'] = from_date
+        self.save_sync_state()
+
     def _update_transactions_json(self, df: pd.DataFrame) -> bool:
         """
         Internal method to update transactions.json file with current transaction data.
@@ -591,8 +861,6 @@ class SchwabTransactionHandler:
             bool: True if successful, False otherwise
         """
         try:
-            import json
-            
             if df.empty:
                 print("❌ No transaction data to update")
                 return False
@@ -631,8 +899,7 @@ class SchwabTransactionHandler:
                 transactions_data['transactions'].append(transaction_record)
             
             # Write to transactions.json in root directory
-            with open('transactions.json', 'w') as f:
-                json.dump(transactions_data, f, indent=2)
+            save_artifact('transactions.json', transactions_data)
             
             return True
             
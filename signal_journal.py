@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Executed Signal Journal
+
+Append-only JSON Lines record of executed strategy signals with an in-memory
+index for duplicate checks:
+
+- record() appends one line, so writes cost the same however long the history is
+- contains()/get() are dict lookups; lines appended by other processes are
+  picked up by reading only the bytes added since the last check
+- Entries from previous days are moved to an archive file once per day
+  (compaction), keeping the live journal to the current session
+
+Appends, compaction and index refreshes hold an flock on <journal>.lock, so
+processes sharing a journal never compact twice or index past each other's lines.
+
+The journal is created from the legacy single-JSON file on first use.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+
+class SignalJournal:
+    """Append-only executed-signal journal with an in-memory signal id index"""
+
+    def __init__(self, journal_file: str, archive_file: Optional[str] = None,
+                 legacy_file: Optional[str] = None):
+        """
+        Open the journal, importing the legacy JSON file if the journal does not exist yet.
+
+        Args:
+            journal_file: JSON Lines journal path
+            archive_file: Where compaction moves entries from previous days
+                (defaults to <journal>_archive.jsonl)
+            legacy_file: Legacy {'executed_signals': {...}} JSON file to import
+        """
+        self.journal_file = journal_file
+        self.archive_file = archive_file or f"{os.path.splitext(journal_file)[0]}_archive.jsonl"
+        self.legacy_file = legacy_file
+        self.lock_file = f"{journal_file}.lock"
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._inode = None
+        self._compacted_on = None
+
+        with self._exclusive():
+            if not os.path.exists(self.journal_file) and legacy_file and os.path.exists(legacy_file):
+                self._import_legacy(legacy_file)
+            self._compact_if_new_day()
+            self._refresh()
+
+    def contains(self, signal_id: str) -> bool:
+        """Whether a signal id has been executed (in this session)."""
+        return self.get(signal_id) is not None
+
+    def get(self, signal_id: str) -> Optional[Dict[str, Any]]:
+        """Journal entry for a signal id, or None."""
+        with self._exclusive():
+            self._compact_if_new_day()
+            self._refresh()
+            return self.entries.get(signal_id)
+
+    def all_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of every entry in the live journal, keyed by signal id."""
+        with self._exclusive():
+            self._compact_if_new_day()
+            self._refresh()
+            return dict(self.entries)
+
+    def record(self, signal_id: str, entry: Dict[str, Any]):
+        """
+        Append an executed signal.
+
+        Args:
+            signal_id: Duplicate-prevention key
+            entry: Entry stored for the signal (signal, execution_result, executed_at)
+        """
+        entry = dict(entry, signal_id=signal_id)
+        line = json.dumps(entry, default=str, separators=(',', ':')) + '\n'
+
+        with self._exclusive():
+            self._compact_if_new_day()
+            with open(self.journal_file, 'a') as f:
+                f.write(line)
+            # Index from the last offset rather than adding our line's length, which
+            # would skip lines other processes appended before ours
+            self._refresh()
+
+    def compact(self):
+        """Move entries from previous days to the archive and rewrite the journal with today's entries."""
+        with self._exclusive():
+            self._compact()
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the journal lock against other threads and, via flock, other processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _compact_if_new_day(self):
+        if self._compacted_on != date.today():
+            self._compact()
+
+    def _compact(self):
+        today = date.today()
+        self._compacted_on = today
+        if not os.path.exists(self.journal_file):
+            return
+
+        entries = self._read_entries(self.journal_file)
+        today_prefix = today.isoformat()
+        old = [entry for entry in entries if not str(entry.get('executed_at', '')).startswith(today_prefix)]
+        if not old:
+            return
+
+        with open(self.archive_file, 'a') as f:
+            for entry in old:
+                f.write(json.dumps(entry, default=str, separators=(',', ':')) + '\n')
+
+        temp_file = f"{self.journal_file}.tmp"
+        with open(temp_file, 'w') as f:
+            for entry in entries:
+                if str(entry.get('executed_at', '')).startswith(today_prefix):
+                    f.write(json.dumps(entry, default=str, separators=(',', ':')) + '\n')
+        os.replace(temp_file, self.journal_file)
+
+        print(f"🗜️ Compacted {self.journal_file}: archived {len(old)} entries from previous days")
+        self._inode = None  # Force a full reload
+
+    def _refresh(self):
+        """Index lines appended since the last read; reload fully if the file was replaced."""
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            self.entries = {}
+            self._offset = 0
+            self._inode = None
+            return
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self.entries = {}
+            self._offset = 0
+            self._inode = stat.st_ino
+
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.journal_file, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        # Only index complete lines; a partially written last line is read next time
+        end = data.rfind(b'\n') + 1
+        for raw_line in data[:end].splitlines():
+            entry = self._parse_line(raw_line)
+            if entry:
+                self.entries[entry['signal_id']] = entry
+        self._offset += end
+
+    def _read_entries(self, filepath: str):
+        with open(filepath, 'rb') as f:
+            return [entry for entry in map(self._parse_line, f) if entry]
+
+    @staticmethod
+    def _parse_line(raw_line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(raw_line)
+        except ValueError:
+            return None
+        return entry if isinstance(entry, dict) and entry.get('signal_id') else None
+
+    def _import_legacy(self, legacy_file: str):
+        """Write the legacy file's executed signals as the initial journal."""
+        try:
+            with open(legacy_file, 'r') as f:
+                executed_signals = json.load(f).get('executed_signals', {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not import {legacy_file}: {e}")
+            return
+
+        temp_file = f"{self.journal_file}.tmp"
+        with open(temp_file, 'w') as f:
+            for signal_id, entry in executed_signals.items():
+                f.write(json.dumps(dict(entry, signal_id=signal_id), default=str, separators=(',', ':')) + '\n')
+        os.replace(temp_file, self.journal_file)
+        print(f"📥 Imported {len(executed_signals)} executed signals from {legacy_file} into {self.journal_file}")
@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from config_loader import ConfigLoader
 from historical_data_handler import HistoricalDataHandler
+from artifact_store import load_artifact, load_artifact_records, save_artifact
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -94,14 +95,13 @@ class SymbolsMonitorHandler:
     def _load_position_symbols(self) -> List[str]:
         """Load symbols from current_positions.json"""
         try:
-            with open('current_positions.json', 'r') as f:
-                data = json.load(f)
-                symbols = data.get('symbols', [])
-                logger.info(f"💼 Loaded {len(symbols)} symbols from current_positions.json")
-                return symbols
-        except FileNotFoundError:
-            logger.info("💼 current_positions.json not found")
-            return []
+            data = load_artifact('current_positions.json')
+            if data is None:
+                logger.info("💼 current_positions.json not found")
+                return []
+            symbols = data.get('symbols', [])
+            logger.info(f"💼 Loaded {len(symbols)} symbols from current_positions.json")
+            return symbols
         except Exception as e:
             logger.error(f"❌ Error loading current_positions.json: {e}")
             return []
@@ -277,9 +277,7 @@ class SymbolsMonitorHandler:
             # Get position details from current_positions.json
             position_details = {}
             try:
-                with open('current_positions.json', 'r') as f:
-                    positions_data = json.load(f)
-                    position_details = positions_data.get('positions', {})
+                position_details = load_artifact_records('current_positions.json', 'positions')
                 logger.info(f"📊 Position details loaded for {len(position_details)} positions")
             except Exception as e:
                 logger.warning(f"⚠️ Could not load position details: {e}")
@@ -377,8 +375,7 @@ class SymbolsMonitorHandler:
                 integrated_data['watchlist_data'][symbol] = symbol_data
             
             # Write to integrated_watchlist.json
-            with open('integrated_watchlist.json', 'w') as f:
-                json.dump(integrated_data, f, indent=2)
+            save_artifact('integrated_watchlist.json', integrated_data, records_key='watchlist_data')
             
             logger.info(f"✅ Created integrated_watchlist.json with {len(all_symbols)} symbols")
             logger.info(f"📊 Sources: Positions({len(position_symbols)}) + Strategies({len(strategy_symbols)}) = Total({len(all_symbols)})")
@@ -532,11 +529,9 @@ class SymbolsMonitorHandler:
                 logger.warning(f"Warning: Failed to auto-update integrated_watchlist.json: {e}")
             
             # Then read and return the data
-            with open('integrated_watchlist.json', 'r') as f:
-                data = json.load(f)
-                watchlist_data = data.get('watchlist_data', {})
-                logger.debug(f"📋 Retrieved watchlist data for {len(watchlist_data)} symbols and auto-updated JSON (market_data={include_market_data})")
-                return watchlist_data
+            watchlist_data = load_artifact_records('integrated_watchlist.json', 'watchlist_data')
+            logger.debug(f"📋 Retrieved watchlist data for {len(watchlist_data)} symbols and auto-updated JSON (market_data={include_market_data})")
+            return watchlist_data
                 
         except Exception as e:
             logger.warning(f"Could not load integrated watchlist data: {e}")
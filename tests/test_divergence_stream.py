@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming divergence state: the bar still forming, divergence
+events and the 1-minute indicators built from the streams.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from divergence_indicators_calculator import (
+    SWING_ORDER, DivergenceStreamState, _divergence_streams, get_divergence_stream, grade_divergence,
+    process_timeframe_indicators_batch, sync_divergence_stream
+)
+
+# Bar of the lower swing low in divergence_closes() and the bar that confirms it
+SECOND_SWING_LOW = 69
+CONFIRMING_BAR = SECOND_SWING_LOW + SWING_ORDER
+
+
+def make_bars(times: pd.DatetimeIndex) -> pd.DataFrame:
+    """1-minute bars with a deterministic random walk"""
+    closes = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.5, len(times)))
+    return pd.DataFrame({
+        'datetime': times,
+        'high': closes + 0.3,
+        'low': closes - 0.3,
+        'close': closes
+    })
+
+
+def test_forming_bar_is_excluded():
+    # Bar times are naive local times, as HistoricalDataHandler returns them
+    now = pd.Timestamp('2026-03-02 10:15:30')
+    times = pd.date_range(end=now.floor('min'), periods=100, freq='min')
+    df = make_bars(times)
+    df['datetime'] = times.strftime('%Y-%m-%d %H:%M:%S')
+
+    sync_divergence_stream('TEST_LOCAL', '1min', df, now=now)
+    state = _divergence_streams[('TEST_LOCAL', '1min')]
+    assert state.last_time == np.datetime64(times[-2])
+    assert state.bars == 99
+
+    # Once it has closed, the bar is fed on the next sync
+    sync_divergence_stream('TEST_LOCAL', '1min', df, now=now + pd.Timedelta(minutes=1))
+    assert state.last_time == np.datetime64(times[-1])
+    assert state.bars == 100
+
+
+def test_default_clock_matches_local_bar_times(monkeypatch):
+    # Local time behind UTC: comparing local bars with a UTC clock fed every bar
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    try:
+        for attempt in range(3):
+            started = pd.Timestamp.now()
+            times = pd.date_range(end=started.floor('min'), periods=100, freq='min')
+            key = (f'TEST_CLOCK_{attempt}', '1min')
+            sync_divergence_stream(key[0], key[1], make_bars(times))
+            # Retry if a minute boundary passed during the sync
+            if pd.Timestamp.now().floor('min') == started.floor('min'):
+                break
+        assert _divergence_streams[key].bars == 99
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_forming_bar_is_excluded_for_timezone_aware_bars():
+    now = pd.Timestamp('2026-03-02 15:15:30', tz='UTC')
+    times = pd.date_range(end=now.floor('min'), periods=100, freq='min').tz_convert('America/New_York')
+
+    sync_divergence_stream('TEST_AWARE', '1min', make_bars(times), now=now)
+    state = _divergence_streams[('TEST_AWARE', '1min')]
+    assert state.bars == 99
+    assert state.last_time == np.datetime64(times[-2].tz_convert('UTC').tz_localize(None))
+
+
+def divergence_closes(second_low: float = 93.5) -> np.ndarray:
+    """Closes with a sharp drop to a swing low at bar 49, then a gentle slide to a
+    lower low at bar 69 with a higher RSI (bullish divergence)"""
+    closes = list(100 + 0.3 * np.sin(np.arange(40)))
+    closes += list(np.linspace(99.5, 94.0, 11))[1:]
+    closes += [94.5, 95.5, 96.5, 97.0, 97.5, 97.8, 98.0, 97.6, 97.2]
+    closes += [96.6, 96.8, 96.0, 96.2, 95.4, 95.6, 94.8, 95.0, 94.2, 94.4, second_low]
+    closes += [94.0, 94.6, 95.2, 95.8, 96.4, 97.0, 97.4, 97.8]
+    return np.array(closes)
+
+
+def divergence_bars(closes: np.ndarray) -> pd.DataFrame:
+    """Closed 1-minute bars (from 2024) around the given closes"""
+    times = pd.date_range('2024-03-04 10:00', periods=len(closes), freq='min')
+    return pd.DataFrame({
+        'datetime': times,
+        'open': closes,
+        'high': closes + 0.1,
+        'low': closes - 0.1,
+        'close': closes,
+        'volume': 1000
+    })
+
+
+def feed(state: DivergenceStreamState, df: pd.DataFrame) -> dict:
+    """Feed bars one at a time; returns {bar index: events emitted by that bar}"""
+    emitted = {}
+    for i, bar in enumerate(df.itertuples()):
+        events = state.update(np.datetime64(bar.datetime), bar.high, bar.low, bar.close)
+        if events:
+            emitted[i] = events
+    return emitted
+
+
+def test_divergence_event_emitted_on_confirming_bar():
+    df = divergence_bars(divergence_closes())
+    state = DivergenceStreamState('TEST_EVENT', '1min', strict=True)
+
+    emitted = feed(state, df)
+
+    assert list(emitted) == [CONFIRMING_BAR]
+    event, = emitted[CONFIRMING_BAR]
+    assert event['direction'] == 'bullish'
+    assert event['signal_type'] == 'BUY'
+    assert event['swing_times'] == [df['datetime'][49].isoformat(), df['datetime'][SECOND_SWING_LOW].isoformat()]
+    assert event['swing_prices'] == pytest.approx([93.9, 93.4])
+    assert event['swing_rsi'][1] > event['swing_rsi'][0]
+    assert event['confirmed_at'] == df['datetime'][CONFIRMING_BAR].isoformat()
+    assert state.divergences()['bullish'][event['strength']]
+    assert not any(state.divergences()['bearish'].values())
+
+
+@pytest.mark.parametrize('second_low, strength', [
+    (93.5, 'strong'),   # 0.53% lower low
+    (93.7, 'medium'),   # 0.32%
+    (93.85, 'weak'),    # 0.16%
+])
+def test_divergence_event_grades(second_low, strength):
+    state = DivergenceStreamState('TEST_GRADE', '1min', strict=True)
+
+    event, = feed(state, divergence_bars(divergence_closes(second_low)))[CONFIRMING_BAR]
+
+    assert event['strength'] == strength
+    assert event['strength'] == grade_divergence(event['price_move_pct'], event['rsi_move'])
+    assert state.divergences()['bullish'] == {name: name == strength for name in ('strong', 'medium', 'weak')}
+
+
+def test_grade_thresholds_are_exclusive():
+    assert grade_divergence(0.51, 3.01) == 'strong'
+    assert grade_divergence(0.5, 3.01) == 'medium'
+    assert grade_divergence(0.51, 3.0) == 'medium'
+    assert grade_divergence(0.21, 2.01) == 'medium'
+    assert grade_divergence(0.2, 2.01) == 'weak'
+    assert grade_divergence(0.21, 2.0) == 'weak'
+
+
+def test_resync_does_not_repeat_events():
+    df = divergence_bars(divergence_closes())
+    now = df['datetime'].iloc[-1] + pd.Timedelta(minutes=1)
+
+    # The first sync only warms the stream up
+    assert sync_divergence_stream('TEST_RESYNC', '1min', df.iloc[:60], now=now) == []
+    events = sync_divergence_stream('TEST_RESYNC', '1min', df, now=now)
+    assert [event['confirmed_at'] for event in events] == [df['datetime'][CONFIRMING_BAR].isoformat()]
+
+    assert sync_divergence_stream('TEST_RESYNC', '1min', df, now=now) == []
+    assert sync_divergence_stream('TEST_RESYNC', '1min', df.iloc[10:], now=now) == []
+
+
+def test_1min_indicators_come_from_the_stream():
+    df = divergence_bars(divergence_closes())
+
+    process_timeframe_indicators_batch('1min', {'TEST_1MIN': df.iloc[:60].copy()})
+    indicators = process_timeframe_indicators_batch('1min', {'TEST_1MIN': df.copy()})['TEST_1MIN']
+
+    state = get_divergence_stream('TEST_1MIN', '1min')
+    assert state.bars == len(df)
+    assert [event['confirmed_at'] for event in indicators['divergence_events']] == [
+        df['datetime'][CONFIRMING_BAR].isoformat()
+    ]
+    assert indicators['bullish_divergence_detected']
+    assert indicators['signal_type'] == 'BUY'
+    assert indicators['swing_lows'] == state.swing_prices('bullish')
+    assert indicators['current_rsi'] == state.rsi.value
+
+    # Later runs without new bars report no events again
+    indicators = process_timeframe_indicators_batch('1min', {'TEST_1MIN': df.copy()})['TEST_1MIN']
+    assert indicators['divergence_events'] == []
+    assert indicators['bullish_divergence_detected']
@@ -16,12 +16,12 @@ import numpy as np
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import logging
-import json
 import os
 import time as time_module
 
 # Import our existing data handlers
 from historical_data_handler import HistoricalDataHandler
+from artifact_store import save_artifact
 
 class VIXDataHandler:
     """
@@ -268,8 +268,7 @@ class VIXDataHandler:
             }
             
             # Write to file
-            with open(self.output_file, 'w') as f:
-                json.dump(output_data, f, indent=2)
+            save_artifact(self.output_file, output_data)
             
             print(f"✅ Saved VIX data to {self.output_file}")
             return True
@@ -0,0 +1,141 @@
+"""
+WebSocket Client Sender
+Per-client bounded send queue so one slow browser never delays the others
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from websockets.exceptions import ConnectionClosed
+
+logger = logging.getLogger(__name__)
+
+
+class ClientSender:
+    """
+    Owns all broadcast traffic to one client.
+
+    Broadcasts are enqueued without awaiting the socket and drained by a
+    dedicated task. Messages enqueued with a topic replace any undelivered
+    message for the same topic (latest wins), so a lagging client skips
+    superseded snapshots instead of falling further behind. A client whose
+    oldest undelivered message exceeds ``max_lag`` seconds, or whose queue
+    exceeds ``max_queue`` messages, is disconnected.
+    """
+
+    def __init__(self, websocket, max_queue: int = 100, max_lag: float = 10.0,
+                 on_close: Optional[Callable[[Any], None]] = None):
+        """
+        Initialize the sender and start its drain task on the running loop.
+
+        Args:
+            websocket: Client connection
+            max_queue: Maximum undelivered messages before disconnecting
+            max_lag: Maximum age in seconds of the oldest undelivered message
+            on_close: Called with the websocket once the sender stops
+        """
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.on_close = on_close
+
+        # key -> (enqueued_at, message); topic keys keep their queue position when replaced
+        self.pending: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._sequence = 0
+        self._sending_since: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self.closed = False
+
+        # Metrics
+        self.sent_count = 0
+        self.coalesced_count = 0
+
+        self.task = asyncio.create_task(self._drain())
+
+    def enqueue(self, message: str, topic: Optional[str] = None) -> bool:
+        """
+        Queue a message for delivery without waiting on the socket.
+
+        Args:
+            message: Serialized message
+            topic: Coalescing key; None keeps every message in order
+
+        Returns:
+            False if the client is closed or was disconnected for lagging
+        """
+        if self.closed:
+            return False
+
+        now = time.monotonic()
+        if topic is None:
+            self._sequence += 1
+            key = ('message', self._sequence)
+        else:
+            key = ('topic', topic)
+
+        if key in self.pending:
+            # Latest wins, but lag is still measured from the first undelivered version
+            enqueued_at = self.pending[key][0]
+            self.coalesced_count += 1
+        else:
+            enqueued_at = now
+        self.pending[key] = (enqueued_at, message)
+
+        lag = self.lag(now)
+        if lag > self.max_lag or len(self.pending) > self.max_queue:
+            logger.warning(f"🐢 Disconnecting slow client {self.websocket.remote_address}: "
+                           f"lag {lag:.1f}s, {len(self.pending)} queued messages")
+            self._disconnect()
+            return False
+
+        self._wakeup.set()
+        return True
+
+    def lag(self, now: float = None) -> float:
+        """Age in seconds of the oldest message not yet delivered."""
+        if now is None:
+            now = time.monotonic()
+        oldest = self._sending_since
+        if self.pending:
+            first_enqueued = next(iter(self.pending.values()))[0]
+            oldest = first_enqueued if oldest is None else min(oldest, first_enqueued)
+        return now - oldest if oldest is not None else 0.0
+
+    async def _drain(self):
+        """Deliver queued messages in order until the connection closes."""
+        try:
+            while True:
+                await self._wakeup.wait()
+                while self.pending:
+                    _, (enqueued_at, message) = self.pending.popitem(last=False)
+                    self._sending_since = enqueued_at
+                    await self.websocket.send(message)
+                    self._sending_since = None
+                    self.sent_count += 1
+                self._wakeup.clear()
+        except ConnectionClosed:
+            pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Error sending to client {self.websocket.remote_address}: {e}")
+        finally:
+            self.closed = True
+            self.pending.clear()
+            if self.on_close:
+                self.on_close(self.websocket)
+
+    def _disconnect(self):
+        """Stop delivering and close the lagging connection."""
+        self.closed = True
+        self.pending.clear()
+        self.task.cancel()
+        asyncio.create_task(self.websocket.close(code=1008, reason='Client too slow'))
+
+    def close(self):
+        """Stop the drain task (connection already closing)."""
+        self.closed = True
+        self.task.cancel()
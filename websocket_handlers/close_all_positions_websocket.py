@@ -76,6 +76,7 @@ class CloseAllPositionsWebSocketServer:
                         'positions_close_failed': result.get('positions_close_failed', 0),
                         'cancelled_orders': result.get('cancelled_orders', []),
                         'closed_positions': result.get('closed_positions', []),
+                        'flatten_metrics': result.get('flatten_metrics'),
                         'execution_time': result.get('execution_time'),
                         'message': result.get('message', 'Close all positions completed'),
                         'timestamp': datetime.now().isoformat()
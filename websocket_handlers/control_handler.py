@@ -5,138 +5,181 @@ Handles all WebSocket control operations (risk management, strategies, watchlist
 """
 
 import asyncio
+import inspect
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 import os
 import subprocess
-import psutil
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Callable, Tuple
+
+from process_supervisor import get_process_supervisor
 
 logger = logging.getLogger(__name__)
 
+# Execution policies for registered handlers
+POLICY_INLINE = 'inline'              # awaited on the server event loop
+POLICY_THREAD = 'thread'              # own event loop in a worker thread
+POLICY_CONFIG_WRITE = 'config_write'  # single worker thread, in arrival order
+
+# Inline handlers taking longer than this are logged as blocking the loop
+INLINE_BUDGET_SECONDS = 0.005
+
+
+class LoopBoundWebSocket:
+    """
+    Connection wrapper for handlers running on a worker thread's event loop.
+    
+    send() is scheduled on the loop that owns the connection; everything
+    else is read from the wrapped connection.
+    """
+    
+    def __init__(self, websocket, loop):
+        self._websocket = websocket
+        self._loop = loop
+    
+    async def send(self, message):
+        await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._websocket.send(message), self._loop)
+        )
+    
+    def __getattr__(self, name):
+        return getattr(self._websocket, name)
+
+
+class HandlerMetrics:
+    """Handler wall time per control message type"""
+    
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, message_type: str, policy: str, elapsed: float, failed: bool = False):
+        """Record one handled message."""
+        entry = self.stats.setdefault(message_type, {
+            'policy': policy, 'count': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+        })
+        entry['policy'] = policy
+        entry['count'] += 1
+        entry['errors'] += int(failed)
+        entry['total_seconds'] += elapsed
+        entry['max_seconds'] = max(entry['max_seconds'], elapsed)
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counts and average / max handler time in milliseconds."""
+        return {
+            message_type: {
+                'policy': entry['policy'],
+                'count': entry['count'],
+                'errors': entry['errors'],
+                'avg_ms': entry['total_seconds'] * 1000 / entry['count'],
+                'max_ms': entry['max_seconds'] * 1000
+            }
+            for message_type, entry in self.stats.items()
+        }
+
 class ControlHandler:
     """Handler for all control operations"""
     
-    def __init__(self, broadcast_callback, db_query_handler):
-        """Initialize the control handler"""
+    def __init__(self, broadcast_callback, db_query_handler, max_workers: int = 8):
+        """
+        Initialize the control handler.
+        
+        Args:
+            broadcast_callback: Coroutine broadcasting a message dict (must be thread-safe)
+            db_query_handler: Shared database query handler
+            max_workers: Worker threads for blocking handlers
+        """
         self.broadcast_callback = broadcast_callback
         self.db_query_handler = db_query_handler
+        
+        # Strategy scripts and the realtime monitor are started and tracked here
+        self.process_supervisor = get_process_supervisor()
+        
+        # Blocking handlers run off the event loop; config writes are serialized
+        self.worker_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='control')
+        self.config_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='control-config')
+        self.metrics = HandlerMetrics()
+        
+        self.dispatch_table: Dict[str, Tuple[Callable, str, bool]] = {}
+        self._register_handlers()
+    
+    def _register_handlers(self):
+        """Build the message type -> (handler, execution policy) dispatch table"""
+        # Small config reads stay on the loop; anything that writes files, waits on
+        # subprocesses, scans processes, hits the database or calls the broker API
+        # runs in a worker thread. Config writers share one thread so writes to the
+        # same JSON files keep their arrival order.
+        handlers = {
+            'save_risk_config': (self.handle_risk_config_save, POLICY_CONFIG_WRITE),
+            'get_risk_config': (self.handle_risk_config_get, POLICY_INLINE),
+            'save_strategy_config': (self.handle_strategy_config_save, POLICY_CONFIG_WRITE),
+            'get_strategy_config': (self.handle_strategy_config_get, POLICY_INLINE),
+            'add_watchlist_symbol': (self.handle_add_watchlist_symbol, POLICY_CONFIG_WRITE),
+            'remove_watchlist_symbol': (self.handle_remove_watchlist_symbol, POLICY_CONFIG_WRITE),
+            'get_watchlist': (self.handle_get_watchlist, POLICY_INLINE),
+            'refresh_watchlist_with_cleanup': (self.handle_refresh_watchlist_with_cleanup, POLICY_THREAD),
+            'check_auth_status': (self.handle_check_auth_status, POLICY_THREAD),
+            'exchange_tokens': (self.handle_exchange_tokens, POLICY_THREAD),
+            'save_trading_config': (self.handle_trading_config_save, POLICY_CONFIG_WRITE),
+            'get_trading_config': (self.handle_trading_config_get, POLICY_INLINE),
+            'save_risk_settings': (self.handle_risk_settings_save, POLICY_CONFIG_WRITE),
+            'save_strategy_watchlist': (self.handle_strategy_watchlist_save, POLICY_CONFIG_WRITE),
+            'get_strategy_watchlist': (self.handle_strategy_watchlist_get, POLICY_INLINE),
+            'add_strategy_watchlist_symbol': (self.handle_add_strategy_watchlist_symbol, POLICY_CONFIG_WRITE),
+            'remove_strategy_watchlist_symbol': (self.handle_remove_strategy_watchlist_symbol, POLICY_CONFIG_WRITE),
+            'run_strategy': (self.handle_run_strategy, POLICY_THREAD),
+            'stop_strategy': (self.handle_stop_strategy, POLICY_THREAD),
+            'execute_python_script': (self.handle_execute_python_script, POLICY_THREAD),
+            'stop_python_script': (self.handle_stop_python_script, POLICY_THREAD),
+            'get_strategy_status': (self.handle_get_strategy_status, POLICY_INLINE),
+            'save_timing_settings': (self.handle_timing_settings_save, POLICY_CONFIG_WRITE),
+            'get_timing_settings': (self.handle_timing_settings_get, POLICY_INLINE),
+            'close_all_positions': (self.handle_close_all_positions, POLICY_THREAD),
+            'request_trading_statistics': (self.handle_request_trading_statistics, POLICY_THREAD),
+            'get_control_metrics': (self.handle_get_control_metrics, POLICY_INLINE),
+        }
+        for message_type, (handler, policy) in handlers.items():
+            self.register(message_type, handler, policy)
+    
+    def register(self, message_type: str, handler: Callable, policy: str = POLICY_INLINE):
+        """
+        Register (or replace) the handler for a message type.
+        
+        Args:
+            message_type: Client message 'type' routed to the handler
+            handler: Coroutine function taking (websocket) or (websocket, client_msg)
+            policy: POLICY_INLINE, POLICY_THREAD or POLICY_CONFIG_WRITE
+        """
+        if policy not in (POLICY_INLINE, POLICY_THREAD, POLICY_CONFIG_WRITE):
+            raise ValueError(f"Unknown execution policy: {policy}")
+        takes_message = len(inspect.signature(handler).parameters) > 1
+        self.dispatch_table[message_type] = (handler, policy, takes_message)
     
     async def handle_message(self, websocket, client_msg, client_addr):
-        """Route control messages to appropriate handlers"""
+        """Route control messages to their registered handler under its execution policy"""
         message_type = client_msg.get('type')
+        entry = self.dispatch_table.get(message_type)
+        if entry is None:
+            logger.warning(f"⚠️ Unknown message type: {message_type}")
+            return False
         
+        handler, policy, takes_message = entry
+        logger.info(f"📨 Received {message_type} message from {client_addr}")
+        
+        start = time.perf_counter()
+        failed = False
         try:
-            if message_type == 'save_risk_config':
-                await self.handle_risk_config_save(websocket, client_msg)
-            
-            elif message_type == 'get_risk_config':
-                await self.handle_risk_config_get(websocket)
-            
-            elif message_type == 'save_strategy_config':
-                logger.info(f"📨 Received save_strategy_config message from {client_addr}")
-                await self.handle_strategy_config_save(websocket, client_msg)
-            
-            elif message_type == 'get_strategy_config':
-                logger.info(f"📨 Received get_strategy_config message from {client_addr}")
-                await self.handle_strategy_config_get(websocket)
-            
-            elif message_type == 'add_watchlist_symbol':
-                logger.info(f"📨 Received add_watchlist_symbol message from {client_addr}")
-                await self.handle_add_watchlist_symbol(websocket, client_msg)
-            
-            elif message_type == 'remove_watchlist_symbol':
-                logger.info(f"📨 Received remove_watchlist_symbol message from {client_addr}")
-                await self.handle_remove_watchlist_symbol(websocket, client_msg)
-            
-            elif message_type == 'get_watchlist':
-                logger.info(f"📨 Received get_watchlist message from {client_addr}")
-                await self.handle_get_watchlist(websocket)
-            
-            elif message_type == 'refresh_watchlist_with_cleanup':
-                logger.info(f"📨 Received refresh_watchlist_with_cleanup message from {client_addr}")
-                await self.handle_refresh_watchlist_with_cleanup(websocket)
-            
-            elif message_type == 'check_auth_status':
-                logger.info(f"📨 Received check_auth_status message from {client_addr}")
-                await self.handle_check_auth_status(websocket)
-            
-            elif message_type == 'exchange_tokens':
-                logger.info(f"📨 Received exchange_tokens message from {client_addr}")
-                await self.handle_exchange_tokens(websocket, client_msg)
-            
-            elif message_type == 'save_trading_config':
-                logger.info(f"📨 Received save_trading_config message from {client_addr}")
-                await self.handle_trading_config_save(websocket, client_msg)
-            
-            elif message_type == 'get_trading_config':
-                logger.info(f"📨 Received get_trading_config message from {client_addr}")
-                await self.handle_trading_config_get(websocket)
-            
-            elif message_type == 'save_risk_settings':
-                logger.info(f"📨 Received save_risk_settings message from {client_addr}")
-                await self.handle_risk_settings_save(websocket, client_msg)
-            
-            elif message_type == 'save_strategy_watchlist':
-                logger.info(f"📨 Received save_strategy_watchlist message from {client_addr}")
-                await self.handle_strategy_watchlist_save(websocket, client_msg)
-            
-            elif message_type == 'get_strategy_watchlist':
-                logger.info(f"📨 Received get_strategy_watchlist message from {client_addr}")
-                await self.handle_strategy_watchlist_get(websocket, client_msg)
-            
-            elif message_type == 'add_strategy_watchlist_symbol':
-                logger.info(f"📨 Received add_strategy_watchlist_symbol message from {client_addr}")
-                await self.handle_add_strategy_watchlist_symbol(websocket, client_msg)
-            
-            elif message_type == 'remove_strategy_watchlist_symbol':
-                logger.info(f"📨 Received remove_strategy_watchlist_symbol message from {client_addr}")
-                await self.handle_remove_strategy_watchlist_symbol(websocket, client_msg)
-            
-            elif message_type == 'run_strategy':
-                logger.info(f"📨 Received run_strategy message from {client_addr}")
-                await self.handle_run_strategy(websocket, client_msg)
-            
-            elif message_type == 'stop_strategy':
-                logger.info(f"📨 Received stop_strategy message from {client_addr}")
-                await self.handle_stop_strategy(websocket, client_msg)
-            
-            elif message_type == 'execute_python_script':
-                logger.info(f"📨 Received execute_python_script message from {client_addr}")
-                await self.handle_execute_python_script(websocket, client_msg)
-            
-            elif message_type == 'stop_python_script':
-                logger.info(f"📨 Received stop_python_script message from {client_addr}")
-                await self.handle_stop_python_script(websocket, client_msg)
-            
-            elif message_type == 'get_strategy_status':
-                logger.info(f"📨 Received get_strategy_status message from {client_addr}")
-                await self.handle_get_strategy_status(websocket, client_msg)
-            
-            elif message_type == 'save_timing_settings':
-                logger.info(f"📨 Received save_timing_settings message from {client_addr}")
-                await self.handle_timing_settings_save(websocket, client_msg)
-            
-            elif message_type == 'get_timing_settings':
-                logger.info(f"📨 Received get_timing_settings message from {client_addr}")
-                await self.handle_timing_settings_get(websocket, client_msg)
-            
-            elif message_type == 'close_all_positions':
-                logger.info(f"📨 Received close_all_positions message from {client_addr}")
-                await self.handle_close_all_positions(websocket, client_msg)
-            
-            elif message_type == 'request_trading_statistics':
-                logger.info(f"📨 Received request_trading_statistics message from {client_addr}")
-                await self.handle_request_trading_statistics(websocket, client_msg)
-            
+            if policy == POLICY_INLINE:
+                args = (websocket, client_msg) if takes_message else (websocket,)
+                await handler(*args)
             else:
-                logger.warning(f"⚠️ Unknown message type: {message_type}")
-                return False
-            
+                await self._run_in_worker(handler, policy, takes_message, websocket, client_msg)
             return True
             
         except Exception as e:
+            failed = True
             logger.error(f"❌ Error handling {message_type} message: {e}")
             await websocket.send(json.dumps({
                 'type': f'{message_type}_error',
@@ -145,6 +188,34 @@ class ControlHandler:
                 'timestamp': datetime.now().isoformat()
             }))
             return False
+        
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.record(message_type, policy, elapsed, failed)
+            if policy == POLICY_INLINE and elapsed > INLINE_BUDGET_SECONDS:
+                logger.warning(f"🐢 Inline handler {message_type} held the event loop for "
+                               f"{elapsed * 1000:.1f} ms; consider a worker policy")
+    
+    async def _run_in_worker(self, handler, policy, takes_message, websocket, client_msg):
+        """Run a handler coroutine on its own event loop in a worker thread"""
+        loop = asyncio.get_running_loop()
+        worker_websocket = LoopBoundWebSocket(websocket, loop)
+        args = (worker_websocket, client_msg) if takes_message else (worker_websocket,)
+        executor = self.config_write_executor if policy == POLICY_CONFIG_WRITE else self.worker_executor
+        await loop.run_in_executor(executor, asyncio.run, handler(*args))
+    
+    async def handle_get_control_metrics(self, websocket):
+        """Send per message type handler timing"""
+        await websocket.send(json.dumps({
+            'type': 'control_metrics',
+            'metrics': self.metrics.snapshot(),
+            'timestamp': datetime.now().isoformat()
+        }))
+    
+    def shutdown(self):
+        """Stop the worker threads (pending handlers are allowed to finish)"""
+        self.worker_executor.shutdown(wait=False)
+        self.config_write_executor.shutdown(wait=False)
 
     # Risk Management Handlers
     async def handle_risk_config_save(self, websocket, client_msg):
@@ -780,43 +851,22 @@ class ControlHandler:
             
             # Restart real-time monitor process
             try:
-                # Find and terminate existing realtime_monitor.py processes
-                terminated_processes = []
-                
-                for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                    try:
-                        cmdline = proc.info['cmdline']
-                        if cmdline and any('realtime_monitor.py' in arg for arg in cmdline):
-                            logger.info(f"🛑 Terminating existing realtime_monitor process: PID {proc.info['pid']}")
-                            proc.terminate()
-                            terminated_processes.append(proc.info['pid'])
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        continue
-                
-                # Wait for processes to terminate gracefully
-                if terminated_processes:
-                    logger.info(f"⏳ Waiting for {len(terminated_processes)} processes to terminate...")
-                    import time
-                    time.sleep(2)
+                # Stop the supervised realtime_monitor.py process and its process group
+                self.process_supervisor.stop('realtime_monitor.py')
                 
                 # Start new realtime_monitor.py process
                 logger.info("🚀 Starting new realtime_monitor.py process...")
-                monitor_process = subprocess.Popen([
-                    'python3', 'realtime_monitor.py'
-                ], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                cwd=os.getcwd()
+                monitor_process = self.process_supervisor.start(
+                    'realtime_monitor.py', ['python3', 'realtime_monitor.py'], new_session=True
                 )
                 
                 logger.info(f"✅ Started new realtime_monitor.py process with PID: {monitor_process.pid}")
                 
                 # Give the new process a moment to initialize
-                import time
                 time.sleep(1)
                 
                 # Check if the process is still running
-                if monitor_process.poll() is None:
+                if self.process_supervisor.is_running('realtime_monitor.py'):
                     logger.info("✅ Real-time monitor process is running successfully")
                 else:
                     logger.error("❌ Real-time monitor process failed to start")
@@ -1880,36 +1930,22 @@ class ControlHandler:
             logger.info(f"🚀 Starting {script_name} process...")
             
             # Check if script is already running
-            script_running = False
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    cmdline = proc.info['cmdline']
-                    if cmdline and any(script_name in arg for arg in cmdline):
-                        script_running = True
-                        logger.info(f"{script_name} already running: PID {proc.info['pid']}")
-                        break
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
+            script_running = self.process_supervisor.is_running(script_name)
+            if script_running:
+                logger.info(f"{script_name} already running: PID {self.process_supervisor.get(script_name).pid}")
             
             if not script_running:
                 # Start new script process
                 logger.info(f"🚀 Starting new {script_name} process...")
-                script_process = subprocess.Popen([
-                    'python3', script_name
-                ], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                cwd=os.getcwd()
-                )
+                script_process = self.process_supervisor.start(script_name, ['python3', script_name])
                 
                 logger.info(f"✅ Started {script_name} process with PID: {script_process.pid}")
                 
                 # Give the process a moment to initialize
-                import time
                 time.sleep(2)
                 
                 # Check if the process is still running
-                if script_process.poll() is None:
+                if self.process_supervisor.is_running(script_name):
                     logger.info(f"✅ {script_name} is running successfully")
                     success = True
                     message = f"{script_name} started successfully"
@@ -1918,6 +1954,9 @@ class ControlHandler:
                     await self.update_strategy_running_state(strategy_id, True)
                 else:
                     logger.error(f"❌ {script_name} failed to start")
+                    output = self.process_supervisor.tail_log(script_name)
+                    if output:
+                        logger.error(f"❌ Process output: {output}")
                     success = False
                     message = f"{script_name} failed to start"
             else:
@@ -1994,26 +2033,10 @@ class ControlHandler:
         try:
             logger.info(f"🛑 Stopping {script_name} via WebSocket...")
             
-            # Find and terminate script processes
-            terminated_processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    cmdline = proc.info['cmdline']
-                    if cmdline and any(script_name in arg for arg in cmdline):
-                        logger.info(f"🛑 Terminating {script_name} process: PID {proc.info['pid']}")
-                        proc.terminate()
-                        terminated_processes.append(proc.info['pid'])
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            
-            if terminated_processes:
-                # Wait for processes to terminate gracefully
-                logger.info(f"⏳ Waiting for {len(terminated_processes)} processes to terminate...")
-                import time
-                time.sleep(2)
-                
+            # Terminate the supervised script process (waits for it to exit)
+            if self.process_supervisor.stop(script_name):
                 success = True
-                message = f"{script_name} stopped successfully ({len(terminated_processes)} processes terminated)"
+                message = f"{script_name} stopped successfully"
                 
                 # Update running state in trading config
                 await self.update_strategy_running_state(strategy_id, False)
@@ -2397,6 +2420,7 @@ class ControlHandler:
                         'positions_close_failed': result.get('positions_close_failed', 0),
                         'cancelled_orders': result.get('cancelled_orders', []),
                         'closed_positions': result.get('closed_positions', []),
+                        'flatten_metrics': result.get('flatten_metrics'),
                         'execution_time': result.get('execution_time'),
                         'message': result.get('message', 'Close all positions completed'),
                         'timestamp': datetime.now().isoformat()
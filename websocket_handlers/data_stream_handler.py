@@ -8,12 +8,12 @@ import asyncio
 import json
 from datetime import datetime
 import logging
-import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
 
 # Import the database query handler
 from db_query_handler import DatabaseQueryHandler
+from latency_tracer import load_latency_summary
 
 logger = logging.getLogger(__name__)
 
@@ -26,43 +26,67 @@ class DataStreamHandler:
         self.running = False
         self.latest_data = {}
         
+        # Snapshot version, bumped whenever latest_data changes; lets the server
+        # reuse pre-serialized messages until the next change
+        self.data_version = 0
+        self.snapshot_ready = asyncio.Event()
+        
         # Initialize database query handler
         self.db_query_handler = DatabaseQueryHandler()
         
         # Data polling interval (seconds)
         self.polling_interval = 3
         
-        # Start data polling thread
-        self.data_thread = None
+        # Polling task on the server loop; blocking DB queries run on a single worker
+        # thread so the psycopg2 connection is never used concurrently
+        self.poll_task = None
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-poll')
     
     def start_data_polling(self):
-        """Start background thread to poll database for updates"""
-        def poll_data():
-            logger.info("🔄 Starting PostgreSQL database polling thread")
-            while self.running:
-                try:
-                    # Get latest data from database
-                    new_data = self.get_latest_data()
-                    
-                    # Check if data content has actually changed
-                    if new_data != self.latest_data:
-                        self.latest_data = new_data
-                        
-                        # Broadcast to all connected clients via callback
-                        if self.broadcast_callback:
-                            asyncio.run(self.broadcast_callback(new_data))
-                    
-                    time.sleep(self.polling_interval)  # Poll every 3 seconds
+        """Start the database polling task on the running event loop"""
+        self.running = True
+        self.poll_task = asyncio.get_running_loop().create_task(self.poll_data())
+    
+    async def poll_data(self):
+        """Poll the database and broadcast changes from the loop that owns the connections"""
+        logger.info("🔄 Starting PostgreSQL database polling task")
+        loop = asyncio.get_running_loop()
+        
+        while self.running:
+            try:
+                # Get latest data from database without blocking the event loop
+                new_data = await loop.run_in_executor(self.db_executor, self.get_latest_data)
+                
+                # Check if data content has actually changed (fetch times always do)
+                if self._content(new_data) != self._content(self.latest_data):
+                    self.data_version += 1
+                    new_data['version'] = self.data_version
+                    self.latest_data = new_data
+                    self.snapshot_ready.set()
                     
-                except Exception as e:
-                    logger.error(f"❌ Error in database polling: {e}")
-                    time.sleep(5)  # Wait longer on error
-            
-            logger.info("🛑 Database polling thread stopped")
+                    # Broadcast to all connected clients via callback
+                    if self.broadcast_callback:
+                        await self.broadcast_callback(new_data)
+                
+                await asyncio.sleep(self.polling_interval)  # Poll every 3 seconds
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ Error in database polling: {e}")
+                await asyncio.sleep(5)  # Wait longer on error
         
-        self.running = True
-        self.data_thread = threading.Thread(target=poll_data, daemon=True)
-        self.data_thread.start()
+        logger.info("🛑 Database polling task stopped")
+    
+    @staticmethod
+    def _content(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Snapshot without its version and fetch/write times, for change detection"""
+        content = {key: value for key, value in data.items() if key not in ('version', 'timestamp')}
+        if isinstance(content.get('signal_latency'), dict):
+            content['signal_latency'] = {
+                key: value for key, value in content['signal_latency'].items() if key != 'updated_at'
+            }
+        return content
     
     def get_latest_data(self) -> Dict[str, Any]:
         """Get latest data from PostgreSQL database"""
@@ -147,6 +171,12 @@ class DataStreamHandler:
                 data['market_status'] = dashboard_data['market_status']
                 data['data_types'].append('market_status')
             
+            # Signal-to-order latency percentiles written by the trading engines
+            latency_summary = load_latency_summary()
+            if latency_summary and latency_summary.get('strategies'):
+                data['signal_latency'] = latency_summary
+                data['data_types'].append('signal_latency')
+            
             # Add summary statistics
             data['summary'] = {
                 'total_pml_signals': len(data.get('pml_signals', [])),
@@ -174,16 +204,39 @@ class DataStreamHandler:
                 'database_connected': False
             }
     
-    def get_initial_data(self):
-        """Get initial data for new clients"""
-        if self.latest_data:
-            return self.latest_data
-        else:
-            return self.get_latest_data()
+    async def get_initial_data(self, timeout: float = 10) -> Dict[str, Any]:
+        """
+        Get the cached snapshot for new clients and request_data.
+        
+        Served from memory; before the first poll completes, callers wait for it
+        instead of querying the database themselves.
+        
+        Args:
+            timeout: Seconds to wait for the first snapshot
+            
+        Returns:
+            Latest versioned snapshot, or an empty placeholder if none is ready
+        """
+        if not self.latest_data:
+            try:
+                await asyncio.wait_for(self.snapshot_ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ No database snapshot available yet for new client")
+                return {
+                    'timestamp': datetime.now().isoformat(),
+                    'data_types': [],
+                    'data_source': 'postgresql'
+                }
+        return self.latest_data
     
     def stop(self):
         """Stop the data polling"""
         logger.info("🛑 Stopping data stream handler...")
         self.running = False
-        if self.data_thread and self.data_thread.is_alive():
-            self.data_thread.join(timeout=5)
+        if self.poll_task and not self.poll_task.done():
+            try:
+                self.poll_task.cancel()
+            except RuntimeError:
+                # Event loop already closed; the task went with it
+                pass
+        self.db_executor.shutdown(wait=False)
@@ -6,13 +6,12 @@ Handles start/stop control for the real-time data monitor script
 
 import asyncio
 import json
-import subprocess
-import os
 import psutil
-import signal
 from datetime import datetime
 import logging
 
+from process_supervisor import get_process_supervisor
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -23,7 +22,7 @@ class RealtimeDataHandler:
     def __init__(self, broadcast_callback=None, auto_start=True):
         """Initialize the real-time data handler"""
         self.broadcast_callback = broadcast_callback
-        self.monitor_process = None
+        self.process_supervisor = get_process_supervisor()
         self.monitor_pid = None
         self.script_name = 'realtime_monitor.py'
         self.is_running = False
@@ -39,21 +38,12 @@ class RealtimeDataHandler:
         logger.info("📊 Real-time Data Handler initialized")
     
     def _check_existing_process(self):
-        """Check if realtime monitor is already running"""
+        """Check if the supervisor adopted a realtime monitor started before this server"""
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    cmdline = proc.info['cmdline']
-                    if cmdline and any(self.script_name in arg for arg in cmdline):
-                        self.monitor_pid = proc.info['pid']
-                        self.monitor_process = psutil.Process(self.monitor_pid)
-                        self.is_running = True
-                        logger.info(f"🔍 Found existing realtime monitor process PID: {self.monitor_pid}")
-                        return
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            
-            logger.info("🔍 No existing realtime monitor process found")
+            if self._is_monitor_running():
+                logger.info(f"🔍 Found existing realtime monitor process PID: {self.monitor_pid}")
+            else:
+                logger.info("🔍 No existing realtime monitor process found")
             
         except Exception as e:
             logger.error(f"❌ Error checking for existing process: {e}")
@@ -103,17 +93,12 @@ class RealtimeDataHandler:
             
             logger.info("🚀 Auto-starting real-time data monitor...")
             
-            # Start the realtime monitor process
-            self.monitor_process = subprocess.Popen([
-                'python3', self.script_name
-            ], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            cwd=os.getcwd(),
-            preexec_fn=os.setsid  # Create new process group for clean shutdown
+            # Start the realtime monitor in its own process group so stopping it also stops its scripts
+            monitor_process = self.process_supervisor.start(
+                self.script_name, ['python3', self.script_name], new_session=True
             )
             
-            self.monitor_pid = self.monitor_process.pid
+            self.monitor_pid = monitor_process.pid
             self.is_running = True
             
             logger.info(f"✅ Auto-started real-time data monitor with PID: {self.monitor_pid}")
@@ -122,7 +107,7 @@ class RealtimeDataHandler:
             await asyncio.sleep(3)
             
             # Check if it's still running
-            if self.monitor_process.poll() is None:
+            if self.process_supervisor.is_running(self.script_name):
                 logger.info("✅ Real-time data monitor is running successfully (auto-started)")
                 
                 # Broadcast status update to all clients
@@ -137,27 +122,18 @@ class RealtimeDataHandler:
                 
             else:
                 # Process failed to start
-                return_code = self.monitor_process.returncode
-                stderr_output = ""
-                
-                try:
-                    stdout_output, stderr_output = self.monitor_process.communicate(timeout=5)
-                    if isinstance(stderr_output, bytes):
-                        stderr_output = stderr_output.decode('utf-8')
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not get process output: {e}")
+                return_code = self.process_supervisor.status(self.script_name).get('exit_code')
+                stderr_output = self.process_supervisor.tail_log(self.script_name)
                 
                 logger.error(f"❌ Real-time data monitor auto-start failed (return code: {return_code})")
                 if stderr_output:
                     logger.error(f"❌ Process stderr: {stderr_output.strip()}")
                 
-                self.monitor_process = None
                 self.monitor_pid = None
                 self.is_running = False
             
         except Exception as e:
             logger.error(f"❌ Error auto-starting real-time data monitor: {e}")
-            self.monitor_process = None
             self.monitor_pid = None
             self.is_running = False
     
@@ -178,17 +154,12 @@ class RealtimeDataHandler:
             
             logger.info(f"🚀 Starting realtime monitor: {self.script_name}")
             
-            # Start the realtime monitor process
-            self.monitor_process = subprocess.Popen([
-                'python3', self.script_name
-            ], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            cwd=os.getcwd(),
-            preexec_fn=os.setsid  # Create new process group for clean shutdown
+            # Start the realtime monitor in its own process group so stopping it also stops its scripts
+            monitor_process = self.process_supervisor.start(
+                self.script_name, ['python3', self.script_name], new_session=True
             )
             
-            self.monitor_pid = self.monitor_process.pid
+            self.monitor_pid = monitor_process.pid
             self.is_running = True
             
             logger.info(f"✅ Started realtime monitor process with PID: {self.monitor_pid}")
@@ -197,7 +168,7 @@ class RealtimeDataHandler:
             await asyncio.sleep(2)
             
             # Check if it's still running
-            if self.monitor_process.poll() is None:
+            if self.process_supervisor.is_running(self.script_name):
                 logger.info("✅ Realtime monitor process is running successfully")
                 
                 # Send success response
@@ -222,21 +193,13 @@ class RealtimeDataHandler:
                 
             else:
                 # Process failed to start
-                return_code = self.monitor_process.returncode
-                stderr_output = ""
-                
-                try:
-                    stdout_output, stderr_output = self.monitor_process.communicate(timeout=5)
-                    if isinstance(stderr_output, bytes):
-                        stderr_output = stderr_output.decode('utf-8')
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not get process output: {e}")
+                return_code = self.process_supervisor.status(self.script_name).get('exit_code')
+                stderr_output = self.process_supervisor.tail_log(self.script_name)
                 
                 logger.error(f"❌ Realtime monitor process failed to start (return code: {return_code})")
                 if stderr_output:
                     logger.error(f"❌ Process stderr: {stderr_output.strip()}")
                 
-                self.monitor_process = None
                 self.monitor_pid = None
                 self.is_running = False
                 
@@ -250,7 +213,6 @@ class RealtimeDataHandler:
             
         except Exception as e:
             logger.error(f"❌ Error starting realtime monitor: {e}")
-            self.monitor_process = None
             self.monitor_pid = None
             self.is_running = False
             
@@ -276,31 +238,10 @@ class RealtimeDataHandler:
             
             logger.info(f"🛑 Stopping realtime monitor process PID: {self.monitor_pid}")
             
-            # Try to terminate gracefully first
-            if psutil.pid_exists(self.monitor_pid):
-                try:
-                    proc = psutil.Process(self.monitor_pid)
-                    
-                    # Send SIGTERM to the process group to stop all child processes
-                    os.killpg(os.getpgid(self.monitor_pid), signal.SIGTERM)
-                    
-                    # Wait for graceful termination
-                    try:
-                        proc.wait(timeout=10)
-                        logger.info("✅ Realtime monitor process terminated gracefully")
-                    except psutil.TimeoutExpired:
-                        logger.warning("⚠️ Process didn't terminate gracefully, killing...")
-                        os.killpg(os.getpgid(self.monitor_pid), signal.SIGKILL)
-                        proc.wait(timeout=5)
-                        logger.info("✅ Realtime monitor process killed")
-                        
-                except psutil.NoSuchProcess:
-                    logger.info("ℹ️ Process already terminated")
-                except ProcessLookupError:
-                    logger.info("ℹ️ Process group already terminated")
+            # SIGTERM to the process group, SIGKILL if it does not exit in time (waited on off the loop)
+            await asyncio.get_running_loop().run_in_executor(None, self.process_supervisor.stop, self.script_name)
             
             # Clear tracking
-            self.monitor_process = None
             self.monitor_pid = None
             self.is_running = False
             
@@ -325,7 +266,6 @@ class RealtimeDataHandler:
         except Exception as e:
             logger.error(f"❌ Error stopping realtime monitor: {e}")
             # Clear tracking anyway
-            self.monitor_process = None
             self.monitor_pid = None
             self.is_running = False
             
@@ -355,7 +295,6 @@ class RealtimeDataHandler:
                     }
                 except psutil.NoSuchProcess:
                     is_running = False
-                    self.monitor_process = None
                     self.monitor_pid = None
                     self.is_running = False
             
@@ -406,37 +345,10 @@ class RealtimeDataHandler:
     def _is_monitor_running(self):
         """Check if realtime monitor process is currently running"""
         try:
-            # First check our tracked PID
-            if self.monitor_pid and psutil.pid_exists(self.monitor_pid):
-                try:
-                    proc = psutil.Process(self.monitor_pid)
-                    cmdline = proc.cmdline()
-                    if any(self.script_name in arg for arg in cmdline):
-                        return True
-                except psutil.NoSuchProcess:
-                    pass
-            
-            # Fallback: search all processes
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    cmdline = proc.info['cmdline']
-                    if cmdline and any(self.script_name in arg for arg in cmdline):
-                        # Update our tracking if we found it
-                        if not self.monitor_pid:
-                            self.monitor_pid = proc.info['pid']
-                            logger.info(f"🔍 Found existing realtime monitor process PID: {self.monitor_pid}")
-                        return True
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            
-            # Clear tracking if not found
-            if self.monitor_pid:
-                logger.debug("🔍 Realtime monitor process not found - clearing tracking")
-                self.monitor_process = None
-                self.monitor_pid = None
-                self.is_running = False
-            
-            return False
+            status = self.process_supervisor.status(self.script_name)
+            self.monitor_pid = status['pid']
+            self.is_running = status['is_running']
+            return self.is_running
             
         except Exception as e:
             logger.error(f"❌ Error checking if realtime monitor is running: {e}")
@@ -0,0 +1,173 @@
+"""
+WebSocket Subscription Manager
+Per-client subscription state and topic-filtered, serialize-once message building
+"""
+
+import logging
+import time
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterable
+
+from .wire_format import ENCODERS, WireMetrics, encoding_for
+
+logger = logging.getLogger(__name__)
+
+# Keys of a data stream snapshot that every subscriber receives
+METADATA_KEYS = ('timestamp', 'version', 'data_source', 'error', 'database_connected', 'summary')
+
+
+class SubscriptionManager:
+    """
+    Tracks which data types (and optionally which symbols) each client wants and
+    builds filtered data messages, serializing every topic once per broadcast.
+
+    A client that never sent ``subscribe`` receives every data type, so existing
+    dashboards keep working unchanged.
+    """
+
+    def __init__(self, metrics: Optional[WireMetrics] = None):
+        # websocket -> {data_type: set of symbols, or None for all symbols}
+        self.subscriptions: Dict[Any, Dict[str, Optional[Set[str]]]] = {}
+        self.metrics = metrics
+        
+        # Encoded fragments and messages of the latest versioned snapshot, reused
+        # by connects and request_data until the snapshot version changes
+        self._cache_version = None
+        self._fragments: Dict[Tuple[str, str, Optional[frozenset]], Any] = {}
+        self._messages_by_key: Dict[tuple, Any] = {}
+
+    def subscribe(self, websocket, data_types, symbols: Optional[List[str]] = None) -> Dict[str, Optional[List[str]]]:
+        """
+        Add data types to a client's subscription.
+
+        Args:
+            websocket: Client connection
+            data_types: List of data types, or dict of data type -> symbols (None for all)
+            symbols: Symbol filter applied to every data type given as a list
+
+        Returns:
+            The client's full subscription after the update
+        """
+        if isinstance(data_types, dict):
+            requested = data_types
+        else:
+            requested = {data_type: symbols for data_type in (data_types or [])}
+
+        client_subscription = self.subscriptions.setdefault(websocket, {})
+        for data_type, type_symbols in requested.items():
+            client_subscription[data_type] = set(type_symbols) if type_symbols else None
+
+        return self.describe(websocket)
+
+    def unsubscribe(self, websocket, data_types: Iterable[str]) -> Dict[str, Optional[List[str]]]:
+        """Remove data types from a client's subscription."""
+        client_subscription = self.subscriptions.setdefault(websocket, {})
+        for data_type in data_types or []:
+            client_subscription.pop(data_type, None)
+        return self.describe(websocket)
+
+    def remove_client(self, websocket):
+        """Forget a disconnected client."""
+        self.subscriptions.pop(websocket, None)
+
+    def describe(self, websocket) -> Dict[str, Optional[List[str]]]:
+        """JSON-friendly view of a client's subscription."""
+        return {
+            data_type: sorted(type_symbols) if type_symbols is not None else None
+            for data_type, type_symbols in self.subscriptions.get(websocket, {}).items()
+        }
+
+    def build_messages(self, data: Dict[str, Any], clients: Iterable[Any]) -> Dict[Any, Any]:
+        """
+        Build the encoded data message for each client.
+
+        Each topic is encoded once per wire encoding and distinct symbol filter,
+        and clients with the same encoding and subscription share one message.
+        For versioned snapshots the encoded messages are cached, so repeated
+        builds of the same version cost no serialization.
+
+        Args:
+            data: Data stream snapshot (see DataStreamHandler.get_latest_data)
+            clients: Connections to build messages for
+
+        Returns:
+            Dict of websocket -> message (str for JSON, bytes for MessagePack);
+            clients subscribed to none of the snapshot's data types are omitted
+        """
+        data_types = [data_type for data_type in data.get('data_types', []) if data_type in data]
+        version = data.get('version')
+        if version is not None and version == self._cache_version:
+            fragments = self._fragments
+            messages_by_key = self._messages_by_key
+        else:
+            fragments = {}
+            messages_by_key = {}
+            if version is not None:
+                self._cache_version = version
+                self._fragments = fragments
+                self._messages_by_key = messages_by_key
+        messages = {}
+
+        for websocket in clients:
+            encoding = encoding_for(websocket)
+            client_subscription = self.subscriptions.get(websocket)
+            if client_subscription is None:
+                topics = tuple((data_type, None) for data_type in data_types)
+            else:
+                topics = tuple(
+                    (data_type, frozenset(client_subscription[data_type]) if client_subscription[data_type] is not None else None)
+                    for data_type in data_types if data_type in client_subscription
+                )
+
+            key = (encoding, topics)
+            if key not in messages_by_key:
+                if not topics and data_types:
+                    messages_by_key[key] = None
+                else:
+                    messages_by_key[key] = self._build_message(data, encoding, topics, fragments)
+
+            if messages_by_key[key] is not None:
+                messages[websocket] = messages_by_key[key]
+
+        return messages
+
+    def build_message(self, data: Dict[str, Any], websocket) -> Optional[Any]:
+        """Build the encoded data message for a single client."""
+        return self.build_messages(data, [websocket]).get(websocket)
+
+    def _build_message(self, data: Dict[str, Any], encoding: str, topics: tuple, fragments: Dict) -> Any:
+        """Assemble one message from cached key/value fragments."""
+        encoder = ENCODERS[encoding]
+        items = []
+
+        for key in METADATA_KEYS:
+            if key in data:
+                items.append((encoder.encode(key), self._fragment(fragments, encoder, key, None, data[key], 'data_metadata')))
+        items.append((encoder.encode('data_types'), encoder.encode([data_type for data_type, _ in topics])))
+
+        for data_type, type_symbols in topics:
+            value = self._fragment(
+                fragments, encoder, data_type, type_symbols,
+                self._filter_symbols(data[data_type], type_symbols),
+                data_type
+            )
+            items.append((encoder.encode(data_type), value))
+
+        return encoder.join_map(items)
+
+    def _fragment(self, fragments: Dict, encoder, name: str, type_symbols: Optional[frozenset],
+                  value: Any, metric_type: str) -> Any:
+        """Encode a value once per broadcast and record its size and encode time."""
+        fragment_key = (encoder.name, name, type_symbols)
+        if fragment_key not in fragments:
+            start = time.perf_counter()
+            fragments[fragment_key] = encoder.encode(value)
+            if self.metrics:
+                self.metrics.record(metric_type, encoder.name, encoder.size(fragments[fragment_key]),
+                                    time.perf_counter() - start)
+        return fragments[fragment_key]
+
+    def _filter_symbols(self, payload: Any, symbols: Optional[frozenset]) -> Any:
+        """Keep only the requested symbols from a list of symbol records; other payloads pass through."""
+        if symbols is None or not isinstance(payload, list):
+            return payload
+        return [item for item in payload if not isinstance(item, dict) or item.get('symbol') in symbols]
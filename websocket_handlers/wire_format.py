@@ -0,0 +1,141 @@
+"""
+WebSocket Wire Format
+Encoding negotiated per connection (JSON text or MessagePack binary) and
+per-message-type payload size / encode-time metrics
+"""
+
+import json
+import logging
+import time
+from typing import Dict, Any, Optional, Sequence
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Subprotocols offered by the dashboard; clients that offer none get JSON
+MSGPACK_SUBPROTOCOL = 'volflow.msgpack'
+JSON_SUBPROTOCOL = 'volflow.json'
+
+
+def available_subprotocols():
+    """Subprotocols this server can speak, in order of preference."""
+    if msgpack is not None:
+        return [MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL]
+    return [JSON_SUBPROTOCOL]
+
+
+def select_subprotocol(connection, subprotocols: Sequence[str]) -> Optional[str]:
+    """
+    Pick the wire encoding during the WebSocket handshake.
+
+    MessagePack is chosen when the client offers it and msgpack is installed;
+    clients offering no subprotocol are still accepted and receive JSON.
+    """
+    for subprotocol in available_subprotocols():
+        if subprotocol in subprotocols:
+            return subprotocol
+    return None
+
+
+def encoding_for(websocket) -> str:
+    """Encoding negotiated for a connection: 'msgpack' or 'json'."""
+    if getattr(websocket, 'subprotocol', None) == MSGPACK_SUBPROTOCOL and msgpack is not None:
+        return 'msgpack'
+    return 'json'
+
+
+class JsonEncoder:
+    """Text frames; map fragments are joined exactly as json.dumps would"""
+
+    name = 'json'
+
+    def encode(self, value: Any) -> str:
+        return json.dumps(value, default=str)
+
+    def join_map(self, items) -> str:
+        return '{' + ', '.join(key + ': ' + value for key, value in items) + '}'
+
+    def size(self, fragment: str) -> int:
+        return len(fragment.encode('utf-8'))
+
+
+class MsgpackEncoder:
+    """Binary frames; map fragments are concatenated behind a MessagePack map header"""
+
+    name = 'msgpack'
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def join_map(self, items) -> bytes:
+        items = list(items)
+        count = len(items)
+        if count < 16:
+            header = bytes([0x80 | count])
+        elif count < 0x10000:
+            header = b'\xde' + count.to_bytes(2, 'big')
+        else:
+            header = b'\xdf' + count.to_bytes(4, 'big')
+        return header + b''.join(key + value for key, value in items)
+
+    def size(self, fragment: bytes) -> int:
+        return len(fragment)
+
+
+ENCODERS = {'json': JsonEncoder()}
+if msgpack is not None:
+    ENCODERS['msgpack'] = MsgpackEncoder()
+
+
+class WireMetrics:
+    """Payload bytes and encode time per message type and encoding"""
+
+    def __init__(self, log_interval: float = 300):
+        """
+        Initialize metrics.
+
+        Args:
+            log_interval: Seconds between summary log lines
+        """
+        self.stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.log_interval = log_interval
+        self.last_log = time.monotonic()
+
+    def record(self, message_type: str, encoding: str, size: int, encode_seconds: float):
+        """Record one encoded payload (before permessage-deflate)."""
+        entry = self.stats.setdefault(message_type, {}).setdefault(
+            encoding, {'count': 0, 'bytes': 0, 'encode_seconds': 0.0}
+        )
+        entry['count'] += 1
+        entry['bytes'] += size
+        entry['encode_seconds'] += encode_seconds
+
+        if time.monotonic() - self.last_log >= self.log_interval:
+            self.log_summary()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Totals and per-message averages for every message type."""
+        return {
+            message_type: {
+                encoding: {
+                    'count': entry['count'],
+                    'total_bytes': entry['bytes'],
+                    'avg_bytes': entry['bytes'] / entry['count'],
+                    'avg_encode_ms': entry['encode_seconds'] * 1000 / entry['count']
+                }
+                for encoding, entry in encodings.items()
+            }
+            for message_type, encodings in self.stats.items()
+        }
+
+    def log_summary(self):
+        """Log the current metrics."""
+        self.last_log = time.monotonic()
+        for message_type, encodings in sorted(self.snapshot().items()):
+            for encoding, entry in encodings.items():
+                logger.info(f"📦 {message_type} [{encoding}]: {entry['count']} msgs, "
+                            f"avg {entry['avg_bytes']:,.0f} bytes, avg encode {entry['avg_encode_ms']:.2f} ms")
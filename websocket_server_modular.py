@@ -9,17 +9,21 @@ import websockets
 import json
 import subprocess
 import os
+import time
 from datetime import datetime
 import logging
 from typing import Dict, List, Any
 
 # Import modular handlers
 from websocket_handlers.data_stream_handler import DataStreamHandler
-from websocket_handlers.control_handler import ControlHandler
+from websocket_handlers.control_handler import ControlHandler, POLICY_THREAD
 from websocket_handlers.alerts_handler import AlertsHandler
 from websocket_handlers.session_management_handler import SessionManagementHandler
 from websocket_handlers.api_connection_handler import handle_api_connection_websocket
 from websocket_handlers.realtime_monitor_handler import RealtimeDataHandler
+from websocket_handlers.subscription_manager import SubscriptionManager
+from websocket_handlers.client_sender import ClientSender
+from websocket_handlers.wire_format import WireMetrics, available_subprotocols, encoding_for, select_subprotocol
 
 # Import the database query handler
 from db_query_handler import DatabaseQueryHandler
@@ -31,11 +35,24 @@ logger = logging.getLogger(__name__)
 class ModularWebSocketServer:
     """Modular WebSocket server that coordinates between data streaming and control operations"""
     
-    def __init__(self, port=8765):
+    def __init__(self, port=8765, max_client_queue=100, max_client_lag=10.0, compression=True):
         """Initialize the modular WebSocket server"""
         self.port = port
         self.clients = set()
         self.running = False
+        self.loop = None
+        
+        # permessage-deflate plus per-connection JSON/MessagePack encoding
+        self.compression = compression
+        self.wire_metrics = WireMetrics()
+        
+        # Per-client data type / symbol subscriptions
+        self.subscription_manager = SubscriptionManager(self.wire_metrics)
+        
+        # Per-client bounded send queues (slow clients are coalesced, then dropped)
+        self.senders = {}
+        self.max_client_queue = max_client_queue
+        self.max_client_lag = max_client_lag
         
         # Initialize database query handler
         self.db_query_handler = DatabaseQueryHandler()
@@ -43,6 +60,8 @@ class ModularWebSocketServer:
         # Initialize handlers with broadcast callback
         self.data_handler = DataStreamHandler(self.broadcast_data)
         self.control_handler = ControlHandler(self.broadcast_message, self.db_query_handler)
+        # close_all_positions waits on the API script, so it runs in a control worker thread
+        self.control_handler.register('close_all_positions', self.handle_close_all_positions, POLICY_THREAD)
         self.alerts_handler = AlertsHandler(self.broadcast_message, self.db_query_handler)
         self.session_handler = SessionManagementHandler(self.broadcast_message, self.db_query_handler)
         self.realtime_data_handler = RealtimeDataHandler(self.broadcast_message, auto_start=True)
@@ -98,6 +117,7 @@ class ModularWebSocketServer:
                         'positions_close_failed': result.get('positions_close_failed', 0),
                         'cancelled_orders': result.get('cancelled_orders', []),
                         'closed_positions': result.get('closed_positions', []),
+                        'flatten_metrics': result.get('flatten_metrics'),
                         'execution_time': result.get('execution_time'),
                         'message': result.get('message', 'Close all positions completed'),
                         'timestamp': datetime.now().isoformat()
@@ -166,63 +186,77 @@ class ModularWebSocketServer:
             }))
     
     async def broadcast_data(self, data):
-        """Broadcast data to all connected clients"""
-        if not self.clients:
+        """Broadcast data to connected clients, filtered by each client's subscription"""
+        if not self.senders:
             return
         
-        message = json.dumps(data, default=str)
-        disconnected_clients = set()
-        
-        for client in self.clients.copy():
-            try:
-                await client.send(message)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.add(client)
-            except Exception as e:
-                logger.error(f"❌ Error sending data to client: {e}")
-                disconnected_clients.add(client)
-        
-        # Remove disconnected clients
-        self.clients -= disconnected_clients
-        
-        if disconnected_clients:
-            logger.info(f"🔌 Removed {len(disconnected_clients)} disconnected clients")
+        self._call_on_server_loop(self._fan_out_data, data)
     
     async def broadcast_message(self, message_dict):
         """Broadcast control message to all connected clients"""
-        if not self.clients:
+        if not self.senders:
             return
         
+        start = time.perf_counter()
         message = json.dumps(message_dict, default=str)
-        disconnected_clients = set()
-        
-        for client in self.clients.copy():
-            try:
-                await client.send(message)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.add(client)
-            except Exception as e:
-                logger.error(f"❌ Error broadcasting message to client: {e}")
-                disconnected_clients.add(client)
-        
-        # Remove disconnected clients
-        self.clients -= disconnected_clients
+        self.wire_metrics.record(message_dict.get('type', 'message'), 'json',
+                                 len(message.encode('utf-8')), time.perf_counter() - start)
+        self._call_on_server_loop(self._fan_out_message, message)
+    
+    def _fan_out_data(self, data):
+        """Queue a data snapshot for every subscribed client (latest snapshot wins)"""
+        # Each topic is serialized once; clients only receive what they subscribed to
+        messages = self.subscription_manager.build_messages(data, list(self.senders))
+        for client, message in messages.items():
+            sender = self.senders.get(client)
+            if sender:
+                sender.enqueue(message, topic='data')
+    
+    def _fan_out_message(self, message):
+        """Queue a control message for every client, in order"""
+        for sender in list(self.senders.values()):
+            sender.enqueue(message)
+    
+    def _call_on_server_loop(self, callback, *args):
+        """Run callback on the event loop that owns the client connections"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
         
-        if disconnected_clients:
-            logger.info(f"🔌 Removed {len(disconnected_clients)} disconnected clients during broadcast")
+        if self.loop is None or running_loop is self.loop:
+            callback(*args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+    
+    def _remove_client(self, websocket):
+        """Forget a client and its sender and subscription state"""
+        self.clients.discard(websocket)
+        sender = self.senders.pop(websocket, None)
+        if sender:
+            sender.close()
+        self.subscription_manager.remove_client(websocket)
     
     async def handle_client(self, websocket):
         """Handle new WebSocket client connection"""
         client_addr = websocket.remote_address
-        logger.info(f"🔗 New client connected: {client_addr}")
+        logger.info(f"🔗 New client connected: {client_addr} (encoding: {encoding_for(websocket)})")
         
-        # Add client to set
+        # Add client to set with its own send queue
         self.clients.add(websocket)
+        self.senders[websocket] = ClientSender(
+            websocket,
+            max_queue=self.max_client_queue,
+            max_lag=self.max_client_lag,
+            on_close=self._remove_client
+        )
         
         try:
-            # Send initial data immediately
-            initial_data = self.data_handler.get_initial_data()
-            await websocket.send(json.dumps(initial_data, default=str))
+            # Send the cached snapshot immediately (superseded by any newer snapshot still queued)
+            initial_data = await self.data_handler.get_initial_data()
+            initial_message = self.subscription_manager.build_message(initial_data, websocket)
+            if initial_message:
+                self.senders[websocket].enqueue(initial_message, topic='data')
             
             # Keep connection alive and handle messages
             async for message in websocket:
@@ -240,26 +274,49 @@ class ModularWebSocketServer:
                         }))
                     
                     elif message_type == 'request_data':
-                        # Send latest data
-                        fresh_data = self.data_handler.get_latest_data()
-                        await websocket.send(json.dumps(fresh_data, default=str))
+                        # Send latest snapshot from memory (no database query)
+                        latest_data = await self.data_handler.get_initial_data()
+                        message = self.subscription_manager.build_message(latest_data, websocket)
+                        sender = self.senders.get(websocket)
+                        if message and sender:
+                            sender.enqueue(message, topic='data')
                     
                     elif message_type == 'subscribe':
-                        # Handle subscription to specific data types
+                        # Handle subscription to specific data types (optionally per symbol)
                         data_types = client_msg.get('data_types', [])
-                        logger.info(f"📡 Client {client_addr} subscribed to: {data_types}")
+                        subscription = self.subscription_manager.subscribe(
+                            websocket, data_types, client_msg.get('symbols')
+                        )
+                        logger.info(f"📡 Client {client_addr} subscribed to: {subscription}")
                         
                         # Send acknowledgment
                         await websocket.send(json.dumps({
                             'type': 'subscription_ack',
                             'subscribed_to': data_types,
+                            'subscriptions': subscription,
                             'timestamp': datetime.now().isoformat()
                         }))
                     
-                    elif message_type == 'close_all_positions':
-                        # Handle close all positions directly in main server
-                        logger.info(f"🚨 Received close_all_positions message from {client_addr}")
-                        await self.handle_close_all_positions(websocket, client_msg)
+                    elif message_type == 'get_wire_metrics':
+                        await websocket.send(json.dumps({
+                            'type': 'wire_metrics',
+                            'encoding': encoding_for(websocket),
+                            'compression': self.compression,
+                            'metrics': self.wire_metrics.snapshot(),
+                            'timestamp': datetime.now().isoformat()
+                        }))
+                    
+                    elif message_type == 'unsubscribe':
+                        data_types = client_msg.get('data_types', [])
+                        subscription = self.subscription_manager.unsubscribe(websocket, data_types)
+                        logger.info(f"📡 Client {client_addr} unsubscribed from: {data_types}")
+                        
+                        await websocket.send(json.dumps({
+                            'type': 'unsubscription_ack',
+                            'unsubscribed_from': data_types,
+                            'subscriptions': subscription,
+                            'timestamp': datetime.now().isoformat()
+                        }))
                     
                     elif message_type in ['get_status', 'refresh_status', 'test_connection']:
                         # Route API connection messages to API connection handler
@@ -326,8 +383,8 @@ class ModularWebSocketServer:
         except Exception as e:
             logger.error(f"❌ Error with client {client_addr}: {e}")
         finally:
-            # Remove client from set
-            self.clients.discard(websocket)
+            # Remove client, its sender and subscriptions
+            self._remove_client(websocket)
             
             # Also unregister from API connection handler if registered
             try:
@@ -342,6 +399,7 @@ class ModularWebSocketServer:
     async def start_server(self):
         """Start the modular WebSocket server"""
         logger.info(f"🚀 Starting Modular WebSocket Server on port {self.port}")
+        self.loop = asyncio.get_running_loop()
         
         try:
             # Start data polling
@@ -353,7 +411,9 @@ class ModularWebSocketServer:
                 "localhost",
                 self.port,
                 ping_interval=2,
-                ping_timeout=10
+                ping_timeout=10,
+                compression="deflate" if self.compression else None,
+                select_subprotocol=select_subprotocol
             )
             
             logger.info(f"✅ Modular WebSocket server running on ws://localhost:{self.port}")
@@ -363,6 +423,8 @@ class ModularWebSocketServer:
             logger.info("⏰ Session management: ACTIVE")
             logger.info("📊 Real-time data monitor: ACTIVE (auto-start enabled)")
             logger.info("🔄 Database polling every 3 seconds")
+            logger.info(f"📦 Wire encodings: {', '.join(available_subprotocols())}, "
+                        f"permessage-deflate: {'on' if self.compression else 'off'}")
             
             # Auto-start real-time data monitor if needed
             await self.realtime_data_handler.start_auto_monitor_if_needed()
@@ -376,6 +438,7 @@ class ModularWebSocketServer:
         finally:
             self.running = False
             self.data_handler.stop()
+            self.control_handler.shutdown()
             # Cleanup real-time data handler
             if hasattr(self, 'realtime_data_handler'):
                 asyncio.create_task(self.realtime_data_handler.cleanup())
@@ -386,6 +449,7 @@ class ModularWebSocketServer:
         logger.info("🛑 Stopping Modular WebSocket server...")
         self.running = False
         self.data_handler.stop()
+        self.control_handler.shutdown()
         # Cleanup real-time data handler
         if hasattr(self, 'realtime_data_handler'):
             asyncio.create_task(self.realtime_data_handler.cleanup())
@@ -396,11 +460,19 @@ def main():
     
     parser = argparse.ArgumentParser(description='Modular PostgreSQL WebSocket Server')
     parser.add_argument('--port', type=int, default=8765, help='WebSocket port (default: 8765)')
+    parser.add_argument('--max-client-queue', type=int, default=100,
+                        help='Undelivered messages per client before disconnecting it (default: 100)')
+    parser.add_argument('--max-client-lag', type=float, default=10.0,
+                        help='Seconds a client may lag behind broadcasts before disconnecting it (default: 10)')
+    
+    parser.add_argument('--no-compression', action='store_true',
+                        help='Disable permessage-deflate compression')
     
     args = parser.parse_args()
     
     # Create and start modular WebSocket server
-    server = ModularWebSocketServer(args.port)
+    server = ModularWebSocketServer(args.port, args.max_client_queue, args.max_client_lag,
+                                    compression=not args.no_compression)
     
     try:
         # Run the WebSocket server